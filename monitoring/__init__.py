@@ -39,6 +39,8 @@ from .prometheus_metrics import (
     update_component_health,
     track_business_metric,
     update_active_sessions,
+    update_executor_metrics,
+    update_temporary_session_metrics,
     get_all_metrics
 )
 
@@ -59,5 +61,7 @@ __all__ = [
     'update_component_health',
     'track_business_metric',
     'update_active_sessions',
+    'update_executor_metrics',
+    'update_temporary_session_metrics',
     'get_all_metrics'
 ] 
\ No newline at end of file
@@ -22,7 +22,9 @@ from .prometheus_metrics import (
     track_performance_metric,
     update_component_health,
     track_business_metric,
-    update_active_sessions
+    update_active_sessions,
+    update_executor_metrics,
+    update_temporary_session_metrics
 )
 
 class PrometheusInstrumentation:
@@ -250,6 +252,31 @@ class PrometheusInstrumentation:
         """
         update_active_sessions(session_type, user_type, count)
     
+    def track_executor_state(self, executor: str, in_flight: int, queue_depth: int,
+                             wait_time: Optional[float] = None, rejected: bool = False):
+        """
+        Track bounded executor load.
+        
+        Args:
+            executor: Executor name
+            in_flight: Tasks currently running
+            queue_depth: Tasks waiting for a worker
+            wait_time: Queue wait of a task that just started (if any)
+            rejected: Whether a task was just rejected
+        """
+        update_executor_metrics(executor, in_flight, queue_depth, wait_time, rejected)
+    
+    def track_temporary_sessions(self, entries: int, bytes_held: int, spilled: int = 0):
+        """
+        Track temporary session store size.
+        
+        Args:
+            entries: Sessions held in memory
+            bytes_held: Estimated bytes held by those sessions
+            spilled: Sessions in the on-disk spill store
+        """
+        update_temporary_session_metrics(entries, bytes_held, spilled)
+    
     def set_component_healthy(self, component: str):
         """Mark a component as healthy."""
         update_component_health(component, "healthy")
@@ -96,6 +96,53 @@ external_api_time = Histogram(
     buckets=[0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0]
 )
 
+# ==================== CONCURRENCY METRICS ====================
+
+# Chat turns currently executing on the bounded executor
+executor_in_flight = Gauge(
+    'chat_executor_in_flight',
+    'Chat turns currently being processed by executor workers',
+    ['executor']
+)
+
+# Chat turns waiting for a free worker
+executor_queue_depth = Gauge(
+    'chat_executor_queue_depth',
+    'Chat turns waiting for an executor worker',
+    ['executor']
+)
+
+# Time spent waiting for a worker
+executor_queue_wait_time = Histogram(
+    'chat_executor_queue_wait_seconds',
+    'Time chat turns waited for an executor worker',
+    ['executor'],
+    buckets=[0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0]
+)
+
+# Turns rejected because the queue was full
+executor_rejections = Counter(
+    'chat_executor_rejections_total',
+    'Chat turns rejected because the executor queue was full',
+    ['executor']
+)
+
+# Anonymous sessions held by the temporary session store
+temporary_session_entries = Gauge(
+    'temporary_sessions_entries',
+    'Temporary (anonymous) sessions held in memory'
+)
+
+temporary_session_bytes = Gauge(
+    'temporary_sessions_bytes',
+    'Estimated bytes held by in-memory temporary sessions'
+)
+
+temporary_session_spilled = Gauge(
+    'temporary_sessions_spilled_entries',
+    'Temporary sessions spilled to the on-disk store'
+)
+
 # ==================== BUSINESS METRICS ====================
 
 # Chat message tracking
@@ -279,6 +326,22 @@ def update_active_sessions(session_type: str, user_type: str, count: int):
         user_type=user_type
     ).set(count)
 
+def update_executor_metrics(executor: str, in_flight: int, queue_depth: int,
+                            wait_time: Optional[float] = None, rejected: bool = False):
+    """Update bounded executor gauges, wait-time histogram and rejections."""
+    executor_in_flight.labels(executor=executor).set(in_flight)
+    executor_queue_depth.labels(executor=executor).set(queue_depth)
+    if wait_time is not None:
+        executor_queue_wait_time.labels(executor=executor).observe(wait_time)
+    if rejected:
+        executor_rejections.labels(executor=executor).inc()
+
+def update_temporary_session_metrics(entries: int, bytes_held: int, spilled: int = 0):
+    """Update temporary session store gauges."""
+    temporary_session_entries.set(entries)
+    temporary_session_bytes.set(bytes_held)
+    temporary_session_spilled.set(spilled)
+
 # ==================== METRICS REGISTRY ====================
 
 def get_all_metrics():
@@ -295,6 +358,13 @@ def get_all_metrics():
         'vector_search_time': vector_search_time,
         'database_query_time': database_query_time,
         'external_api_time': external_api_time,
+        'executor_in_flight': executor_in_flight,
+        'executor_queue_depth': executor_queue_depth,
+        'executor_queue_wait_time': executor_queue_wait_time,
+        'executor_rejections': executor_rejections,
+        'temporary_session_entries': temporary_session_entries,
+        'temporary_session_bytes': temporary_session_bytes,
+        'temporary_session_spilled': temporary_session_spilled,
         'message_count': message_count,
         'active_sessions': active_sessions,
         'memory_operations': memory_operations,
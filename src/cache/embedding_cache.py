@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Query Embedding Cache for Crowd Due Dill
+
+LRU + TTL cache in front of OpenAIEmbeddings.embed_query:
+- Keyed by normalized query text (and embedding model)
+- Vectors kept as compact float32 arrays with a bounded memory budget
+- Optional SQLite store so embeddings survive restarts
+- In-flight de-duplication so concurrent retrieval branches never
+  embed the same string twice
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.utils.logger import logger
+
+
+class EmbeddingCache:
+    """
+    Two-level embedding cache (memory LRU + optional on-disk store).
+
+    Features:
+    - Text normalization so trivially different queries share an entry
+    - float32 storage (half the size of Python float lists per dimension)
+    - Memory bound by entry count and byte budget
+    - TTL expiry applied to both levels
+    """
+
+    def __init__(self,
+                 cache_dir: Optional[str] = "data/embedding_cache",
+                 model_name: str = "text-embedding-3-large",
+                 max_entries: int = 5000,
+                 max_memory_mb: float = 64.0,
+                 ttl_seconds: float = 30 * 24 * 3600,
+                 max_disk_entries: int = 50000):
+        """
+        Initialize embedding cache.
+
+        Args:
+            cache_dir: Directory for the SQLite store (None disables persistence)
+            model_name: Embedding model name, part of every cache key
+            max_entries: Maximum vectors held in memory
+            max_memory_mb: Maximum memory used by cached vectors
+            ttl_seconds: Entry lifetime
+            max_disk_entries: Maximum rows kept in the on-disk store
+        """
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+
+        # Performance tracking
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.db_path = None
+        self._conn = None
+        if cache_dir:
+            self._setup_disk_store(cache_dir)
+
+    def _setup_disk_store(self, cache_dir: str):
+        """Initialize SQLite store for persisted embeddings."""
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.db_path = os.path.join(cache_dir, "query_embeddings.db")
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+            self._conn.commit()
+            logger.debug(f"Embedding cache store ready: {self.db_path}")
+        except Exception as e:
+            logger.warning(f"Embedding cache running memory-only: {e}")
+            self._conn = None
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize query text so near-identical queries share a cache key."""
+        text = unicodedata.normalize("NFKC", text or "")
+        text = re.sub(r"\s+", " ", text.lower()).strip()
+        return text.rstrip(" ?!.")
+
+    def _key(self, normalized: str) -> str:
+        """Build cache key from model name and normalized text."""
+        return hashlib.sha256(f"{self.model_name}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Return cached float32 vector for text, or None on miss."""
+        normalized = self.normalize(text)
+        key = self._key(normalized)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                vector, stored_at = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                self._drop(key)
+
+            vector = self._disk_get(key, now)
+            if vector is not None:
+                self._memory_put(key, vector, now)
+                self.disk_hits += 1
+                return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, vector) -> np.ndarray:
+        """Store vector for text; returns the compact float32 copy."""
+        normalized = self.normalize(text)
+        key = self._key(normalized)
+        compact = np.asarray(vector, dtype=np.float32)
+        now = time.time()
+
+        with self._lock:
+            self._memory_put(key, compact, now)
+            self._disk_put(key, normalized, compact, now)
+        return compact
+
+    def _memory_put(self, key: str, vector: np.ndarray, stored_at: float):
+        """Insert into memory LRU and enforce entry/byte budget."""
+        if key in self._memory:
+            self._drop(key)
+        self._memory[key] = (vector, stored_at)
+        self._memory_bytes += vector.nbytes
+
+        while self._memory and (len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes):
+            oldest_key = next(iter(self._memory))
+            self._drop(oldest_key)
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        """Remove key from memory LRU."""
+        vector, _ = self._memory.pop(key)
+        self._memory_bytes -= vector.nbytes
+
+    def _disk_get(self, key: str, now: float) -> Optional[np.ndarray]:
+        """Load vector from disk store if present and fresh."""
+        if not self._conn:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT vector, created_at FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            blob, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM embeddings WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE embeddings SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return np.frombuffer(blob, dtype=np.float32).copy()
+        except Exception as e:
+            logger.debug(f"Embedding cache disk read failed: {e}")
+            return None
+
+    def _disk_put(self, key: str, normalized: str, vector: np.ndarray, now: float):
+        """Persist vector to disk store and prune oldest rows."""
+        if not self._conn:
+            return
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, model, text, dim, vector, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, self.model_name, normalized, int(vector.shape[0]), vector.tobytes(), now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN ("
+                "SELECT key FROM embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,)
+            )
+            self._conn.commit()
+        except Exception as e:
+            logger.debug(f"Embedding cache disk write failed: {e}")
+
+    def iter_persisted(self, limit: Optional[int] = None):
+        """Yield (normalized_text, float32 vector) pairs from the disk store, most recent first."""
+        if not self._conn:
+            return
+        with self._lock:
+            query = "SELECT text, vector FROM embeddings WHERE model = ? ORDER BY last_used DESC"
+            params: Tuple[Any, ...] = (self.model_name,)
+            if limit:
+                query += " LIMIT ?"
+                params = params + (limit,)
+            rows = self._conn.execute(query, params).fetchall()
+        for text, blob in rows:
+            yield text, np.frombuffer(blob, dtype=np.float32)
+
+    def clear(self):
+        """Clear memory and disk entries."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._conn:
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.commit()
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get embedding cache statistics."""
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            'entries': len(self._memory),
+            'memory_bytes': self._memory_bytes,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': ((self.hits + self.disk_hits) / total * 100) if total else 0.0,
+            'persistent': self._conn is not None
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain Embeddings wrapper that serves embed_query from EmbeddingCache.
+
+    Document embeddings (ingestion) pass straight through; query embeddings are
+    cached and concurrent requests for the same text share one API call.
+    """
+
+    def __init__(self, base_embeddings: Embeddings, cache: EmbeddingCache):
+        self.base_embeddings = base_embeddings
+        self.cache = cache
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents without caching (ingestion path)."""
+        return self.base_embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, using the cache and in-flight de-duplication."""
+        cached = self.cache.get(text)
+        if cached is not None:
+            return cached.tolist()
+
+        key = self.cache.normalize(text)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            return future.result().tolist()
+
+        try:
+            vector = self.cache.put(text, self.base_embeddings.embed_query(text))
+            future.set_result(vector)
+            return vector.tolist()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries, sending all cache misses in one API request."""
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        for i, text in enumerate(texts):
+            cached = self.cache.get(text)
+            if cached is not None:
+                vectors[i] = cached.tolist()
+            else:
+                missing.setdefault(self.cache.normalize(text), []).append(i)
+
+        if missing:
+            representatives = [texts[positions[0]] for positions in missing.values()]
+            embedded = self.base_embeddings.embed_documents(representatives)
+            for text, positions, vector in zip(representatives, missing.values(), embedded):
+                compact = self.cache.put(text, vector).tolist()
+                for position in positions:
+                    vectors[position] = compact
+
+        return vectors
+
+    def __getattr__(self, name: str):
+        """Delegate unknown attributes (model, dimensions, ...) to the wrapped embeddings."""
+        return getattr(self.base_embeddings, name)
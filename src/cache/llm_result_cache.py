@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+LLM Result Cache for Crowd Due Dill
+
+Disk-backed cache for per-chunk LLM work done at ingestion time
+(contextual summaries and legal metadata extraction):
+- Keyed by task, prompt template version, model and chunk hash
+  (plus any other prompt inputs, e.g. the document title)
+- Results stored as JSON in SQLite so rebuilds and re-runs are served
+  from disk instead of calling the model again
+- Only successful results are stored; bumping a prompt version
+  invalidates its entries without touching other tasks
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.utils.logger import logger
+
+
+class LLMResultCache:
+    """
+    Persistent cache of deterministic per-chunk LLM results.
+
+    Features:
+    - One SQLite file shared by all ingestion tasks
+    - Thread-safe (ingestion runs chunks on a thread pool)
+    - Entries never expire: a result is valid for as long as its
+      prompt version, model and inputs are unchanged
+    """
+
+    def __init__(self, cache_dir: str = "data/llm_cache"):
+        """
+        Initialize LLM result cache.
+
+        Args:
+            cache_dir: Directory for the SQLite store
+        """
+        self._lock = threading.Lock()
+
+        # Performance tracking
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        self.db_path = None
+        self._conn = None
+        self._setup_disk_store(cache_dir)
+
+    def _setup_disk_store(self, cache_dir: str):
+        """Initialize SQLite store for LLM results."""
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.db_path = os.path.join(cache_dir, "llm_results.db")
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_results (
+                    key TEXT PRIMARY KEY,
+                    task TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    chunk_hash TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_results_task ON llm_results(task, prompt_version)")
+            self._conn.commit()
+            logger.debug(f"LLM result cache store ready: {self.db_path}")
+        except Exception as e:
+            logger.warning(f"LLM result cache disabled: {e}")
+            self._conn = None
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """SHA-256 of a chunk's text (same hash the document registry stores)."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _key(task: str, prompt_version: str, model: str, chunk_hash: str, context: str) -> str:
+        """Build cache key from everything that determines the model output."""
+        raw = "\x00".join((task, prompt_version, model, chunk_hash, context))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, task: str, prompt_version: str, model: str, chunk_hash: str,
+            context: str = "") -> Optional[Any]:
+        """Return the cached result, or None on miss."""
+        if not self._conn:
+            return None
+        key = self._key(task, prompt_version, model, chunk_hash, context)
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT result FROM llm_results WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                self.hits += 1
+            return json.loads(row[0])
+        except Exception as e:
+            logger.debug(f"LLM result cache read failed: {e}")
+            return None
+
+    def put(self, task: str, prompt_version: str, model: str, chunk_hash: str,
+            result: Any, context: str = ""):
+        """Store a successful result (must be JSON-serializable)."""
+        if not self._conn:
+            return
+        key = self._key(task, prompt_version, model, chunk_hash, context)
+        try:
+            payload = json.dumps(result)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_results "
+                    "(key, task, prompt_version, model, chunk_hash, result, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, task, prompt_version, model, chunk_hash, payload, time.time())
+                )
+                self._conn.commit()
+                self.writes += 1
+        except Exception as e:
+            logger.debug(f"LLM result cache write failed: {e}")
+
+    def clear(self, task: Optional[str] = None):
+        """Clear all entries, or only those of one task."""
+        if not self._conn:
+            return
+        with self._lock:
+            if task:
+                self._conn.execute("DELETE FROM llm_results WHERE task = ?", (task,))
+            else:
+                self._conn.execute("DELETE FROM llm_results")
+            self._conn.commit()
+            self.hits = self.misses = self.writes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get LLM result cache statistics."""
+        entries: Dict[str, int] = {}
+        if self._conn:
+            with self._lock:
+                for task, prompt_version, count in self._conn.execute(
+                    "SELECT task, prompt_version, COUNT(*) FROM llm_results GROUP BY task, prompt_version"
+                ):
+                    entries[f"{task}@{prompt_version}"] = count
+        total = self.hits + self.misses
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'hit_rate': (self.hits / total * 100) if total else 0.0,
+            'persistent': self._conn is not None
+        }
@@ -2,14 +2,25 @@
 """
 Q&A Cache System for Crowd Due Dill
 
+Semantic answer cache checked before classification:
+- Question embeddings stored in a cosine ChromaDB collection
+- Answers stored with RAG sources, model and timestamp
+- LRU eviction once max_cache_size is reached
+- Entries invalidated when any source document changes
+- Negated queries never served (or stored) through the cache
+- Only context-free turns are served or stored: the cache is shared by all
+  users, so answers shaped by conversation history or memory never enter it
 """
 
 import os
+import re
 import json
 import time
-from typing import List, Dict, Any, Optional, Tuple
+import hashlib
+import threading
+from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime
 
 # ChromaDB and embeddings
 import chromadb
@@ -19,6 +30,13 @@ from langchain_openai import OpenAIEmbeddings
 # Internal imports
 from utils.logger import logger
 
+# References back to earlier turns ("what about them?", "as you said above")
+FOLLOW_UP_PATTERN = re.compile(
+    r"\b(it|its|they|them|their|theirs|those|these|above|previous|previously|earlier|"
+    r"same|aforementioned|you said|you mentioned|as mentioned)\b",
+    re.IGNORECASE
+)
+
 @dataclass
 class CacheEntry:
     """Cache entry with metadata."""
@@ -31,90 +49,394 @@ class CacheEntry:
 class QACache:
     """
     Semantic Q&A cache using vector similarity.
-    
+
     Features:
     - Vector-based similarity search
     - Configurable similarity thresholds
     - Performance tracking
-    - Automatic cache management
+    - Automatic cache management (LRU eviction, source invalidation)
     """
-    
+
+    COLLECTION_NAME = "qa_cache"
+
     def __init__(
         self,
         cache_dir: str = "data/qa_cache",
         similarity_threshold: float = 0.85,
-        max_cache_size: int = 1000
+        max_cache_size: int = 1000,
+        embeddings=None,
+        model_name: str = "",
+        registry_path: str = "data/document_registry.json",
+        negative_detector=None
     ):
-        """Initialize Q&A cache."""
+        """
+        Initialize Q&A cache.
+
+        Args:
+            cache_dir: ChromaDB storage directory for cached pairs
+            similarity_threshold: Minimum cosine similarity for a hit
+            max_cache_size: Maximum cached pairs before LRU eviction
+            embeddings: Embeddings instance (share the RAG one to reuse query embeddings)
+            model_name: LLM that produced the answers; entries from other models are ignored
+            registry_path: Document registry used to detect changed sources
+            negative_detector: NegativeIntentDetector used to bypass negated queries
+        """
         self.cache_dir = cache_dir
         self.similarity_threshold = similarity_threshold
         self.max_cache_size = max_cache_size
-        
+        self.model_name = model_name
+        self.registry_path = registry_path
+        self.negative_detector = negative_detector
+        self.embeddings = embeddings
+
         # Performance tracking
         self.hits = 0
         self.misses = 0
-        
+        self.negative_bypasses = 0
+        self.context_bypasses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.total_search_time = 0.0
+
+        # Source document hashes (reloaded when the registry file changes)
+        self._registry_mtime = None
+        self._source_hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
         # Initialize storage
         os.makedirs(cache_dir, exist_ok=True)
-        self.cache_file = os.path.join(cache_dir, "qa_cache.json")
-        
+
         # Initialize vector storage
         self._setup_vector_storage()
-        
+
         # Load existing cache
         self._load_cache()
-        
-        logger.system_ready(f"Q&A Cache: {len(self.cache)} question-answer pairs loaded")
-    
+
+        logger.system_ready(f"Q&A Cache: {self.count()} question-answer pairs loaded")
+
     def _setup_vector_storage(self):
         """Initialize vector storage for Q&A cache."""
-        # Stub implementation - cache is disabled
-        pass
-    
+        self.collection = None
+        try:
+            if self.embeddings is None:
+                self.embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+
+            self.client = chromadb.PersistentClient(
+                path=self.cache_dir,
+                settings=Settings(anonymized_telemetry=False)
+            )
+            self.collection = self.client.get_or_create_collection(
+                name=self.COLLECTION_NAME,
+                metadata={"hnsw:space": "cosine"}
+            )
+        except Exception as e:
+            logger.warning(f"Q&A cache disabled: {e}")
+            self.collection = None
+
     def _load_cache(self):
-        """Load existing cache from file."""
-        # Initialize empty cache
-        self.cache = {}
-    
-    def search_qa(self, query: str, k: int = 3) -> Optional[Tuple[str, str]]:
+        """Load source document hashes used for invalidation."""
+        self._refresh_source_hashes()
+
+    def _refresh_source_hashes(self) -> Dict[str, str]:
+        """Reload document registry hashes if the registry file changed."""
+        try:
+            mtime = os.path.getmtime(self.registry_path)
+        except OSError:
+            return self._source_hashes
+
+        if mtime != self._registry_mtime:
+            try:
+                with open(self.registry_path, 'r') as f:
+                    registry = json.load(f)
+                self._source_hashes = {
+                    filepath: record.get('file_hash', '')
+                    for filepath, record in registry.items()
+                }
+                self._registry_mtime = mtime
+            except Exception as e:
+                logger.debug(f"Q&A cache registry load failed: {e}")
+
+        return self._source_hashes
+
+    @staticmethod
+    def _question_id(question: str) -> str:
+        """Stable id for a question (re-adding the same question replaces it)."""
+        normalized = " ".join(question.lower().split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+    def _is_negative(self, query: str) -> bool:
+        """Check negative intent with the configured detector."""
+        return bool(self.negative_detector and self.negative_detector.has_negative_intent(query))
+
+    def _is_stale(self, metadata: Dict[str, Any]) -> bool:
+        """Check whether any source document changed since the answer was cached."""
+        try:
+            cached_hashes = json.loads(metadata.get('source_hashes', '{}'))
+        except (TypeError, ValueError):
+            return True
+
+        current_hashes = self._refresh_source_hashes()
+        # Sources missing from the registry were stored with an empty hash
+        return any(current_hashes.get(source, '') != file_hash for source, file_hash in cached_hashes.items())
+
+    def is_context_free(self, messages: list, medium_term_summary: Optional[str] = None,
+                        record: bool = True) -> bool:
+        """
+        Check whether a turn's answer depends only on its question.
+
+        Answers are generated with the session's history and memory summary, so
+        only first turns without a summary or follow-up references may be shared
+        across users. Bypassed turns are counted in context_bypasses.
+
+        Args:
+            messages: Session messages, ending with the current question
+            medium_term_summary: Session memory summary, if any
+            record: Count a bypass in context_bypasses (the lookup side does,
+                the storage side re-checks the same turn and does not)
+        """
+        questions = [message for message in messages if getattr(message, "type", None) == "human"]
+        context_free = (
+            not medium_term_summary
+            and len(questions) == 1
+            and not FOLLOW_UP_PATTERN.search(questions[0].content)
+        )
+        if not context_free and record:
+            self.context_bypasses += 1
+        return context_free
+
+    def count(self) -> int:
+        """Number of cached Q&A pairs."""
+        if not self.collection:
+            return 0
+        try:
+            return self.collection.count()
+        except Exception:
+            return 0
+
+    def search_qa(self, query: str, k: int = 3) -> Optional[CacheEntry]:
         """
         Search for similar Q&A pairs.
-        
+
         Args:
             query: User's question
             k: Number of results to retrieve
-            
+
         Returns:
-            Best matching Q&A pair if similarity above threshold, None otherwise
+            Best matching cache entry if similarity above threshold, None otherwise
         """
-        # Cache is disabled - always return None (cache miss)
-        self.misses += 1
-        return None
-    
-    def add_qa_pair(self, question: str, answer: str, qa_id: str = None) -> bool:
-        """Add a new Q&A pair to the cache."""
-        # Cache is disabled - return True for compatibility
-        return True
-    
-    def _add_documents_batch(self, qa_pairs: List[Dict[str, str]], batch_size: int = 50) -> bool:
+        if self._is_negative(query):
+            self.negative_bypasses += 1
+            logger.negative_intent(query[:50])
+            return None
+
+        if not self.collection or not self.count():
+            self.misses += 1
+            return None
+
+        start_time = time.time()
+        try:
+            query_embedding = self.embeddings.embed_query(query)
+            where = {"model": self.model_name} if self.model_name else None
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=min(k, self.count()),
+                where=where,
+                include=["documents", "metadatas", "distances"]
+            )
+        except Exception as e:
+            logger.debug(f"Q&A cache search failed: {e}")
+            self.misses += 1
+            return None
+        finally:
+            self.total_search_time += time.time() - start_time
+
+        ids = results.get('ids', [[]])[0]
+        documents = results.get('documents', [[]])[0]
+        metadatas = results.get('metadatas', [[]])[0]
+        distances = results.get('distances', [[]])[0]
+
+        stale_ids = []
+        best = None
+        for entry_id, question, metadata, distance in zip(ids, documents, metadatas, distances):
+            similarity = 1.0 - distance
+            if similarity < self.similarity_threshold:
+                break
+            # Never answer a positive question with an answer cached for a negated one
+            if self._is_negative(question):
+                continue
+            if self._is_stale(metadata):
+                stale_ids.append(entry_id)
+                continue
+            best = (entry_id, question, metadata, similarity)
+            break
+
+        if stale_ids:
+            self._delete(stale_ids)
+            self.invalidations += len(stale_ids)
+            logger.debug(f"Q&A cache: invalidated {len(stale_ids)} entries with changed sources")
+
+        if best is None:
+            self.misses += 1
+            return None
+
+        entry_id, question, metadata, similarity = best
+        self.hits += 1
+        self._touch(entry_id, metadata)
+        logger.qa_cache_hit(similarity, query[:50])
+
+        return CacheEntry(
+            question=question,
+            answer=metadata.get('answer', ''),
+            similarity=similarity,
+            timestamp=metadata.get('timestamp', ''),
+            metadata={
+                'sources': json.loads(metadata.get('sources', '[]')),
+                'model': metadata.get('model', ''),
+                'message_type': metadata.get('message_type', ''),
+                'hits': metadata.get('hits', 0) + 1
+            }
+        )
+
+    def _touch(self, entry_id: str, metadata: Dict[str, Any]):
+        """Record a hit for LRU ordering."""
+        try:
+            updated = dict(metadata)
+            updated['hits'] = metadata.get('hits', 0) + 1
+            updated['last_hit'] = time.time()
+            self.collection.update(ids=[entry_id], metadatas=[updated])
+        except Exception as e:
+            logger.debug(f"Q&A cache hit update failed: {e}")
+
+    def _delete(self, ids: List[str]):
+        """Delete entries by id."""
+        try:
+            self.collection.delete(ids=ids)
+        except Exception as e:
+            logger.debug(f"Q&A cache delete failed: {e}")
+
+    def add_qa_pair(self, question: str, answer: str, qa_id: str = None,
+                    sources: Optional[List[str]] = None, message_type: str = "") -> bool:
+        """
+        Add a new Q&A pair to the cache.
+
+        Args:
+            question: User question
+            answer: Generated answer
+            qa_id: Optional explicit id (defaults to a hash of the question)
+            sources: Source document paths the answer was grounded on
+            message_type: Agent type that produced the answer
+
+        Returns:
+            True if the pair was stored
+        """
+        return self._add_documents_batch([{
+            'question': question,
+            'answer': answer,
+            'id': qa_id,
+            'sources': sources or [],
+            'message_type': message_type
+        }])
+
+    def _add_documents_batch(self, qa_pairs: List[Dict[str, Any]], batch_size: int = 50) -> bool:
         """Add multiple Q&A pairs in batches."""
-        # Cache is disabled - return True for compatibility
-        return True
-    
+        if not self.collection:
+            return False
+
+        pairs = [pair for pair in qa_pairs if pair.get('answer') and not self._is_negative(pair['question'])]
+        if not pairs:
+            return False
+
+        current_hashes = self._refresh_source_hashes()
+        now = time.time()
+
+        try:
+            for i in range(0, len(pairs), batch_size):
+                batch = pairs[i:i + batch_size]
+                questions = [pair['question'] for pair in batch]
+                metadatas = []
+                for pair in batch:
+                    sources = sorted(set(pair.get('sources', [])))
+                    metadatas.append({
+                        'answer': pair['answer'],
+                        'sources': json.dumps(sources),
+                        'source_hashes': json.dumps({source: current_hashes.get(source, '') for source in sources}),
+                        'model': self.model_name,
+                        'message_type': pair.get('message_type', ''),
+                        'timestamp': datetime.now().isoformat(),
+                        'hits': 0,
+                        'last_hit': now
+                    })
+
+                self.collection.upsert(
+                    ids=[pair.get('id') or self._question_id(pair['question']) for pair in batch],
+                    embeddings=self._embed_questions(questions),
+                    documents=questions,
+                    metadatas=metadatas
+                )
+
+            self._enforce_size_limit()
+            return True
+
+        except Exception as e:
+            logger.debug(f"Q&A cache add failed: {e}")
+            return False
+
+    def _embed_questions(self, questions: List[str]) -> List[List[float]]:
+        """Embed questions as queries (reuses cached query embeddings when available)."""
+        if hasattr(self.embeddings, 'embed_queries'):
+            return self.embeddings.embed_queries(questions)
+        return [self.embeddings.embed_query(question) for question in questions]
+
+    def _enforce_size_limit(self):
+        """Evict least recently used entries above max_cache_size."""
+        with self._lock:
+            overflow = self.count() - self.max_cache_size
+            if overflow <= 0:
+                return
+
+            entries = self.collection.get(include=["metadatas"])
+            by_recency = sorted(
+                zip(entries['ids'], entries['metadatas']),
+                key=lambda item: item[1].get('last_hit', 0)
+            )
+            evict_ids = [entry_id for entry_id, _ in by_recency[:overflow]]
+            self._delete(evict_ids)
+            self.evictions += len(evict_ids)
+            logger.debug(f"Q&A cache: evicted {len(evict_ids)} least recently used entries")
+
+    def invalidate_stale(self) -> int:
+        """Remove every entry whose source documents changed; returns removed count."""
+        if not self.collection:
+            return 0
+
+        entries = self.collection.get(include=["metadatas"])
+        stale_ids = [
+            entry_id for entry_id, metadata in zip(entries['ids'], entries['metadatas'])
+            if self._is_stale(metadata)
+        ]
+        if stale_ids:
+            self._delete(stale_ids)
+            self.invalidations += len(stale_ids)
+        return len(stale_ids)
+
     def get_stats(self) -> Dict[str, Any]:
         """Get Q&A cache statistics."""
         total_queries = self.hits + self.misses
         hit_rate = (self.hits / total_queries * 100) if total_queries > 0 else 0
-        
+
         return {
-            'total_qa_pairs': 0,
+            'total_qa_pairs': self.count(),
             'total_queries': total_queries,
             'cache_hits': self.hits,
             'hit_rate': hit_rate,
-            'avg_response_time': 0.0,
-            'similarity_threshold': self.similarity_threshold
+            'avg_response_time': (self.total_search_time / total_queries) if total_queries > 0 else 0.0,
+            'similarity_threshold': self.similarity_threshold,
+            'negative_bypasses': self.negative_bypasses,
+            'context_bypasses': self.context_bypasses,
+            'invalidations': self.invalidations,
+            'evictions': self.evictions
         }
-    
+
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get Q&A cache statistics (alias for web API compatibility)."""
         stats = self.get_stats()
@@ -124,44 +446,64 @@ class QACache:
             'hit_rate': stats['hit_rate'],
             'avg_response_time': stats['avg_response_time']
         }
-    
+
     def clear_cache(self):
         """Clear the Q&A cache."""
-        self.cache = {}
+        if self.collection:
+            try:
+                self.client.delete_collection(self.COLLECTION_NAME)
+            except Exception as e:
+                logger.debug(f"Q&A cache collection delete failed: {e}")
+            self._setup_vector_storage()
         self.hits = 0
         self.misses = 0
         logger.command_executed("Q&A cache cleared")
         return True
-    
+
     def get_domain_stats(self) -> Dict[str, int]:
-        """Get Q&A pairs count by domain."""
-        # Cache is disabled - return empty stats
-        return {}
-    
+        """Get Q&A pairs count by agent type (no domain restrictions)."""
+        if not self.collection:
+            return {}
+        counts: Dict[str, int] = {}
+        for metadata in self.collection.get(include=["metadatas"])['metadatas']:
+            message_type = metadata.get('message_type') or 'unknown'
+            counts[message_type] = counts.get(message_type, 0) + 1
+        return counts
+
     def update_collection_metadata(self, updates: Dict[str, Any]) -> bool:
         """Update collection metadata with automatic timestamp."""
-        # Cache is disabled - return True for compatibility
-        return True
-    
+        if not self.collection:
+            return False
+        try:
+            metadata = dict(self.collection.metadata or {})
+            metadata.update(updates)
+            metadata['last_updated'] = datetime.now().isoformat()
+            self.collection.modify(metadata=metadata)
+            return True
+        except Exception as e:
+            logger.debug(f"Q&A cache metadata update failed: {e}")
+            return False
+
     def get_collection_info(self) -> Dict[str, Any]:
         """Get comprehensive collection information with health metrics."""
+        stats = self.get_stats()
         return {
-            'name': 'qa_cache_disabled',
-            'count': 0,
-            'metadata': {},
+            'name': self.COLLECTION_NAME if self.collection else 'qa_cache_disabled',
+            'count': stats['total_qa_pairs'],
+            'metadata': dict(self.collection.metadata or {}) if self.collection else {},
             'type': 'qa_cache',
             'health': {
-                'hit_rate_status': 'disabled',
-                'response_time_status': 'disabled',
-                'total_queries': self.hits + self.misses,
-                'cache_hits': self.hits,
-                'hit_rate_percent': 0,
-                'avg_response_time_ms': 0,
+                'hit_rate_status': 'good' if stats['hit_rate'] >= 20 else 'low',
+                'response_time_status': 'good' if stats['avg_response_time'] < 0.5 else 'slow',
+                'total_queries': stats['total_queries'],
+                'cache_hits': stats['cache_hits'],
+                'hit_rate_percent': stats['hit_rate'],
+                'avg_response_time_ms': stats['avg_response_time'] * 1000,
                 'similarity_threshold': self.similarity_threshold
             },
-            'domain_distribution': {}
+            'domain_distribution': self.get_domain_stats()
         }
-    
+
     def __str__(self) -> str:
         """String representation."""
-        return f"QACache(disabled, threshold={self.similarity_threshold})" 
\ No newline at end of file
+        return f"QACache(pairs={self.count()}, threshold={self.similarity_threshold})"
\ No newline at end of file
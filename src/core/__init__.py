@@ -7,6 +7,17 @@ Central location for all core system functionality.
 from .contextual_rag import OptimizedContextualRAGSystem
 from .domain_manager import DomainManager
 from .resilience_manager import ResilienceManager
+from .reranker_service import CrossEncoderReranker, reranker_service
+from .query_router import LocalQueryRouter, RoutingDecision
+from .article_index import ArticleIndex, ArticleIndexWriter
+from .lexical_index import LexicalIndex
+from .quantized_index import QuantizedVectorIndex
+from .query_parser import ParsedQuery, QueryParser, RegulationRegistry
+from .retrieval_policy import AdaptiveRetrievalPolicy
+from .ingestion_scheduler import IngestionScheduler, ProviderLimiter
+from .ingestion_writer import IngestionWriter
+from .session_catalog import SessionCatalog
+from .checkpoint_store import PooledSqliteSaver
 from .stats_collector import StatsCollector
 from .auth0_validator import Auth0User, Auth0TokenValidator, get_auth0_config
 from .auth0_middleware import (
@@ -39,6 +50,23 @@ __all__ = [
     'DomainManager', 
     'ResilienceManager',
     'StatsCollector',
+    'CrossEncoderReranker',
+    'reranker_service',
+    'LocalQueryRouter',
+    'RoutingDecision',
+    'ArticleIndex',
+    'ArticleIndexWriter',
+    'LexicalIndex',
+    'QuantizedVectorIndex',
+    'ParsedQuery',
+    'QueryParser',
+    'RegulationRegistry',
+    'AdaptiveRetrievalPolicy',
+    'IngestionScheduler',
+    'ProviderLimiter',
+    'IngestionWriter',
+    'SessionCatalog',
+    'PooledSqliteSaver',
     # Auth0 components
     'Auth0User',
     'Auth0TokenValidator',
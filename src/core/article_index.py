@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Article Index for Crowd Due Dill
+
+Precomputed (regulation source, article number) -> chunk lookup built at ingest time:
+- Compact binary file, memory-mapped at startup (only the key table is decoded)
+- Precise "Article N" queries become dictionary hits plus a primary-key fetch
+  instead of a $contains scan over every stored chunk
+- Each posting records the chunk ID, the character offset of the article
+  reference and whether the chunk defines the article or only mentions it
+"""
+
+import mmap
+import os
+import re
+import struct
+import threading
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from src.utils.logger import logger
+
+
+INDEX_MAGIC = b"CDDARTIX"
+INDEX_VERSION = 1
+
+# magic, version, key count, posting count, string count
+HEADER = struct.Struct("<8sIIII")
+# source string index, article number, first posting, posting count
+KEY_RECORD = struct.Struct("<IIII")
+# chunk ID string index, character offset, flags
+POSTING_RECORD = struct.Struct("<III")
+STRING_OFFSET = struct.Struct("<I")
+
+FLAG_DEFINING = 1
+
+ARTICLE_HEADING_PATTERN = re.compile(r'^[#*\s]*(?:Article|Art\.)\s*(\d+)\b', re.MULTILINE)
+ARTICLE_MENTION_PATTERN = re.compile(r'\bArticle\s+(\d+)\b')
+
+
+class ArticlePosting(NamedTuple):
+    """One chunk referencing an article."""
+    chunk_id: str
+    offset: int
+    defining: bool
+
+
+def parse_article_number(article: Union[str, int]) -> Optional[int]:
+    """Convert 'Article 22' / '22' / 22 to 22 (None if no number)."""
+    if isinstance(article, int):
+        return article
+    match = re.search(r'\d+', article or "")
+    return int(match.group()) if match else None
+
+
+def extract_article_references(text: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[int, Tuple[int, bool]]:
+    """
+    Find the articles a chunk defines or mentions.
+
+    A chunk defines an article when it contains its heading or carries it as
+    article_number metadata; other "Article N" occurrences are mentions.
+
+    Returns:
+        Article number -> (character offset of first reference, defining)
+    """
+    references: Dict[int, Tuple[int, bool]] = {}
+
+    for match in ARTICLE_HEADING_PATTERN.finditer(text):
+        article = int(match.group(1))
+        if article not in references:
+            references[article] = (match.start(1), True)
+
+    metadata_article = parse_article_number((metadata or {}).get('article_number') or "")
+    if metadata_article is not None and metadata_article not in references:
+        mention = re.search(rf'\bArticle\s+{metadata_article}\b', text)
+        references[metadata_article] = (mention.start() if mention else 0, True)
+
+    for match in ARTICLE_MENTION_PATTERN.finditer(text):
+        article = int(match.group(1))
+        if article not in references:
+            references[article] = (match.start(), False)
+
+    return references
+
+
+class ArticleIndex:
+    """
+    Read-only, memory-mapped article index.
+
+    The file is replaced atomically by ArticleIndexWriter; lookups notice a
+    new file and remap it, so a running API picks up re-ingested documents.
+    """
+
+    def __init__(self, path: str = "data/chroma_db/article_index.bin"):
+        """
+        Initialize the index.
+
+        Args:
+            path: Index file (a missing file gives an empty, unloaded index)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._view = None
+        self._file_id = None
+
+        # Performance tracking
+        self.lookups = 0
+        self.hits = 0
+
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """Map the index file again if it changed on disk; returns True if (re)loaded."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+
+        file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if file_id == self._file_id:
+            return False
+
+        with self._lock:
+            if file_id == self._file_id:
+                return False
+            try:
+                self._view = self._map(self.path)
+                self._file_id = file_id
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning(f"Article index {self.path} could not be loaded: {e}")
+                return False
+
+        logger.debug_optimization(f"Article index loaded: {len(self._view['keys'])} (source, article) keys")
+        return True
+
+    @staticmethod
+    def _map(path: str) -> Dict[str, Any]:
+        """Memory-map an index file and decode its key table."""
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, key_count, posting_count, string_count = HEADER.unpack_from(data, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError("not an article index (or unsupported version)")
+
+        view = {
+            'data': data,
+            'postings_start': HEADER.size + key_count * KEY_RECORD.size,
+            'offsets_start': HEADER.size + key_count * KEY_RECORD.size + posting_count * POSTING_RECORD.size,
+        }
+        view['strings_start'] = view['offsets_start'] + (string_count + 1) * STRING_OFFSET.size
+
+        keys = {}
+        by_article: Dict[int, List[Tuple[str, int]]] = {}
+        sources: Dict[int, str] = {}
+        for i in range(key_count):
+            source_index, article, first, count = KEY_RECORD.unpack_from(data, HEADER.size + i * KEY_RECORD.size)
+            if source_index not in sources:
+                sources[source_index] = ArticleIndex._read_string(view, source_index)
+            source = sources[source_index]
+            keys[(source, article)] = (first, count)
+            by_article.setdefault(article, []).append((source, first, count))
+
+        view['keys'] = keys
+        view['by_article'] = by_article
+        return view
+
+    @staticmethod
+    def _read_string(view: Dict[str, Any], index: int) -> str:
+        """Decode one string from the string table."""
+        data = view['data']
+        start = STRING_OFFSET.unpack_from(data, view['offsets_start'] + index * STRING_OFFSET.size)[0]
+        end = STRING_OFFSET.unpack_from(data, view['offsets_start'] + (index + 1) * STRING_OFFSET.size)[0]
+        return data[view['strings_start'] + start:view['strings_start'] + end].decode("utf-8")
+
+    @staticmethod
+    def _read_postings(view: Dict[str, Any], first: int, count: int) -> List[ArticlePosting]:
+        """Decode a run of postings."""
+        postings = []
+        for i in range(first, first + count):
+            string_index, offset, flags = POSTING_RECORD.unpack_from(
+                view['data'], view['postings_start'] + i * POSTING_RECORD.size
+            )
+            postings.append(ArticlePosting(ArticleIndex._read_string(view, string_index), offset, bool(flags & FLAG_DEFINING)))
+        return postings
+
+    def is_loaded(self) -> bool:
+        """Check whether an index file is mapped."""
+        return self._view is not None
+
+    def __len__(self) -> int:
+        return len(self._view['keys']) if self._view else 0
+
+    def lookup(self, article_number: Union[str, int], source: Optional[str] = None,
+               limit: Optional[int] = None) -> List[ArticlePosting]:
+        """
+        Find chunks for an article.
+
+        Args:
+            article_number: 'Article 22', '22' or 22
+            source: Exact document source (None searches every regulation)
+            limit: Maximum postings returned
+
+        Returns:
+            Postings with chunks defining the article first, then mentions
+        """
+        self.refresh()
+        view = self._view
+        article = parse_article_number(article_number)
+        self.lookups += 1
+        if view is None or article is None:
+            return []
+
+        if source is not None:
+            entry = view['keys'].get((source, article))
+            runs = [entry] if entry else []
+        else:
+            runs = [(first, count) for _, first, count in view['by_article'].get(article, [])]
+
+        postings = []
+        for first, count in runs:
+            postings.extend(self._read_postings(view, first, count))
+        postings.sort(key=lambda posting: not posting.defining)
+
+        if postings:
+            self.hits += 1
+        return postings[:limit] if limit is not None else postings
+
+    def items(self) -> Iterator[Tuple[Tuple[str, int], List[ArticlePosting]]]:
+        """Iterate over every (source, article) key and its postings."""
+        view = self._view
+        if view is None:
+            return
+        for key, (first, count) in view['keys'].items():
+            yield key, self._read_postings(view, first, count)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        return {
+            'loaded': self.is_loaded(),
+            'keys': len(self),
+            'file_size_bytes': self._file_id[2] if self._file_id else 0,
+            'lookups': self.lookups,
+            'hits': self.hits
+        }
+
+
+class ArticleIndexWriter:
+    """Builds and atomically replaces the article index file during ingestion."""
+
+    def __init__(self, path: str = "data/chroma_db/article_index.bin", start_empty: bool = False):
+        """
+        Initialize the writer.
+
+        Args:
+            path: Index file
+            start_empty: Ignore the existing file (full rebuild)
+        """
+        self.path = path
+        self._entries: Dict[Tuple[str, int], List[ArticlePosting]] = {}
+
+        if not start_empty:
+            for key, postings in ArticleIndex(path).items():
+                self._entries[key] = postings
+
+    def add_chunk(self, chunk_id: str, source: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """Index one stored chunk; returns the number of articles it references."""
+        references = extract_article_references(text, metadata)
+        for article, (offset, defining) in references.items():
+            self._entries.setdefault((source, article), []).append(ArticlePosting(chunk_id, offset, defining))
+        return len(references)
+
+    def remove_source(self, source: str) -> int:
+        """Drop every posting of a document; returns keys removed."""
+        keys = [key for key in self._entries if key[0] == source]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def remove_chunks(self, chunk_ids) -> int:
+        """Drop postings for specific chunk IDs; returns postings removed."""
+        chunk_ids = set(chunk_ids)
+        removed = 0
+        for key in list(self._entries):
+            kept = [posting for posting in self._entries[key] if posting.chunk_id not in chunk_ids]
+            removed += len(self._entries[key]) - len(kept)
+            if kept:
+                self._entries[key] = kept
+            else:
+                del self._entries[key]
+        return removed
+
+    def save(self) -> int:
+        """Write the index (temp file + rename); returns the file size in bytes."""
+        strings: Dict[str, int] = {}
+
+        def intern(value: str) -> int:
+            if value not in strings:
+                strings[value] = len(strings)
+            return strings[value]
+
+        key_records = []
+        posting_records = []
+        for (source, article) in sorted(self._entries):
+            postings = sorted(self._entries[(source, article)], key=lambda posting: not posting.defining)
+            key_records.append(KEY_RECORD.pack(intern(source), article, len(posting_records), len(postings)))
+            for posting in postings:
+                posting_records.append(POSTING_RECORD.pack(
+                    intern(posting.chunk_id), posting.offset, FLAG_DEFINING if posting.defining else 0
+                ))
+
+        encoded = [value.encode("utf-8") for value in strings]
+        offsets = [0]
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(key_records), len(posting_records), len(encoded)))
+            f.write(b"".join(key_records))
+            f.write(b"".join(posting_records))
+            f.write(b"".join(STRING_OFFSET.pack(offset) for offset in offsets))
+            f.write(b"".join(encoded))
+        os.replace(temp_path, self.path)
+
+        size = os.path.getsize(self.path)
+        logger.debug(f"Article index saved: {len(key_records)} keys, {len(posting_records)} postings, {size} bytes")
+        return size
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Bounded Chat Executor for Crowd Due Dill
+
+Runs the blocking chat pipeline (LangGraph invoke, LLM calls, ChromaDB
+queries, SQLite checkpoint writes) off the asyncio event loop:
+- Fixed worker pool sets the number of concurrently processed turns
+- Bounded waiting queue; excess requests are rejected instead of piling up
+- Streaming turns (sync generators) hold a worker for the whole stream
+- In-flight / queue-depth / wait-time reporting through a metrics callback
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from src.utils.logger import logger
+
+
+class ChatCapacityError(RuntimeError):
+    """Raised when the chat executor queue is full."""
+
+
+class BoundedChatExecutor:
+    """
+    Thread pool with a bounded queue for async endpoints that call sync code.
+
+    Usage:
+        result = await chat_executor.run(process_turn, session_id, message)
+        frames = chat_executor.stream(stream_turn, session_id, message)
+    """
+
+    def __init__(self,
+                 max_concurrency: int = 8,
+                 max_queue: int = 64,
+                 name: str = "chat",
+                 metrics_callback: Optional[Callable[..., None]] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            max_concurrency: Chat turns processed at the same time
+            max_queue: Turns allowed to wait for a worker before rejecting
+            name: Executor name (thread prefix and metrics label)
+            metrics_callback: Called as callback(executor=, in_flight=, queue_depth=,
+                              wait_time=, rejected=) whenever the state changes
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.name = name
+        self.metrics_callback = metrics_callback
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"{name}_worker_")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queued = 0
+
+        # Performance tracking
+        self.stats = {
+            'completed': 0,
+            'rejected': 0,
+            'max_queue_depth': 0,
+            'total_wait_time': 0.0
+        }
+
+    def _report(self, wait_time: Optional[float] = None, rejected: bool = False):
+        """Push current state to the metrics callback."""
+        if not self.metrics_callback:
+            return
+        try:
+            self.metrics_callback(
+                executor=self.name,
+                in_flight=self._in_flight,
+                queue_depth=self._queued,
+                wait_time=wait_time,
+                rejected=rejected
+            )
+        except Exception as e:
+            logger.debug(f"Chat executor metrics error: {e}")
+
+    def _admit(self) -> Callable[..., Callable[[], Any]]:
+        """
+        Reserve a place in the queue.
+
+        Returns:
+            Function wrapping func(*args, **kwargs) into the pool worker body
+
+        Raises:
+            ChatCapacityError: If all workers are busy and the queue is full
+        """
+        with self._lock:
+            if self._in_flight + self._queued >= self.max_concurrency + self.max_queue:
+                self.stats['rejected'] += 1
+                self._report(rejected=True)
+                raise ChatCapacityError(f"{self.name} executor at capacity ({self.max_concurrency} running, {self._queued} queued)")
+            self._queued += 1
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self._queued)
+            self._report()
+
+        submitted_at = time.time()
+
+        def wrap(func: Callable[..., Any], *args, **kwargs) -> Callable[[], Any]:
+            def worker():
+                wait_time = time.time() - submitted_at
+                with self._lock:
+                    self._queued -= 1
+                    self._in_flight += 1
+                    self.stats['total_wait_time'] += wait_time
+                    self._report(wait_time=wait_time)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    with self._lock:
+                        self._in_flight -= 1
+                        self.stats['completed'] += 1
+                        self._report()
+            return worker
+
+        return wrap
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on the worker pool and await its result.
+
+        Raises:
+            ChatCapacityError: If all workers are busy and the queue is full
+        """
+        worker = self._admit()(func, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(worker))
+
+    def stream(self, func: Callable[..., Iterator[Any]], *args, **kwargs) -> AsyncIterator[Any]:
+        """
+        Run a blocking generator on the worker pool and iterate it asynchronously.
+
+        The generator keeps one worker for its whole lifetime, so streamed turns
+        count against max_concurrency and the queue exactly like run(). Admission
+        happens immediately (call from a coroutine); if the consumer goes away the
+        generator is closed after its next item.
+
+        Raises:
+            ChatCapacityError: If all workers are busy and the queue is full
+        """
+        loop = asyncio.get_running_loop()
+        frames: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        finished = object()
+
+        def emit(item, error=None):
+            try:
+                loop.call_soon_threadsafe(frames.put_nowait, (item, error))
+            except RuntimeError:
+                cancelled.set()  # Event loop closed
+
+        def produce():
+            generator = func(*args, **kwargs)
+            try:
+                for item in generator:
+                    emit(item)
+                    if cancelled.is_set():
+                        break
+            except Exception as e:
+                emit(finished, e)
+                return
+            finally:
+                generator.close()
+            emit(finished)
+
+        future = loop.run_in_executor(self._executor, self._admit()(produce))
+
+        async def consume():
+            try:
+                while True:
+                    item, error = await frames.get()
+                    if item is finished:
+                        if error:
+                            raise error
+                        break
+                    yield item
+                await future
+            finally:
+                cancelled.set()
+
+        return consume()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executor statistics."""
+        with self._lock:
+            stats = self.stats.copy()
+            stats.update({
+                'in_flight': self._in_flight,
+                'queue_depth': self._queued,
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'avg_wait_time': stats['total_wait_time'] / stats['completed'] if stats['completed'] else 0.0
+            })
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool."""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Store for Crowd Due Dill
+
+SQLite storage layer for the LangGraph checkpointer:
+- WAL journal with synchronous=NORMAL (cheap commits, readers never block writers)
+- Per-thread connection pool with a busy timeout instead of one shared,
+  lock-serialised connection
+- Retention policy keeping the latest N checkpoints per conversation thread
+- Offline prune / VACUUM helpers used by tools/checkpoint_maintenance.py
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from src.utils.logger import logger
+
+
+class PooledSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver with pooled WAL connections and per-thread checkpoint retention.
+
+    SqliteSaver runs every query through self.conn under self.lock. Here
+    self.conn resolves to the calling thread's own connection, so the lock is
+    not needed and concurrent chat turns no longer queue behind each other.
+    """
+
+    def __init__(self,
+                 db_path: str = "data/sessions/graph_checkpoints.db",
+                 keep_latest: int = 10,
+                 prune_every: int = 5,
+                 busy_timeout: float = 30.0,
+                 serde=None):
+        """
+        Initialize the checkpoint store.
+
+        Args:
+            db_path: SQLite database file
+            keep_latest: Checkpoints kept per thread (0 disables pruning)
+            prune_every: Checkpoint writes per thread between pruning passes
+            busy_timeout: Seconds a connection waits for another writer
+            serde: Optional LangGraph serializer
+        """
+        self.db_path = db_path
+        self.keep_latest = keep_latest
+        self.prune_every = prune_every
+        self.busy_timeout = busy_timeout
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._pool_lock = threading.Lock()
+        self._puts_since_prune: Dict[tuple, int] = {}
+
+        # Performance tracking
+        self.stats = {
+            'checkpoints_written': 0,
+            'prune_passes': 0,
+            'checkpoints_pruned': 0
+        }
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        super().__init__(self._new_connection(), serde=serde)
+
+        # Connections are per thread, so SqliteSaver's global lock is unnecessary
+        self.lock = nullcontext()
+        self.setup()
+
+    def _new_connection(self) -> sqlite3.Connection:
+        """Open a tuned connection and add it to the pool."""
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._pool_lock:
+            self._connections.append(conn)
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection owned by the calling thread (opened on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._new_connection()
+            self._local.conn = conn
+        return conn
+
+    @conn.setter
+    def conn(self, value: sqlite3.Connection):
+        self._local.conn = value
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        """Save a checkpoint, pruning the thread's old checkpoints periodically."""
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        self.stats['checkpoints_written'] += 1
+
+        if self.keep_latest:
+            key = (str(config["configurable"]["thread_id"]), config["configurable"].get("checkpoint_ns", ""))
+            with self._pool_lock:
+                count = self._puts_since_prune.get(key, 0) + 1
+                due = count >= self.prune_every
+                self._puts_since_prune[key] = 0 if due else count
+            if due:
+                self.prune_thread(*key)
+
+        return next_config
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints and writes of a thread."""
+        super().delete_thread(thread_id)
+        with self._pool_lock:
+            for key in [key for key in self._puts_since_prune if key[0] == str(thread_id)]:
+                del self._puts_since_prune[key]
+
+    def prune_thread(self, thread_id: str, checkpoint_ns: str = "", keep_latest: Optional[int] = None) -> int:
+        """
+        Delete all but the newest checkpoints of a thread (and their pending writes).
+
+        Returns:
+            Number of checkpoints deleted
+        """
+        keep = self.keep_latest if keep_latest is None else keep_latest
+        try:
+            with self.cursor() as cur:
+                cur.execute("""
+                    DELETE FROM checkpoints
+                    WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN (
+                        SELECT checkpoint_id FROM checkpoints
+                        WHERE thread_id = ? AND checkpoint_ns = ?
+                        ORDER BY checkpoint_id DESC LIMIT ?
+                    )
+                """, (thread_id, checkpoint_ns, thread_id, checkpoint_ns, keep))
+                deleted = cur.rowcount
+                if deleted:
+                    cur.execute("""
+                        DELETE FROM writes
+                        WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN (
+                            SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                        )
+                    """, (thread_id, checkpoint_ns, thread_id, checkpoint_ns))
+        except sqlite3.Error as e:
+            logger.debug(f"Checkpoint pruning skipped for {thread_id[:8]}: {e}")
+            return 0
+
+        self.stats['prune_passes'] += 1
+        self.stats['checkpoints_pruned'] += deleted
+        return deleted
+
+    def prune_all(self, keep_latest: Optional[int] = None) -> int:
+        """Apply the retention policy to every thread; returns checkpoints deleted."""
+        with self.cursor(transaction=False) as cur:
+            threads = cur.execute("SELECT DISTINCT thread_id, checkpoint_ns FROM checkpoints").fetchall()
+        return sum(self.prune_thread(thread_id, checkpoint_ns, keep_latest) for thread_id, checkpoint_ns in threads)
+
+    def vacuum(self) -> Dict[str, int]:
+        """
+        Checkpoint the WAL and rebuild the database file to reclaim space.
+
+        Run offline (no API/CLI process using the database).
+
+        Returns:
+            File size in bytes before and after
+        """
+        size_before = self.get_file_size()
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+        return {'size_before': size_before, 'size_after': self.get_file_size()}
+
+    def get_file_size(self) -> int:
+        """Database size in bytes, including the WAL file."""
+        return sum(
+            os.path.getsize(path)
+            for path in (self.db_path, f"{self.db_path}-wal")
+            if os.path.exists(path)
+        )
+
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Get checkpoint table statistics."""
+        with self.cursor(transaction=False) as cur:
+            checkpoints, threads = cur.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT thread_id) FROM checkpoints"
+            ).fetchone()
+            writes = cur.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+
+        stats = self.stats.copy()
+        stats.update({
+            'threads': threads,
+            'checkpoints': checkpoints,
+            'writes': writes,
+            'avg_checkpoints_per_thread': checkpoints / threads if threads else 0.0,
+            'file_size_bytes': self.get_file_size(),
+            'pooled_connections': len(self._connections),
+            'keep_latest': self.keep_latest
+        })
+        return stats
+
+    def close(self):
+        """Close all pooled connections."""
+        with self._pool_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
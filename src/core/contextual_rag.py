@@ -11,18 +11,26 @@ Clean, production-ready RAG system with:
 """
 
 import os
-import re
 import time
 import chromadb
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
 
+from .article_index import ArticleIndex
+from .ingestion_writer import IngestionWriter
+from .lexical_index import LexicalIndex
+from .quantized_index import QuantizedVectorIndex
+from .query_parser import QueryParser, RegulationRegistry
+from .retrieval_policy import AdaptiveRetrievalPolicy
 from .stats_collector import StatsCollector
 from .resilience_manager import resilience_manager
+from .reranker_service import reranker_service
 from src.vectorization.metadata_system import MetadataManager
+from src.cache.embedding_cache import EmbeddingCache, CachedEmbeddings
 from src.utils.logger import logger
 
 
@@ -38,24 +46,84 @@ class OptimizedContextualRAGSystem:
     - Simplified query interface without domain restrictions
     """
     
+    # Reciprocal-rank fusion constant (score = sum of 1 / (RRF_K + rank))
+    RRF_K = 60
+    
+    # HNSW index parameters for the collection. space, ef_construction and
+    # max_neighbors are fixed at creation (tools/collection_maintenance.py
+    # rebuild); ef_search can be tuned in place.
+    HNSW_CONFIG = {
+        "space": "cosine",
+        "ef_search": 100,
+        "ef_construction": 200,
+        "max_neighbors": 16,
+        "num_threads": 4
+    }
+    COLLECTION_VERSION = "2.2.0"
+    
     def __init__(self, 
                  chroma_path: str = "data/chroma_db",
-                 collection_name: str = "contextual_rag_collection"):
+                 collection_name: str = "contextual_rag_collection",
+                 parallel_retrieval: bool = True,
+                 vector_branch_timeout: float = 10.0,
+                 keyword_branch_timeout: float = 3.0,
+                 retrieval_workers: int = 8,
+                 embedding_cache_dir: Optional[str] = "data/embedding_cache",
+                 article_index_path: Optional[str] = None,
+                 lexical_retrieval: bool = True,
+                 lexical_branch_timeout: float = 2.0,
+                 lexical_index_path: Optional[str] = None,
+                 document_registry_path: str = "data/document_registry.json",
+                 adaptive_retrieval: bool = True,
+                 retrieval_policy: Optional[AdaptiveRetrievalPolicy] = None,
+                 quantized_index_path: Optional[str] = None):
         """
         Initialize the RAG system.
         
         Args:
             chroma_path: Path to ChromaDB storage
             collection_name: Name of the ChromaDB collection
+            parallel_retrieval: Run vector and keyword branches concurrently
+            vector_branch_timeout: Deadline (seconds) for the vector+rerank branch
+            keyword_branch_timeout: Deadline (seconds) for the keyword branch
+            retrieval_workers: Thread pool size shared by concurrent queries
+            embedding_cache_dir: On-disk store for query embeddings (None = memory only)
+            article_index_path: Precomputed article index (default: inside chroma_path)
+            lexical_retrieval: Fuse BM25 results with the dense results
+            lexical_branch_timeout: Deadline (seconds) for the BM25 branch
+            lexical_index_path: BM25 index file (default: inside chroma_path)
+            document_registry_path: Ingested documents, used to recognise regulation names
+            adaptive_retrieval: Size the rerank pool per query and skip/stop reranking early
+            retrieval_policy: Thresholds for adaptive retrieval (defaults if None)
+            quantized_index_path: Quantized ANN mirror (default: inside chroma_path, used once synced)
         """
         self.chroma_path = chroma_path
         self.collection_name = collection_name
+        self.embedding_cache_dir = embedding_cache_dir
+        
+        # Concurrent hybrid retrieval configuration
+        self.parallel_retrieval = parallel_retrieval
+        self.vector_branch_timeout = vector_branch_timeout
+        self.keyword_branch_timeout = keyword_branch_timeout
+        self.lexical_retrieval = lexical_retrieval
+        self.lexical_branch_timeout = lexical_branch_timeout
+        self.adaptive_retrieval = adaptive_retrieval
+        self.retrieval_policy = retrieval_policy or AdaptiveRetrievalPolicy()
+        self._retrieval_executor = ThreadPoolExecutor(max_workers=retrieval_workers, thread_name_prefix="rag_retrieval_")
         
         # Initialize core components
         self.stats_collector = StatsCollector()
         self.embeddings = None
+        self.embedding_cache = None
         self.chroma_client = None
         self.vectorstore = None
+        self.reranker = reranker_service
+        
+        # Article lookups are served from the ingest-time index when it exists
+        self.article_index = ArticleIndex(article_index_path or os.path.join(chroma_path, "article_index.bin"))
+        self.lexical_index = LexicalIndex(lexical_index_path or os.path.join(chroma_path, "lexical_index.npz"))
+        self.quantized_index = QuantizedVectorIndex(quantized_index_path or os.path.join(chroma_path, "quantized_index"))
+        self.query_parser = QueryParser(RegulationRegistry.from_document_registry(document_registry_path))
         
         # Setup all components
         self._setup_embeddings()
@@ -66,19 +134,27 @@ class OptimizedContextualRAGSystem:
         logger.system_ready("RAG System ready - hybrid retrieval enabled - no domain restrictions")
     
     def _setup_embeddings(self):
-        """Initialize OpenAI embeddings with resilience."""
+        """Initialize OpenAI embeddings with resilience and a shared query-embedding cache."""
         try:
-            self.embeddings = OpenAIEmbeddings(
+            base_embeddings = OpenAIEmbeddings(
                 model="text-embedding-3-large",
                 show_progress_bar=False,
                 max_retries=3,
                 timeout=30.0
             )
             
-            # Register with resilience manager
-            resilience_manager.register_openai_health_check(self.embeddings)
+            # Register with resilience manager (health checks bypass the cache)
+            resilience_manager.register_openai_health_check(base_embeddings)
+            
+            # Every retrieval path (LangChain vectorstore, direct ChromaDB queries)
+            # embeds through this wrapper, so a query is embedded at most once
+            self.embedding_cache = EmbeddingCache(
+                cache_dir=self.embedding_cache_dir,
+                model_name=base_embeddings.model
+            )
+            self.embeddings = CachedEmbeddings(base_embeddings, self.embedding_cache)
             
-            logger.debug_openai("OpenAI embeddings initialized with resilience")
+            logger.debug_openai("OpenAI embeddings initialized with resilience and query cache")
             
         except Exception as e:
             logger.error(f"Failed to initialize OpenAI embeddings: {e}")
@@ -113,9 +189,11 @@ class OptimizedContextualRAGSystem:
                 collection = self.chroma_client.get_collection(name=self.collection_name)
                 count = collection.count()
                 logger.debug_chromadb(f"Loaded existing collection: {count} documents")
+                self._check_hnsw_config(collection)
             else:
                 # Create new collection with metadata and HNSW optimization
                 collection = self._create_optimized_collection()
+            self._configure_distance_space(collection)
             
             # Wrap with LangChain
             self.vectorstore = Chroma(
@@ -128,38 +206,68 @@ class OptimizedContextualRAGSystem:
             logger.debug_chromadb(f"Error setting up vectorstore: {e}")
             self._setup_fallback_vectorstore()
     
-    def _create_optimized_collection(self):
-        """Create new collection with HNSW optimization and metadata."""
+    @classmethod
+    def collection_metadata(cls, created: Optional[str] = None) -> Dict[str, Any]:
+        """Descriptive metadata stored on the collection."""
         from datetime import datetime
         
-        collection_metadata = {
-            "version": "2.1.0",
-            "created": datetime.now().isoformat(),
+        now = datetime.now().isoformat()
+        return {
+            "version": cls.COLLECTION_VERSION,
+            "created": created or now,
             "embedding_model": "text-embedding-3-large",
-            "description": "Crowdfunding regulation knowledge base with domain-aware RAG",
-            "domains": "lunar,ifs,astrology,crystals,numerology,tarot",
+            "description": "Crowdfunding regulation knowledge base",
             "hnsw_config": "optimized",
-            "last_updated": datetime.now().isoformat(),
+            "last_updated": now,
             "system": "crowd_due_dill"
         }
+    
+    def _create_optimized_collection(self):
+        """Create new collection with HNSW optimization and metadata."""
+        collection_metadata = self.collection_metadata()
         
         collection = self.chroma_client.create_collection(
             name=self.collection_name,
             metadata=collection_metadata,
-            configuration={
-                "hnsw": {
-                    "space": "cosine",
-                    "ef_search": 100,
-                    "ef_construction": 200,
-                    "max_neighbors": 16,
-                    "num_threads": 4
-                }
-            }
+            configuration={"hnsw": dict(self.HNSW_CONFIG)}
         )
         
         logger.debug_chromadb(f"Created new collection with HNSW optimization v{collection_metadata['version']}")
         return collection
     
+    def _check_hnsw_config(self, collection):
+        """Warn when an existing collection was built with different HNSW parameters (ef_search is tunable)."""
+        try:
+            effective = (collection.configuration or {}).get('hnsw') or {}
+        except Exception as e:
+            logger.debug_chromadb(f"Could not read collection configuration: {e}")
+            return
+        
+        mismatched = {
+            key: effective[key] for key in ("space", "ef_construction", "max_neighbors")
+            if key in effective and effective[key] != self.HNSW_CONFIG[key]
+        }
+        if mismatched:
+            logger.warning(
+                f"Collection '{self.collection_name}' HNSW settings differ from the expected configuration: {mismatched} "
+                f"- see tools/collection_maintenance.py report"
+            )
+    
+    def _configure_distance_space(self, collection):
+        """Read the collection's distance space once so ANN distances convert to similarities correctly."""
+        try:
+            # Chroma defaults to l2 when no space was configured
+            space = ((collection.configuration or {}).get('hnsw') or {}).get('space') or 'l2'
+        except Exception as e:
+            logger.debug_chromadb(f"Could not read collection configuration: {e}")
+            space = None
+        
+        if space in AdaptiveRetrievalPolicy.SPACES:
+            self.retrieval_policy.space = space
+        elif self.adaptive_retrieval:
+            logger.warning(f"Unknown distance space {space!r} for '{self.collection_name}' - adaptive retrieval disabled")
+            self.adaptive_retrieval = False
+    
     def _setup_fallback_vectorstore(self):
         """Setup fallback vectorstore if main setup fails."""
         if os.path.exists(self.chroma_path):
@@ -171,6 +279,7 @@ class OptimizedContextualRAGSystem:
                 )
                 count = self.vectorstore._collection.count()
                 logger.debug_chromadb(f"Fallback vectorstore: {count} documents")
+                self._configure_distance_space(self.vectorstore._collection)
             except Exception as e:
                 logger.error(f"Fallback vectorstore failed: {e}")
                 self.vectorstore = None
@@ -185,62 +294,9 @@ class OptimizedContextualRAGSystem:
             query_text: User's query
             
         Returns:
-            Dictionary with query analysis results
-        """
-        query_lower = query_text.lower().strip()
-        
-        # Pattern 1: "Article [number] of [regulation]" (most common)
-        article_pattern = r'\barticle\s+(\d+)\s+of\s+(?:the\s+)?([a-zA-Z\s]+?)(?:\s|$)'
-        match = re.search(article_pattern, query_lower)
-        
-        if match:
-            article_num = match.group(1)
-            regulation = match.group(2).strip()
-            return {
-                'is_precise_lookup': True,
-                'article_number': f"Article {article_num}",
-                'regulation': regulation,
-                'query_type': 'precise_article',
-                'confidence': 0.9
-            }
-        
-        # Pattern 2: "GDPR Article 15", "DSA Article 22" (regulation first)
-        acronym_pattern = r'\b(gdpr|dsa|aml|dora)\s+article\s+(\d+)'
-        match = re.search(acronym_pattern, query_lower)
-        
-        if match:
-            regulation = match.group(1).upper()
-            article_num = match.group(2)
-            return {
-                'is_precise_lookup': True,
-                'article_number': f"Article {article_num}",
-                'regulation': regulation,
-                'query_type': 'precise_acronym',
-                'confidence': 0.8
-            }
-        
-        # Pattern 3: "Article [number]" (standalone)
-        standalone_pattern = r'\barticle\s+(\d+)\b'
-        match = re.search(standalone_pattern, query_lower)
-        
-        if match:
-            article_num = match.group(1)
-            return {
-                'is_precise_lookup': True,
-                'article_number': f"Article {article_num}",
-                'regulation': None,
-                'query_type': 'precise_standalone',
-                'confidence': 0.7
-            }
-        
-        # Default: semantic search
-        return {
-            'is_precise_lookup': False,
-            'article_number': None,
-            'regulation': None,
-            'query_type': 'semantic',
-            'confidence': 1.0
-        }
+            Dictionary with query analysis results (see ParsedQuery.to_query_info)
+        """
+        return self.query_parser.analyze(query_text)
     
     def _metadata_search(self, query_info: Dict[str, Any], k: int) -> List[Document]:
         """
@@ -263,21 +319,11 @@ class OptimizedContextualRAGSystem:
             }
             
             # Add regulation filter if detected
-            if query_info.get('regulation'):
-                reg = query_info['regulation']
-                # Map common abbreviations to full names
-                regulation_map = {
-                    'dsa': 'digital_act',
-                    'gdpr': 'gdpr',
-                    'aml': 'aml',
-                    'dora': 'dora'
-                }
-                
-                source_key = regulation_map.get(reg.lower(), reg.lower())
+            if query_info.get('source'):
                 where_clause = {
                     "$and": [
                         {"article_number": {"$eq": query_info['article_number']}},
-                        {"source": {"$contains": source_key}}
+                        {"source": {"$eq": query_info['source']}}
                     ]
                 }
             
@@ -323,16 +369,8 @@ class OptimizedContextualRAGSystem:
             List of Document objects from semantic search
         """
         try:
-            if query_info.get('regulation') and hasattr(self.vectorstore, '_collection'):
+            if query_info.get('source') and hasattr(self.vectorstore, '_collection'):
                 # Try filtered semantic search
-                reg = query_info['regulation']
-                regulation_map = {
-                    'dsa': 'digital_act',
-                    'gdpr': 'gdpr', 
-                    'aml': 'aml',
-                    'dora': 'dora'
-                }
-                source_key = regulation_map.get(reg.lower(), reg.lower())
                 
                 # Generate embedding
                 def generate_embedding():
@@ -344,7 +382,7 @@ class OptimizedContextualRAGSystem:
                 chroma_results = self.vectorstore._collection.query(
                     query_embeddings=[query_embedding],
                     n_results=k,
-                    where={"source": {"$contains": source_key}},
+                    where={"source": {"$eq": query_info['source']}},
                     include=["documents", "metadatas", "distances"]
                 )
                 
@@ -438,7 +476,9 @@ class OptimizedContextualRAGSystem:
         
         Provides both vector+reranked results AND keyword results to the agent:
         - Vector search -> Cross-encoder reranking (5 results)
+        - BM25 lexical search, fused into the vector results by reciprocal rank
         - Keyword search (3 results) 
+        - All branches run concurrently, each bounded by its own deadline
         - Agent receives both sets for optimal decision making
         
         Args:
@@ -463,14 +503,25 @@ class OptimizedContextualRAGSystem:
             logger.debug_optimization(f"Query type detected: {query_info['query_type']} (confidence: {query_info['confidence']})")
             
             # PARALLEL EXECUTION: Both searches run independently
-            
-            # Path 1: Vector search + Cross-encoder reranking (5 results)
-            vector_docs = self._retrieve_vector_with_reranking(query_text, k=5)
-            
+            # Path 1: Vector search (embedding + ANN) + Cross-encoder reranking (5 results)
             # Path 2: Keyword search (3 results, only for precise queries)
-            keyword_docs = []
+            retrieval_decisions: Dict[str, Any] = {}
+            branches = {
+                'vector': (self._retrieve_vector_with_reranking, (query_text, 5, retrieval_decisions), self.vector_branch_timeout)
+            }
             if query_info['is_precise_lookup']:
-                keyword_docs = self._keyword_search(query_info, k=3)
+                branches['keyword'] = (self._keyword_search, (query_info, 3), self.keyword_branch_timeout)
+            if self.lexical_retrieval and len(self.lexical_index):
+                branches['lexical'] = (self._lexical_search, (query_text, 5), self.lexical_branch_timeout)
+            
+            branch_results, branch_info = self._run_retrieval_branches(branches)
+            vector_docs = branch_results.get('vector', [])
+            keyword_docs = branch_results.get('keyword', [])
+            if branch_results.get('lexical'):
+                vector_docs = self._reciprocal_rank_fusion([vector_docs, branch_results['lexical']], 5)
+            
+            # Per-query candidate pool / rerank decisions
+            query_info['retrieval'] = dict(retrieval_decisions)
             
             # Create parallel results structure
             results = {
@@ -478,6 +529,7 @@ class OptimizedContextualRAGSystem:
                 'keyword_results': self._format_results(keyword_docs, 'keyword_precise'),
                 'query_info': query_info,
                 'search_strategy': 'parallel_hybrid',
+                'branches': branch_info,
                 'total_results': len(vector_docs) + len(keyword_docs),
                 'processing_time': time.time() - start_time
             }
@@ -494,32 +546,266 @@ class OptimizedContextualRAGSystem:
                 start_time, "error", str(e)
             )
     
-    def _retrieve_vector_with_reranking(self, query_text: str, k: int = 5) -> List[Document]:
+    def query_batch(self, queries: List[str], k: int = 4) -> List[Dict[str, Any]]:
+        """
+        Query the RAG system with many questions at once.
+        
+        Returns the same per-query results as query(), but batches the
+        expensive steps across the whole list:
+        - One embeddings request for all uncached queries
+        - One multi-query ChromaDB ANN call
+        - One cross-encoder pass over every (query, candidate) pair
+        Keyword and BM25 searches are local and run per query.
+        
+        Args:
+            queries: Query texts (e.g. a due-diligence checklist)
+            k: Number of chunks to retrieve (used for vector search)
+            
+        Returns:
+            One 'parallel_hybrid' result dictionary per query, in input order
+        """
+        start_time = time.time()
+        if not queries:
+            return []
+        
+        # Check system availability
+        if not self.vectorstore:
+            return [
+                self._create_error_response(
+                    "Vector search is not available. Please check embeddings configuration.",
+                    start_time, "error"
+                )
+                for _ in queries
+            ]
+        
+        try:
+            vector_batches, batch_decisions = self._batch_vector_with_reranking(queries, 5)
+        except Exception as e:
+            logger.debug_optimization(f"Batched vector retrieval failed, querying one by one: {e}")
+            return [self.query(query_text, k) for query_text in queries]
+        
+        vector_duration = time.time() - start_time
+        logger.debug_optimization(f"Batched vector+reranking for {len(queries)} queries in {vector_duration:.2f}s")
+        
+        results = []
+        for query_text, vector_docs, retrieval_decisions in zip(queries, vector_batches, batch_decisions):
+            try:
+                query_info = self._detect_query_type(query_text)
+                query_info['retrieval'] = retrieval_decisions
+                branch_info = {'vector': {'status': 'ok', 'duration': vector_duration, 'batched': len(queries)}}
+                
+                keyword_docs = []
+                if query_info['is_precise_lookup']:
+                    branch_start = time.time()
+                    keyword_docs = self._keyword_search(query_info, 3)
+                    branch_info['keyword'] = {'status': 'ok', 'duration': time.time() - branch_start}
+                
+                if self.lexical_retrieval and len(self.lexical_index):
+                    branch_start = time.time()
+                    lexical_docs = self._lexical_search(query_text, 5)
+                    branch_info['lexical'] = {'status': 'ok', 'duration': time.time() - branch_start}
+                    if lexical_docs:
+                        vector_docs = self._reciprocal_rank_fusion([vector_docs, lexical_docs], 5)
+                
+                results.append({
+                    'vector_results': self._format_results(vector_docs, 'vector_reranked'),
+                    'keyword_results': self._format_results(keyword_docs, 'keyword_precise'),
+                    'query_info': query_info,
+                    'search_strategy': 'parallel_hybrid',
+                    'branches': branch_info,
+                    'total_results': len(vector_docs) + len(keyword_docs),
+                    'processing_time': time.time() - start_time
+                })
+                
+            except Exception as e:
+                logger.error(f"RAG batch query error: {str(e)}")
+                results.append(self._create_error_response(
+                    "I encountered an error while searching for information.",
+                    start_time, "error", str(e)
+                ))
+        
+        return results
+    
+    def _batch_vector_with_reranking(self, queries: List[str], k: int) -> Tuple[List[List[Document]], List[Dict[str, Any]]]:
+        """
+        Vector search and cross-encoder reranking for many queries in one pass each.
+        
+        Args:
+            queries: Query texts
+            k: Number of final results per query
+            
+        Returns:
+            Tuple of (reranked documents per query, retrieval decisions per query)
+        """
+        if not hasattr(self.vectorstore, '_collection') or not self.embeddings:
+            raise RuntimeError("batched retrieval needs a ChromaDB collection and embeddings")
+        
+        initial_k = self.retrieval_policy.fetch_size(k) if self.adaptive_retrieval else max(k * 3, 15)
+        
+        # One embeddings request for every uncached query
+        def generate_embeddings():
+            if hasattr(self.embeddings, 'embed_queries'):
+                return self.embeddings.embed_queries(list(queries))
+            return self.embeddings.embed_documents(list(queries))
+        
+        query_embeddings = resilience_manager.execute_with_openai_resilience(generate_embeddings)
+        
+        all_docs = self._batch_ann_search(query_embeddings, initial_k)
+        queue_depth = self.reranker.queue_depth()
+        decisions = [self._plan_reranking(docs, k, queue_depth) for docs in all_docs]
+        
+        # Cross-encoder passes of at most max_batch_pairs over all (query, candidate) pairs,
+        # so interactive reranks queued meanwhile are not stuck behind the whole batch
+        to_rerank = [i for i, plan in enumerate(decisions) if plan['rerank']]
+        scores = None
+        if to_rerank and self.reranker.is_available():
+            try:
+                # Bulk runs wait for every pass rather than the interactive timeout
+                scores = self.reranker.rerank_many(
+                    [(queries[i], all_docs[i][:decisions[i]['candidate_pool']]) for i in to_rerank],
+                    timeout=None
+                )
+            except Exception as e:
+                logger.debug_optimization(f"Batched reranking failed: {e}")
+        
+        reranked_scores = dict(zip(to_rerank, scores)) if scores is not None else {}
+        results = []
+        for i, docs in enumerate(all_docs):
+            if i in reranked_scores:
+                candidates = docs[:decisions[i]['candidate_pool']]
+                for doc, score in zip(candidates, reranked_scores[i]):
+                    doc.metadata['_rerank_score'] = float(score)
+                docs = sorted(candidates, key=lambda d: d.metadata.get('_rerank_score', 0.0), reverse=True)
+                decisions[i]['reranked'] = len(reranked_scores[i])
+                decisions[i]['stop_reason'] = 'batched'
+            else:
+                decisions[i].setdefault('reranked', 0)
+                for doc in docs:
+                    doc.metadata['_rerank_score'] = 0.0
+            results.append(docs[:k])
+        
+        pair_count = sum(len(batch) for batch in reranked_scores.values())
+        logger.debug_optimization(f"Batched ANN for {len(queries)} queries, reranked {pair_count} pairs")
+        return results, decisions
+    
+    def _batch_ann_search(self, query_embeddings: List[List[float]], k: int) -> List[List[Document]]:
+        """
+        ANN candidates for several query embeddings.
+        
+        Uses the quantized mirror when synced (one chunk fetch for all
+        queries), otherwise one multi-query ChromaDB call.
+        """
+        if self.quantized_index.is_loaded():
+            try:
+                all_hits = [self.quantized_index.search(embedding, k) for embedding in query_embeddings]
+                found = self._fetch_chunks(list({chunk_id for hits in all_hits for chunk_id, _ in hits}))
+                return [self._documents_for_hits(hits, found) for hits in all_hits]
+            except Exception as e:
+                logger.debug_optimization(f"Quantized index batch search failed, using ChromaDB: {e}")
+        
+        chroma_results = self.vectorstore._collection.query(
+            query_embeddings=query_embeddings,
+            n_results=k,
+            include=["documents", "metadatas", "distances"]
+        )
+        
+        batches = []
+        for i in range(len(query_embeddings)):
+            ids = chroma_results['ids'][i]
+            documents = chroma_results['documents'][i]
+            metadatas = chroma_results['metadatas'][i] if chroma_results.get('metadatas') else [{}] * len(ids)
+            distances = chroma_results['distances'][i]
+            
+            docs = []
+            for chunk_id, doc_text, metadata, distance in zip(ids, documents, metadatas, distances):
+                metadata = dict(metadata or {})
+                metadata['_similarity_score'] = float(distance)
+                metadata['_search_type'] = 'vector'
+                docs.append(Document(page_content=doc_text, metadata=metadata, id=chunk_id))
+            batches.append(docs)
+        return batches
+    
+    def _run_retrieval_branches(self, branches: Dict[str, Tuple[Any, tuple, float]]) -> Tuple[Dict[str, List[Document]], Dict[str, Any]]:
+        """
+        Run retrieval branches concurrently with a per-branch deadline.
+        
+        Each branch gets its own deadline measured from fan-out, so a slow
+        branch only loses its own results and never delays the others.
+        
+        Args:
+            branches: Mapping of branch name -> (callable, args, timeout seconds)
+            
+        Returns:
+            Tuple of (branch name -> documents, branch name -> timing/status info)
+        """
+        results = {}
+        info = {}
+        
+        def timed(func, args):
+            branch_start = time.time()
+            docs = func(*args)
+            return docs, time.time() - branch_start
+        
+        # Sequential mode (or a single branch): no thread hand-off needed
+        if not self.parallel_retrieval or len(branches) == 1:
+            for name, (func, args, _) in branches.items():
+                results[name], duration = timed(func, args)
+                info[name] = {'status': 'ok', 'duration': duration}
+            return results, info
+        
+        fan_out_start = time.time()
+        futures = {
+            name: self._retrieval_executor.submit(timed, func, args)
+            for name, (func, args, _) in branches.items()
+        }
+        
+        for name, future in futures.items():
+            deadline = fan_out_start + branches[name][2]
+            try:
+                results[name], duration = future.result(timeout=max(0.0, deadline - time.time()))
+                info[name] = {'status': 'ok', 'duration': duration}
+            except FuturesTimeoutError:
+                future.cancel()
+                results[name] = []
+                info[name] = {'status': 'timeout', 'duration': time.time() - fan_out_start}
+                logger.debug_optimization(f"Retrieval branch '{name}' exceeded {branches[name][2]:.1f}s deadline - continuing without it")
+            except Exception as e:
+                results[name] = []
+                info[name] = {'status': 'error', 'duration': time.time() - fan_out_start, 'error': str(e)}
+                logger.debug_optimization(f"Retrieval branch '{name}' failed: {e}")
+        
+        return results, info
+    
+    def _retrieve_vector_with_reranking(self, query_text: str, k: int = 5,
+                                        decisions: Optional[Dict[str, Any]] = None) -> List[Document]:
         """
         Execute vector search followed by cross-encoder reranking.
         
+        With adaptive retrieval the rerank pool is sized from the ANN score
+        distribution, reranking is skipped for a clear ANN winner and stops
+        early once scores saturate.
+        
         Args:
             query_text: Query text
             k: Number of final results after reranking
+            decisions: Optional dict filled with the per-query retrieval decisions
             
         Returns:
             List of reranked Document objects
         """
+        decisions = decisions if decisions is not None else {}
         try:
-            # Import cross-encoder for reranking
-            try:
-                from sentence_transformers import CrossEncoder
-                cross_encoder = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2", max_length=512)
-                reranking_available = True
-            except ImportError:
-                logger.debug_optimization("Cross-encoder not available, falling back to similarity search")
-                reranking_available = False
-            
-            # Get more documents for reranking (3x the final number)
-            initial_k = max(k * 3, 15)
-            
-            # Perform initial vector search with similarity scores
-            if hasattr(self.vectorstore, 'similarity_search_with_score'):
+            # Shared cross-encoder (loaded once per process)
+            reranking_available = self.reranker.is_available()
+            
+            # Get more documents for reranking (fixed 3x pool unless adaptive)
+            initial_k = self.retrieval_policy.fetch_size(k) if self.adaptive_retrieval else max(k * 3, 15)
+            
+            # Perform initial vector search with similarity scores (in-process mirror when synced)
+            mirrored = self._quantized_vector_search(query_text, initial_k)
+            if mirrored is not None:
+                docs = mirrored
+            elif hasattr(self.vectorstore, 'similarity_search_with_score'):
                 # Use similarity_search_with_score for distance/similarity scores
                 search_results = self.vectorstore.similarity_search_with_score(query_text, k=initial_k)
                 docs = []
@@ -539,26 +825,21 @@ class OptimizedContextualRAGSystem:
                 logger.debug_optimization("No documents found in initial vector search")
                 return []
             
+            # Decide how many candidates to rerank (all of them in fixed mode)
+            plan = self._plan_reranking(docs, k, self.reranker.queue_depth())
+            decisions.update(plan)
+            
             # Apply reranking if available
-            if reranking_available and len(docs) > 1:
+            if reranking_available and plan['rerank']:
                 try:
-                    # Prepare query-document pairs for cross-encoder
-                    pairs = [[query_text, doc.page_content] for doc in docs]
-                    
-                    # Get reranking scores
-                    rerank_scores = cross_encoder.predict(pairs)
+                    candidates = docs[:plan['candidate_pool']]
+                    reranked = self._rerank_in_rounds(query_text, candidates, k, decisions)
                     
-                    # Add rerank scores to documents
-                    for i, doc in enumerate(docs):
-                        if i < len(rerank_scores):
-                            doc.metadata['_rerank_score'] = float(rerank_scores[i])
-                        else:
-                            doc.metadata['_rerank_score'] = 0.0
+                    # Sort by rerank score (descending); unscored candidates keep ANN order after them
+                    reranked.sort(key=lambda d: d.metadata.get('_rerank_score', 0.0), reverse=True)
+                    docs = reranked + [doc for doc in candidates if '_rerank_score' not in doc.metadata]
                     
-                    # Sort by rerank score (descending)
-                    docs.sort(key=lambda d: d.metadata.get('_rerank_score', 0.0), reverse=True)
-                    
-                    logger.debug_optimization(f"Reranked {len(docs)} documents using cross-encoder")
+                    logger.debug_optimization(f"Reranked {decisions['reranked']}/{len(candidates)} documents using cross-encoder ({decisions['stop_reason']})")
                     
                 except Exception as e:
                     logger.debug_optimization(f"Reranking failed: {e}")
@@ -566,7 +847,8 @@ class OptimizedContextualRAGSystem:
                     for doc in docs:
                         doc.metadata['_rerank_score'] = 0.0
             else:
-                # Add default rerank scores when reranking is not available
+                # Add default rerank scores when reranking is not available or skipped
+                decisions.setdefault('reranked', 0)
                 for doc in docs:
                     doc.metadata['_rerank_score'] = 0.0
             
@@ -580,6 +862,104 @@ class OptimizedContextualRAGSystem:
             # Fallback to standard vector search
             return self._standard_vector_search(query_text, k)
     
+    def _quantized_vector_search(self, query_text: str, k: int) -> Optional[List[Document]]:
+        """
+        ANN search against the in-process quantized mirror.
+        
+        Args:
+            query_text: Query text
+            k: Number of candidates
+            
+        Returns:
+            Documents with '_similarity_score' (collection distance), or None to use ChromaDB
+        """
+        if not self.quantized_index.is_loaded() or not self.embeddings or not hasattr(self.vectorstore, '_collection'):
+            return None
+        
+        try:
+            query_embedding = resilience_manager.execute_with_openai_resilience(
+                lambda: self.embeddings.embed_query(query_text)
+            )
+            hits = self.quantized_index.search(query_embedding, k)
+        except Exception as e:
+            logger.debug_optimization(f"Quantized index search failed, using ChromaDB: {e}")
+            return None
+        
+        docs = self._documents_for_hits(hits)
+        if hits and not docs:
+            # Mirror out of sync with the collection (or fetch failed)
+            return None
+        return docs
+    
+    def _documents_for_hits(self, hits: List[Tuple[str, float]],
+                            found: Optional[Dict[str, Tuple[str, Dict[str, Any]]]] = None) -> List[Document]:
+        """Turn (chunk ID, distance) hits into vector-search Documents, keeping hit order."""
+        if found is None:
+            found = self._fetch_chunks([chunk_id for chunk_id, _ in hits]) if hits else {}
+        docs = []
+        for chunk_id, distance in hits:
+            if chunk_id not in found:
+                continue
+            doc_text, metadata = found[chunk_id]
+            metadata = dict(metadata, _similarity_score=float(distance), _search_type='vector')
+            docs.append(Document(page_content=doc_text, metadata=metadata, id=chunk_id))
+        return docs
+    
+    def _plan_reranking(self, docs: List[Document], k: int, queue_depth: int) -> Dict[str, Any]:
+        """
+        Decide the rerank candidate pool for ANN results carrying '_similarity_score'.
+        
+        Args:
+            docs: ANN candidates, best first
+            k: Number of final results
+            queue_depth: Requests waiting on the shared reranker
+            
+        Returns:
+            Decision dict from the retrieval policy (whole pool in fixed mode)
+        """
+        if self.adaptive_retrieval:
+            return self.retrieval_policy.plan(
+                [self.retrieval_policy.similarity(doc.metadata['_similarity_score']) for doc in docs],
+                k, queue_depth=queue_depth
+            )
+        return {'candidates_fetched': len(docs), 'candidate_pool': len(docs), 'rerank': len(docs) > 1, 'reason': 'fixed_pool'}
+    
+    def _rerank_in_rounds(self, query_text: str, candidates: List[Document], k: int,
+                          decisions: Dict[str, Any]) -> List[Document]:
+        """
+        Cross-encode candidates in ANN order, stopping early when the policy allows.
+        
+        Without adaptive retrieval the whole pool is scored in one round.
+        
+        Returns:
+            The scored candidates (with '_rerank_score' metadata)
+        """
+        round_size = self.retrieval_policy.rerank_round_size if self.adaptive_retrieval else len(candidates)
+        scores: List[float] = []
+        stop_reason = 'pool_exhausted'
+        
+        for start in range(0, len(candidates), round_size):
+            batch = candidates[start:start + round_size]
+            # Batched with concurrent requests by the shared reranker; a request still
+            # queued when the branch deadline passes is withdrawn, not scored later
+            round_scores = self.reranker.rerank(query_text, batch, timeout=self.vector_branch_timeout)
+            if round_scores is None:
+                raise RuntimeError("reranker unavailable")
+            
+            for doc, score in zip(batch, round_scores):
+                doc.metadata['_rerank_score'] = float(score)
+            scores.extend(round_scores)
+            
+            if self.adaptive_retrieval and start + round_size < len(candidates):
+                reason = self.retrieval_policy.should_stop(scores, round_scores, k)
+                if reason:
+                    stop_reason = reason
+                    break
+        
+        decisions['reranked'] = len(scores)
+        decisions['stop_reason'] = stop_reason
+        return [doc for doc in candidates if '_rerank_score' in doc.metadata]
+    
     def _format_results(self, docs: List[Document], search_type: str) -> List[Dict[str, Any]]:
         """
         Format Document objects into standardized result dictionaries.
@@ -641,6 +1021,10 @@ class OptimizedContextualRAGSystem:
         if not self.chroma_client or not hasattr(self.vectorstore, '_collection'):
             return []
         
+        # O(1) article index lookup instead of a $contains scan
+        if self.article_index.is_loaded():
+            return self._indexed_keyword_search(query_info, k)
+        
         try:
             # Build keyword search term
             article_text = query_info['article_number']  # e.g., "Article 22"
@@ -652,17 +1036,8 @@ class OptimizedContextualRAGSystem:
             metadata_filters.append({"article_number": {"$eq": article_text}})
             
             # 2. Add regulation source filter if specified
-            if query_info.get('regulation'):
-                reg = query_info['regulation']
-                regulation_map = {
-                    'dsa': 'crawled_content/digital_act.md',
-                    'gdpr': 'crawled_content/gdpr.md', 
-                    'aml': 'crawled_content/aml.md',
-                    'dora': 'crawled_content/dora.md'
-                }
-                source_value = regulation_map.get(reg.lower())
-                if source_value:
-                    metadata_filters.append({"source": {"$eq": source_value}})
+            if query_info.get('source'):
+                metadata_filters.append({"source": {"$eq": query_info['source']}})
             
             # Build final where clause with $and operator
             if len(metadata_filters) == 1:
@@ -713,6 +1088,134 @@ class OptimizedContextualRAGSystem:
             # Fallback to text-only search
             return self._keyword_text_only_search(query_info, k)
     
+    def _indexed_keyword_search(self, query_info: Dict[str, Any], k: int) -> List[Document]:
+        """
+        Keyword search served from the precomputed article index.
+        
+        Chunks defining the article come first (equivalent to the metadata
+        match), chunks only mentioning it follow (the text-only fallback).
+        
+        Args:
+            query_info: Query analysis from _detect_query_type
+            k: Number of results to return
+            
+        Returns:
+            List of Document objects in index order
+        """
+        article_text = query_info['article_number']
+        
+        # Multi-article queries ("Articles 5-7") collect postings per article
+        postings = []
+        for article in query_info.get('article_numbers') or [article_text]:
+            postings.extend(self.article_index.lookup(article, source=query_info.get('source'), limit=k))
+        postings.sort(key=lambda posting: not posting.defining)
+        postings = postings[:k]
+        if not postings:
+            logger.debug_optimization(f"Article index has no chunks for '{article_text}'")
+            return []
+        
+        found = self._fetch_chunks([posting.chunk_id for posting in postings])
+        
+        docs = []
+        for posting in postings:
+            if posting.chunk_id not in found:
+                continue
+            doc_text, metadata = found[posting.chunk_id]
+            metadata['_search_type'] = 'keyword_metadata' if posting.defining else 'keyword_text_only'
+            metadata['_precise_match'] = posting.defining
+            metadata['_article_offset'] = posting.offset
+            docs.append(Document(page_content=doc_text, metadata=metadata))
+        
+        logger.debug_optimization(f"Article index found {len(docs)} chunks for '{article_text}'")
+        return docs
+    
+    def _fetch_chunks(self, chunk_ids: List[str]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """
+        Fetch stored chunks by ID (primary-key lookup, no embedding or scan).
+        
+        Returns:
+            Chunk ID -> (document text, metadata); missing IDs are omitted
+        """
+        try:
+            chroma_results = self.vectorstore._collection.get(ids=chunk_ids, include=["documents", "metadatas"])
+        except Exception as e:
+            logger.debug_optimization(f"Chunk fetch by ID failed: {e}")
+            return {}
+        
+        ids = chroma_results.get('ids', [])
+        return {
+            chunk_id: (doc_text, metadata or {})
+            for chunk_id, doc_text, metadata in zip(
+                ids,
+                chroma_results.get('documents', []),
+                chroma_results.get('metadatas') or [{}] * len(ids)
+            )
+        }
+    
+    def _lexical_search(self, query_text: str, k: int) -> List[Document]:
+        """
+        Execute BM25 search over the stored chunk texts.
+        
+        Args:
+            query_text: Query text
+            k: Number of results to return
+            
+        Returns:
+            List of Document objects ranked by BM25 score
+        """
+        if not self.chroma_client or not hasattr(self.vectorstore, '_collection'):
+            return []
+        
+        hits = self.lexical_index.search(query_text, k)
+        if not hits:
+            return []
+        
+        found = self._fetch_chunks([chunk_id for chunk_id, _ in hits])
+        docs = []
+        for chunk_id, score in hits:
+            if chunk_id not in found:
+                continue
+            doc_text, metadata = found[chunk_id]
+            metadata['_search_type'] = 'lexical'
+            metadata['_bm25_score'] = score
+            docs.append(Document(page_content=doc_text, metadata=metadata, id=chunk_id))
+        
+        logger.debug_optimization(f"BM25 search found {len(docs)} chunks")
+        return docs
+    
+    def _reciprocal_rank_fusion(self, ranked_lists: List[List[Document]], k: int) -> List[Document]:
+        """
+        Merge ranked result lists by reciprocal-rank fusion.
+        
+        Documents are matched by chunk ID (falling back to their leading
+        content); the first list's copy of a document is kept.
+        
+        Args:
+            ranked_lists: Result lists, each best first
+            k: Number of fused results
+            
+        Returns:
+            Fused results with '_rrf_score' metadata
+        """
+        fused: Dict[str, Document] = {}
+        scores: Dict[str, float] = {}
+        
+        for docs in ranked_lists:
+            for rank, doc in enumerate(docs, start=1):
+                key = getattr(doc, 'id', None) or doc.page_content[:100]
+                scores[key] = scores.get(key, 0.0) + 1.0 / (self.RRF_K + rank)
+                if key in fused:
+                    fused[key].metadata['_search_type'] = 'both'
+                else:
+                    fused[key] = doc
+        
+        ranked = sorted(fused, key=lambda key: scores[key], reverse=True)[:k]
+        for key in ranked:
+            fused[key].metadata['_rrf_score'] = scores[key]
+        
+        logger.debug_optimization(f"RRF fused {sum(len(docs) for docs in ranked_lists)} results into {len(ranked)}")
+        return [fused[key] for key in ranked]
+    
     def _keyword_text_only_search(self, query_info: Dict[str, Any], k: int) -> List[Document]:
         """
         Fallback keyword search using only text filtering (original method).
@@ -733,17 +1236,8 @@ class OptimizedContextualRAGSystem:
             
             # Build basic metadata filter for regulation if specified
             where_metadata_filter = None
-            if query_info.get('regulation'):
-                reg = query_info['regulation']
-                regulation_map = {
-                    'dsa': 'crawled_content/digital_act.md',
-                    'gdpr': 'crawled_content/gdpr.md', 
-                    'aml': 'crawled_content/aml.md',
-                    'dora': 'crawled_content/dora.md'
-                }
-                source_value = regulation_map.get(reg.lower())
-                if source_value:
-                    where_metadata_filter = {"source": {"$eq": source_value}}
+            if query_info.get('source'):
+                where_metadata_filter = {"source": {"$eq": query_info['source']}}
             
             # Execute text-only keyword search
             chroma_results = self.vectorstore._collection.get(
@@ -901,22 +1395,28 @@ class OptimizedContextualRAGSystem:
         }
     
     # Batch operations
-    def add_documents_batch(self, documents, batch_size: int = 100):
-        """Add documents in batches with progress tracking."""
-        if not self.vectorstore:
+    def add_documents_batch(self, documents, batch_size: int = 100, max_batch_tokens: int = 100_000):
+        """Add documents in token-budgeted batches, embedding the next batch while the previous one is written."""
+        if not self.vectorstore or not self.embeddings:
             logger.error("Cannot add documents - vectorstore not available")
             return False
         
         try:
             total_docs = len(documents)
-            logger.debug(f"Adding {total_docs} documents in batches of {batch_size}")
+            logger.debug(f"Adding {total_docs} documents (batches of <= {batch_size} docs / {max_batch_tokens} tokens)")
             
-            for i in range(0, total_docs, batch_size):
-                batch = documents[i:i + batch_size]
-                self.vectorstore.add_documents(batch)
-                logger.debug(f"Added batch {i//batch_size + 1}/{(total_docs + batch_size - 1)//batch_size}")
-            
-            logger.command_executed(f"Added {total_docs} documents successfully")
+            writer = IngestionWriter(
+                self.vectorstore._collection, self.embeddings,
+                max_batch_tokens=max_batch_tokens, max_batch_items=batch_size
+            )
+            for document in documents:
+                writer.add(document)
+            result = writer.close()
+            
+            if result['failed']:
+                logger.error(f"Failed to add {len(result['failed'])}/{total_docs} documents")
+                return False
+            logger.command_executed(f"Added {total_docs} documents successfully in {result['batches']} batches")
             return True
             
         except Exception as e:
@@ -937,6 +1437,17 @@ class OptimizedContextualRAGSystem:
         resilience_stats = resilience_manager.get_health_summary()
         stats.update(resilience_stats)
         
+        # Add reranker stats
+        stats['reranker'] = self.reranker.get_stats()
+        
+        # Add query embedding cache stats
+        if self.embedding_cache:
+            stats['embedding_cache'] = self.embedding_cache.get_stats()
+        
+        stats['article_index'] = self.article_index.get_stats()
+        stats['lexical_index'] = self.lexical_index.get_stats()
+        stats['quantized_index'] = self.quantized_index.get_stats()
+        
         return stats
     
     def get_domain_status(self) -> Dict[str, Any]:
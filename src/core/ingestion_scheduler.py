@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Ingestion Scheduler for Crowd Due Dill
+
+Rate-limit-aware scheduling of per-chunk model calls during ingestion:
+- Token buckets per provider for requests/minute and tokens/minute quotas
+- Adaptive concurrency per provider (AIMD: additive increase on success,
+  multiplicative decrease on 429 / RESOURCE_EXHAUSTED)
+- Rate-limited calls retried with jittered exponential backoff
+- Per-chunk stage pipelining: independent stages of one chunk run side by
+  side and every chunk moves on as soon as its own prerequisites finish,
+  so different chunks are in different stages at the same time
+- Live throughput (chunks/s, tokens/s) for progress reporting
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.utils.logger import logger
+
+
+RATE_LIMIT_MARKERS = ("429", "resource_exhausted", "rate limit", "rate_limit", "quota", "too many requests")
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether an exception is a provider rate-limit / quota rejection."""
+    for attribute in ("code", "status_code", "status"):
+        if getattr(error, attribute, None) == 429:
+            return True
+    message = f"{type(error).__name__} {error}".lower()
+    return any(marker in message for marker in RATE_LIMIT_MARKERS)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for quota accounting (~4 characters per token)."""
+    return max(1, len(text or "") // 4)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """
+        Initialize the bucket.
+
+        Args:
+            per_minute: Refill rate (requests or tokens per minute)
+            capacity: Burst size (defaults to one second of quota, at least 1)
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Take amount from the bucket, blocking until it is available.
+
+        Requests larger than the capacity are allowed once the bucket is full
+        (they drive the balance negative and delay later callers instead).
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                needed = min(amount, self.capacity)
+                if self._available >= needed:
+                    self._available -= amount
+                    return waited
+                delay = (needed - self._available) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class AdaptiveConcurrencyLimiter:
+    """Concurrency limit adjusted with AIMD on rate-limit feedback."""
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 16,
+                 increase_after: int = 10, decrease_factor: float = 0.5):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial: Starting concurrency limit
+            minimum: Lowest limit after decreases
+            maximum: Highest limit after increases
+            increase_after: Consecutive successes before the limit grows by one
+            decrease_factor: Multiplier applied to the limit on a rate-limit error
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase_after = increase_after
+        self.decrease_factor = decrease_factor
+        self.limit = max(minimum, min(initial, maximum))
+        self.in_flight = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Block until a slot under the current limit is free."""
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self):
+        """Free a slot."""
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        """Additive increase after a run of successful calls."""
+        with self._condition:
+            self._successes += 1
+            if self._successes >= self.increase_after and self.limit < self.maximum:
+                self.limit += 1
+                self._successes = 0
+                self._condition.notify_all()
+
+    def on_rate_limited(self):
+        """Multiplicative decrease."""
+        with self._condition:
+            self.limit = max(self.minimum, int(self.limit * self.decrease_factor))
+            self._successes = 0
+
+
+class ProviderLimiter:
+    """Quota buckets, adaptive concurrency and 429 retries for one model provider."""
+
+    def __init__(self, name: str,
+                 requests_per_minute: float,
+                 tokens_per_minute: Optional[float] = None,
+                 max_concurrency: int = 8,
+                 initial_concurrency: Optional[int] = None,
+                 max_retries: int = 5,
+                 backoff_base: float = 1.0,
+                 backoff_max: float = 60.0):
+        """
+        Initialize the provider limiter.
+
+        Args:
+            name: Provider name used in stats (e.g. 'gemini', 'openai')
+            requests_per_minute: Request quota
+            tokens_per_minute: Token quota (None = unlimited)
+            max_concurrency: Highest concurrent calls AIMD may reach
+            initial_concurrency: Starting concurrency (defaults to half the maximum)
+            max_retries: Rate-limited attempts retried before the error is raised
+            backoff_base: First backoff delay in seconds (doubles per retry, jittered)
+            backoff_max: Longest backoff delay in seconds
+        """
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute, capacity=tokens_per_minute / 6.0) if tokens_per_minute else None
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial=initial_concurrency or max(1, max_concurrency // 2),
+            maximum=max_concurrency
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._stats_lock = threading.Lock()
+        self.calls = 0
+        self.tokens_used = 0
+        self.rate_limited = 0
+        self.throttle_seconds = 0.0
+
+    def call(self, fn: Callable[..., Any], *args, tokens: int = 0, **kwargs) -> Any:
+        """
+        Run fn under this provider's limits.
+
+        Rate-limit errors shrink the concurrency limit and are retried with
+        backoff; any other exception propagates to the caller unchanged.
+
+        Args:
+            fn: The model call
+            tokens: Estimated tokens the call consumes
+        """
+        for attempt in range(self.max_retries + 1):
+            waited = self.requests.acquire(1)
+            if self.tokens and tokens:
+                waited += self.tokens.acquire(tokens)
+
+            self.concurrency.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                self.concurrency.on_rate_limited()
+                with self._stats_lock:
+                    self.rate_limited += 1
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+                logger.warning(f"{self.name} rate limited (attempt {attempt + 1}), "
+                               f"concurrency -> {self.concurrency.limit}, retrying in {delay:.1f}s")
+            else:
+                self.concurrency.on_success()
+                with self._stats_lock:
+                    self.calls += 1
+                    self.tokens_used += tokens
+                    self.throttle_seconds += waited
+                return result
+            finally:
+                self.concurrency.release()
+            time.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get provider call statistics."""
+        with self._stats_lock:
+            return {
+                'calls': self.calls,
+                'tokens': self.tokens_used,
+                'rate_limited': self.rate_limited,
+                'throttle_seconds': self.throttle_seconds,
+                'concurrency_limit': self.concurrency.limit
+            }
+
+
+@dataclass
+class PipelineStage:
+    """One per-item processing step run by the IngestionScheduler."""
+    name: str
+    fn: Callable[[int, Any], Any]
+    after: Sequence[str] = ()
+
+
+class IngestionScheduler:
+    """
+    Runs per-chunk stages on a shared worker pool.
+
+    Stages of one item start as soon as the stages they depend on have
+    finished for that item, so chunk N can be embedding while chunk N+5 is
+    still being contextualized. Model quotas are enforced by the
+    ProviderLimiter each stage calls through, not by the pool size.
+    """
+
+    def __init__(self, limiters: Optional[Dict[str, ProviderLimiter]] = None, max_workers: int = 16):
+        """
+        Initialize the scheduler.
+
+        Args:
+            limiters: Provider limiters by name (reported in stats)
+            max_workers: Worker threads shared by all stages
+        """
+        self.limiters = limiters or {}
+        self.max_workers = max_workers
+        self._started = 0.0
+        self._items_done = 0
+        self._tokens_at_start = 0
+
+    def limiter(self, name: str) -> ProviderLimiter:
+        """Provider limiter by name."""
+        return self.limiters[name]
+
+    def run(self, items: Sequence[Any], stages: Sequence[PipelineStage],
+            on_item_done: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+            on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Run every stage for every item.
+
+        Args:
+            items: Work items (chunks)
+            stages: Stages in dependency order; stage.fn(index, item) gets the
+                item and its return value is stored under stage.name
+            on_item_done: Called (index, results) once all stages of an item finished
+            on_progress: Called with get_stats() after each finished item
+
+        Returns:
+            Per-item dicts of stage name -> result (an exception instance if the stage raised)
+        """
+        names = {stage.name for stage in stages}
+        for stage in stages:
+            unknown = set(stage.after) - names
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages {sorted(unknown)}")
+
+        results: List[Dict[str, Any]] = [{} for _ in items]
+        self._started = time.monotonic()
+        self._items_done = 0
+        self._tokens_at_start = self._tokens_used()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            submitted = set()
+
+            def submit_ready(index: int):
+                for stage in stages:
+                    if (index, stage.name) in submitted:
+                        continue
+                    if all(dependency in results[index] for dependency in stage.after):
+                        submitted.add((index, stage.name))
+                        future = executor.submit(stage.fn, index, items[index])
+                        pending[future] = (index, stage.name)
+
+            for index in range(len(items)):
+                submit_ready(index)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, name = pending.pop(future)
+                    try:
+                        results[index][name] = future.result()
+                    except Exception as e:
+                        logger.warning(f"Ingestion stage '{name}' failed for item {index}: {e}")
+                        results[index][name] = e
+                    submit_ready(index)
+
+                    if len(results[index]) == len(stages):
+                        self._items_done += 1
+                        if on_item_done:
+                            on_item_done(index, results[index])
+                        if on_progress:
+                            on_progress(self.get_stats())
+
+        return results
+
+    def _tokens_used(self) -> int:
+        return sum(limiter.tokens_used for limiter in self.limiters.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Live throughput of the current (or last) run; provider counters are cumulative."""
+        elapsed = max(time.monotonic() - self._started, 1e-9) if self._started else 0.0
+        providers = {name: limiter.get_stats() for name, limiter in self.limiters.items()}
+        tokens = self._tokens_used() - self._tokens_at_start
+        return {
+            'items_done': self._items_done,
+            'elapsed': elapsed,
+            'chunks_per_s': self._items_done / elapsed if elapsed else 0.0,
+            'tokens_per_s': tokens / elapsed if elapsed else 0.0,
+            'providers': providers
+        }
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Ingestion Writer for Crowd Due Dill
+
+Streams chunks into the ChromaDB collection during ingestion:
+- Batches sized by estimated token count (not document count)
+- Embedding requests for later batches overlap the Chroma upsert of
+  earlier ones, with a bounded number of batches in flight
+- Failed embedding batches are retried and then split so one bad input
+  does not fail its neighbours; failed upserts are retried with the
+  vectors already computed (successful items are never re-embedded)
+- Upserts keyed by chunk ID, so re-running a write is idempotent
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from langchain_core.documents import Document
+
+from src.utils.logger import logger
+from .ingestion_scheduler import ProviderLimiter, estimate_tokens
+
+
+class IngestionWriter:
+    """
+    Token-budgeted, pipelined embedding + upsert writer.
+
+    Usage:
+        writer = IngestionWriter(collection, embeddings)
+        for doc in documents:
+            writer.add(doc)
+        result = writer.close()
+    """
+
+    def __init__(self, collection, embeddings,
+                 limiter: Optional[ProviderLimiter] = None,
+                 max_batch_tokens: int = 100_000,
+                 max_batch_items: int = 256,
+                 max_in_flight: int = 2,
+                 max_retries: int = 2,
+                 retry_delay: float = 1.0):
+        """
+        Initialize the writer.
+
+        Args:
+            collection: ChromaDB collection to upsert into
+            embeddings: LangChain embeddings used for embed_documents
+            limiter: Optional provider limiter for the embedding requests
+            max_batch_tokens: Estimated tokens per embedding request
+            max_batch_items: Documents per embedding request
+            max_in_flight: Batches being embedded or written at once
+            max_retries: Extra attempts for a failed embedding request or upsert
+            retry_delay: Base delay between attempts (grows linearly)
+        """
+        self.collection = collection
+        self.embeddings = embeddings
+        self.limiter = limiter
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_items = max_batch_items
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self._slots = threading.Semaphore(max_in_flight)
+        self._upsert_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._futures = []
+        self._batch: List[Dict[str, Any]] = []
+        self._batch_tokens = 0
+        self._closed = False
+
+        self._order: List[str] = []
+        self._queued = set()
+        self._written = set()
+        self.failed: Dict[str, str] = {}
+        self.batches = 0
+        self.tokens = 0
+        self.embed_seconds = 0.0
+        self.upsert_seconds = 0.0
+        self._started = time.time()
+
+    def add(self, document: Document, chunk_id: Optional[str] = None) -> str:
+        """
+        Queue a document for embedding (page_content) and upsert.
+
+        Documents already queued under the same ID are ignored.
+
+        Args:
+            document: Document to embed; metadata is stored as-is
+            chunk_id: Vector ID (defaults to metadata['chunk_id'], else a new UUID)
+
+        Returns:
+            The vector ID
+        """
+        if self._closed:
+            raise RuntimeError("IngestionWriter is closed")
+
+        chunk_id = chunk_id or document.metadata.get('chunk_id') or str(uuid.uuid4())
+        if chunk_id in self._queued:
+            return chunk_id
+        self._queued.add(chunk_id)
+        self._order.append(chunk_id)
+
+        tokens = estimate_tokens(document.page_content)
+        if self._batch and (self._batch_tokens + tokens > self.max_batch_tokens
+                            or len(self._batch) >= self.max_batch_items):
+            self._dispatch()
+
+        self._batch.append({
+            'id': chunk_id,
+            'text': document.page_content,
+            'metadata': document.metadata or None,
+            'tokens': tokens
+        })
+        self._batch_tokens += tokens
+        return chunk_id
+
+    def _dispatch(self):
+        """Hand the current batch to a worker (blocks while max_in_flight batches are busy)."""
+        batch, self._batch, self._batch_tokens = self._batch, [], 0
+        self._slots.acquire()
+        self.batches += 1
+        self._futures.append(self._executor.submit(self._run_batch, batch))
+
+    def _run_batch(self, batch: List[Dict[str, Any]]):
+        try:
+            self._write(batch)
+        finally:
+            self._slots.release()
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        """Embed and upsert one batch, splitting it if embedding keeps failing."""
+        try:
+            vectors = self._with_retries(self._embed, batch)
+        except Exception as e:
+            if len(batch) > 1:
+                middle = len(batch) // 2
+                logger.warning(f"Embedding batch of {len(batch)} failed ({e}); retrying in halves")
+                self._write(batch[:middle])
+                self._write(batch[middle:])
+            else:
+                self._record_failure(batch, e)
+            return
+
+        try:
+            self._with_retries(self._upsert, batch, vectors)
+        except Exception as e:
+            self._record_failure(batch, e)
+            return
+
+        with self._state_lock:
+            self._written.update(item['id'] for item in batch)
+
+    def _with_retries(self, fn, *args):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return fn(*args)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.debug(f"{fn.__name__} attempt {attempt + 1} failed: {e}")
+                time.sleep(self.retry_delay * (attempt + 1))
+
+    def _embed(self, batch: List[Dict[str, Any]]) -> List[List[float]]:
+        start = time.time()
+        texts = [item['text'] for item in batch]
+        tokens = sum(item['tokens'] for item in batch)
+        if self.limiter:
+            vectors = self.limiter.call(self.embeddings.embed_documents, texts, tokens=tokens)
+        else:
+            vectors = self.embeddings.embed_documents(texts)
+        if len(vectors) != len(batch):
+            raise RuntimeError(f"got {len(vectors)} embeddings for {len(batch)} documents")
+        with self._state_lock:
+            self.tokens += tokens
+            self.embed_seconds += time.time() - start
+        return vectors
+
+    def _upsert(self, batch: List[Dict[str, Any]], vectors: List[List[float]]):
+        start = time.time()
+        with self._upsert_lock:
+            self.collection.upsert(
+                ids=[item['id'] for item in batch],
+                embeddings=vectors,
+                documents=[item['text'] for item in batch],
+                metadatas=[item['metadata'] for item in batch]
+            )
+        with self._state_lock:
+            self.upsert_seconds += time.time() - start
+
+    def _record_failure(self, batch: List[Dict[str, Any]], error: Exception):
+        logger.error(f"Failed to write {len(batch)} chunks: {error}")
+        with self._state_lock:
+            for item in batch:
+                self.failed[item['id']] = str(error)
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Flush the last batch and wait for all writes.
+
+        Returns:
+            Write result: written IDs (in the order added), failed IDs with errors and timings
+        """
+        if not self._closed:
+            if self._batch:
+                self._dispatch()
+            self._closed = True
+            for future in self._futures:
+                future.result()
+            self._executor.shutdown(wait=True)
+
+        return {
+            'written': [chunk_id for chunk_id in self._order if chunk_id in self._written],
+            'failed': dict(self.failed),
+            'batches': self.batches,
+            'tokens': self.tokens,
+            'embed_seconds': self.embed_seconds,
+            'upsert_seconds': self.upsert_seconds,
+            'duration': time.time() - self._started
+        }
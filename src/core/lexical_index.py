@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Lexical Index for Crowd Due Dill
+
+BM25 inverted index over stored chunk texts:
+- Catches exact legal terms dense embeddings blur ("CASP", "ELTIF", "Article 23(4)(b)")
+- Postings kept as term-major NumPy arrays (CSC layout), so scoring a query
+  is a handful of slices and one bincount
+- Persisted as a single .npz file, updated incrementally at ingest time and
+  reloaded by running processes when the file changes
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.logger import logger
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\([a-z0-9]+\))*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were which with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into index terms.
+
+    References like "23(4)(b)" are kept whole and also indexed as their base
+    number, so both "Article 23(4)(b)" and "Article 23" match.
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if "(" in token:
+            tokens.append(token.split("(", 1)[0])
+    return tokens
+
+
+class LexicalIndex:
+    """
+    Incrementally updatable BM25 index.
+
+    Documents are stored as per-chunk term-frequency rows; the term-major
+    posting arrays used for scoring are rebuilt lazily after updates.
+    """
+
+    def __init__(self, path: Optional[str] = "data/chroma_db/lexical_index.npz",
+                 k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize the index.
+
+        Args:
+            path: .npz file (None keeps the index in memory only)
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalisation
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.RLock()
+        self._vocab: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._ids: List[str] = []
+        self._sources: List[str] = []
+        self._rows: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._compiled = None
+        self._dirty = False
+        self._file_id = None
+
+        # Performance tracking
+        self.searches = 0
+        self.total_search_time = 0.0
+
+        self.refresh()
+
+    # Persistence
+
+    def refresh(self) -> bool:
+        """Reload the index file if another process replaced it; returns True if reloaded."""
+        if not self.path:
+            return False
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+
+        file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if file_id == self._file_id or self._dirty:
+                return False
+            try:
+                self._load(self.path)
+                self._file_id = file_id
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Lexical index {self.path} could not be loaded: {e}")
+                return False
+
+        logger.debug_optimization(f"Lexical index loaded: {len(self._ids)} chunks, {len(self._terms)} terms")
+        return True
+
+    def _load(self, path: str):
+        """Read the CSR arrays from disk."""
+        with np.load(path, allow_pickle=False) as data:
+            terms = data['terms'].tolist()
+            ids = data['ids'].tolist()
+            sources = data['sources'].tolist()
+            row_ptr = data['row_ptr']
+            term_ids = data['term_ids']
+            tfs = data['tfs']
+
+        self._terms = terms
+        self._vocab = {term: i for i, term in enumerate(terms)}
+        self._ids = ids
+        self._sources = sources
+        self._rows = [
+            (term_ids[row_ptr[i]:row_ptr[i + 1]], tfs[row_ptr[i]:row_ptr[i + 1]])
+            for i in range(len(ids))
+        ]
+        self._compiled = None
+
+    def save(self):
+        """Write the index (temp file + rename)."""
+        if not self.path:
+            return
+        with self._lock:
+            lengths = [len(term_ids) for term_ids, _ in self._rows]
+            row_ptr = np.zeros(len(self._rows) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=row_ptr[1:])
+
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = f"{self.path}.tmp.npz"
+            np.savez(
+                temp_path,
+                terms=np.array(self._terms, dtype=str),
+                ids=np.array(self._ids, dtype=str),
+                sources=np.array(self._sources, dtype=str),
+                row_ptr=row_ptr,
+                term_ids=np.concatenate([row[0] for row in self._rows]) if self._rows else np.zeros(0, dtype=np.int32),
+                tfs=np.concatenate([row[1] for row in self._rows]) if self._rows else np.zeros(0, dtype=np.float32)
+            )
+            os.replace(temp_path, self.path)
+
+            stat = os.stat(self.path)
+            self._file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._dirty = False
+
+    # Updates
+
+    def add_documents(self, ids: Sequence[str], texts: Sequence[str], sources: Optional[Sequence[str]] = None) -> int:
+        """Add (or replace) chunks; returns the number indexed."""
+        sources = sources or [""] * len(ids)
+        with self._lock:
+            existing = set(ids) & set(self._ids)
+            if existing:
+                self._remove_where(lambda i: self._ids[i] in existing)
+
+            for chunk_id, text, source in zip(ids, texts, sources):
+                counts: Dict[int, int] = {}
+                for token in tokenize(text):
+                    term_id = self._vocab.get(token)
+                    if term_id is None:
+                        term_id = self._vocab[token] = len(self._terms)
+                        self._terms.append(token)
+                    counts[term_id] = counts.get(term_id, 0) + 1
+
+                self._ids.append(chunk_id)
+                self._sources.append(source)
+                self._rows.append((
+                    np.fromiter(counts.keys(), dtype=np.int32, count=len(counts)),
+                    np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+                ))
+
+            self._compiled = None
+            self._dirty = True
+        return len(ids)
+
+    def remove_source(self, source: str) -> int:
+        """Drop every chunk of a document; returns chunks removed."""
+        with self._lock:
+            return self._remove_where(lambda i: self._sources[i] == source)
+
+    def remove_ids(self, ids: Sequence[str]) -> int:
+        """Drop specific chunks; returns chunks removed."""
+        ids = set(ids)
+        with self._lock:
+            return self._remove_where(lambda i: self._ids[i] in ids)
+
+    def _remove_where(self, predicate) -> int:
+        """Remove rows matching predicate(row index)."""
+        keep = [i for i in range(len(self._ids)) if not predicate(i)]
+        removed = len(self._ids) - len(keep)
+        if removed:
+            self._ids = [self._ids[i] for i in keep]
+            self._sources = [self._sources[i] for i in keep]
+            self._rows = [self._rows[i] for i in keep]
+            self._compiled = None
+            self._dirty = True
+        return removed
+
+    def clear(self):
+        """Remove all chunks (vocabulary included)."""
+        with self._lock:
+            self._vocab = {}
+            self._terms = []
+            self._ids = []
+            self._sources = []
+            self._rows = []
+            self._compiled = None
+            self._dirty = True
+
+    # Scoring
+
+    def _compile(self):
+        """Build term-major BM25 weight arrays from the document rows."""
+        doc_count = len(self._rows)
+        term_count = len(self._terms)
+        lengths = np.array([row[1].sum() for row in self._rows], dtype=np.float32)
+
+        if doc_count == 0:
+            return np.zeros(term_count + 1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32), 0
+
+        docs = np.repeat(np.arange(doc_count, dtype=np.int32), [len(row[0]) for row in self._rows])
+        terms = np.concatenate([row[0] for row in self._rows])
+        tfs = np.concatenate([row[1] for row in self._rows])
+
+        doc_freq = np.bincount(terms, minlength=term_count).astype(np.float32)
+        idf = np.log1p((doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+        avg_length = float(lengths.mean()) or 1.0
+        norm = self.k1 * (1.0 - self.b + self.b * lengths[docs] / avg_length)
+        weights = (idf[terms] * tfs * (self.k1 + 1.0) / (tfs + norm)).astype(np.float32)
+
+        order = np.argsort(terms, kind="stable")
+        term_ptr = np.zeros(term_count + 1, dtype=np.int64)
+        np.cumsum(doc_freq.astype(np.int64), out=term_ptr[1:])
+        return term_ptr, docs[order], weights[order], doc_count
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Score all chunks against a query.
+
+        Returns:
+            Up to k (chunk ID, BM25 score) pairs, best first (zero scores dropped)
+        """
+        start_time = time.time()
+        self.refresh()
+
+        with self._lock:
+            if self._compiled is None:
+                self._compiled = self._compile()
+            term_ptr, post_docs, post_weights, doc_count = self._compiled
+            ids = self._ids
+            term_ids = sorted({self._vocab[token] for token in tokenize(query) if token in self._vocab})
+
+        results = []
+        if term_ids and doc_count:
+            slices = [slice(term_ptr[t], term_ptr[t + 1]) for t in term_ids]
+            scores = np.bincount(
+                np.concatenate([post_docs[s] for s in slices]),
+                weights=np.concatenate([post_weights[s] for s in slices]),
+                minlength=doc_count
+            )
+            top = min(k, doc_count)
+            candidates = np.argpartition(-scores, top - 1)[:top]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            results = [(ids[i], float(scores[i])) for i in candidates if scores[i] > 0]
+
+        self.searches += 1
+        self.total_search_time += time.time() - start_time
+        return results
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        return {
+            'chunks': len(self._ids),
+            'terms': len(self._terms),
+            'postings': int(sum(len(row[0]) for row in self._rows)),
+            'searches': self.searches,
+            'avg_search_time': self.total_search_time / self.searches if self.searches else 0.0
+        }
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Quantized Vector Index for Crowd Due Dill
+
+Read-only, in-process mirror of the ChromaDB collection for fast ANN search:
+- Coarse pass over int8 or binary codes of Matryoshka-truncated vectors
+  (text-embedding-3 vectors keep most of their quality when truncated)
+- Full-precision rescoring of the best candidates
+- Arrays stored as .npy files and memory-mapped, so every API worker shares
+  the page cache instead of holding its own copy
+- Rebuilt from the collection by a sync command after ingestion; readers
+  notice the new version and remap it
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.logger import logger
+
+
+INDEX_FORMAT_VERSION = 1
+QUANTIZATION_MODES = ("int8", "binary")
+META_FILE = "meta.json"
+
+# Set bits per byte value, for Hamming distances when np.bitwise_count (NumPy 2) is missing
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+def _hamming(codes: np.ndarray, query_bits: np.ndarray) -> np.ndarray:
+    """Hamming distance between packed binary codes and one packed query."""
+    if hasattr(np, "bitwise_count"):
+        if codes.shape[1] % 8 == 0:
+            # Popcount 64 bits at a time
+            codes = np.ascontiguousarray(codes).view(np.uint64)
+            query_bits = query_bits.view(np.uint64)
+        return np.bitwise_count(np.bitwise_xor(codes, query_bits)).sum(axis=1, dtype=np.int32)
+    return POPCOUNT[np.bitwise_xor(codes, query_bits)].sum(axis=1, dtype=np.int32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise rows (zero rows stay zero)."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def quantize(vectors: np.ndarray, mode: str, dims: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Quantize full-precision vectors for the coarse pass.
+
+    Args:
+        vectors: (n, full_dims) float vectors
+        mode: 'int8' (symmetric, one scale per vector) or 'binary' (sign bits)
+        dims: Leading dimensions kept (Matryoshka truncation)
+
+    Returns:
+        Tuple of (codes, per-vector scales or None for binary)
+    """
+    truncated = _normalize(np.asarray(vectors, dtype=np.float32)[:, :dims])
+    if mode == "binary":
+        return np.packbits(truncated > 0, axis=1), None
+
+    scales = np.abs(truncated).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.round(truncated / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class QuantizedVectorIndex:
+    """
+    Memory-mapped quantized mirror of the vector collection.
+
+    A missing or unreadable mirror leaves the index unloaded, in which case
+    the RAG system keeps using ChromaDB for ANN search.
+    """
+
+    def __init__(self, path: str = "data/chroma_db/quantized_index",
+                 oversample: int = 4, block_rows: int = 1024):
+        """
+        Initialize the index.
+
+        Args:
+            path: Mirror directory (holds meta.json and the .npy arrays)
+            oversample: Candidates rescored at full precision per result
+            block_rows: Rows scored per step of the coarse pass (kept cache-sized)
+        """
+        self.path = path
+        self.oversample = oversample
+        self.block_rows = block_rows
+
+        self._lock = threading.Lock()
+        self._view: Optional[Dict[str, Any]] = None
+        self._file_id = None
+
+        # Performance tracking
+        self.searches = 0
+        self.total_search_time = 0.0
+
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """Map the current mirror version if it changed on disk; returns True if (re)loaded."""
+        meta_path = os.path.join(self.path, META_FILE)
+        try:
+            stat = os.stat(meta_path)
+        except OSError:
+            return False
+
+        file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if file_id == self._file_id:
+            return False
+
+        with self._lock:
+            if file_id == self._file_id:
+                return False
+            try:
+                self._view = self._map(self.path, meta_path)
+                self._file_id = file_id
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Quantized index {self.path} could not be loaded: {e}")
+                return False
+
+        meta = self._view['meta']
+        logger.debug_optimization(f"Quantized index loaded: {meta['count']} vectors, {meta['mode']} x {meta['dims']} dims")
+        return True
+
+    @staticmethod
+    def _map(path: str, meta_path: str) -> Dict[str, Any]:
+        """Load the metadata and memory-map the arrays it points to."""
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get('format_version') != INDEX_FORMAT_VERSION or meta.get('mode') not in QUANTIZATION_MODES:
+            raise ValueError("not a quantized index (or unsupported version)")
+
+        files = meta['files']
+        view = {
+            'meta': meta,
+            'ids': np.load(os.path.join(path, files['ids']), allow_pickle=False).tolist(),
+            'codes': np.load(os.path.join(path, files['codes']), mmap_mode="r"),
+            'full': np.load(os.path.join(path, files['full']), mmap_mode="r"),
+            'scales': np.load(os.path.join(path, files['scales'])) if files.get('scales') else None,
+        }
+        if len(view['ids']) != meta['count'] or view['full'].shape[0] != meta['count']:
+            raise ValueError("quantized index arrays do not match their metadata")
+        return view
+
+    def is_loaded(self) -> bool:
+        """Check whether a mirror is mapped."""
+        return self._view is not None
+
+    def __len__(self) -> int:
+        return self._view['meta']['count'] if self._view else 0
+
+    def vectors(self) -> Tuple[List[str], np.ndarray]:
+        """Stored chunk IDs and their memory-mapped full-precision vectors."""
+        if self._view is None:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        return self._view['ids'], self._view['full']
+
+    def _coarse_scores(self, view: Dict[str, Any], query: np.ndarray) -> np.ndarray:
+        """Approximate similarity of every stored vector to the query (higher is closer)."""
+        meta = view['meta']
+        codes = view['codes']
+
+        if meta['mode'] == "binary":
+            query_bits = np.packbits(query > 0)
+            scores = np.empty(len(codes), dtype=np.float32)
+            for start in range(0, len(codes), self.block_rows):
+                block = codes[start:start + self.block_rows]
+                scores[start:start + len(block)] = -_hamming(block, query_bits)
+            return scores
+
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), self.block_rows):
+            block = codes[start:start + self.block_rows].astype(np.float32)
+            scores[start:start + len(block)] = block @ query
+        return scores * view['scales']
+
+    def search(self, query_embedding: Sequence[float], k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Find the nearest stored vectors.
+
+        Args:
+            query_embedding: Full-precision query vector
+            k: Number of results
+
+        Returns:
+            Up to k (chunk ID, cosine distance) pairs, nearest first
+        """
+        start_time = time.time()
+        self.refresh()
+        view = self._view
+        if view is None or not view['meta']['count'] or k <= 0:
+            return []
+
+        meta = view['meta']
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape[0] != meta['full_dims']:
+            raise ValueError(f"query has {query.shape[0]} dims, index stores {meta['full_dims']}")
+
+        # Coarse pass over the truncated, quantized codes
+        coarse = self._coarse_scores(view, _normalize(query[:meta['dims']]))
+        pool = min(len(coarse), max(k, k * self.oversample))
+        candidates = np.argpartition(-coarse, pool - 1)[:pool]
+
+        # Full-precision rescoring of the candidates only
+        candidates.sort()
+        similarities = np.asarray(view['full'][candidates], dtype=np.float32) @ _normalize(query)
+        order = np.argsort(-similarities, kind="stable")[:k]
+
+        ids = view['ids']
+        results = [(ids[candidates[i]], float(1.0 - similarities[i])) for i in order]
+
+        self.searches += 1
+        self.total_search_time += time.time() - start_time
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        meta = self._view['meta'] if self._view else {}
+        return {
+            'loaded': self.is_loaded(),
+            'vectors': len(self),
+            'mode': meta.get('mode'),
+            'dims': meta.get('dims'),
+            'full_dims': meta.get('full_dims'),
+            'built_at': meta.get('built_at'),
+            'searches': self.searches,
+            'avg_search_time': self.total_search_time / self.searches if self.searches else 0.0
+        }
+
+
+def build_quantized_index(collection, path: str = "data/chroma_db/quantized_index",
+                          mode: str = "int8", dims: Optional[int] = 256,
+                          batch_size: int = 1000) -> Dict[str, Any]:
+    """
+    Rebuild the mirror from a ChromaDB collection.
+
+    The arrays for the new version are written next to the old ones and
+    meta.json is replaced last, so readers switch over atomically; files of
+    older versions are removed afterwards.
+
+    Args:
+        collection: ChromaDB collection holding the embeddings
+        path: Mirror directory
+        mode: 'int8' or 'binary'
+        dims: Leading dimensions kept for the coarse pass (None keeps all)
+        batch_size: Vectors read from the collection per request
+
+    Returns:
+        Build statistics
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"unknown quantization mode '{mode}' (expected one of {QUANTIZATION_MODES})")
+
+    start_time = time.time()
+    os.makedirs(path, exist_ok=True)
+    version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    files = {
+        'ids': f"ids-{version}.npy",
+        'codes': f"codes-{version}.npy",
+        'full': f"full-{version}.npy",
+        'scales': f"scales-{version}.npy" if mode == "int8" else None,
+    }
+
+    total = collection.count()
+    ids: List[str] = []
+    full = codes = scales = None
+    full_dims = coarse_dims = 0
+
+    for offset in range(0, total, batch_size):
+        batch = collection.get(limit=batch_size, offset=offset, include=["embeddings"])
+        if batch['embeddings'] is None or not len(batch['ids']):
+            break
+        vectors = _normalize(np.asarray(batch['embeddings'], dtype=np.float32))
+
+        if full is None:
+            full_dims = vectors.shape[1]
+            coarse_dims = min(dims or full_dims, full_dims)
+            code_width = (coarse_dims + 7) // 8 if mode == "binary" else coarse_dims
+            full = np.lib.format.open_memmap(os.path.join(path, files['full']), mode="w+",
+                                             dtype=np.float32, shape=(total, full_dims))
+            codes = np.lib.format.open_memmap(os.path.join(path, files['codes']), mode="w+",
+                                              dtype=np.uint8 if mode == "binary" else np.int8,
+                                              shape=(total, code_width))
+            scales = np.ones(total, dtype=np.float32)
+
+        batch_codes, batch_scales = quantize(vectors, mode, coarse_dims)
+        rows = slice(len(ids), len(ids) + len(vectors))
+        full[rows] = vectors
+        codes[rows] = batch_codes
+        if batch_scales is not None:
+            scales[rows] = batch_scales
+        ids.extend(batch['ids'])
+
+    count = len(ids)
+    if full is None:
+        # Empty collection: zero-row arrays keep the reader logic uniform
+        full = np.lib.format.open_memmap(os.path.join(path, files['full']), mode="w+", dtype=np.float32, shape=(0, 0))
+        codes = np.lib.format.open_memmap(os.path.join(path, files['codes']), mode="w+", dtype=np.int8, shape=(0, 0))
+        scales = np.ones(0, dtype=np.float32)
+    elif count < total:
+        raise ValueError(f"collection returned {count} of {total} vectors; rerun the sync")
+
+    full.flush()
+    codes.flush()
+    del full, codes
+    np.save(os.path.join(path, files['ids']), np.asarray(ids, dtype=str))
+    if files['scales']:
+        np.save(os.path.join(path, files['scales']), scales)
+
+    meta = {
+        'format_version': INDEX_FORMAT_VERSION,
+        'mode': mode,
+        'dims': coarse_dims,
+        'full_dims': full_dims,
+        'count': count,
+        'collection': getattr(collection, 'name', None),
+        'built_at': datetime.now().isoformat(),
+        'files': files
+    }
+    meta_path = os.path.join(path, META_FILE)
+    temp_path = f"{meta_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(temp_path, meta_path)
+
+    # Open mmaps of older versions stay valid after unlink
+    current = {name for name in files.values() if name}
+    for name in os.listdir(path):
+        if name.endswith(".npy") and name not in current:
+            try:
+                os.remove(os.path.join(path, name))
+            except OSError:
+                pass
+
+    stats = {
+        'vectors': count,
+        'mode': mode,
+        'dims': coarse_dims,
+        'full_dims': full_dims,
+        'code_bytes': count * ((coarse_dims + 7) // 8 if mode == "binary" else coarse_dims),
+        'build_time': time.time() - start_time
+    }
+    logger.debug_optimization(f"Quantized index built: {count} vectors ({mode} x {coarse_dims}) in {stats['build_time']:.1f}s")
+    return stats
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Query Parser for Crowd Due Dill
+
+Compiled, data-driven query understanding for regulatory lookups:
+- One registry of regulations and their aliases (acronyms, titles, CELEX-style
+  numbers), extended from the document registry so newly ingested
+  regulations are recognised without code changes
+- All patterns compiled once; aliases are matched by a single alternation
+- Article lists ("Articles 5, 6 and 9"), ranges ("Articles 5-7"),
+  paragraphs and points ("Article 23(4)(b)", "paragraph 2 of Article 5")
+- Typed ParsedQuery result with a dict view for existing query_info consumers
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.logger import logger
+
+
+# Largest article range expanded from a "5-7" style reference
+MAX_RANGE_ARTICLES = 50
+
+
+@dataclass(frozen=True)
+class Regulation:
+    """A regulation known to the corpus."""
+    key: str
+    name: str
+    source: str
+    aliases: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class ArticleReference:
+    """One referenced article, optionally narrowed to a paragraph and point."""
+    number: int
+    paragraph: Optional[str] = None
+    point: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        """Article label as stored in chunk metadata ('Article 22')."""
+        return f"Article {self.number}"
+
+    def __str__(self) -> str:
+        suffix = "".join(f"({part})" for part in (self.paragraph, self.point) if part)
+        return f"{self.label}{suffix}"
+
+
+@dataclass
+class ParsedQuery:
+    """Result of parsing a user query."""
+    text: str
+    articles: List[ArticleReference] = field(default_factory=list)
+    regulations: List[Regulation] = field(default_factory=list)
+    # Regulations named right after an article reference ("Article 5 of DORA")
+    article_regulations: List[Regulation] = field(default_factory=list)
+
+    @property
+    def is_precise_lookup(self) -> bool:
+        return bool(self.articles)
+
+    @property
+    def regulation(self) -> Optional[Regulation]:
+        """The regulation when exactly one is named, or the one the articles are cited from."""
+        if len(self.regulations) == 1:
+            return self.regulations[0]
+        return self.article_regulations[0] if len(self.article_regulations) == 1 else None
+
+    @property
+    def query_type(self) -> str:
+        if not self.articles:
+            return 'semantic'
+        if len(self.articles) > 1:
+            return 'multi_article'
+        return 'precise_article' if self.regulation else 'precise_standalone'
+
+    @property
+    def confidence(self) -> float:
+        if not self.articles:
+            return 1.0
+        return 0.9 if self.regulation else 0.7
+
+    def to_query_info(self) -> Dict[str, Any]:
+        """Dict view used by retrieval, routing and API responses."""
+        regulation = self.regulation
+        return {
+            'is_precise_lookup': self.is_precise_lookup,
+            'article_number': self.articles[0].label if self.articles else None,
+            'articles': [str(article) for article in self.articles],
+            'article_numbers': sorted({article.number for article in self.articles}),
+            'regulation': regulation.key if regulation else None,
+            'regulations': [reg.key for reg in self.regulations],
+            'source': regulation.source if regulation else None,
+            'query_type': self.query_type,
+            'confidence': self.confidence
+        }
+
+
+# Built-in regulations for crawled_content/; keys are the document file stems
+DEFAULT_REGULATIONS = (
+    Regulation('gdpr', 'General Data Protection Regulation', 'crawled_content/gdpr.md',
+               ('gdpr', 'general data protection regulation', '2016/679')),
+    Regulation('digital_act', 'Digital Services Act', 'crawled_content/digital_act.md',
+               ('dsa', 'digital services act', 'digital act', '2022/2065')),
+    Regulation('aml', 'Anti-Money Laundering Regulation', 'crawled_content/aml.md',
+               ('aml', 'amlr', 'anti-money laundering', 'anti money laundering', '2024/1624')),
+    Regulation('dora', 'Digital Operational Resilience Act', 'crawled_content/dora.md',
+               ('dora', 'digital operational resilience act', 'digital operational resilience', '2022/2554')),
+    Regulation('dora_amend', 'DORA Delegated Regulation (EU) 2024/1773', 'crawled_content/dora_amend.md',
+               ('dora amendment', 'dora delegated regulation', '2024/1773')),
+    Regulation('crowdfunding', 'European Crowdfunding Service Providers Regulation', 'crawled_content/crowdfunding.md',
+               ('ecsp', 'ecspr', 'crowdfunding regulation', 'ecsp regulation', '2020/1503')),
+    Regulation('scoring', 'Crowdfunding Scoring Delegated Regulation (EU) 2024/358', 'crawled_content/scoring.md',
+               ('crowdfunding scoring', 'credit scoring', 'scoring regulation', '2024/358')),
+)
+
+
+class RegulationRegistry:
+    """Regulations and aliases, matched against queries by one compiled pattern."""
+
+    def __init__(self, regulations: Iterable[Regulation] = DEFAULT_REGULATIONS):
+        self._regulations: Dict[str, Regulation] = {}
+        self._alias_map: Dict[str, Regulation] = {}
+        self._pattern = None
+        for regulation in regulations:
+            self.register(regulation)
+
+    @classmethod
+    def from_document_registry(cls, registry_path: str = "data/document_registry.json") -> "RegulationRegistry":
+        """
+        Build the registry from the built-in table plus every ingested document.
+
+        Documents without a built-in entry are registered under their file
+        stem (e.g. 'mica_regulation.md' -> 'mica regulation').
+        """
+        registry = cls()
+        try:
+            if os.path.exists(registry_path):
+                with open(registry_path, 'r') as f:
+                    registry.add_sources(json.load(f).keys())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read document registry {registry_path}: {e}")
+        return registry
+
+    def register(self, regulation: Regulation):
+        """Add or replace a regulation."""
+        self._regulations[regulation.key] = regulation
+        # The file stem is only a name for regulations without curated aliases;
+        # built-in stems like 'crowdfunding' or 'scoring' are ordinary query words
+        for alias in regulation.aliases or (regulation.key.replace('_', ' '),):
+            self._alias_map[alias.lower()] = regulation
+        self._pattern = None
+
+    def add_sources(self, sources: Iterable[str]):
+        """Register document sources, updating built-in entries to the stored path."""
+        for source in sources:
+            key = os.path.splitext(os.path.basename(source))[0].lower()
+            known = self._regulations.get(key)
+            if known:
+                if known.source != source:
+                    self.register(Regulation(known.key, known.name, source, known.aliases))
+            else:
+                self.register(Regulation(key, key.replace('_', ' ').title(), source))
+
+    def get(self, key: str) -> Optional[Regulation]:
+        """Look up a regulation by key or alias."""
+        key = (key or "").lower()
+        return self._regulations.get(key) or self._alias_map.get(key)
+
+    def __iter__(self):
+        return iter(self._regulations.values())
+
+    def __len__(self) -> int:
+        return len(self._regulations)
+
+    def _compiled(self):
+        """Single alternation over all aliases, longest first so 'dora amendment' beats 'dora'."""
+        if self._pattern is None:
+            aliases = sorted(self._alias_map, key=len, reverse=True)
+            self._pattern = re.compile(r"(?<![\w/])(" + "|".join(re.escape(alias) for alias in aliases) + r")(?![\w/])")
+        return self._pattern
+
+    def find(self, query_lower: str) -> List[Regulation]:
+        """Regulations named in a lowercased query, in order of appearance."""
+        found = []
+        for match in self._compiled().finditer(query_lower):
+            regulation = self._alias_map[match.group(1)]
+            if regulation not in found:
+                found.append(regulation)
+        return found
+
+    def find_after(self, query_lower: str, position: int) -> Optional[Regulation]:
+        """Regulation named right after position, e.g. after 'article 5' in 'article 5 of the gdpr'."""
+        start = ARTICLE_CONNECTOR_PATTERN.match(query_lower, position).end()
+        match = self._compiled().match(query_lower, start)
+        return self._alias_map[match.group(1)] if match else None
+
+
+# "Article 5", "Articles 5, 6 and 9", "Art. 23(4)(b)", "Articles 5 to 7"
+ARTICLE_LIST_PATTERN = re.compile(
+    r"\b(?:articles?|arts?\.?)\s*"
+    r"(\d+(?![\d/])(?:\(\w{1,4}\))*(?:\s*(?:,|and|or|to|through|-|–)\s*(?:article\s*)?\d+(?![\d/])(?:\(\w{1,4}\))*)*)"
+)
+ARTICLE_ITEM_PATTERN = re.compile(r"(\d+)((?:\(\w{1,4}\))*)|(to|through|-|–)")
+PARAGRAPH_OF_PATTERN = re.compile(
+    r"\b(?:paragraph|para\.?)\s*(\d+)(?:\s*(?:point|\()\s*\(?(\w{1,4})\)?)?\s+of\s+(?:articles?|arts?\.?)\s*(\d+)"
+)
+SUBDIVISION_PATTERN = re.compile(r"\((\w{1,4})\)")
+# Words between an article reference and the regulation it is cited from
+ARTICLE_CONNECTOR_PATTERN = re.compile(r"\s*(?:(?:of|under|in)\s+)?(?:the\s+)?(?:regulation\s+)?(?:\(eu\)\s*)?")
+
+
+class QueryParser:
+    """Parses article references and regulation names from user queries."""
+
+    def __init__(self, registry: Optional[RegulationRegistry] = None):
+        self.registry = registry or RegulationRegistry()
+
+    def parse(self, query_text: str) -> ParsedQuery:
+        """Parse a query into a ParsedQuery."""
+        query_lower = query_text.lower()
+        articles: List[ArticleReference] = []
+        cited: List[Regulation] = []
+
+        def add(reference: ArticleReference):
+            if reference not in articles:
+                articles.append(reference)
+
+        def cite(position: int):
+            regulation = self.registry.find_after(query_lower, position)
+            if regulation and regulation not in cited:
+                cited.append(regulation)
+
+        for match in PARAGRAPH_OF_PATTERN.finditer(query_lower):
+            add(ArticleReference(int(match.group(3)), match.group(1), match.group(2)))
+            cite(match.end())
+
+        for match in ARTICLE_LIST_PATTERN.finditer(query_lower):
+            cite(match.end())
+            range_pending = False
+            previous = None
+            for number, subdivisions, range_word in ARTICLE_ITEM_PATTERN.findall(match.group(1)):
+                if range_word:
+                    range_pending = previous is not None
+                    continue
+
+                parts = SUBDIVISION_PATTERN.findall(subdivisions)
+                reference = ArticleReference(int(number), parts[0] if parts else None, parts[1] if len(parts) > 1 else None)
+                if range_pending and 0 < reference.number - previous <= MAX_RANGE_ARTICLES:
+                    for between in range(previous + 1, reference.number):
+                        add(ArticleReference(between))
+                range_pending = False
+                previous = reference.number
+                add(reference)
+
+        # "paragraph 2 of Article 5" also matches "Article 5" on its own
+        narrowed = {article.number for article in articles if article.paragraph}
+        articles = [a for a in articles if a.paragraph or a.number not in narrowed]
+
+        return ParsedQuery(query_text, articles, self.registry.find(query_lower), cited)
+
+    def analyze(self, query_text: str) -> Dict[str, Any]:
+        """Parse and return the query_info dict."""
+        return self.parse(query_text).to_query_info()
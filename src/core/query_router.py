@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Local Query Router for Crowd Due Dill
+
+In-process fast path for turn classification:
+- Rules built on the RAG query analysis (article lookups, regulation terms,
+  advisory vs analytical cues, small talk)
+- Embedding nearest-centroid over labelled LLM classifier decisions
+- Returns None for ambiguous turns so the LLM classifier decides
+
+When the router decides, the turn needs a single LLM round-trip (the answer).
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from src.utils.logger import logger
+
+
+# Regulation vocabulary that signals the knowledge base is needed
+REGULATION_PATTERN = re.compile(
+    r"\b(gdpr|dsa|dora|aml|amld|ecsp|mica|crowdfunding|regulation|directive|article|recital|"
+    r"compliance|compliant|authori[sz]ation|licen[cs]e|supervisory|competent authority|"
+    r"data protection|credit scoring|money laundering|digital services|operational resilience|"
+    r"investor protection|key investment information|kiis|penalt(?:y|ies)|sanction)\b"
+)
+
+# Business concern / reassurance cues -> advisory agent
+ADVISORY_PATTERN = re.compile(
+    r"\b(worried|concerned|afraid|anxious|should (?:we|i)|do (?:we|i) need|is it worth|"
+    r"strategy|strategic|recommend|advice|advise|risk(?:s|y)?|decision|prioriti[sz]e|"
+    r"business|budget|expand|launch|best approach|what would you)\b"
+)
+
+# Technical / factual cues -> analytical agent
+ANALYTICAL_PATTERN = re.compile(
+    r"\b(what (?:is|are|does)|define|definition|explain|list|requirements?|procedure|"
+    r"obligations?|article|paragraph|provision|according to|difference between|"
+    r"how does|which|when does|threshold|deadline|timeline)\b"
+)
+
+# Small talk that never needs retrieval
+SMALL_TALK_PATTERN = re.compile(
+    r"^\s*(hi|hello|hey|good (?:morning|afternoon|evening)|thanks|thank you|ok|okay|"
+    r"bye|goodbye|cheers|great|perfect)\b[\s!.,?]*$"
+)
+
+
+@dataclass
+class RoutingDecision:
+    """Turn classification produced by the local router or the LLM."""
+    message_type: str
+    should_use_rag: bool
+    confidence: float
+    path: str  # 'rules', 'centroid' or 'llm'
+
+
+class LocalQueryRouter:
+    """
+    Cheap in-process router deciding message_type / should_use_rag.
+
+    Labels are (message_type, should_use_rag) pairs. Every LLM classifier
+    decision is recorded as a labelled example; once enough examples exist
+    per label, queries close to one label centroid (and clearly closer than
+    to the runner-up) are routed without the LLM.
+    """
+
+    LABELS = [
+        ("advisory", True),
+        ("advisory", False),
+        ("analytical", True),
+        ("analytical", False),
+    ]
+
+    def __init__(self,
+                 embeddings=None,
+                 query_analyzer: Optional[Callable[[str], Dict[str, Any]]] = None,
+                 history_path: Optional[str] = "data/routing/label_centroids.npz",
+                 min_examples_per_label: int = 5,
+                 min_similarity: float = 0.55,
+                 min_margin: float = 0.05,
+                 save_every: int = 10):
+        """
+        Initialize the local router.
+
+        Args:
+            embeddings: Embeddings used for the centroid stage (shares the RAG query cache)
+            query_analyzer: Callable returning RAG query analysis (is_precise_lookup, ...)
+            history_path: Where labelled centroid sums are persisted (None = memory only)
+            min_examples_per_label: Examples a label needs before its centroid is used
+            min_similarity: Minimum cosine similarity to the best centroid
+            min_margin: Required similarity gap between best and runner-up centroids
+            save_every: Persist centroids after this many new examples
+        """
+        self.embeddings = embeddings
+        self.query_analyzer = query_analyzer
+        self.history_path = history_path
+        self.min_examples_per_label = min_examples_per_label
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.save_every = save_every
+
+        # Running sums of unit-normalized embeddings per label
+        self._sums: Dict[tuple, np.ndarray] = {}
+        self._counts: Dict[tuple, int] = {label: 0 for label in self.LABELS}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+        self._load_history()
+
+    def _load_history(self):
+        """Load persisted centroid sums."""
+        if not self.history_path or not os.path.exists(self.history_path):
+            return
+        try:
+            data = np.load(self.history_path)
+            for index, label in enumerate(self.LABELS):
+                count = int(data['counts'][index])
+                if count:
+                    self._sums[label] = data['sums'][index].astype(np.float32)
+                    self._counts[label] = count
+            logger.debug(f"Router: loaded {sum(self._counts.values())} labelled examples")
+        except Exception as e:
+            logger.debug(f"Router history load failed: {e}")
+
+    def _save_history(self):
+        """Persist centroid sums (called with the lock held)."""
+        if not self.history_path or not self._sums:
+            return
+        try:
+            dim = len(next(iter(self._sums.values())))
+            sums = np.zeros((len(self.LABELS), dim), dtype=np.float32)
+            counts = np.zeros(len(self.LABELS), dtype=np.int64)
+            for index, label in enumerate(self.LABELS):
+                if label in self._sums:
+                    sums[index] = self._sums[label]
+                    counts[index] = self._counts[label]
+            os.makedirs(os.path.dirname(self.history_path), exist_ok=True)
+            tmp_path = self.history_path + ".tmp.npz"
+            np.savez(tmp_path, sums=sums, counts=counts)
+            os.replace(tmp_path, self.history_path)
+            self._unsaved = 0
+        except Exception as e:
+            logger.debug(f"Router history save failed: {e}")
+
+    def _embed(self, query: str) -> Optional[np.ndarray]:
+        """Unit-normalized query embedding, or None if unavailable."""
+        if not self.embeddings:
+            return None
+        try:
+            vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            return vector / norm if norm else None
+        except Exception as e:
+            logger.debug(f"Router embedding failed: {e}")
+            return None
+
+    def route(self, query: str) -> Optional[RoutingDecision]:
+        """
+        Classify a turn locally.
+
+        Args:
+            query: User message
+
+        Returns:
+            RoutingDecision, or None if the turn is ambiguous and needs the LLM
+        """
+        decision = self._route_by_rules(query)
+        if decision:
+            return decision
+        return self._route_by_centroid(query)
+
+    def _route_by_rules(self, query: str) -> Optional[RoutingDecision]:
+        """Regex/keyword rules on top of the RAG query analysis."""
+        query_lower = query.lower().strip()
+
+        if SMALL_TALK_PATTERN.match(query_lower):
+            return RoutingDecision("analytical", False, 0.95, "rules")
+
+        query_info = self.query_analyzer(query) if self.query_analyzer else {}
+        advisory = bool(ADVISORY_PATTERN.search(query_lower))
+        analytical = bool(ANALYTICAL_PATTERN.search(query_lower))
+
+        # Exact article lookups always need retrieval
+        if query_info.get('is_precise_lookup'):
+            message_type = "advisory" if advisory and not analytical else "analytical"
+            return RoutingDecision(message_type, True, query_info.get('confidence', 0.8), "rules")
+
+        if REGULATION_PATTERN.search(query_lower) and advisory != analytical:
+            return RoutingDecision("advisory" if advisory else "analytical", True, 0.8, "rules")
+
+        return None
+
+    def _route_by_centroid(self, query: str) -> Optional[RoutingDecision]:
+        """Nearest labelled centroid, only when clearly separated."""
+        ready = [label for label in self.LABELS if self._counts[label] >= self.min_examples_per_label]
+        if len(ready) < 2:
+            return None
+
+        vector = self._embed(query)
+        if vector is None:
+            return None
+
+        with self._lock:
+            scored = []
+            for label in ready:
+                centroid = self._sums[label]
+                norm = np.linalg.norm(centroid)
+                scored.append((float(vector @ centroid / norm) if norm else 0.0, label))
+        scored.sort(reverse=True)
+
+        (best_score, best_label), (runner_up_score, _) = scored[0], scored[1]
+        if best_score < self.min_similarity or best_score - runner_up_score < self.min_margin:
+            return None
+
+        return RoutingDecision(best_label[0], best_label[1], best_score, "centroid")
+
+    def record_llm_decision(self, query: str, message_type: str, should_use_rag: bool):
+        """Add an LLM classifier decision to the labelled history."""
+        label = (message_type, bool(should_use_rag))
+        if label not in self._counts:
+            return
+
+        vector = self._embed(query)
+        if vector is None:
+            return
+
+        with self._lock:
+            if label in self._sums:
+                self._sums[label] = self._sums[label] + vector
+            else:
+                self._sums[label] = vector.copy()
+            self._counts[label] += 1
+            self._unsaved += 1
+            if self._unsaved >= self.save_every:
+                self._save_history()
+
+    def flush(self):
+        """Persist any unsaved labelled examples."""
+        with self._lock:
+            if self._unsaved:
+                self._save_history()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get labelled history statistics."""
+        return {
+            'labelled_examples': {f"{label[0]}/{'rag' if label[1] else 'no_rag'}": count
+                                  for label, count in self._counts.items()},
+            'centroid_ready': sum(1 for count in self._counts.values() if count >= self.min_examples_per_label)
+        }
+
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Cross-Encoder Reranker Service for Crowd Due Dill
+
+Process-wide reranking service that:
+- Loads the cross-encoder model once (lazily, on first use)
+- Exposes a thread-safe rerank(query, docs) API
+- Micro-batches concurrent requests from multiple /chat handlers
+  into a single forward pass
+
+Separated from the RAG system so the model is shared by every request
+instead of being constructed inside each query() call.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.utils.logger import logger
+
+
+DEFAULT_RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+@dataclass
+class _RerankRequest:
+    """Single pending rerank request waiting for the batch worker."""
+    pairs: List[List[str]]
+    future: Future = field(default_factory=Future)
+
+
+class CrossEncoderReranker:
+    """
+    Shared cross-encoder reranker with request micro-batching.
+
+    Concurrent callers enqueue (query, document) pairs; a single worker thread
+    drains the queue, scores all pending pairs in one predict() call and hands
+    the scores back to each caller. A lone request is scored immediately after
+    the (short) batching window.
+    """
+
+    def __init__(self,
+                 model_name: str = DEFAULT_RERANKER_MODEL,
+                 max_length: int = 512,
+                 batch_window_ms: float = 5.0,
+                 max_batch_pairs: int = 128,
+                 model_loader: Optional[Callable[[], Any]] = None):
+        """
+        Initialize the reranker service (the model is loaded lazily).
+
+        Args:
+            model_name: HuggingFace cross-encoder model name
+            max_length: Maximum token length for each (query, doc) pair
+            batch_window_ms: How long the worker waits to collect concurrent requests
+            max_batch_pairs: Upper bound on pairs scored in one forward pass
+            model_loader: Optional factory returning an object with predict(pairs)
+        """
+        self.model_name = model_name
+        self.max_length = max_length
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_pairs = max_batch_pairs
+        self._model_loader = model_loader or self._load_cross_encoder
+
+        self._model = None
+        self._available: Optional[bool] = None
+        self._load_lock = threading.Lock()
+
+        # Batching queue shared by all callers
+        self._pending: List[_RerankRequest] = []
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+        # Performance tracking
+        self.stats = {
+            'requests': 0,
+            'cancelled': 0,
+            'pairs_scored': 0,
+            'forward_passes': 0,
+            'max_batch_requests': 0,
+            'total_predict_time': 0.0,
+            'model_load_time': 0.0
+        }
+
+    def _load_cross_encoder(self):
+        """Load the sentence-transformers cross-encoder model."""
+        from sentence_transformers import CrossEncoder
+        return CrossEncoder(self.model_name, max_length=self.max_length)
+
+    def _ensure_model(self) -> bool:
+        """Load the model once; return True if reranking is available."""
+        if self._available is not None:
+            return self._available
+
+        with self._load_lock:
+            if self._available is not None:
+                return self._available
+
+            start_time = time.time()
+            try:
+                self._model = self._model_loader()
+                self._available = True
+                self.stats['model_load_time'] = time.time() - start_time
+                logger.debug_optimization(f"Cross-encoder loaded once in {self.stats['model_load_time']:.2f}s: {self.model_name}")
+            except ImportError:
+                logger.debug_optimization("Cross-encoder not available, falling back to similarity search")
+                self._available = False
+            except Exception as e:
+                logger.debug_optimization(f"Cross-encoder failed to load: {e}")
+                self._available = False
+
+        return self._available
+
+    def is_available(self) -> bool:
+        """Check whether reranking can be performed (loads the model on first call)."""
+        return self._ensure_model()
+
+    def warmup(self) -> bool:
+        """Load the model and start the batch worker ahead of the first query."""
+        if not self._ensure_model():
+            return False
+        self._ensure_worker()
+        return True
+
+    def _ensure_worker(self):
+        """Start the batch worker thread if it is not running."""
+        if self._worker and self._worker.is_alive():
+            return
+        with self._condition:
+            if self._worker and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._worker_loop,
+                name="reranker_batcher",
+                daemon=True
+            )
+            self._worker.start()
+
+    def queue_depth(self) -> int:
+        """Number of requests waiting for the batch worker."""
+        with self._condition:
+            return len(self._pending)
+
+    def rerank(self, query: str, docs: Sequence[Any], timeout: Optional[float] = 30.0) -> Optional[List[float]]:
+        """
+        Score documents against a query with the shared cross-encoder.
+
+        Args:
+            query: Query text
+            docs: Document texts or objects exposing page_content
+            timeout: Maximum seconds to wait for the batched forward pass
+
+        Returns:
+            List of scores aligned with docs, or None if reranking is unavailable
+        """
+        if not docs:
+            return []
+        if not self._ensure_model():
+            return None
+
+        pairs = [[query, self._doc_text(doc)] for doc in docs]
+        return self._submit(_RerankRequest(pairs=pairs), timeout)
+
+    def rerank_many(self, requests: Sequence[tuple], timeout: Optional[float] = 60.0) -> Optional[List[List[float]]]:
+        """
+        Score several (query, docs) requests in forward passes of at most max_batch_pairs.
+
+        Pairs are submitted one chunk at a time, so interactive rerank() calls
+        queued in the meantime join the next forward pass instead of waiting
+        behind the whole batch.
+
+        Args:
+            requests: Sequence of (query, docs) tuples
+            timeout: Maximum seconds to wait for all results
+
+        Returns:
+            One score list per request, or None if reranking is unavailable
+        """
+        if not self._ensure_model():
+            return None
+
+        pairs = []
+        sizes = []
+        for query, docs in requests:
+            sizes.append(len(docs))
+            pairs.extend([query, self._doc_text(doc)] for doc in docs)
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        scores = []
+        for start in range(0, len(pairs), self.max_batch_pairs):
+            remaining = max(deadline - time.monotonic(), 0.0) if deadline is not None else None
+            chunk = pairs[start:start + self.max_batch_pairs]
+            scores.extend(self._submit(_RerankRequest(pairs=chunk), remaining))
+
+        results = []
+        offset = 0
+        for size in sizes:
+            results.append(scores[offset:offset + size])
+            offset += size
+        return results
+
+    def _submit(self, request: _RerankRequest, timeout: Optional[float]) -> List[float]:
+        """Queue a request and wait for its scores; abandoned requests are never scored."""
+        self._ensure_worker()
+        with self._condition:
+            self._pending.append(request)
+            self.stats['requests'] += 1
+            self._condition.notify()
+
+        try:
+            return request.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Still queued: drop it so later batches don't pay for it
+            if request.future.cancel():
+                with self._condition:
+                    if request in self._pending:
+                        self._pending.remove(request)
+                self.stats['cancelled'] += 1
+            raise
+
+    @staticmethod
+    def _doc_text(doc: Any) -> str:
+        """Extract text from a string or Document-like object."""
+        if isinstance(doc, str):
+            return doc
+        return getattr(doc, 'page_content', str(doc))
+
+    def _take_batch(self) -> List[_RerankRequest]:
+        """Wait for pending requests and take up to max_batch_pairs of them."""
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+
+        # Give concurrent handlers a short window to join this forward pass
+        if self.batch_window > 0:
+            time.sleep(self.batch_window)
+
+        with self._condition:
+            batch = []
+            pair_count = 0
+            while self._pending:
+                next_size = len(self._pending[0].pairs)
+                if batch and pair_count + next_size > self.max_batch_pairs:
+                    break
+                request = self._pending.pop(0)
+                # Callers that timed out cancelled their future; skip them
+                if not request.future.set_running_or_notify_cancel():
+                    continue
+                batch.append(request)
+                pair_count += next_size
+            return batch
+
+    def _worker_loop(self):
+        """Batch worker: drain queue, score everything in one predict() call."""
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                continue
+
+            all_pairs = [pair for request in batch for pair in request.pairs]
+            start_time = time.time()
+
+            try:
+                scores = self._model.predict(all_pairs)
+                scores = [float(score) for score in scores]
+            except Exception as e:
+                logger.debug_optimization(f"Reranking batch failed: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            duration = time.time() - start_time
+            self.stats['forward_passes'] += 1
+            self.stats['pairs_scored'] += len(all_pairs)
+            self.stats['total_predict_time'] += duration
+            self.stats['max_batch_requests'] = max(self.stats['max_batch_requests'], len(batch))
+
+            offset = 0
+            for request in batch:
+                size = len(request.pairs)
+                request.future.set_result(scores[offset:offset + size])
+                offset += size
+
+            if len(batch) > 1:
+                logger.debug_optimization(f"Reranked {len(all_pairs)} pairs from {len(batch)} requests in one pass ({duration:.3f}s)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get reranker statistics."""
+        stats = self.stats.copy()
+        stats['model_name'] = self.model_name
+        stats['available'] = bool(self._available)
+        stats['avg_requests_per_pass'] = (
+            stats['requests'] / stats['forward_passes'] if stats['forward_passes'] else 0.0
+        )
+        return stats
+
+
+# Global reranker service instance
+reranker_service = CrossEncoderReranker()
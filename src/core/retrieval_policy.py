@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Adaptive Retrieval Policy for Crowd Due Dill
+
+Decides per query how much cross-encoder work the vector branch does:
+- Candidate pool sized from the ANN similarity distribution (only hits
+  close to the best one are worth reranking)
+- Reranking skipped when the top ANN hit is far ahead of the rest
+- Reranking done in rounds that stop once scores saturate or a round no
+  longer improves on the current top k
+- Tighter pools while the shared reranker is backed up
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class AdaptiveRetrievalPolicy:
+    """Candidate-pool sizing, rerank skipping and early-exit rules."""
+
+    # Chroma HNSW distance spaces the similarity conversion understands
+    SPACES = ("cosine", "ip", "l2")
+
+    def __init__(self,
+                 max_pool: int = 24,
+                 min_pool_multiplier: float = 1.5,
+                 similarity_window: float = 0.12,
+                 skip_margin: float = 0.10,
+                 skip_min_similarity: float = 0.60,
+                 rerank_round_size: int = 8,
+                 saturation_score: float = 6.0,
+                 improvement_margin: float = 1.0,
+                 busy_queue_depth: int = 4,
+                 space: str = "cosine"):
+        """
+        Initialize the policy.
+
+        Args:
+            max_pool: Most ANN candidates fetched and considered for reranking
+            min_pool_multiplier: Smallest rerank pool as a multiple of k
+            similarity_window: Candidates within this cosine similarity of the best hit are reranked
+            skip_margin: Top-1 vs top-2 similarity gap that skips reranking
+            skip_min_similarity: Top-1 similarity required before reranking may be skipped
+            rerank_round_size: Candidates scored per rerank round
+            saturation_score: Cross-encoder score treated as "clearly relevant"
+            improvement_margin: A round whose best score trails the current k-th best by
+                more than this ends reranking
+            busy_queue_depth: Pending reranker requests at which pools shrink to the minimum
+            space: Distance space of the collection ("cosine", "ip" or "l2")
+        """
+        if space not in self.SPACES:
+            raise ValueError(f"Unsupported distance space: {space}")
+        self.max_pool = max_pool
+        self.min_pool_multiplier = min_pool_multiplier
+        self.similarity_window = similarity_window
+        self.skip_margin = skip_margin
+        self.skip_min_similarity = skip_min_similarity
+        self.rerank_round_size = rerank_round_size
+        self.saturation_score = saturation_score
+        self.improvement_margin = improvement_margin
+        self.busy_queue_depth = busy_queue_depth
+        self.space = space
+
+    def fetch_size(self, k: int) -> int:
+        """Number of ANN candidates to fetch (ANN cost barely depends on it)."""
+        return max(self.max_pool, k)
+
+    def similarity(self, distance: float) -> float:
+        """
+        Convert a Chroma distance to a cosine similarity.
+
+        Embeddings are unit length, so the l2 space (squared euclidean distance,
+        2 - 2cos) and the ip space (1 - dot product) both map back to cosine.
+        """
+        if self.space == "l2":
+            return 1.0 - distance / 2.0
+        return 1.0 - distance
+
+    def plan(self, similarities: Sequence[float], k: int, queue_depth: int = 0) -> Dict[str, Any]:
+        """
+        Decide pool size and whether to rerank.
+
+        Args:
+            similarities: ANN similarities, best first
+            k: Results wanted
+            queue_depth: Requests waiting on the shared reranker
+
+        Returns:
+            Decision dict: candidate_pool, rerank, reason, top_similarity, similarity_gap
+        """
+        min_pool = min(len(similarities), max(k, int(round(k * self.min_pool_multiplier))))
+        decision = {
+            'candidates_fetched': len(similarities),
+            'candidate_pool': min_pool,
+            'rerank': False,
+            'reason': 'no_candidates',
+            'top_similarity': similarities[0] if similarities else 0.0,
+            'similarity_gap': 0.0
+        }
+        if len(similarities) <= 1:
+            decision['reason'] = 'single_candidate' if similarities else 'no_candidates'
+            return decision
+
+        top = similarities[0]
+        gap = top - similarities[1]
+        decision['similarity_gap'] = gap
+
+        if gap >= self.skip_margin and top >= self.skip_min_similarity:
+            decision['reason'] = 'clear_ann_winner'
+            return decision
+
+        within_window = sum(1 for score in similarities if top - score <= self.similarity_window)
+        pool = min(len(similarities), self.max_pool, max(min_pool, within_window))
+        if queue_depth >= self.busy_queue_depth:
+            pool = min_pool
+            decision['reason'] = 'reranker_busy'
+        else:
+            decision['reason'] = 'similarity_window'
+
+        decision['candidate_pool'] = pool
+        decision['rerank'] = True
+        return decision
+
+    def should_stop(self, scores: List[float], round_scores: List[float], k: int) -> Optional[str]:
+        """
+        Check the early-exit rules after a rerank round.
+
+        Args:
+            scores: All cross-encoder scores so far
+            round_scores: Scores from the round just finished
+            k: Results wanted
+
+        Returns:
+            Stop reason, or None to continue with the next round
+        """
+        if len(scores) < k:
+            return None
+
+        kth_best = sorted(scores, reverse=True)[k - 1]
+        if kth_best >= self.saturation_score:
+            return 'scores_saturated'
+        if round_scores and max(round_scores) < kth_best - self.improvement_margin:
+            return 'no_improvement'
+        return None
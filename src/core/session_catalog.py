@@ -0,0 +1,184 @@
+"""
+Session Catalog
+
+Indexed SQLite table of session metadata maintained alongside the LangGraph
+checkpointer. Listing sessions becomes a single indexed query per page
+instead of scanning and deserialising checkpoints.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.utils.logger import logger
+
+
+CATALOG_COLUMNS = ("thread_id", "user_id", "title", "created_at", "last_activity",
+                   "message_count", "archived", "archived_at")
+
+
+def user_id_for_thread(thread_id: str) -> Optional[str]:
+    """Extract the user key from a 'user_<sub>_<uuid>' thread ID (None for anonymous/CLI threads)."""
+    if not thread_id or not thread_id.startswith("user_") or "_" not in thread_id[5:]:
+        return None
+    return thread_id[5:].rsplit("_", 1)[0]
+
+
+class SessionCatalog:
+    """Session metadata table indexed by user and last activity."""
+
+    def __init__(self, db_path: str = "data/sessions/session_catalog.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS session_catalog (
+                thread_id TEXT PRIMARY KEY,
+                user_id TEXT,
+                title TEXT,
+                created_at TEXT NOT NULL,
+                last_activity TEXT NOT NULL,
+                message_count INTEGER NOT NULL DEFAULT 0,
+                archived INTEGER NOT NULL DEFAULT 0,
+                archived_at TEXT
+            )
+        """)
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_session_catalog_user_activity
+            ON session_catalog(user_id, archived, last_activity DESC)
+        """)
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_session_catalog_activity
+            ON session_catalog(archived, last_activity DESC)
+        """)
+        self._conn.commit()
+
+    def upsert(self, thread_id: str, created_at: str, last_activity: str = None,
+               message_count: int = 0, title: str = None, archived: bool = False,
+               archived_at: str = None):
+        """Insert or fully replace a session row."""
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO session_catalog
+                (thread_id, user_id, title, created_at, last_activity, message_count, archived, archived_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (thread_id, user_id_for_thread(thread_id), title, created_at,
+                  last_activity or created_at, message_count, int(archived), archived_at))
+            self._conn.commit()
+
+    def update(self, thread_id: str, **fields) -> bool:
+        """Update selected columns of an existing session; returns False if the row is missing."""
+        fields = {key: value for key, value in fields.items() if key in CATALOG_COLUMNS and key != "thread_id"}
+        if not fields:
+            return False
+        if "archived" in fields:
+            fields["archived"] = int(fields["archived"])
+
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE session_catalog SET {assignments} WHERE thread_id = ?",
+                (*fields.values(), thread_id)
+            )
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def delete(self, thread_id: str):
+        """Remove a session row."""
+        with self._lock:
+            self._conn.execute("DELETE FROM session_catalog WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
+
+    def get(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Get one session row."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM session_catalog WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list(self, limit: int = 10, offset: int = 0, user_id: Optional[str] = None,
+             archived: bool = False) -> List[Dict[str, Any]]:
+        """
+        List one page of sessions, newest activity first.
+
+        Args:
+            limit: Page size
+            offset: Rows to skip
+            user_id: Only sessions of this user key (None lists all users)
+            archived: List archived instead of active sessions
+        """
+        order = "archived_at DESC" if archived else "last_activity DESC"
+        query = "SELECT * FROM session_catalog WHERE archived = ?"
+        params: list = [int(archived)]
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        query += f" ORDER BY {order} LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def find_by_prefix(self, partial_id: str) -> Optional[str]:
+        """Find a thread ID starting with partial_id (uses the primary key index)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT thread_id FROM session_catalog WHERE thread_id >= ? AND thread_id < ? LIMIT 1",
+                (partial_id, partial_id + "\uffff")
+            ).fetchone()
+        return row["thread_id"] if row else None
+
+    def count(self) -> int:
+        """Number of catalogued sessions."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM session_catalog").fetchone()[0]
+
+    def backfill_from_checkpointer(self, checkpointer) -> int:
+        """
+        Populate the catalog from existing checkpoints (one-time migration).
+
+        Checkpoints are listed newest first, so the first one seen per thread is its latest state.
+        """
+        seen = set()
+        for checkpoint_tuple in checkpointer.list(None):
+            thread_id = (checkpoint_tuple.config or {}).get("configurable", {}).get("thread_id")
+            if not thread_id or thread_id in seen:
+                continue
+            seen.add(thread_id)
+
+            channel_values = checkpoint_tuple.checkpoint.get("channel_values", {})
+            metadata = channel_values.get("session_metadata") or {}
+            created_at = metadata.get("created_at") or channel_values.get("created_at") or "unknown"
+            self.upsert(
+                thread_id,
+                created_at=created_at,
+                last_activity=metadata.get("last_activity") or channel_values.get("last_activity") or created_at,
+                message_count=len(channel_values.get("messages", [])),
+                title=metadata.get("title"),
+                archived=metadata.get("archived", False),
+                archived_at=metadata.get("archived_at")
+            )
+
+        logger.debug(f"Session catalog backfilled with {len(seen)} sessions")
+        return len(seen)
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a row to the session dict shape used by the session manager."""
+        session = dict(row)
+        session["archived"] = bool(session["archived"])
+        if session["archived_at"] is None:
+            session["archived_at"] = "unknown"
+        return session
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
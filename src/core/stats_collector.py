@@ -56,11 +56,19 @@ class StatsCollector:
         self.memory_stats = {
             'summaries_created': 0,
             'summary_creation_times': deque(maxlen=50),
+            'summary_prompt_tokens': 0,
+            'summary_completion_tokens': 0,
             'memory_context_builds': 0,
             'short_term_trims': 0,
             'toggles': defaultdict(int)  # Track toggle operations
         }
         
+        # Turn routing tracking (local rules / centroid vs LLM classifier)
+        self.routing_stats = defaultdict(lambda: {
+            'count': 0,
+            'total_time': 0.0
+        })
+        
         # System start time
         self.start_time = datetime.now()
         
@@ -75,10 +83,13 @@ class StatsCollector:
         
         logger.debug(f"Recorded {query_type} query: {response_time:.3f}s")
     
-    def record_memory_summary_creation(self, creation_time: float, summary_length: int):
+    def record_memory_summary_creation(self, creation_time: float, summary_length: int,
+                                       prompt_tokens: int = 0, completion_tokens: int = 0):
         """Record memory summary creation."""
         self.memory_stats['summaries_created'] += 1
         self.memory_stats['summary_creation_times'].append(creation_time)
+        self.memory_stats['summary_prompt_tokens'] += prompt_tokens
+        self.memory_stats['summary_completion_tokens'] += completion_tokens
         logger.debug(f"Recorded memory summary creation: {creation_time:.3f}s, {summary_length} chars")
     
     def record_memory_context_build(self):
@@ -95,6 +106,28 @@ class StatsCollector:
         self.memory_stats['toggles'][action] += 1
         logger.debug(f"Recorded memory toggle: {action}")
     
+    def record_routing_decision(self, path: str, decision_time: float):
+        """Record which routing path classified a turn."""
+        stats = self.routing_stats[path]
+        stats['count'] += 1
+        stats['total_time'] += decision_time
+        logger.debug(f"Recorded {path} routing: {decision_time:.3f}s")
+    
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """Get routing path counts, shares and average decision time."""
+        total = sum(stats['count'] for stats in self.routing_stats.values())
+        by_path = {}
+        for path, stats in self.routing_stats.items():
+            by_path[path] = {
+                'count': stats['count'],
+                'share': (stats['count'] / total * 100) if total > 0 else 0.0,
+                'avg_decision_time': stats['total_time'] / stats['count'] if stats['count'] > 0 else 0.0
+            }
+        return {
+            'total_decisions': total,
+            'by_path': by_path
+        }
+    
     def get_memory_stats(self) -> Dict[str, Any]:
         """Get memory system statistics."""
         stats = self.memory_stats.copy()
@@ -324,6 +357,13 @@ class StatsCollector:
             else:
                 print("📈 Query Performance: No queries processed yet")
             
+            # Routing paths
+            routing_stats = self.get_routing_stats()
+            if routing_stats['total_decisions'] > 0:
+                print(f"🧭 Routing: {routing_stats['total_decisions']} decisions")
+                for path, stats in routing_stats['by_path'].items():
+                    print(f"     {path}: {stats['count']} ({stats['share']:.1f}%), {stats['avg_decision_time']*1000:.1f}ms avg")
+            
             # Memory statistics
             memory_stats = self.get_memory_stats()
             print(f"🧠 Memory System:")
@@ -333,6 +373,7 @@ class StatsCollector:
             
             if memory_stats['avg_summary_creation_time'] > 0:
                 print(f"   Avg summary creation: {memory_stats['avg_summary_creation_time']:.3f}s")
+                print(f"   Summary tokens: {memory_stats['summary_prompt_tokens']} prompt, {memory_stats['summary_completion_tokens']} completion")
             
             if memory_stats['toggles']:
                 print(f"   Toggle operations:")
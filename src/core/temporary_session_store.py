@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+Temporary Session Store for Crowd Due Dill
+
+Bounded stores for anonymous (temp_*) conversations behind one backend interface:
+- TemporarySessionStore: in-process LRU/TTL store with a memory budget and
+  optional spill to a local SQLite file (single worker)
+- SharedTemporarySessionStore: SQLite WAL file opened per operation, shared
+  by all API worker processes (uvicorn --workers N)
+- Per-session message cap and entry count / bytes reporting for both
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.logger import logger
+
+
+# Fixed per-message overhead added to the content length when estimating size
+MESSAGE_OVERHEAD_BYTES = 400
+SESSION_OVERHEAD_BYTES = 2048
+
+
+def trim_session_messages(state: Dict[str, Any], max_messages: int) -> int:
+    """Drop the oldest messages beyond max_messages; returns the number dropped."""
+    messages = state.get("messages", [])
+    excess = len(messages) - max_messages
+    if excess <= 0:
+        return 0
+
+    del messages[:excess]
+
+    # The summary count fallback indexes from the first message, so shift it too
+    context = state.get("context")
+    for key in ("summarized_message_count", "last_summary_message_count"):
+        if context and context.get(key):
+            context[key] = max(context[key] - excess, 0)
+    return excess
+
+
+def estimate_session_bytes(state: Dict[str, Any]) -> int:
+    """Estimate memory held by a session state (message text dominates)."""
+    size = SESSION_OVERHEAD_BYTES
+    for message in state.get("messages", []):
+        content = getattr(message, "content", "")
+        size += MESSAGE_OVERHEAD_BYTES + (len(content) if isinstance(content, str) else 0)
+    size += len(state.get("medium_term_summary") or "")
+    return size
+
+
+class TemporarySessionBackend(ABC):
+    """
+    Dict-like interface shared by temporary session stores.
+
+    States returned by get() may be copies, so callers write changes back:
+        state = store[session_id]
+        state["messages"].append(message)
+        store[session_id] = state
+    """
+
+    @abstractmethod
+    def get(self, session_id: str, default=None) -> Optional[Dict[str, Any]]:
+        """Get a session state, or default if missing/expired."""
+
+    @abstractmethod
+    def set(self, session_id: str, state: Dict[str, Any]):
+        """Store a session state."""
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        """Remove a session."""
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+
+    def __setitem__(self, session_id: str, state: Dict[str, Any]):
+        self.set(session_id, state)
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        state = self.get(session_id)
+        if state is None:
+            raise KeyError(session_id)
+        return state
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __delitem__(self, session_id: str):
+        self.delete(session_id)
+
+
+class TemporarySessionStore(TemporarySessionBackend):
+    """In-process temporary session store with LRU/TTL eviction."""
+
+    def __init__(self,
+                 max_sessions: int = 1000,
+                 ttl_seconds: int = 3600,
+                 max_memory_mb: int = 128,
+                 max_messages_per_session: int = 100,
+                 spill_dir: Optional[str] = None,
+                 cleanup_every: int = 100,
+                 report_interval: float = 30.0,
+                 metrics_callback: Optional[Callable[..., None]] = None):
+        """
+        Initialize the store.
+
+        Args:
+            max_sessions: Sessions kept in memory before LRU eviction
+            ttl_seconds: Idle time after which a session expires
+            max_memory_mb: Estimated memory budget for all in-memory sessions
+            max_messages_per_session: Oldest messages beyond this are dropped
+            spill_dir: Directory for the on-disk spill store (None disables spilling)
+            cleanup_every: Writes between deletions of expired spilled sessions
+            report_interval: Minimum seconds between metrics reports
+                (counting the spill table is a full scan; spill cleanup always reports)
+            metrics_callback: Called as callback(entries=, bytes_held=, spilled=)
+        """
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.max_messages_per_session = max_messages_per_session
+        self.cleanup_every = cleanup_every
+        self.report_interval = report_interval
+        self.metrics_callback = metrics_callback
+        self._writes = 0
+        self._last_report = float("-inf")
+
+        # session_id -> (state, size_bytes, last_access)
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        # Performance tracking
+        self.stats = {
+            'evicted_lru': 0,
+            'evicted_memory': 0,
+            'expired': 0,
+            'spilled': 0,
+            'restored': 0,
+            'messages_trimmed': 0
+        }
+
+        self._spill_conn = None
+        if spill_dir:
+            self._setup_spill_store(spill_dir)
+
+    def _setup_spill_store(self, spill_dir: str):
+        """Initialize SQLite store for spilled sessions."""
+        try:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._spill_conn = sqlite3.connect(os.path.join(spill_dir, "temporary_sessions.db"), check_same_thread=False)
+            self._spill_conn.execute("PRAGMA journal_mode=WAL")
+            self._spill_conn.execute("""
+                CREATE TABLE IF NOT EXISTS temporary_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    state BLOB NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._spill_conn.execute("CREATE INDEX IF NOT EXISTS idx_temporary_sessions_last_access ON temporary_sessions(last_access)")
+            self._spill_conn.commit()
+        except Exception as e:
+            logger.warning(f"Temporary session spill store disabled: {e}")
+            self._spill_conn = None
+
+    def _report(self, force: bool = False):
+        """Push current size to the metrics callback (at most once per report_interval unless forced)."""
+        if not self.metrics_callback:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_report < self.report_interval:
+            return
+        self._last_report = now
+        try:
+            self.metrics_callback(entries=len(self._sessions), bytes_held=self._bytes, spilled=self._spill_count())
+        except Exception as e:
+            logger.debug(f"Temporary session metrics error: {e}")
+
+    def _drop(self, session_id: str):
+        """Remove a session from memory."""
+        _, size, _ = self._sessions.pop(session_id)
+        self._bytes -= size
+
+    def _spill(self, session_id: str, state: Dict[str, Any], last_access: float):
+        """Write an evicted session to the spill store."""
+        if not self._spill_conn:
+            return
+        try:
+            self._spill_conn.execute(
+                "INSERT OR REPLACE INTO temporary_sessions (session_id, state, last_access) VALUES (?, ?, ?)",
+                (session_id, pickle.dumps(state), last_access)
+            )
+            self._spill_conn.commit()
+            self.stats['spilled'] += 1
+        except Exception as e:
+            logger.debug(f"Temporary session spill error: {e}")
+
+    def _restore(self, session_id: str, now: float) -> Optional[Dict[str, Any]]:
+        """Load a spilled session back into memory (removing it from disk)."""
+        if not self._spill_conn:
+            return None
+        try:
+            row = self._spill_conn.execute(
+                "SELECT state, last_access FROM temporary_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if not row:
+                return None
+            self._spill_conn.execute("DELETE FROM temporary_sessions WHERE session_id = ?", (session_id,))
+            self._spill_conn.commit()
+            if now - row[1] > self.ttl_seconds:
+                self.stats['expired'] += 1
+                return None
+            self.stats['restored'] += 1
+            return pickle.loads(row[0])
+        except Exception as e:
+            logger.debug(f"Temporary session restore error: {e}")
+            return None
+
+    def _spill_count(self) -> int:
+        """Number of sessions in the spill store."""
+        if not self._spill_conn:
+            return 0
+        try:
+            return self._spill_conn.execute("SELECT COUNT(*) FROM temporary_sessions").fetchone()[0]
+        except Exception:
+            return 0
+
+    def _evict(self, now: float):
+        """Expire idle sessions, then evict LRU sessions until within count and memory limits."""
+        while self._sessions:
+            session_id, (state, _, last_access) = next(iter(self._sessions.items()))
+            if now - last_access > self.ttl_seconds:
+                self._drop(session_id)
+                self.stats['expired'] += 1
+            elif len(self._sessions) > self.max_sessions:
+                self._drop(session_id)
+                self._spill(session_id, state, last_access)
+                self.stats['evicted_lru'] += 1
+            elif self._bytes > self.max_bytes and len(self._sessions) > 1:
+                self._drop(session_id)
+                self._spill(session_id, state, last_access)
+                self.stats['evicted_memory'] += 1
+            else:
+                break
+
+    def _cleanup_spill(self, now: float):
+        """Delete expired sessions from the spill store (restore also skips them)."""
+        if self._spill_conn:
+            try:
+                self._spill_conn.execute("DELETE FROM temporary_sessions WHERE last_access < ?", (now - self.ttl_seconds,))
+                self._spill_conn.commit()
+            except Exception as e:
+                logger.debug(f"Temporary session spill cleanup error: {e}")
+        self._report(force=True)
+
+    def get(self, session_id: str, default=None) -> Optional[Dict[str, Any]]:
+        """Get a session state (refreshing its LRU position), or default if missing/expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                state, size, last_access = entry
+                if now - last_access <= self.ttl_seconds:
+                    self._sessions[session_id] = (state, size, now)
+                    self._sessions.move_to_end(session_id)
+                    return state
+                self._drop(session_id)
+                self.stats['expired'] += 1
+                self._report()
+                return default
+
+            state = self._restore(session_id, now)
+            if state is None:
+                return default
+            self._put(session_id, state, now)
+            return state
+
+    def _put(self, session_id: str, state: Dict[str, Any], now: float):
+        """Store a session state and enforce limits."""
+        if session_id in self._sessions:
+            self._drop(session_id)
+        self.stats['messages_trimmed'] += trim_session_messages(state, self.max_messages_per_session)
+        size = estimate_session_bytes(state)
+        self._sessions[session_id] = (state, size, now)
+        self._bytes += size
+        self._evict(now)
+
+        self._writes += 1
+        if self._writes % self.cleanup_every == 0:
+            self._cleanup_spill(now)
+        else:
+            self._report()
+
+    def set(self, session_id: str, state: Dict[str, Any]):
+        """Store a session state."""
+        with self._lock:
+            self._put(session_id, state, time.time())
+
+    def delete(self, session_id: str):
+        """Remove a session from memory and the spill store."""
+        with self._lock:
+            if session_id in self._sessions:
+                self._drop(session_id)
+            if self._spill_conn:
+                self._spill_conn.execute("DELETE FROM temporary_sessions WHERE session_id = ?", (session_id,))
+                self._spill_conn.commit()
+            self._report()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        with self._lock:
+            stats = self.stats.copy()
+            stats.update({
+                'backend': 'memory',
+                'entries': len(self._sessions),
+                'bytes_held': self._bytes,
+                'spilled_entries': self._spill_count(),
+                'max_sessions': self.max_sessions,
+                'max_bytes': self.max_bytes
+            })
+        return stats
+
+
+class SharedTemporarySessionStore(TemporarySessionBackend):
+    """
+    Temporary session store in a SQLite WAL file shared across worker processes.
+
+    Each operation opens its own connection, so the store is safe to use from
+    any thread and any uvicorn worker pointing at the same file.
+    """
+
+    def __init__(self,
+                 db_path: str = "data/sessions/temporary_sessions.db",
+                 max_sessions: int = 10000,
+                 ttl_seconds: int = 3600,
+                 max_messages_per_session: int = 100,
+                 cleanup_every: int = 100,
+                 report_interval: float = 30.0,
+                 metrics_callback: Optional[Callable[..., None]] = None):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: SQLite file shared by all workers
+            max_sessions: Sessions kept before the least recently used are deleted
+            ttl_seconds: Idle time after which a session expires
+            max_messages_per_session: Oldest messages beyond this are dropped
+            cleanup_every: Writes between expiry/LRU cleanup passes
+            report_interval: Minimum seconds between metrics reports from writes
+                (counting the table is a full scan; cleanup always reports)
+            metrics_callback: Called as callback(entries=, bytes_held=, spilled=)
+        """
+        self.db_path = db_path
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_messages_per_session = max_messages_per_session
+        self.cleanup_every = cleanup_every
+        self.report_interval = report_interval
+        self.metrics_callback = metrics_callback
+        self._writes = 0
+        self._last_report = float("-inf")
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS temporary_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    state BLOB NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_temporary_sessions_last_access ON temporary_sessions(last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a per-operation connection (waits on writers from other workers)."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, session_id: str, default=None) -> Optional[Dict[str, Any]]:
+        """Load a session state, or default if missing/expired."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute(
+                    "SELECT state, last_access FROM temporary_sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                if not row:
+                    return default
+                if now - row[1] > self.ttl_seconds:
+                    conn.execute("DELETE FROM temporary_sessions WHERE session_id = ?", (session_id,))
+                    return default
+                conn.execute("UPDATE temporary_sessions SET last_access = ? WHERE session_id = ?", (now, session_id))
+            return pickle.loads(row[0])
+        finally:
+            conn.close()
+
+    def set(self, session_id: str, state: Dict[str, Any]):
+        """Write a session state."""
+        trim_session_messages(state, self.max_messages_per_session)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO temporary_sessions (session_id, state, last_access) VALUES (?, ?, ?)",
+                    (session_id, pickle.dumps(state), time.time())
+                )
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._writes += 1
+            cleanup_due = self._writes % self.cleanup_every == 0
+        if cleanup_due:
+            self.cleanup()
+        self._report()
+
+    def delete(self, session_id: str):
+        """Remove a session."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM temporary_sessions WHERE session_id = ?", (session_id,))
+        finally:
+            conn.close()
+        self._report()
+
+    def cleanup(self):
+        """Delete expired sessions and the least recently used beyond max_sessions."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM temporary_sessions WHERE last_access < ?", (time.time() - self.ttl_seconds,))
+                conn.execute("""
+                    DELETE FROM temporary_sessions WHERE session_id IN (
+                        SELECT session_id FROM temporary_sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_sessions,))
+        except Exception as e:
+            logger.debug(f"Temporary session cleanup error: {e}")
+        finally:
+            conn.close()
+        self._report(force=True)
+
+    def _report(self, force: bool = False):
+        """Push current size to the metrics callback (at most once per report_interval unless forced)."""
+        if not self.metrics_callback:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_report < self.report_interval:
+                return
+            self._last_report = now
+        try:
+            stats = self.get_stats()
+            self.metrics_callback(entries=stats['entries'], bytes_held=stats['bytes_held'], spilled=0)
+        except Exception as e:
+            logger.debug(f"Temporary session metrics error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        conn = self._connect()
+        try:
+            entries, bytes_held = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(state)), 0) FROM temporary_sessions"
+            ).fetchone()
+        finally:
+            conn.close()
+        return {
+            'backend': 'sqlite',
+            'entries': entries,
+            'bytes_held': bytes_held,
+            'max_sessions': self.max_sessions
+        }
+
+
+def create_temporary_session_store(backend: str = "memory", **kwargs) -> TemporarySessionBackend:
+    """
+    Create a temporary session store.
+
+    Args:
+        backend: "memory" (single process) or "sqlite" (shared across workers)
+        **kwargs: Store options (spill_dir/max_memory_mb apply to memory, db_path to sqlite)
+    """
+    if backend == "sqlite":
+        for option in ("spill_dir", "max_memory_mb"):
+            kwargs.pop(option, None)
+        return SharedTemporarySessionStore(**kwargs)
+    if backend != "memory":
+        raise ValueError(f"Unknown temporary session backend: {backend}")
+    kwargs.pop("db_path", None)
+    return TemporarySessionStore(**kwargs)
@@ -10,6 +10,7 @@ import os
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from src.utils.logger import logger
+from .session_catalog import SessionCatalog
 
 
 class UnifiedSessionManager:
@@ -21,17 +22,30 @@ class UnifiedSessionManager:
     - Memory settings stored in graph state
     - Session metadata in graph state
     - Built-in conversation history
+    - Indexed session catalog for listing without scanning checkpoints
+    
+    current_thread_id is only a convenience for the single-user CLI. Request
+    handlers pass thread_id explicitly and load/create with set_current=False,
+    so concurrent requests (and multiple workers) never share it.
     """
     
-    def __init__(self, checkpointer, graph):
+    def __init__(self, checkpointer, graph, catalog: Optional[SessionCatalog] = None):
         self.checkpointer = checkpointer
         self.graph = graph
         self.current_thread_id: Optional[str] = None
         
         # Ensure sessions directory exists for the SQLite database
         os.makedirs("data/sessions", exist_ok=True)
+        
+        # Session metadata table, backfilled once from existing checkpoints
+        self.catalog = catalog or SessionCatalog()
+        if self.catalog.count() == 0:
+            try:
+                self.catalog.backfill_from_checkpointer(self.checkpointer)
+            except Exception as e:
+                logger.error(f"Failed to backfill session catalog: {e}")
     
-    def create_session(self) -> Dict[str, Any]:
+    def create_session(self, set_current: bool = True) -> Dict[str, Any]:
         """Create a new session with clean state."""
         thread_id = str(uuid.uuid4())
         
@@ -50,8 +64,10 @@ class UnifiedSessionManager:
         
         # Initialize the session by updating state
         self.graph.update_state(config, metadata)
+        self.register_session(thread_id, metadata)
         
-        self.current_thread_id = thread_id
+        if set_current:
+            self.current_thread_id = thread_id
         logger.debug(f"Created session: {thread_id[:8]}...")
         
         return {
@@ -60,7 +76,24 @@ class UnifiedSessionManager:
             "state": metadata
         }
     
-    def load_session(self, thread_id: str) -> Optional[Dict[str, Any]]:
+    def register_session(self, thread_id: str, session_metadata: Dict[str, Any] = None, message_count: int = 0):
+        """Add or replace a session's catalog entry (for sessions written directly to the graph)."""
+        session_metadata = session_metadata or {}
+        created_at = session_metadata.get("created_at") or datetime.now().isoformat()
+        try:
+            self.catalog.upsert(
+                thread_id,
+                created_at=created_at,
+                last_activity=session_metadata.get("last_activity") or created_at,
+                message_count=message_count,
+                title=session_metadata.get("title"),
+                archived=session_metadata.get("archived", False),
+                archived_at=session_metadata.get("archived_at")
+            )
+        except Exception as e:
+            logger.error(f"Failed to register session {thread_id[:8]}... in catalog: {e}")
+    
+    def load_session(self, thread_id: str, set_current: bool = True) -> Optional[Dict[str, Any]]:
         """Load an existing session by thread ID."""
         config = {"configurable": {"thread_id": thread_id}}
         
@@ -69,7 +102,8 @@ class UnifiedSessionManager:
             state_snapshot = self.graph.get_state(config)
             
             if state_snapshot and state_snapshot.values:
-                self.current_thread_id = thread_id
+                if set_current:
+                    self.current_thread_id = thread_id
                 logger.debug(f"Loaded session: {thread_id[:8]}...")
                 
                 return {
@@ -90,6 +124,7 @@ class UnifiedSessionManager:
         try:
             # Use checkpointer's delete_thread method with the correct parameter format
             self.checkpointer.delete_thread(thread_id)
+            self.catalog.delete(thread_id)
             
             if self.current_thread_id == thread_id:
                 self.current_thread_id = None
@@ -102,13 +137,15 @@ class UnifiedSessionManager:
             print(f"❌ Session {thread_id[:8]}... not found")
             return False
     
-    def update_activity(self, domains_used: List[str] = None) -> bool:
+    def update_activity(self, domains_used: List[str] = None, message_count: Optional[int] = None,
+                        thread_id: Optional[str] = None) -> bool:
         """Update session activity timestamp - domain tracking removed."""
-        if not self.current_thread_id:
+        thread_id = thread_id or self.current_thread_id
+        if not thread_id:
             return False
         
         try:
-            config = {"configurable": {"thread_id": self.current_thread_id}}
+            config = {"configurable": {"thread_id": thread_id}}
             current_state = self.graph.get_state(config)
             
             if current_state and current_state.values:
@@ -120,6 +157,17 @@ class UnifiedSessionManager:
                 
                 # Update state
                 self.graph.update_state(config, updates)
+                
+                # Keep the catalog row current (message_count is the conversation length)
+                catalog_updates = {"last_activity": updates["last_activity"]}
+                if message_count is not None:
+                    catalog_updates["message_count"] = message_count
+                if not self.catalog.update(thread_id, **catalog_updates):
+                    self.register_session(
+                        thread_id,
+                        current_state.values.get("session_metadata", {}),
+                        message_count or len(current_state.values.get("messages", []))
+                    )
                 return True
                 
         except Exception as e:
@@ -127,12 +175,13 @@ class UnifiedSessionManager:
         
         return False
     
-    def save_memory_settings(self, memory_manager) -> bool:
-        """Save memory settings to current session state."""
-        if not self.current_thread_id:
+    def save_memory_settings(self, memory_manager, thread_id: Optional[str] = None) -> bool:
+        """Save memory settings to a session's state (default: current session)."""
+        thread_id = thread_id or self.current_thread_id
+        if not thread_id:
             return False
         
-        config = {"configurable": {"thread_id": self.current_thread_id}}
+        config = {"configurable": {"thread_id": thread_id}}
         
         try:
             memory_status = memory_manager.get_memory_status()
@@ -149,12 +198,13 @@ class UnifiedSessionManager:
             logger.error(f"Failed to save memory settings: {e}")
             return False
     
-    def restore_memory_settings(self, memory_manager) -> bool:
-        """Restore memory settings from current session state."""
-        if not self.current_thread_id:
+    def restore_memory_settings(self, memory_manager, thread_id: Optional[str] = None) -> bool:
+        """Restore memory settings from a session's state (default: current session)."""
+        thread_id = thread_id or self.current_thread_id
+        if not thread_id:
             return False
         
-        config = {"configurable": {"thread_id": self.current_thread_id}}
+        config = {"configurable": {"thread_id": thread_id}}
         
         try:
             # Get current state
@@ -185,54 +235,10 @@ class UnifiedSessionManager:
             logger.error(f"Failed to restore memory settings: {e}")
             return False
     
-    def list_sessions(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """List recent sessions using checkpointer."""
+    def list_sessions(self, limit: int = 10, user_id: Optional[str] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """List recent active sessions from the session catalog (newest activity first)."""
         try:
-            sessions_dict = {}
-            
-            # Get all checkpoints (threads) using the correct API
-            # Note: checkpointer.list() returns ALL checkpoints, including multiple per thread
-            for checkpoint_tuple in self.checkpointer.list(None, limit=limit*10):  # Get more to account for duplicates
-                if not checkpoint_tuple.config:
-                    continue
-                    
-                thread_id = checkpoint_tuple.config.get("configurable", {}).get("thread_id")
-                if not thread_id:
-                    continue
-                
-                # Extract metadata from the checkpoint tuple
-                metadata = checkpoint_tuple.checkpoint.get("channel_values", {}).get("session_metadata", {})
-                message_count = len(checkpoint_tuple.checkpoint.get("channel_values", {}).get("messages", []))
-                last_activity = metadata.get("last_activity", "unknown")
-                
-                # Only keep the most recent checkpoint for each thread_id (latest last_activity)
-                if thread_id not in sessions_dict:
-                    sessions_dict[thread_id] = {
-                        "thread_id": thread_id,
-                        "created_at": metadata.get("created_at", "unknown"),
-                        "last_activity": last_activity,
-                        "message_count": message_count,
-                        "title": metadata.get("title"),
-                        "archived": metadata.get("archived", False)
-                    }
-                else:
-                    # Keep the checkpoint with the most recent activity
-                    existing_activity = sessions_dict[thread_id]["last_activity"]
-                    if last_activity != "unknown" and (existing_activity == "unknown" or last_activity > existing_activity):
-                        sessions_dict[thread_id] = {
-                            "thread_id": thread_id,
-                            "created_at": metadata.get("created_at", "unknown"),
-                            "last_activity": last_activity,
-                            "message_count": message_count,
-                            "title": metadata.get("title"),
-                            "archived": metadata.get("archived", False)
-                        }
-            
-            # Convert dict to list, filter out archived sessions, and sort by last activity (newest first)
-            sessions = [s for s in sessions_dict.values() if not s.get("archived", False)]
-            sessions.sort(key=lambda x: x.get("last_activity", ""), reverse=True)
-            return sessions[:limit]
-            
+            return self.catalog.list(limit=limit, offset=offset, user_id=user_id)
         except Exception as e:
             logger.error(f"Failed to list sessions: {e}")
             return []
@@ -240,26 +246,18 @@ class UnifiedSessionManager:
     def find_session_by_partial_id(self, partial_id: str) -> Optional[str]:
         """Find session by partial thread ID."""
         try:
-            # List all sessions and find one that starts with partial_id
-            for checkpoint_tuple in self.checkpointer.list(None, limit=100):  
-                if not checkpoint_tuple.config:
-                    continue
-                    
-                thread_id = checkpoint_tuple.config.get("configurable", {}).get("thread_id")
-                if thread_id and thread_id.startswith(partial_id):
-                    return thread_id
-            return None
-            
+            return self.catalog.find_by_prefix(partial_id)
         except Exception as e:
             logger.error(f"Failed to find session: {e}")
             return None
     
-    def get_current_session(self) -> Optional[Dict[str, Any]]:
-        """Get current session information."""
-        if not self.current_thread_id:
+    def get_current_session(self, thread_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get session information (default: current session)."""
+        thread_id = thread_id or self.current_thread_id
+        if not thread_id:
             return None
         
-        config = {"configurable": {"thread_id": self.current_thread_id}}
+        config = {"configurable": {"thread_id": thread_id}}
         
         try:
             current_state = self.graph.get_state(config)
@@ -269,7 +267,7 @@ class UnifiedSessionManager:
                 message_count = len(current_state.values.get("messages", []))
                 
                 return {
-                    "thread_id": self.current_thread_id,
+                    "thread_id": thread_id,
                     "created_at": metadata.get("created_at", "unknown"),
                     "last_activity": metadata.get("last_activity", "unknown"),
                     "message_count": message_count,
@@ -310,6 +308,7 @@ class UnifiedSessionManager:
             
             # Update state
             self.graph.update_state(config, {"session_metadata": metadata})
+            self.catalog.update(thread_id, title=title, last_activity=metadata["last_activity"])
             logger.debug(f"Updated session {thread_id[:8]}... title to: {title}")
             return True
             
@@ -335,6 +334,8 @@ class UnifiedSessionManager:
             
             # Update state
             self.graph.update_state(config, {"session_metadata": metadata})
+            self.catalog.update(thread_id, archived=True, archived_at=metadata["archived_at"],
+                                last_activity=metadata["last_activity"])
             logger.debug(f"Archived session {thread_id[:8]}...")
             return True
             
@@ -360,6 +361,8 @@ class UnifiedSessionManager:
             
             # Update state
             self.graph.update_state(config, {"session_metadata": metadata})
+            self.catalog.update(thread_id, archived=False, archived_at=None,
+                                last_activity=metadata["last_activity"])
             logger.debug(f"Unarchived session {thread_id[:8]}...")
             return True
             
@@ -367,55 +370,10 @@ class UnifiedSessionManager:
             logger.error(f"Failed to unarchive session: {e}")
             return False
 
-    def list_archived_sessions(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """List archived sessions using checkpointer."""
+    def list_archived_sessions(self, limit: int = 50, user_id: Optional[str] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """List archived sessions from the session catalog (newest archive first)."""
         try:
-            sessions_dict = {}
-            
-            # Get all checkpoints (threads) using the correct API
-            for checkpoint_tuple in self.checkpointer.list(None, limit=limit*10):  # Get more to account for duplicates
-                if not checkpoint_tuple.config:
-                    continue
-                    
-                thread_id = checkpoint_tuple.config.get("configurable", {}).get("thread_id")
-                if not thread_id:
-                    continue
-                
-                # Extract metadata from the checkpoint tuple
-                metadata = checkpoint_tuple.checkpoint.get("channel_values", {}).get("session_metadata", {})
-                message_count = len(checkpoint_tuple.checkpoint.get("channel_values", {}).get("messages", []))
-                last_activity = metadata.get("last_activity", "unknown")
-                
-                # Only keep the most recent checkpoint for each thread_id (latest last_activity)
-                if thread_id not in sessions_dict:
-                    sessions_dict[thread_id] = {
-                        "thread_id": thread_id,
-                        "created_at": metadata.get("created_at", "unknown"),
-                        "last_activity": last_activity,
-                        "message_count": message_count,
-                        "title": metadata.get("title"),
-                        "archived": metadata.get("archived", False),
-                        "archived_at": metadata.get("archived_at", "unknown")
-                    }
-                else:
-                    # Keep the checkpoint with the most recent activity
-                    existing_activity = sessions_dict[thread_id]["last_activity"]
-                    if last_activity != "unknown" and (existing_activity == "unknown" or last_activity > existing_activity):
-                        sessions_dict[thread_id] = {
-                            "thread_id": thread_id,
-                            "created_at": metadata.get("created_at", "unknown"),
-                            "last_activity": last_activity,
-                            "message_count": message_count,
-                            "title": metadata.get("title"),
-                            "archived": metadata.get("archived", False),
-                            "archived_at": metadata.get("archived_at", "unknown")
-                        }
-            
-            # Convert dict to list, filter to only archived sessions, and sort by archived date (newest first)
-            archived_sessions = [s for s in sessions_dict.values() if s.get("archived", False)]
-            archived_sessions.sort(key=lambda x: x.get("archived_at", ""), reverse=True)
-            return archived_sessions[:limit]
-            
+            return self.catalog.list(limit=limit, offset=offset, user_id=user_id, archived=True)
         except Exception as e:
             logger.error(f"Failed to list archived sessions: {e}")
-            return [] 
\ No newline at end of file
+            return []
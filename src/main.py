@@ -18,20 +18,24 @@ from langchain.chat_models import init_chat_model
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
 from langchain_core.messages import HumanMessage, AIMessage
-from langgraph.checkpoint.sqlite import SqliteSaver
-import sqlite3
+from langchain_core.runnables import RunnableConfig
+import atexit
 import os
 import sys
+import time
+import uuid
 from pathlib import Path
 
 # Add src directory to Python path for proper relative imports
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
+from core.checkpoint_store import PooledSqliteSaver
 from core.contextual_rag import OptimizedContextualRAGSystem
 from core.resilience_manager import resilience_manager
 from core.stats_collector import StatsCollector
 from core.unified_session_manager import UnifiedSessionManager
+from core.query_router import LocalQueryRouter
 from cache.negative_intent_detector import NegativeIntentDetector
 from cache.qa_cache import QACache
 from utils.logger import logger, set_debug_mode
@@ -42,16 +46,34 @@ from utils.command_handler import command_handler
 load_dotenv()
 
 # Initialize LLM
-llm = init_chat_model("gemini-1.5-flash-8b", model_provider="google_genai")
+LLM_MODEL = "gemini-1.5-flash-8b"
+llm = init_chat_model(LLM_MODEL, model_provider="google_genai")
 
 # Initialize system components
 # Simplified system without domain complexity
 negative_detector = NegativeIntentDetector()
-qa_cache = QACache()
 rag_system = OptimizedContextualRAGSystem()
 
+# Q&A cache shares the RAG embeddings so a cache miss never re-embeds the query
+qa_cache = QACache(
+    embeddings=rag_system.embeddings,
+    model_name=LLM_MODEL,
+    negative_detector=negative_detector
+)
+
+# Optional fast path: decide message_type/should_use_rag in-process and only
+# call the LLM classifier for ambiguous turns (one LLM round-trip per turn)
+FAST_ROUTING = os.getenv('CROWD_DUE_DILL_FAST_ROUTING', 'false').lower() in ('true', '1', 'yes')
+query_router = LocalQueryRouter(
+    embeddings=rag_system.embeddings,
+    query_analyzer=rag_system._detect_query_type
+) if FAST_ROUTING else None
+if query_router:
+    atexit.register(query_router.flush)
+
 # Initialize memory manager with stats collector
 memory_manager = MemoryManager(llm, rag_system.stats_collector)
+atexit.register(memory_manager.cleanup)
 
 # Session manager will be initialized after graph compilation
 
@@ -76,9 +98,48 @@ class State(TypedDict):
     memory_settings: dict[str, Any]  # Memory toggle states
     session_metadata: dict[str, Any]  # Session info (domains, counts, etc.)
 
+def check_qa_cache(state: State):
+    """Serve repeated questions from the semantic Q&A cache, skipping both LLM calls."""
+    last_message = state["messages"][-1]
+    start_time = time.time()
+    # Cached answers are shared across users: follow-ups and turns with memory are always generated
+    entry = None
+    if qa_cache.is_context_free(state["messages"], state.get("medium_term_summary")):
+        entry = qa_cache.search_qa(last_message.content)
+    
+    if entry is None:
+        # Reset the previous turn's marker so routing continues to the classifier
+        return {"rag_context": None}
+    
+    rag_system.stats_collector.record_query("qa_cache", time.time() - start_time)
+    
+    return {
+        "messages": [AIMessage(content=entry.answer, id=uuid.uuid4().hex)],
+        "message_type": entry.metadata.get("message_type") or "analytical",
+        "should_use_rag": True,
+        "rag_context": "qa_cache_hit"
+    }
+
+def route_after_cache(state: State):
+    """Skip classification and generation on a Q&A cache hit."""
+    return END if state.get("rag_context") == "qa_cache_hit" else "classifier"
+
 def classify_and_decide_rag(state: State):
     """Combined message classification and RAG decision for optimal performance."""
     last_message = state["messages"][-1]
+    start_time = time.time()
+    
+    # Fast path: local router decides unambiguous turns without an LLM call
+    if query_router:
+        decision = query_router.route(last_message.content)
+        if decision:
+            rag_system.stats_collector.record_routing_decision(decision.path, time.time() - start_time)
+            logger.debug(f"Local routing ({decision.path}): {decision.message_type}, rag={decision.should_use_rag}")
+            return {
+                "message_type": decision.message_type,
+                "should_use_rag": decision.should_use_rag
+            }
+    
     combined_classifier = llm.with_structured_output(CombinedDecision)
 
     result = combined_classifier.invoke([
@@ -111,6 +172,12 @@ Do NOT use RAG for:
         }
     ])
     
+    rag_system.stats_collector.record_routing_decision("llm", time.time() - start_time)
+    
+    # Every LLM decision becomes a labelled example for the centroid router
+    if query_router:
+        query_router.record_llm_decision(last_message.content, result.message_type, result.should_use_rag)
+    
     return {
         "message_type": result.message_type,
         "should_use_rag": result.should_use_rag
@@ -123,10 +190,18 @@ def router(state: State):
     message_type = state.get("message_type", "analytical")
     return {"next": "advisory" if message_type == "advisory" else "analytical"}
 
+def _collect_sources(results: list) -> list:
+    """Source documents referenced by RAG results (used for Q&A cache invalidation)."""
+    return sorted({
+        result.get("metadata", {}).get("source")
+        for result in results
+        if result.get("metadata", {}).get("source")
+    })
+
 def get_rag_context(query: str, should_use_rag: bool) -> dict:
     """Get RAG context for the query with parallel hybrid retrieval."""
     if not should_use_rag:
-        return {"type": "no_rag", "content": ""}
+        return {"type": "no_rag", "content": "", "sources": []}
     
     try:
         # Use RAG system for parallel hybrid retrieval
@@ -174,7 +249,19 @@ Processing Time: {processing_time:.3f}s
 """
                 
                 context = context_header + "\n\n".join(context_parts)
-                return {"type": "parallel_hybrid", "content": context}
+                return {
+                    "type": "parallel_hybrid",
+                    "content": context,
+                    "sources": _collect_sources(vector_results + keyword_results),
+                    "metadata": {
+                        "query_type": query_info.get("query_type", "unknown"),
+                        "confidence": query_info.get("confidence", 0.0),
+                        "rerank_scores": [round(result.get("rerank_score", 0.0), 4) for result in vector_results],
+                        "vector_results": len(vector_results),
+                        "keyword_results": len(keyword_results),
+                        "processing_time": processing_time
+                    }
+                }
         
         # Fallback: check for legacy format results
         elif rag_result.get("chunks"):
@@ -187,17 +274,17 @@ Processing Time: {processing_time:.3f}s
             
             if context_parts:
                 context = "\n\n".join(context_parts)
-                return {"type": "rag_context", "content": context}
+                return {"type": "rag_context", "content": context, "sources": _collect_sources(rag_result["chunks"])}
         
         # No relevant content found
-        return {"type": "no_rag", "content": ""}
+        return {"type": "no_rag", "content": "", "sources": []}
         
     except Exception as e:
         logger.error(f"RAG context error: {e}")
-        return {"type": "no_rag", "content": ""}
+        return {"type": "no_rag", "content": "", "sources": []}
 
-def create_agent_response(state: State, agent_type: str) -> dict:
-    """Unified agent response creation for both advisory and analytical agents."""
+def prepare_agent_turn(state: State, agent_type: str) -> dict:
+    """Run retrieval and build the prompt for an agent turn (everything before the LLM call)."""
     last_message = state["messages"][-1]
     should_use_rag = state.get("should_use_rag", False)
     rag_result = get_rag_context(last_message.content, should_use_rag)
@@ -298,38 +385,92 @@ You naturally know this current regulatory context. When asked about current dat
     conversation_history = memory_manager.get_conversation_history(state, current_message)
     conversation_messages.extend(conversation_history)
     
-    reply = llm.invoke(conversation_messages)
+    return {
+        "conversation_messages": conversation_messages,
+        "current_message": current_message,
+        "rag_result": rag_result
+    }
+
+def read_checkpoint_state(thread_id: str) -> dict:
+    """Read a session's checkpointed state for a background summary (called under the thread's turn lock)."""
+    return graph.get_state({"configurable": {"thread_id": thread_id}}).values
+
+def persist_summary_update(thread_id: str, updates: dict):
+    """Write a background medium-term summary into the session checkpoint (called under the thread's turn lock)."""
+    config = {"configurable": {"thread_id": thread_id}}
+    graph.update_state(config, memory_manager.merge_summary_update(graph.get_state(config).values, updates))
+
+def finalize_agent_turn(state: State, agent_type: str, turn: dict, reply_content: str,
+                        thread_id: str = None, summary_writer=None, summary_reader=None) -> dict:
+    """Cache the answer, schedule memory updates and build the state update for a completed turn.
+    
+    With a thread_id the medium-term summary is created in the background from
+    the state returned by summary_reader and written by summary_writer
+    (default: the session checkpoint for both).
+    """
+    rag_result = turn["rag_result"]
+    
+    # Cache grounded answers so repeated regulatory questions skip both LLM calls
+    # (context-free turns only - the cache is shared by every user)
+    if (rag_result["type"] in ("parallel_hybrid", "rag_context") and rag_result.get("sources")
+            and qa_cache.is_context_free(state["messages"], state.get("medium_term_summary"), record=False)):
+        qa_cache.add_qa_pair(
+            turn["current_message"],
+            reply_content,
+            sources=rag_result["sources"],
+            message_type=agent_type
+        )
     
     # Update memory after response (your "response first, memory later" approach)
-    memory_updates = memory_manager.update_medium_term_memory(state)
+    memory_updates = memory_manager.update_medium_term_memory(
+        state,
+        thread_id=thread_id,
+        writer=summary_writer or persist_summary_update,
+        reader=summary_reader if summary_writer else read_checkpoint_state
+    )
     
-    response_dict = {"messages": [AIMessage(content=reply.content)], "rag_context": rag_context}
+    # Message IDs let the summary watermark survive trimming of temporary sessions
+    response_dict = {"messages": [AIMessage(content=reply_content, id=uuid.uuid4().hex)], "rag_context": rag_result["content"]}
     response_dict.update(memory_updates)  # Add any memory updates to the state
     
     return response_dict
 
-def advisory_agent(state: State):
+def create_agent_response(state: State, agent_type: str, thread_id: str = None, summary_writer=None,
+                          summary_reader=None) -> dict:
+    """Unified agent response creation for both advisory and analytical agents."""
+    turn = prepare_agent_turn(state, agent_type)
+    reply = llm.invoke(turn["conversation_messages"])
+    return finalize_agent_turn(state, agent_type, turn, reply.content, thread_id, summary_writer, summary_reader)
+
+def advisory_agent(state: State, config: RunnableConfig):
     """Strategic business advisory agent for professional guidance."""
-    return create_agent_response(state, "advisory")
+    return create_agent_response(state, "advisory", thread_id=config.get("configurable", {}).get("thread_id"))
 
-def analytical_agent(state: State):
+def analytical_agent(state: State, config: RunnableConfig):
     """Technical regulatory analysis agent for detailed examination."""
-    return create_agent_response(state, "analytical")
+    return create_agent_response(state, "analytical", thread_id=config.get("configurable", {}).get("thread_id"))
 
 # Initialize persistent checkpointer for session and memory persistence
 # Note: Database path will be user-specific after authentication
+# WAL + per-thread connections; only the latest N checkpoints per thread are kept
 default_db_path = "data/sessions/graph_checkpoints.db"
-os.makedirs(os.path.dirname(default_db_path), exist_ok=True)
-checkpointer = SqliteSaver(sqlite3.connect(default_db_path, check_same_thread=False))
+checkpointer = PooledSqliteSaver(
+    default_db_path,
+    keep_latest=int(os.getenv("CHECKPOINT_KEEP_LATEST", "10")),
+    prune_every=int(os.getenv("CHECKPOINT_PRUNE_EVERY", "5"))
+)
+atexit.register(checkpointer.close)
 
 # Build the agent graph
 graph_builder = StateGraph(State)
+graph_builder.add_node("qa_cache", check_qa_cache)
 graph_builder.add_node("classifier", classify_and_decide_rag)
 graph_builder.add_node("router", router)
 graph_builder.add_node("advisory", advisory_agent)
 graph_builder.add_node("analytical", analytical_agent)
 
-graph_builder.add_edge(START, "classifier")
+graph_builder.add_edge(START, "qa_cache")
+graph_builder.add_conditional_edges("qa_cache", route_after_cache, {"classifier": "classifier", END: END})
 graph_builder.add_edge("classifier", "router")
 graph_builder.add_conditional_edges("router", lambda state: state.get("next"), {"advisory": "advisory", "analytical": "analytical"})
 graph_builder.add_edge("advisory", END)
@@ -357,7 +498,8 @@ def print_stats():
         # Use the enhanced stats collector for internal metrics
         rag_system.stats_collector.print_comprehensive_stats(
             vectorstore=rag_system.vectorstore,
-            memory_manager=memory_manager
+            memory_manager=memory_manager,
+            qa_cache=qa_cache
         )
         
         print("\n💡 Production Monitoring:")
@@ -371,6 +513,7 @@ def print_stats():
 # Register dependencies with command handler (after all functions are defined)
 command_handler.register_dependencies(
     rag_system=rag_system,
+    qa_cache=qa_cache,
     memory_manager=memory_manager,
     session_manager=session_manager,
     print_stats=print_stats,
@@ -464,14 +607,23 @@ def run_chatbot():
             # Add user message to state
             current_state["messages"].append(HumanMessage(content=user_input))
             
-            # Process through agent graph with session config
-            result = graph.invoke(current_state, config=current_config)
+            # Background summary writes wait for the turn, so none lands between
+            # reading the checkpoint and writing the turn back
+            with memory_manager.thread_locks.hold(current_config["configurable"]["thread_id"]):
+                # Pick up medium-term summaries written in the background since the last turn
+                checkpoint_values = graph.get_state(current_config).values
+                for key in ("medium_term_summary", "context"):
+                    if key in checkpoint_values:
+                        current_state[key] = checkpoint_values[key]
+                
+                # Process through agent graph with session config
+                result = graph.invoke(current_state, config=current_config)
             
             # Update state with result
             current_state.update(result)
             
             # Update session activity
-            session_manager.update_activity([])
+            session_manager.update_activity([], message_count=len(current_state["messages"]))
             
             # Update session metadata in state from session manager
             current_session = session_manager.get_current_session()
@@ -486,7 +638,9 @@ def run_chatbot():
                 
                 # Response type indicators
                 cache_indicator = ""
-                if rag_context:
+                if rag_context == "qa_cache_hit":
+                    cache_indicator = "⚡ "  # Served from Q&A cache
+                elif rag_context:
                     cache_indicator = "🔍 "  # RAG used
                 
                 # Add memory indicator if medium-term memory is being used
@@ -5,5 +5,6 @@ Handles short-term and medium-term memory for the Crowd Due Dill AI Agent.
 """
 
 from .memory_manager import MemoryManager
+from .summary_worker import SummaryWorker, ThreadLocks
 
-__all__ = ["MemoryManager"] 
\ No newline at end of file
+__all__ = ["MemoryManager", "SummaryWorker", "ThreadLocks"] 
\ No newline at end of file
@@ -8,19 +8,45 @@ Extracted from main.py to keep the main file focused on orchestration.
 import asyncio
 import time
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from langchain_core.messages import HumanMessage, AIMessage
 from utils.logger import logger
+from .summary_worker import SummaryWorker, ThreadLocks
+
+# Tokens reserved for the summary instructions around the transcript
+SUMMARY_PROMPT_OVERHEAD_TOKENS = 250
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken (cl100k_base), falling back to ~4 characters per token."""
+    global _encoding
+    if not text:
+        return 0
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
 
 
 class MemoryManager:
     """Manages short-term and medium-term memory for conversations."""
     
-    def __init__(self, llm, stats_collector=None):
+    def __init__(self, llm, stats_collector=None, background_summaries: bool = True):
         self.llm = llm
         self.stats_collector = stats_collector
         # Thread pool for parallel summarization (keeping your original approach)
         self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory_")
+        # Background worker so summary LLM calls stay out of the turn latency;
+        # turns hold thread_locks so summary writes cannot interleave with them
+        self.thread_locks = ThreadLocks()
+        self.summary_worker = SummaryWorker(max_workers=2, locks=self.thread_locks) if background_summaries else None
         
         # Memory toggle flags - can be changed at runtime
         self.short_term_enabled = True
@@ -28,6 +54,11 @@ class MemoryManager:
         
         # Centralized short-term memory configuration
         self.short_term_message_count = 20  # Single source of truth for short-term memory size
+        
+        # Incremental summary configuration
+        self.summary_update_interval = 15  # Unsummarized messages (outside short-term) before an update
+        self.summary_prompt_token_budget = 3000  # Cap on summary prompt size
+        self.summary_message_token_limit = 400  # Long messages are truncated to this many tokens
     
     def enable_short_term(self, user_triggered: bool = True) -> bool:
         """Enable short-term memory."""
@@ -80,184 +111,299 @@ class MemoryManager:
             "medium_term": self.medium_term_enabled
         }
 
+    def _summary_window(self) -> int:
+        """Number of most recent messages kept verbatim and therefore not summarized."""
+        return self.short_term_message_count if self.short_term_enabled else 0
+
+    def get_unsummarized_messages(self, messages: list, context: Dict[str, Any]) -> list:
+        """
+        Get messages that have left the short-term window but are not yet in the summary.
+        
+        The watermark is the ID of the last summarized message; sessions without
+        message IDs (temporary sessions, older checkpoints) fall back to the count.
+        """
+        window = self._summary_window()
+        eligible = messages[:-window] if window else list(messages)
+        
+        watermark_id = context.get("summary_watermark_id")
+        if watermark_id:
+            for index in range(len(eligible) - 1, -1, -1):
+                if getattr(eligible[index], "id", None) == watermark_id:
+                    return eligible[index + 1:]
+        
+        summarized_count = context.get("summarized_message_count")
+        if summarized_count is None:
+            summarized_count = self._legacy_summarized_count(context.get("last_summary_message_count", 0))
+        return eligible[summarized_count:] if summarized_count <= len(eligible) else []
+
+    def _legacy_summarized_count(self, message_count: int) -> int:
+        """
+        Convert an older checkpoint's last_summary_message_count to messages summarized.
+        
+        It held the total message count at summary time, and everything but the
+        last short_term_message_count messages had been summarized.
+        """
+        if message_count > self.short_term_message_count:
+            return message_count - self.short_term_message_count
+        return message_count
+
     def should_create_summary(self, state: Dict[str, Any]) -> bool:
         """Determine if we should create/update medium-term summary."""
         messages = state.get("messages", [])
-        context = state.get("context", {})
-        message_count = len(messages)
-        
-        # Check if we need initial summary creation (start from 1st message for testing)
-        if not state.get("medium_term_summary") and message_count >= 1:
-            logger.debug_memory_check(message_count, True, "initial summary needed")
-            return True
+        pending = self.get_unsummarized_messages(messages, state.get("context", {}))
         
-        # Check if we need to update existing summary (every 10 messages)
-        last_summary_count = context.get("last_summary_message_count", 0)
-        current_count = len(messages)
-        
-        should_update = current_count - last_summary_count >= 15
-        reason = f"update needed ({current_count - last_summary_count} messages since last)" if should_update else f"too soon ({current_count - last_summary_count} messages since last)"
-        logger.debug_memory_check(message_count, should_update, reason)
+        # Summarize once enough messages have dropped out of the short-term window
+        should_update = len(pending) >= self.summary_update_interval
+        reason = f"update needed ({len(pending)} unsummarized messages)" if should_update else f"too soon ({len(pending)} unsummarized messages)"
+        logger.debug_memory_check(len(messages), should_update, reason)
         
         return should_update
 
-    async def create_medium_term_summary_async(self, messages: list, existing_summary: str = None) -> str:
-        """Create or update medium-term summary including both user and agent messages."""
-        try:
-            # Include both user and agent messages to track full conversation flow
-            if not messages:
-                return existing_summary or ""
-            
-            # Format conversation messages for summarization
-            conversation_text = []
-            user_message_count = 0
-            agent_message_count = 0
-            
-            for msg in messages:
-                if isinstance(msg, HumanMessage):
-                    conversation_text.append(f"User: {msg.content}")
-                    user_message_count += 1
-                elif isinstance(msg, AIMessage):
-                    conversation_text.append(f"Assistant: {msg.content}")
-                    agent_message_count += 1
-            
-            logger.debug_memory_filtering(len(messages), user_message_count + agent_message_count)
+    def _format_for_summary(self, messages: list, existing_summary: str = None) -> Tuple[List[str], int]:
+        """
+        Format messages oldest-first as transcript lines that fit the prompt token budget.
+        
+        Returns the lines and how many messages they cover; messages past the
+        budget are left for the next summary pass.
+        """
+        budget = self.summary_prompt_token_budget - SUMMARY_PROMPT_OVERHEAD_TOKENS - count_tokens(existing_summary or "")
+        
+        lines = []
+        used_tokens = 0
+        included = 0
+        for msg in messages:
+            if isinstance(msg, HumanMessage):
+                line = f"User: {msg.content}"
+            elif isinstance(msg, AIMessage):
+                line = f"Assistant: {msg.content}"
+            else:
+                included += 1
+                continue
             
-            if not conversation_text:
-                return existing_summary or ""
+            line_tokens = count_tokens(line)
+            # Long answers (e.g. quoted articles) are cut to their opening part;
+            # the oldest message is always kept, cut to the budget if necessary
+            limit = self.summary_message_token_limit if lines else min(self.summary_message_token_limit, budget)
+            if line_tokens > limit > 0:
+                line = line[:len(line) * limit // line_tokens] + " [...]"
+                line_tokens = limit
             
-            # Build summary prompt
-            if existing_summary:
-                # For updates, focus on recent conversation (last 5 exchanges)
-                recent_conversation = conversation_text[-10:]  # Last 10 messages (5 exchanges)
-                prompt = f"""Update the existing medium-term memory summary by integrating new conversation content.
+            if used_tokens + line_tokens > budget:
+                logger.debug(f"Summary prompt budget reached: {len(lines)} of {len(messages)} messages included")
+                break
+            lines.append(line)
+            used_tokens += line_tokens
+            included += 1
+        
+        return lines, included
+
+    def _summarize(self, messages: list, existing_summary: str = None) -> Tuple[str, Dict[str, int], int]:
+        """
+        Fold messages into the existing summary.
+        
+        Returns (summary, token usage, messages folded in); only the oldest
+        messages that fit the prompt budget are folded in.
+        """
+        if not messages:
+            return existing_summary or "", {}, 0
+        
+        conversation_text, included = self._format_for_summary(messages, existing_summary)
+        logger.debug_memory_filtering(len(messages), len(conversation_text))
+        
+        if not conversation_text:
+            return existing_summary or "", {}, included
+        
+        # Build summary prompt
+        if existing_summary:
+            prompt = f"""Update the existing medium-term memory summary by integrating new conversation content.
 
 Previous Summary:
 {existing_summary}
 
-Recent Conversation:
-{chr(10).join(recent_conversation)}
+New Conversation:
+{chr(10).join(conversation_text)}
 
 Create an evolved summary that:
 1. Integrates new insights from both user and assistant exchanges
-        2. Updates user's journey, interests, and current regulatory understanding
-        3. Tracks what guidance/information was already provided to avoid repetition
+2. Updates user's journey, interests, and current regulatory understanding
+3. Tracks what guidance/information was already provided to avoid repetition
 4. Notes recurring themes and patterns in the conversation
 5. Maintains essential context while staying concise
 
 Format: Key Insights & User Journey | Information Already Provided | Current Interests & Patterns
 Target: 500-800 tokens."""
-            else:
-                # For initial summary - be more concise for minimal conversations
-                prompt = f"""Create a concise medium-term memory summary from this conversation.
+        else:
+            prompt = f"""Create a concise medium-term memory summary from this conversation.
 
 Conversation:
 {chr(10).join(conversation_text)}
 
-IMPORTANT: If this is just a greeting or minimal interaction, create a brief summary noting:
-- Basic interaction type (greeting, question, etc.)
-- Any interests or topics mentioned
-- Current conversation status
-
 Only include substantial content if it exists. Do NOT explain limitations or create templates.
 
 Format with sections only if there's substantial content:
 - Key Insights: (only if meaningful insights exist)
-        - Information Provided: (only if regulatory guidance was given)  
+- Information Provided: (only if regulatory guidance was given)
 - Current Focus: (only if clear interests emerged)
 
 Keep concise - aim for 100-300 words maximum."""
 
-            # Use summarization model for efficiency
-            response = await asyncio.get_event_loop().run_in_executor(
-                self.executor, 
-                lambda: self.llm.invoke([HumanMessage(content=prompt)])
-            )
-            
-            return response.content.strip()
-            
+        response = self.llm.invoke([HumanMessage(content=prompt)])
+        summary = response.content.strip()
+        
+        # Prefer provider-reported usage, fall back to local token counts
+        usage_metadata = getattr(response, "usage_metadata", None) or {}
+        usage = {
+            "prompt_tokens": usage_metadata.get("input_tokens") or count_tokens(prompt),
+            "completion_tokens": usage_metadata.get("output_tokens") or count_tokens(summary)
+        }
+        return summary, usage, included
+
+    def create_medium_term_summary(self, messages: list, existing_summary: str = None) -> str:
+        """Create or update medium-term summary including both user and agent messages."""
+        try:
+            summary, _, _ = self._summarize(messages, existing_summary)
+            return summary
         except Exception as e:
             logger.error(f"Summary creation error: {e}")
             return existing_summary or ""
 
-    def _create_summary_sync(self, messages: list, existing_summary: str = None) -> str:
-        """Helper method to create summary in a separate thread with its own event loop."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(
-                self.create_medium_term_summary_async(messages, existing_summary)
-            )
-        finally:
-            loop.close()
-
-    def update_medium_term_memory(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Update medium-term memory if needed - runs after response."""
-        # Check if medium-term memory is enabled
-        if not self.medium_term_enabled:
-            logger.debug_memory_disabled("medium-term", "summary creation")
-            return {}
-            
-        if not self.should_create_summary(state):
+    async def create_medium_term_summary_async(self, messages: list, existing_summary: str = None) -> str:
+        """Async wrapper running summary creation on the memory thread pool."""
+        return await asyncio.get_event_loop().run_in_executor(
+            self.executor,
+            lambda: self.create_medium_term_summary(messages, existing_summary)
+        )
+
+    def build_summary_update(self, messages: list, existing_summary: str = None,
+                             context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Summarize the unsummarized delta.
+        
+        Returns the medium_term_summary, the context keys to set and this pass's
+        summary_cost counters; apply them with merge_summary_update.
+        """
+        context = dict(context or {})
+        pending = self.get_unsummarized_messages(messages, context)
+        if not pending:
             return {}
         
+        message_count = len(messages)
+        logger.debug_memory_update_start(message_count, bool(existing_summary))
+        start_time = time.time()
+        
         try:
-            messages = state.get("messages", [])
-            existing_summary = state.get("medium_term_summary")
-            message_count = len(messages)
-            
-            logger.debug_memory_update_start(message_count, bool(existing_summary))
-            start_time = time.time()
-            
-            # Get messages that need to be summarized (beyond short-term window)
-            messages_to_summarize = messages[:-self.short_term_message_count] if len(messages) > self.short_term_message_count else messages
-            
-            # Create summary - handle both sync and async contexts
-            try:
-                # Check if we're already in an async context (like FastAPI)
-                current_loop = asyncio.get_running_loop()
-                # If we're in an async context, we need to run in a thread to avoid conflicts
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(self._create_summary_sync, messages_to_summarize, existing_summary)
-                    new_summary = future.result(timeout=30)
-            except RuntimeError:
-                # No running loop, we can create our own
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    new_summary = loop.run_until_complete(
-                        self.create_medium_term_summary_async(messages_to_summarize, existing_summary)
-                    )
-                finally:
-                    loop.close()
+            new_summary, usage, included = self._summarize(pending, existing_summary)
+            if not included:
+                return {}
             
             duration = time.time() - start_time
             summary_length = len(new_summary) if new_summary else 0
             
-            # Update context tracking
-            context = state.get("context", {})
-            context["last_summary_message_count"] = len(messages)
+            # Advance the watermark past the messages actually folded in;
+            # anything cut by the prompt budget is picked up by the next pass
+            summarized = max(len(messages) - self._summary_window(), 0) - len(pending) + included
+            context["summary_watermark_id"] = getattr(pending[included - 1], "id", None)
+            context["summarized_message_count"] = summarized
+            context.pop("last_summary_message_count", None)
             context["last_summary_update"] = "success"
             
+            # Cost of this pass; added to the session's counters when the update is merged
+            context.pop("summary_cost", None)
+            cost = {
+                "calls": 1,
+                "messages_summarized": included,
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0)
+            }
+            
             # Log completion and record stats
             logger.debug_memory_update_complete(True, summary_length, duration)
             logger.memory_summary_created(message_count, summary_length)
             
             if self.stats_collector:
-                self.stats_collector.record_memory_summary_creation(duration, summary_length)
+                self.stats_collector.record_memory_summary_creation(
+                    duration, summary_length,
+                    prompt_tokens=usage.get("prompt_tokens", 0),
+                    completion_tokens=usage.get("completion_tokens", 0)
+                )
             
             return {
                 "medium_term_summary": new_summary,
-                "context": context
+                "context": context,
+                "summary_cost": cost
             }
             
         except Exception as e:
-            duration = time.time() - start_time if 'start_time' in locals() else 0
-            logger.debug_memory_update_complete(False, 0, duration)
+            logger.debug_memory_update_complete(False, 0, time.time() - start_time)
             logger.error(f"Medium-term memory update error: {e}")
             return {}
 
+    @staticmethod
+    def merge_summary_update(state: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply a build_summary_update result to a session state.
+        
+        Returns the medium_term_summary/context state update: the context keys
+        are set and the pass's cost is added to the stored summary_cost, so a
+        write never drops counters recorded since the job read the state.
+        """
+        context = {**(state.get("context") or {}), **updates["context"]}
+        cost = dict(context.get("summary_cost") or {})
+        for key, value in updates.get("summary_cost", {}).items():
+            cost[key] = cost.get(key, 0) + value
+        context["summary_cost"] = cost
+        return {
+            "medium_term_summary": updates["medium_term_summary"],
+            "context": context
+        }
+
+    def update_medium_term_memory(self, state: Dict[str, Any], thread_id: Optional[str] = None,
+                                  writer: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                                  reader: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+        """
+        Update medium-term memory if needed - runs after response.
+        
+        With a thread_id and writer the summary is produced by the background
+        worker and written through writer(thread_id, updates), which applies it
+        with merge_summary_update; the turn returns immediately with no state
+        updates. With a reader the job starts from reader(thread_id), read under
+        the thread's turn lock, rather than from this turn's state: a job for the
+        same thread that finished in between has moved the watermark.
+        Otherwise the summary is created inline.
+        """
+        # Check if medium-term memory is enabled
+        if not self.medium_term_enabled:
+            logger.debug_memory_disabled("medium-term", "summary creation")
+            return {}
+            
+        if not self.should_create_summary(state):
+            return {}
+        
+        # Snapshot the state so later turns cannot change what gets summarized
+        messages = list(state.get("messages", []))
+        existing_summary = state.get("medium_term_summary")
+        context = dict(state.get("context", {}))
+        
+        if self.summary_worker and thread_id and writer:
+            def job():
+                if not reader:
+                    return self.build_summary_update(messages, existing_summary, context)
+                with self.thread_locks.hold(thread_id):
+                    stored = reader(thread_id)
+                    if not stored:
+                        return {}
+                    stored_messages = list(stored.get("messages", []))
+                    stored_summary = stored.get("medium_term_summary")
+                    stored_context = dict(stored.get("context") or {})
+                return self.build_summary_update(stored_messages, stored_summary, stored_context)
+            
+            coalesced = self.summary_worker.submit(thread_id, job, writer)
+            logger.debug(f"Medium-term summary scheduled for {thread_id[:8]} ({'coalesced' if coalesced else 'queued'})")
+            return {}
+        
+        updates = self.build_summary_update(messages, existing_summary, context)
+        return self.merge_summary_update(state, updates) if updates else {}
+
     def get_short_term_messages(self, state: Dict[str, Any]) -> List:
         """Get short-term messages using simple message count (centralized method)."""
         messages = state.get("messages", [])
@@ -326,13 +472,27 @@ Keep concise - aim for 100-300 words maximum."""
             print(f"🧠 Medium-term Summary ({len(medium_term)} chars):")
             print(f"{medium_term[:200]}...")
         else:
-            print("🧠 Medium-term Memory: Not yet created (need 1+ messages)")
+            print(f"🧠 Medium-term Memory: Not yet created (after {self.summary_update_interval} messages leave short-term memory)")
         
         # Show short-term memory status
         messages = state.get("messages", [])
         short_term_count = min(self.short_term_message_count, len(messages))
         print(f"💭 Short-term Memory: {short_term_count} messages")
         print(f"📊 Total Messages: {len(messages)}")
+        
+        cost = self.get_summary_cost(state)
+        if cost["calls"]:
+            print(f"💰 Summary Cost: {cost['calls']} calls, {cost['prompt_tokens']} prompt + {cost['completion_tokens']} completion tokens")
+
+    def get_summary_cost(self, state: Dict[str, Any]) -> Dict[str, int]:
+        """Get summarisation cost counters for a session."""
+        cost = state.get("context", {}).get("summary_cost", {})
+        return {
+            "calls": cost.get("calls", 0),
+            "messages_summarized": cost.get("messages_summarized", 0),
+            "prompt_tokens": cost.get("prompt_tokens", 0),
+            "completion_tokens": cost.get("completion_tokens", 0)
+        }
 
     def build_memory_context(self, state: Dict[str, Any]) -> str:
         """Build memory context from short-term and medium-term memory."""
@@ -375,7 +535,9 @@ Keep concise - aim for 100-300 words maximum."""
 
     def get_memory_stats(self) -> Dict[str, Any]:
         """Get memory system statistics."""
-        memory_status = "Active" if self.executor._threads else "Idle"
+        worker_stats = self.summary_worker.get_stats() if self.summary_worker else {}
+        busy = worker_stats.get('queued', 0) or worker_stats.get('running', 0)
+        memory_status = "Active" if busy or self.executor._threads else "Idle"
         
         # Add toggle status
         status_parts = [memory_status]
@@ -387,7 +549,8 @@ Keep concise - aim for 100-300 words maximum."""
         return {
             "status": " ".join(status_parts),
             "description": "Background summarization",
-            "toggles": self.get_memory_status()
+            "toggles": self.get_memory_status(),
+            "summary_worker": worker_stats
         }
 
     def clear_memories(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -420,5 +583,7 @@ Keep concise - aim for 100-300 words maximum."""
 
     def cleanup(self):
         """Cleanup resources."""
+        if getattr(self, 'summary_worker', None):
+            self.summary_worker.flush(timeout=30)
         if hasattr(self, 'executor'):
             self.executor.shutdown(wait=False) 
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+Summary Worker
+
+Background queue for medium-term memory summarisation.
+Keeps summary LLM calls out of the request path: jobs are keyed by
+conversation thread, and a newer job for a thread that is still waiting
+replaces the older one (coalescing), so a burst of turns produces one
+summary per thread. Summaries are written under the thread's turn lock so
+a write never interleaves with a turn that loaded the state before it.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from utils.logger import logger
+
+
+SummaryJob = Callable[[], Dict[str, Any]]
+SummaryWriter = Callable[[str, Dict[str, Any]], None]
+
+
+class ThreadLocks:
+    """
+    Per-conversation locks shared by the chat path and the summary writer.
+
+    A turn holds its thread's lock from loading the state until the turn is
+    persisted; the summary writer takes the same lock, so it either lands
+    before the turn reads the state or is merged into the state the turn wrote.
+    """
+
+    def __init__(self):
+        self._locks: Dict[str, list] = {}  # thread_id -> [lock, holders]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _hold(self, thread_id: str):
+        with self._lock:
+            entry = self._locks.setdefault(thread_id, [threading.RLock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[thread_id]
+
+    def hold(self, thread_id: Optional[str]):
+        """Context manager holding the lock of thread_id (no-op without a thread)."""
+        return self._hold(thread_id) if thread_id else nullcontext()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._locks)
+
+
+class SummaryWorker:
+    """Coalescing background worker that produces and writes memory summaries."""
+
+    def __init__(self, max_workers: int = 2, name: str = "summary", locks: Optional[ThreadLocks] = None):
+        self.name = name
+        self.locks = locks if locks is not None else ThreadLocks()
+        self._pending: Dict[str, Tuple[SummaryJob, SummaryWriter]] = {}
+        self._queue = deque()
+        self._running = set()
+        self._condition = threading.Condition()
+
+        # Performance tracking
+        self.stats = {
+            'scheduled': 0,
+            'coalesced': 0,
+            'completed': 0,
+            'failed': 0,
+            'total_time': 0.0
+        }
+
+        self._threads = [
+            threading.Thread(target=self._worker_loop, name=f"{name}_worker_{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, thread_id: str, job: SummaryJob, writer: SummaryWriter) -> bool:
+        """
+        Schedule a summary job for a conversation thread.
+
+        Args:
+            thread_id: Conversation thread the summary belongs to
+            job: Callable producing the state updates (runs on a worker thread)
+            writer: Callable persisting the updates for thread_id
+
+        Returns:
+            True if the job replaced a pending job for the same thread
+        """
+        with self._condition:
+            self.stats['scheduled'] += 1
+            coalesced = thread_id in self._pending
+            self._pending[thread_id] = (job, writer)
+
+            if coalesced:
+                self.stats['coalesced'] += 1
+            elif thread_id not in self._running:
+                self._queue.append(thread_id)
+                self._condition.notify()
+            # A running thread is re-queued when its current job finishes
+
+        return coalesced
+
+    def _next_job(self) -> Tuple[str, SummaryJob, SummaryWriter]:
+        """Block until a thread with a pending job can run."""
+        with self._condition:
+            while not self._queue:
+                self._condition.wait()
+            thread_id = self._queue.popleft()
+            job, writer = self._pending.pop(thread_id)
+            self._running.add(thread_id)
+            return thread_id, job, writer
+
+    def _worker_loop(self):
+        """Run queued summary jobs one thread at a time."""
+        while True:
+            thread_id, job, writer = self._next_job()
+            start_time = time.time()
+            try:
+                updates = job()
+                if updates:
+                    with self.locks.hold(thread_id):
+                        writer(thread_id, updates)
+                self.stats['completed'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error(f"Background summary error for {thread_id[:8]}: {e}")
+            finally:
+                self.stats['total_time'] += time.time() - start_time
+                with self._condition:
+                    self._running.discard(thread_id)
+                    if thread_id in self._pending:
+                        self._queue.append(thread_id)
+                    self._condition.notify_all()
+
+    def is_pending(self, thread_id: str) -> bool:
+        """Check whether a summary is queued or running for a thread."""
+        with self._condition:
+            return thread_id in self._pending or thread_id in self._running
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all queued and running jobs finish; returns False on timeout."""
+        deadline = time.time() + timeout if timeout is not None else None
+        with self._condition:
+            while self._pending or self._running:
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker statistics."""
+        with self._condition:
+            stats = self.stats.copy()
+            stats['queued'] = len(self._pending)
+            stats['running'] = len(self._running)
+        stats['avg_time'] = stats['total_time'] / stats['completed'] if stats['completed'] else 0.0
+        return stats
@@ -18,6 +18,7 @@ Features:
 
 import re
 import time
+import hashlib
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from pydantic import BaseModel, Field
@@ -118,9 +119,17 @@ class LegalMetadataExtractor:
     Simple, straightforward implementation focused on EU regulatory documents.
     """
     
-    def __init__(self, config: Optional[ExtractionConfig] = None):
+    # Bump whenever the chunk extraction prompt or schema changes (invalidates cached results)
+    PROMPT_VERSION = "chunk-v1"
+    CACHE_TASK = "metadata_extraction"
+    
+    def __init__(self, config: Optional[ExtractionConfig] = None, result_cache=None, rate_limiter=None):
         self.config = config or ExtractionConfig()
         self.metadata_manager = MetadataManager()
+        # Optional persistent cache (src.cache.llm_result_cache.LLMResultCache)
+        self.result_cache = result_cache
+        # Optional quota/concurrency limiter (src.core.ingestion_scheduler.ProviderLimiter)
+        self.rate_limiter = rate_limiter
         self._setup_client()
     
     def _setup_client(self):
@@ -145,6 +154,15 @@ class LegalMetadataExtractor:
             Dictionary containing extracted legal metadata
         """
         
+        chunk_hash = hashlib.sha256(chunk_content.encode('utf-8')).hexdigest()
+        cache_context = f"{document_title}\x00{domain}"
+        if self.result_cache is not None:
+            cached = self.result_cache.get(
+                self.CACHE_TASK, self.PROMPT_VERSION, self.config.model_name, chunk_hash, cache_context
+            )
+            if cached is not None:
+                return cached
+        
         system_prompt = """You are a legal document analysis expert specializing in EU regulations.
 
 Extract structured metadata from legal document chunks with high accuracy.
@@ -177,13 +195,15 @@ Chunk Content:
 
 Extract the structured legal metadata from this chunk."""
         
+        prompt = system_prompt + "\n\n" + user_prompt
         for attempt in range(self.config.retry_attempts):
             try:
-                response = self.client.models.generate_content(
+                response = self._generate(
+                    prompt,
                     model=self.config.model_name,
                     contents=[
                         types.Content(role='user', parts=[
-                            types.Part.from_text(text=system_prompt + "\n\n" + user_prompt)
+                            types.Part.from_text(text=prompt)
                         ])
                     ],
                     config=types.GenerateContentConfig(
@@ -214,6 +234,13 @@ Extract the structured legal metadata from this chunk."""
                 # Apply post-processing validation
                 validated_data = self._validate_extraction(extracted_data, chunk_content)
                 
+                # Only model results are cached - rule-based fallbacks are retried next run
+                if self.result_cache is not None:
+                    self.result_cache.put(
+                        self.CACHE_TASK, self.PROMPT_VERSION, self.config.model_name,
+                        chunk_hash, validated_data, cache_context
+                    )
+                
                 return validated_data
                 
             except Exception as e:
@@ -224,6 +251,15 @@ Extract the structured legal metadata from this chunk."""
                     print(f"❌ Final extraction attempt failed: {e}")
                     return self._create_fallback_metadata(chunk_content)
     
+    def _generate(self, prompt: str, **request):
+        """Call generate_content, through the rate limiter when one is configured."""
+        if self.rate_limiter is None:
+            return self.client.models.generate_content(**request)
+        # ~4 characters per token for the prompt, plus room for the JSON response
+        return self.rate_limiter.call(
+            self.client.models.generate_content, tokens=len(prompt) // 4 + 256, **request
+        )
+    
     def extract_document_metadata(self, document_header: str) -> Dict[str, Any]:
         """
         Extract document-level metadata from document header.
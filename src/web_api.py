@@ -6,9 +6,11 @@ FastAPI-based web interface for the crowdfunding regulatory guidance system.
 Provides REST endpoints for chat, session management, and premium features.
 """
 
+import json
 import logging
 import os
 import sys
+import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
@@ -16,7 +18,7 @@ import uvicorn
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from langchain_core.messages import AIMessage, HumanMessage
 from pydantic import BaseModel
@@ -45,6 +47,8 @@ from src.core import (
     user_sync_service,
     auth0_management,
 )
+from src.core.chat_executor import BoundedChatExecutor, ChatCapacityError
+from src.core.temporary_session_store import create_temporary_session_store
 from src.utils.logger import logger
 
 # Import monitoring system (optional for separate monitoring deployment)
@@ -82,6 +86,10 @@ except ImportError:
             pass
         def update_session_count(self, **kwargs):
             pass
+        def track_executor_state(self, **kwargs):
+            pass
+        def track_temporary_sessions(self, **kwargs):
+            pass
     
     def setup_monitoring(app):
         """Mock monitoring setup when using separate monitoring container"""
@@ -108,9 +116,6 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 web_logger = logging.getLogger("crowdfunding_web_api")
 
-# In-memory store for temporary sessions (anonymous users)
-temporary_sessions = {}
-
 # Initialize FastAPI app
 app = FastAPI(
     title="Crowdfunding Due Diligence API",
@@ -123,6 +128,27 @@ app = FastAPI(
 # Set up monitoring (Prometheus metrics)
 monitoring = setup_monitoring(app)
 
+# Bounded executor for the blocking chat pipeline (keeps the event loop free)
+chat_executor = BoundedChatExecutor(
+    max_concurrency=int(os.getenv("CHAT_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("CHAT_MAX_QUEUE", "64")),
+    name="chat",
+    metrics_callback=monitoring.track_executor_state
+)
+
+# Bounded store for temporary sessions (anonymous users); use the sqlite
+# backend when running several workers so they share anonymous sessions
+temporary_sessions = create_temporary_session_store(
+    os.getenv("TEMP_SESSION_BACKEND", "memory"),
+    db_path=os.getenv("TEMP_SESSION_DB", "data/sessions/temporary_sessions.db"),
+    max_sessions=int(os.getenv("TEMP_SESSION_MAX", "1000")),
+    ttl_seconds=int(os.getenv("TEMP_SESSION_TTL_SECONDS", "3600")),
+    max_memory_mb=int(os.getenv("TEMP_SESSION_MAX_MEMORY_MB", "128")),
+    max_messages_per_session=int(os.getenv("TEMP_SESSION_MAX_MESSAGES", "100")),
+    spill_dir=os.getenv("TEMP_SESSION_SPILL_DIR") or None,
+    metrics_callback=monitoring.track_temporary_sessions
+)
+
 # Configure CORS for web frontend access
 origins = [
     "http://localhost:3000",  # React dev server
@@ -298,10 +324,11 @@ def get_or_create_session(session_id: Optional[str] = None, user: Optional[Auth0
     if session_id:
         # Special handling for temporary sessions
         if session_id.startswith("temp_"):
-            # Check if we have this temporary session in memory
-            if session_id in temporary_sessions:
-                temp_session = temporary_sessions[session_id]
+            # One lookup: the shared backend reads (and unpickles) the row on every get
+            temp_session = temporary_sessions.get(session_id)
+            if temp_session is not None:
                 temp_session["session_metadata"]["last_activity"] = datetime.now().isoformat()
+                temporary_sessions[session_id] = temp_session
                 return session_id, {
                     "state": temp_session,
                     "config": {"configurable": {"thread_id": session_id}},
@@ -329,9 +356,8 @@ def get_or_create_session(session_id: Optional[str] = None, user: Optional[Auth0
                 }
         
         # Try to load existing session (for persistent sessions)
-        session_info = session_manager.load_session(session_id)
+        session_info = session_manager.load_session(session_id, set_current=False)
         if session_info:
-            session_manager.current_thread_id = session_id
             return session_id, {
                 "state": session_info["state"],
                 "config": session_info["config"],
@@ -348,7 +374,7 @@ def get_or_create_session(session_id: Optional[str] = None, user: Optional[Auth0
                 original_session_id = session_id[len(user_prefix):]
                 
                 # Try to load original session
-                original_session_info = session_manager.load_session(original_session_id)
+                original_session_info = session_manager.load_session(original_session_id, set_current=False)
                 if original_session_info:
                     # Check if this session has already been migrated to prevent repeated migrations
                     original_metadata = original_session_info["state"].get("session_metadata", {})
@@ -363,8 +389,6 @@ def get_or_create_session(session_id: Optional[str] = None, user: Optional[Auth0
                     graph.update_state(config, original_session_info["state"])
                     
                     # CRITICAL: Ensure the migrated session is properly persisted
-                    session_manager.current_thread_id = session_id
-                    
                     # Force a checkpoint save by updating the state again with metadata
                     updated_metadata = original_session_info["state"].get("session_metadata", {})
                     updated_metadata["migrated_from"] = original_session_id
@@ -373,6 +397,10 @@ def get_or_create_session(session_id: Optional[str] = None, user: Optional[Auth0
                     
                     # Update the state with migration metadata to ensure persistence
                     graph.update_state(config, {"session_metadata": updated_metadata})
+                    session_manager.register_session(
+                        session_id, updated_metadata,
+                        message_count=len(original_session_info["state"].get("messages", []))
+                    )
                     
                     # Mark original session as migrated and archive it
                     try:
@@ -404,7 +432,7 @@ def get_or_create_session(session_id: Optional[str] = None, user: Optional[Auth0
     if user:
         # For authenticated users, create session with user prefix
         user_prefix = f"user_{user.sub.replace('|', '_')}_"
-        base_session_info = session_manager.create_session()
+        base_session_info = session_manager.create_session(set_current=False)
         base_session_id = base_session_info["thread_id"]
         new_session_id = f"{user_prefix}{base_session_id}"
         
@@ -412,7 +440,7 @@ def get_or_create_session(session_id: Optional[str] = None, user: Optional[Auth0
         config = {"configurable": {"thread_id": new_session_id}}
         graph, _ = get_graph_and_session_manager()
         graph.update_state(config, base_session_info["state"])
-        session_manager.current_thread_id = new_session_id
+        session_manager.register_session(new_session_id, base_session_info["state"])
         
         return new_session_id, {
             "state": base_session_info["state"],
@@ -424,7 +452,6 @@ def get_or_create_session(session_id: Optional[str] = None, user: Optional[Auth0
     else:
         # For anonymous users, create temporary session (not persisted)
         # Generate a temporary session ID for this conversation
-        import uuid
         temp_session_id = f"temp_{uuid.uuid4().hex[:8]}"
         
         # Create minimal session state for temporary use
@@ -445,11 +472,75 @@ def get_or_create_session(session_id: Optional[str] = None, user: Optional[Auth0
             "message_count": 0
         }
 
-def update_session_activity(session_id: str):
-    """Update session activity timestamp."""
+def load_chat_session(session_id: Optional[str], user: Optional[Auth0User]) -> tuple[str, Dict[str, Any]]:
+    """get_or_create_session under the conversation's turn lock (it may write the session back)."""
+    with memory_manager.thread_locks.hold(session_id):
+        return get_or_create_session(session_id, user)
+
+def resolve_chat_session_id(session_id: Optional[str], user: Optional[Auth0User]) -> Optional[str]:
+    """Apply the user-specific prefix to a requested session ID (authenticated users only)."""
+    if not user or not session_id:
+        return session_id
+    
+    # Check if session ID is already prefixed to prevent double-prefixing
+    user_prefix = f"user_{user.sub.replace('|', '_')}_"
+    if session_id.startswith(user_prefix):
+        return session_id
+    return f"{user_prefix}{session_id}"
+
+def build_temporary_turn_state(current_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Create the per-turn state used to process temporary (anonymous) sessions without the graph."""
+    return {
+        "messages": current_state["messages"],
+        "session_metadata": current_state.get("session_metadata", {}),
+        "message_type": None,
+        "should_use_rag": None,
+        "rag_context": None,
+        "medium_term_summary": current_state.get("medium_term_summary"),
+        "context": dict(current_state.get("context", {})),
+        "memory_settings": {},
+    }
+
+def write_temporary_summary(session_id: str, updates: Dict[str, Any]):
+    """Store a background medium-term summary in a temporary session (called under the thread's turn lock)."""
+    session_state = temporary_sessions.get(session_id)
+    if session_state is None:
+        return
+    session_state.update(memory_manager.merge_summary_update(session_state, updates))
+    temporary_sessions[session_id] = session_state
+
+def refresh_summary_state(session_id: str, current_state: Dict[str, Any], current_config: Dict[str, Any],
+                          is_temporary: bool):
+    """Copy the stored medium-term summary and context into a state loaded earlier in the request."""
+    if is_temporary:
+        stored = temporary_sessions.get(session_id) or {}
+    else:
+        graph, _ = get_graph_and_session_manager()
+        stored = graph.get_state(current_config).values
+    for key in ("medium_term_summary", "context"):
+        if key in stored:
+            current_state[key] = stored[key]
+
+def apply_temporary_turn(session_id: str, current_state: Dict[str, Any], response: Dict[str, Any]):
+    """Merge an agent response into a temporary session and store it."""
+    # The agent returns {"messages": [AIMessage(...)], ...}; append the AI message
+    # to the existing conversation instead of replacing it
+    if "messages" in response:
+        current_state["messages"].extend(response["messages"])
+        for key, value in response.items():
+            if key != "messages":
+                current_state[key] = value
+    else:
+        current_state.update(response)
+    
+    # Save the updated temporary session state back to memory store
+    temporary_sessions[session_id] = current_state
+
+def update_session_activity(session_id: str, message_count: Optional[int] = None):
+    """Update session activity timestamp and catalog message count."""
     try:
         _, session_manager = get_graph_and_session_manager()
-        session_manager.update_activity([])  # No domain tracking
+        session_manager.update_activity([], message_count=message_count, thread_id=session_id)  # No domain tracking
     except Exception as e:
         web_logger.error(f"Failed to update session activity: {e}")
 
@@ -567,7 +658,9 @@ async def health_check():
                 "rag_system": "operational",
                 "session_manager": "operational",
                 "auth0": auth0_status,
-                "active_domains": domain_status.get("active_domains", [])
+                "active_domains": domain_status.get("active_domains", []),
+                "chat_executor": chat_executor.get_stats(),
+                "temporary_sessions": temporary_sessions.get_stats()
             }
         }
     except Exception as e:
@@ -583,6 +676,96 @@ async def health_check():
         web_logger.error(f"Health check failed: {e}")
         raise HTTPException(status_code=503, detail="Service unhealthy")
 
+def process_chat_turn(session_id: Optional[str], message: str, user: Optional[Auth0User], user_type: str) -> ChatResponse:
+    """Blocking chat pipeline for one turn (runs on the bounded chat executor)."""
+    # Hold the conversation's turn lock from loading the state until the turn is
+    # stored, so a background summary write is never overwritten by this turn
+    with memory_manager.thread_locks.hold(session_id):
+        # Get or create session (with user migration support)
+        session_id, session_data = get_or_create_session(session_id, user)
+        current_state = session_data["state"]
+        current_config = session_data["config"]
+    
+        # Check if this is a temporary session (anonymous user)
+        is_temporary = session_id.startswith("temp_")
+    
+        web_logger.debug(f"Processing message for {'temporary' if is_temporary else 'persistent'} session {session_id[:8]}...")
+    
+        # Add user message to state
+        # Temporary sessions have no checkpointer to assign IDs; the summary watermark needs them
+        current_state["messages"].append(HumanMessage(content=message, id=uuid.uuid4().hex))
+    
+        # Import functions needed for both temporary and persistent sessions
+        from src.main import llm, check_qa_cache, classify_and_decide_rag, create_agent_response
+    
+        if is_temporary:
+            # For temporary sessions, process directly without database persistence
+            # Use a simple direct approach without graph/checkpointer
+        
+            # Create a simple state for processing
+            simple_state = build_temporary_turn_state(current_state)
+        
+            # Step 1: Serve repeated questions from the Q&A cache
+            response = check_qa_cache(simple_state)
+        
+            if response.get("rag_context") != "qa_cache_hit":
+                # Step 2: Classify the message
+                classification = classify_and_decide_rag(simple_state)
+                simple_state.update(classification)
+            
+                # Step 3: Create response based on classification
+                agent_type = "advisory" if simple_state.get("message_type") == "advisory" else "analytical"
+                response = create_agent_response(
+                    simple_state, agent_type,
+                    thread_id=session_id,
+                    summary_writer=write_temporary_summary,
+                    summary_reader=temporary_sessions.get
+                )
+        
+            # Update the temporary state, preserving conversation history
+            apply_temporary_turn(session_id, current_state, response)
+        else:
+            # For persistent sessions, use full graph processing with database
+            graph, _ = get_graph_and_session_manager()
+            result = graph.invoke(current_state, config=current_config)
+        
+            # Update state with result
+            current_state.update(result)
+        
+            # Update session activity for persistent sessions only
+            update_session_activity(session_id, message_count=len(current_state["messages"]))
+    
+    # Extract response information
+    if not current_state.get("messages"):
+        raise HTTPException(status_code=500, detail="No response generated")
+    
+    last_message = current_state["messages"][-1]
+    
+    # Determine response type and metadata
+    message_type = current_state.get("message_type")
+    rag_context = current_state.get("rag_context")
+    cache_hit = rag_context == "qa_cache_hit"
+    rag_used = bool(rag_context and rag_context != "no_rag")
+    
+    # Track business metrics
+    monitoring.track_chat_message(
+        user_type=user_type,
+        message_type="assistant",
+        cache_hit=cache_hit,
+        rag_used=rag_used
+    )
+    
+    response_content = last_message.content if hasattr(last_message, 'content') else str(last_message)
+    
+    return ChatResponse(
+        response=response_content,
+        session_id=session_id,
+        message_type=message_type,
+        rag_used=rag_used,
+        cache_hit=cache_hit,
+        timestamp=datetime.now()
+    )
+
 @app.post("/chat", response_model=ChatResponse, status_code=status.HTTP_200_OK)
 async def chat(request: ChatRequest, user: OptionalUser = None):
     """Main chat endpoint - POST only (supports optional authentication)"""
@@ -591,126 +774,23 @@ async def chat(request: ChatRequest, user: OptionalUser = None):
     # Track performance with monitoring context manager
     with monitoring.track_request_performance("/chat", user_type):
         try:
-            # Handle user-specific session management
-            if user:
-                # Authenticated user - use user-specific session path
-                base_session_id = request.session_id
-                if base_session_id:
-                    # Check if session ID is already prefixed to prevent double-prefixing
-                    user_prefix = f"user_{user.sub.replace('|', '_')}_"
-                    if base_session_id.startswith(user_prefix):
-                        # Already prefixed, use as-is
-                        session_id = base_session_id
-                    else:
-                        # Not prefixed, add prefix for isolation
-                        session_id = f"{user_prefix}{base_session_id}"
-                else:
-                    session_id = None
-            else:
-                # Anonymous user - use regular session management
-                session_id = request.session_id
-            
-            # Get or create session (with user migration support)
-            session_id, session_data = get_or_create_session(session_id, user)
-            current_state = session_data["state"]
-            current_config = session_data["config"]
-            
-            # Check if this is a temporary session (anonymous user)
-            is_temporary = session_id.startswith("temp_")
-            
             # Sync user data if authenticated
             if user:
                 await user_sync_service.sync_user(user)
             
-            web_logger.debug(f"Processing message for {'temporary' if is_temporary else 'persistent'} session {session_id[:8]}...")
-            
-            # Add user message to state
-            current_state["messages"].append(HumanMessage(content=request.message))
-            
-            # Import functions needed for both temporary and persistent sessions
-            from src.main import llm, classify_and_decide_rag, create_agent_response
-            
-            if is_temporary:
-                # For temporary sessions, process directly without database persistence
-                # Use a simple direct approach without graph/checkpointer
-                
-                # Create a simple state for processing
-                simple_state = {
-                    "messages": current_state["messages"],
-                    "session_metadata": current_state.get("session_metadata", {}),
-                    "message_type": None,
-                    "should_use_rag": None,
-                    "rag_context": None,
-                    "medium_term_summary": None,
-                    "context": {},
-                    "memory_settings": {},
-                }
-                
-                # Step 1: Classify the message
-                classification = classify_and_decide_rag(simple_state)
-                simple_state.update(classification)
-                
-                # Step 2: Create response based on classification
-                agent_type = "advisory" if simple_state.get("message_type") == "advisory" else "analytical"
-                response = create_agent_response(simple_state, agent_type)
-                
-                # Update the temporary state, but preserve conversation history
-                # The create_agent_response returns {"messages": [AIMessage(...)], ...}
-                # We need to add the AI message to existing messages, not replace them
-                if "messages" in response:
-                    # Add the AI response to the existing conversation
-                    current_state["messages"].extend(response["messages"])
-                    # Update other fields from response
-                    for key, value in response.items():
-                        if key != "messages":
-                            current_state[key] = value
-                else:
-                    current_state.update(response)
-                
-                # Save the updated temporary session state back to memory store
-                temporary_sessions[session_id] = current_state
-            else:
-                # For persistent sessions, use full graph processing with database
-                graph, _ = get_graph_and_session_manager()
-                result = graph.invoke(current_state, config=current_config)
-                
-                # Update state with result
-                current_state.update(result)
-                
-                # Update session activity for persistent sessions only
-                update_session_activity(session_id)
-            
-            # Extract response information
-            if current_state.get("messages") and len(current_state["messages"]) > 0:
-                last_message = current_state["messages"][-1]
-                
-                # Determine response type and metadata
-                message_type = current_state.get("message_type")
-                rag_context = current_state.get("rag_context")
-                cache_hit = rag_context == "qa_cache_hit"
-                rag_used = bool(rag_context and rag_context != "no_rag")
-                
-                # Track business metrics
-                monitoring.track_chat_message(
-                    user_type=user_type,
-                    message_type="assistant",
-                    cache_hit=cache_hit,
-                    rag_used=rag_used
-                )
-                
-                response_content = last_message.content if hasattr(last_message, 'content') else str(last_message)
-                
-                return ChatResponse(
-                    response=response_content,
-                    session_id=session_id,
-                    message_type=message_type,
-                    rag_used=rag_used,
-                    cache_hit=cache_hit,
-                    timestamp=datetime.now()
-                )
-            else:
-                raise HTTPException(status_code=500, detail="No response generated")
-                
+            # Run the blocking pipeline on the bounded executor so the event loop
+            # keeps serving other conversations and /health
+            return await chat_executor.run(
+                process_chat_turn,
+                resolve_chat_session_id(request.session_id, user),
+                request.message,
+                user,
+                user_type
+            )
+        
+        except ChatCapacityError as e:
+            web_logger.warning(f"Chat rejected: {e}")
+            raise HTTPException(status_code=503, detail="Server busy, please retry shortly")
         except Exception as e:
             # Track application error
             monitoring.track_application_error(
@@ -724,6 +804,161 @@ async def chat(request: ChatRequest, user: OptionalUser = None):
             web_logger.error(f"Chat processing error: {e}")
             raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
 
+def format_sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a server-sent event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def stream_chat_turn(session_id: str, current_state: Dict[str, Any], current_config: Dict[str, Any],
+                     is_temporary: bool, user_type: str):
+    """
+    Run the cache -> classifier -> RAG -> agent pipeline and yield SSE frames.
+    
+    Emits a 'metadata' event as soon as retrieval finishes, 'token' events while
+    the answer is generated, and a final 'done' event once the turn is persisted.
+    """
+    from src.main import (
+        llm, check_qa_cache, classify_and_decide_rag,
+        prepare_agent_turn, finalize_agent_turn
+    )
+    
+    try:
+        # Hold the conversation's turn lock until the turn is stored and pick up
+        # any background summary written since the state was loaded
+        with memory_manager.thread_locks.hold(current_config["configurable"]["thread_id"]):
+            refresh_summary_state(session_id, current_state, current_config, is_temporary)
+            
+            turn_state = build_temporary_turn_state(current_state) if is_temporary else current_state
+            human_message = turn_state["messages"][-1]
+        
+            # Step 1: Q&A cache (answer is sent as a single token event)
+            response = check_qa_cache(turn_state)
+            cache_hit = response.get("rag_context") == "qa_cache_hit"
+        
+            if cache_hit:
+                agent_node = "qa_cache"
+                message_type = response["message_type"]
+                yield format_sse_event("metadata", {
+                    "session_id": session_id,
+                    "message_type": message_type,
+                    "rag_used": True,
+                    "cache_hit": True,
+                    "retrieval": None
+                })
+                yield format_sse_event("token", {"content": response["messages"][0].content})
+            else:
+                # Step 2: Classify, Step 3: retrieve and build the prompt
+                turn_state.update(response)
+                classification = classify_and_decide_rag(turn_state)
+                turn_state.update(classification)
+            
+                agent_node = "advisory" if turn_state.get("message_type") == "advisory" else "analytical"
+                message_type = classification.get("message_type")
+                turn = prepare_agent_turn(turn_state, agent_node)
+            
+                yield format_sse_event("metadata", {
+                    "session_id": session_id,
+                    "message_type": message_type,
+                    "rag_used": turn["rag_result"]["type"] != "no_rag",
+                    "cache_hit": False,
+                    "retrieval": turn["rag_result"].get("metadata")
+                })
+            
+                # Step 4: Stream answer tokens as they are generated
+                reply_parts = []
+                for chunk in llm.stream(turn["conversation_messages"]):
+                    content = chunk.content if isinstance(chunk.content, str) else ""
+                    if content:
+                        reply_parts.append(content)
+                        yield format_sse_event("token", {"content": content})
+            
+                response = finalize_agent_turn(
+                    turn_state, agent_node, turn, "".join(reply_parts),
+                    thread_id=current_config["configurable"]["thread_id"],
+                    summary_writer=write_temporary_summary if is_temporary else None,
+                    summary_reader=temporary_sessions.get if is_temporary else None
+                )
+                response.update(classification)
+        
+            # Persist the completed turn
+            if is_temporary:
+                apply_temporary_turn(session_id, current_state, response)
+            else:
+                # Checkpoint the human message and final answer as if the agent node ran
+                graph, _ = get_graph_and_session_manager()
+                graph.update_state(
+                    current_config,
+                    {**response, "messages": [human_message] + response["messages"]},
+                    as_node=agent_node
+                )
+                update_session_activity(session_id, message_count=len(current_state["messages"]) + len(response["messages"]))
+        
+        rag_used = cache_hit or bool(response.get("rag_context"))
+        monitoring.track_chat_message(
+            user_type=user_type,
+            message_type="assistant",
+            cache_hit=cache_hit,
+            rag_used=rag_used
+        )
+        
+        yield format_sse_event("done", {
+            "session_id": session_id,
+            "message_type": message_type,
+            "rag_used": rag_used,
+            "cache_hit": cache_hit,
+            "timestamp": datetime.now()
+        })
+        
+    except Exception as e:
+        monitoring.track_application_error(
+            error_type="system",
+            component="chat_stream_endpoint",
+            error=e,
+            user_type=user_type,
+            endpoint="/chat/stream",
+            function="chat_stream"
+        )
+        web_logger.error(f"Chat stream error: {e}")
+        yield format_sse_event("error", {"detail": f"Error processing message: {str(e)}"})
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, user: OptionalUser = None):
+    """Streaming chat endpoint - server-sent events with answer tokens (supports optional authentication)"""
+    user_type = "authenticated" if user else "anonymous"
+    
+    session_id = resolve_chat_session_id(request.session_id, user)
+    try:
+        session_id, session_data = await chat_executor.run(load_chat_session, session_id, user)
+    except ChatCapacityError as e:
+        web_logger.warning(f"Chat stream rejected: {e}")
+        raise HTTPException(status_code=503, detail="Server busy, please retry shortly")
+    current_state = session_data["state"]
+    
+    if user:
+        await user_sync_service.sync_user(user)
+    
+    current_state["messages"].append(HumanMessage(content=request.message, id=uuid.uuid4().hex))
+    
+    # The blocking pipeline runs on the bounded chat executor for the whole stream,
+    # so streamed turns count against CHAT_MAX_CONCURRENCY and the queue bound
+    try:
+        frames = chat_executor.stream(
+            stream_chat_turn,
+            session_id,
+            current_state,
+            session_data["config"],
+            session_id.startswith("temp_"),
+            user_type
+        )
+    except ChatCapacityError as e:
+        web_logger.warning(f"Chat stream rejected: {e}")
+        raise HTTPException(status_code=503, detail="Server busy, please retry shortly")
+    
+    return StreamingResponse(
+        frames,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/status", response_model=SystemStatus)
 async def get_system_status():
     """Get current system status"""
@@ -801,10 +1036,10 @@ async def get_session_history(session_id: str, user: OptionalUser = None):
                 actual_session_id = f"{user_prefix}{session_id}"
             
             # Try to load user-specific session first
-            session_info = session_manager.load_session(actual_session_id)
+            session_info = session_manager.load_session(actual_session_id, set_current=False)
             if not session_info:
                 # Try loading without prefix (for backward compatibility)
-                session_info = session_manager.load_session(session_id)
+                session_info = session_manager.load_session(session_id, set_current=False)
                 if session_info:
                     # Check if this session belongs to this user or is anonymous
                     if session_id.startswith("user_") and not session_id.startswith(user_prefix):
@@ -817,13 +1052,14 @@ async def get_session_history(session_id: str, user: OptionalUser = None):
             
             # Check for temporary sessions first
             if session_id.startswith("temp_"):
-                if session_id not in temporary_sessions:
+                temp_state = temporary_sessions.get(session_id)
+                if temp_state is None:
                     raise HTTPException(status_code=404, detail="Temporary session not found or expired")
                 session_info = {
-                    "state": temporary_sessions[session_id]
+                    "state": temp_state
                 }
             else:
-                session_info = session_manager.load_session(session_id)
+                session_info = session_manager.load_session(session_id, set_current=False)
         
         if not session_info:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -959,10 +1195,10 @@ async def delete_session(session_id: str, user: OptionalUser = None):
                 actual_session_id = f"{user_prefix}{session_id}"
             
             # Verify session exists and belongs to user
-            session_info = session_manager.load_session(actual_session_id)
+            session_info = session_manager.load_session(actual_session_id, set_current=False)
             if not session_info:
                 # Try without prefix for backward compatibility
-                session_info = session_manager.load_session(session_id)
+                session_info = session_manager.load_session(session_id, set_current=False)
                 if session_info and session_id.startswith("user_") and not session_id.startswith(user_prefix):
                     raise HTTPException(status_code=403, detail="Access denied: Cannot delete another user's session")
                 actual_session_id = session_id
@@ -1151,9 +1387,10 @@ async def get_user_sessions(user: RequiredUser):
     try:
         _, session_manager = get_graph_and_session_manager()
         
-        # Filter sessions by user prefix
-        user_prefix = f"user_{user.sub.replace('|', '_')}_"
-        all_sessions = session_manager.list_sessions(limit=50)
+        # Indexed query on the session catalog for this user's sessions
+        user_key = user.sub.replace('|', '_')
+        user_prefix = f"user_{user_key}_"
+        all_sessions = session_manager.list_sessions(limit=50, user_id=user_key)
         
         user_sessions = []
         for session in all_sessions:
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the query parser.
+
+Parsing runs on every RAG query and on the fast routing path, so its cost
+must stay in the microsecond range. Run directly to print timings:
+
+    python tests/performance/test_query_parser_benchmark.py
+"""
+
+import unittest
+import sys
+import time
+from pathlib import Path
+
+# Add project root and src to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+from core.query_parser import QueryParser
+
+
+QUERIES = [
+    "What does Article 22 of the GDPR say about automated decisions?",
+    "DSA Article 15 transparency reporting obligations",
+    "Compare Articles 5-7 and 9 of DORA",
+    "Does Article 23(4)(b) of the ECSP regulation apply to our platform?",
+    "What is the maximum amount a crowdfunding offer can raise in twelve months?",
+    "paragraph 2 of Article 5 of the anti-money laundering regulation",
+]
+
+# Generous ceiling so the check holds on slow CI machines
+MAX_MICROSECONDS_PER_QUERY = 100.0
+
+
+def benchmark(parser: QueryParser, rounds: int = 2000) -> float:
+    """Return the mean parse time per query in microseconds."""
+    for query in QUERIES:
+        parser.parse(query)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in QUERIES:
+            parser.parse(query)
+    return (time.perf_counter() - start) / (rounds * len(QUERIES)) * 1e6
+
+
+class TestQueryParserBenchmark(unittest.TestCase):
+    """Query parsing performance."""
+
+    def test_parse_cost_in_microseconds(self):
+        """Mean per-query parse time stays under the ceiling."""
+        mean_us = benchmark(QueryParser())
+        print(f"\nquery parser: {mean_us:.1f} µs/query")
+        self.assertLess(mean_us, MAX_MICROSECONDS_PER_QUERY)
+
+
+if __name__ == "__main__":
+    print(f"query parser: {benchmark(QueryParser(), rounds=10000):.1f} µs/query")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the precomputed article index.
+
+Tests:
+- Article headings, metadata and mentions are extracted with offsets
+- The binary index round-trips through save and memory-mapped load
+- Defining chunks rank ahead of chunks that only mention the article
+- Re-ingesting a document replaces its postings and readers remap the file
+- Keyword search is served by primary-key fetches instead of $contains scans
+"""
+
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add project root and src to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+from core.article_index import ArticleIndex, ArticleIndexWriter, extract_article_references
+from core.contextual_rag import OptimizedContextualRAGSystem
+from core.query_parser import QueryParser
+
+
+GDPR = "crawled_content/gdpr.md"
+DSA = "crawled_content/digital_act.md"
+
+CHUNKS = [
+    ("gdpr-1", GDPR, "Article 15\nRight of access by the data subject, see also Article 12."),
+    ("gdpr-2", GDPR, "Article 22\nAutomated individual decision-making."),
+    ("gdpr-3", GDPR, "Article 21\nRight to object. Decisions under Article 22 remain subject to review."),
+    ("dsa-1", DSA, "Article 22\nTrusted flaggers."),
+]
+
+
+class TestArticleIndex(unittest.TestCase):
+    """Test suite for ArticleIndex and ArticleIndexWriter."""
+
+    def setUp(self):
+        """Build an index in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.temp_dir.name) / "article_index.bin")
+        writer = ArticleIndexWriter(self.path)
+        for chunk_id, source, text in CHUNKS:
+            writer.add_chunk(chunk_id, source, text)
+        writer.save()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.temp_dir.cleanup()
+
+    def test_extract_references(self):
+        """Headings define an article, in-text references only mention it."""
+        references = extract_article_references("Article 21\nDecisions under Article 22.")
+        self.assertEqual(references[21], (8, True))
+        self.assertFalse(references[22][1])
+
+        from_metadata = extract_article_references("continued text", {"article_number": "Article 5"})
+        self.assertEqual(from_metadata[5], (0, True))
+
+    def test_lookup_by_source(self):
+        """A regulation-specific lookup returns only that source."""
+        index = ArticleIndex(self.path)
+        postings = index.lookup("Article 22", source=GDPR)
+        self.assertEqual([p.chunk_id for p in postings], ["gdpr-2", "gdpr-3"])
+        self.assertTrue(postings[0].defining)
+        self.assertFalse(postings[1].defining)
+        self.assertEqual(postings[1].offset, CHUNKS[2][2].index("Article 22"))
+
+    def test_lookup_all_sources_defining_first(self):
+        """Without a source every regulation is searched, definitions first."""
+        postings = ArticleIndex(self.path).lookup(22)
+        self.assertEqual({p.chunk_id for p in postings[:2]}, {"gdpr-2", "dsa-1"})
+        self.assertEqual(postings[2].chunk_id, "gdpr-3")
+        self.assertEqual(ArticleIndex(self.path).lookup("Article 99"), [])
+
+    def test_reingest_replaces_postings(self):
+        """Removing a source and re-adding it is picked up by a live reader."""
+        index = ArticleIndex(self.path)
+        self.assertEqual(len(index.lookup(15)), 1)
+
+        writer = ArticleIndexWriter(self.path)
+        writer.remove_source(GDPR)
+        writer.add_chunk("gdpr-new", GDPR, "Article 15\nRight of access (amended).")
+        writer.save()
+
+        self.assertEqual([p.chunk_id for p in index.lookup(15)], ["gdpr-new"])
+        self.assertEqual(index.lookup(21), [])
+        self.assertEqual([p.chunk_id for p in index.lookup(22)], ["dsa-1"])
+
+    def test_missing_file_is_unloaded(self):
+        """A missing index reports unloaded so the scan fallback is used."""
+        index = ArticleIndex(str(Path(self.temp_dir.name) / "missing.bin"))
+        self.assertFalse(index.is_loaded())
+        self.assertEqual(index.lookup(22), [])
+
+
+class TestIndexedKeywordSearch(unittest.TestCase):
+    """Test suite for article-index-backed keyword search."""
+
+    def setUp(self):
+        """Create a RAG system around a fake collection."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        path = str(Path(self.temp_dir.name) / "article_index.bin")
+        writer = ArticleIndexWriter(path)
+        for chunk_id, source, text in CHUNKS:
+            writer.add_chunk(chunk_id, source, text)
+        writer.save()
+
+        texts = {chunk_id: text for chunk_id, _, text in CHUNKS}
+        self.collection = Mock()
+        self.collection.get.side_effect = lambda ids, include: {
+            'ids': list(reversed(ids)),
+            'documents': [texts[i] for i in reversed(ids)],
+            'metadatas': [{'source': 'x'} for _ in ids]
+        }
+
+        self.rag = OptimizedContextualRAGSystem.__new__(OptimizedContextualRAGSystem)
+        self.rag.chroma_client = Mock()
+        self.rag.vectorstore = Mock(_collection=self.collection)
+        self.rag.article_index = ArticleIndex(path)
+        self.rag.query_parser = QueryParser()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.temp_dir.cleanup()
+
+    def test_keyword_search_uses_index(self):
+        """Chunks are fetched by ID, in index order, without a document scan."""
+        query_info = self.rag._detect_query_type("What does GDPR Article 22 say?")
+        docs = self.rag._keyword_search(query_info, 3)
+
+        self.assertEqual([d.page_content for d in docs], [CHUNKS[1][2], CHUNKS[2][2]])
+        self.assertEqual(docs[0].metadata['_search_type'], 'keyword_metadata')
+        self.assertEqual(docs[1].metadata['_search_type'], 'keyword_text_only')
+        _, kwargs = self.collection.get.call_args
+        self.assertNotIn('where_document', kwargs)
+
+    def test_unknown_article_returns_nothing(self):
+        """Articles absent from the index do not hit the collection."""
+        docs = self.rag._keyword_search(self.rag._detect_query_type("Article 404"), 3)
+        self.assertEqual(docs, [])
+        self.collection.get.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the bounded chat executor.
+
+Tests:
+- Blocking work runs concurrently without stalling the event loop
+- Concurrency limit and queue bound are enforced
+- Metrics callback receives queue depth and in-flight counts
+- Streamed generators hold a worker and respect the queue bound
+"""
+
+import unittest
+import sys
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.chat_executor import BoundedChatExecutor, ChatCapacityError
+
+
+class TestBoundedChatExecutor(unittest.TestCase):
+    """Test suite for BoundedChatExecutor."""
+
+    def test_blocking_calls_run_concurrently(self):
+        """Several blocking turns overlap instead of running one at a time."""
+        executor = BoundedChatExecutor(max_concurrency=4, max_queue=4)
+
+        async def main():
+            start = time.time()
+            await asyncio.gather(*(executor.run(time.sleep, 0.1) for _ in range(4)))
+            return time.time() - start
+
+        self.assertLess(asyncio.run(main()), 0.3)
+        self.assertEqual(executor.get_stats()['completed'], 4)
+
+    def test_event_loop_stays_responsive(self):
+        """Coroutines keep running while a blocking turn is in progress."""
+        executor = BoundedChatExecutor(max_concurrency=1, max_queue=1)
+
+        async def main():
+            ticks = 0
+            task = asyncio.ensure_future(executor.run(time.sleep, 0.1))
+            while not task.done():
+                ticks += 1
+                await asyncio.sleep(0.01)
+            return ticks
+
+        self.assertGreater(asyncio.run(main()), 3)
+
+    def test_queue_full_rejects(self):
+        """Requests beyond concurrency + queue are rejected."""
+        executor = BoundedChatExecutor(max_concurrency=1, max_queue=1)
+        release = threading.Event()
+
+        async def main():
+            first = asyncio.ensure_future(executor.run(release.wait))
+            second = asyncio.ensure_future(executor.run(release.wait))
+            await asyncio.sleep(0.05)
+            with self.assertRaises(ChatCapacityError):
+                await executor.run(release.wait)
+            release.set()
+            await asyncio.gather(first, second)
+
+        asyncio.run(main())
+        self.assertEqual(executor.get_stats()['rejected'], 1)
+
+    def test_metrics_callback(self):
+        """Metrics callback sees queued and in-flight work."""
+        events = []
+        executor = BoundedChatExecutor(
+            max_concurrency=1,
+            max_queue=4,
+            metrics_callback=lambda **kwargs: events.append(kwargs)
+        )
+
+        async def main():
+            await asyncio.gather(*(executor.run(time.sleep, 0.02) for _ in range(3)))
+
+        asyncio.run(main())
+        self.assertGreaterEqual(max(event['queue_depth'] for event in events), 2)
+        self.assertEqual(max(event['in_flight'] for event in events), 1)
+        self.assertEqual(events[-1]['in_flight'], 0)
+
+    def test_stream_holds_worker(self):
+        """A streaming generator occupies a worker until it finishes."""
+        executor = BoundedChatExecutor(max_concurrency=1, max_queue=0)
+        release = threading.Event()
+
+        def frames():
+            yield "first"
+            release.wait()
+            yield "second"
+
+        async def main():
+            stream = executor.stream(frames)
+            received = [await stream.__anext__()]
+            self.assertEqual(executor.get_stats()['in_flight'], 1)
+            with self.assertRaises(ChatCapacityError):
+                executor.stream(frames)
+            release.set()
+            received.extend([frame async for frame in stream])
+            return received
+
+        self.assertEqual(asyncio.run(main()), ["first", "second"])
+        self.assertEqual(executor.get_stats()['in_flight'], 0)
+        self.assertEqual(executor.get_stats()['rejected'], 1)
+
+    def test_stream_propagates_errors(self):
+        """An exception inside the generator reaches the consumer after earlier items."""
+        executor = BoundedChatExecutor(max_concurrency=1, max_queue=1)
+
+        def frames():
+            yield "first"
+            raise ValueError("boom")
+
+        async def main():
+            received = []
+            with self.assertRaises(ValueError):
+                async for frame in executor.stream(frames):
+                    received.append(frame)
+            return received
+
+        self.assertEqual(asyncio.run(main()), ["first"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the pooled SQLite checkpoint store.
+
+Tests:
+- Database runs in WAL mode with a connection per thread
+- Only the latest N checkpoints per thread are kept
+- Prune and vacuum reclaim space offline
+"""
+
+import unittest
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add project root and src to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+try:
+    from langgraph.checkpoint.base import empty_checkpoint
+    from core.checkpoint_store import PooledSqliteSaver
+    LANGGRAPH_AVAILABLE = True
+except ImportError:
+    LANGGRAPH_AVAILABLE = False
+
+
+def write_checkpoints(store, thread_id, count):
+    """Write a chain of checkpoints for one thread; returns the last config."""
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    for step in range(count):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"step": step, "payload": "x" * 2000}
+        config = store.put(config, checkpoint, {"step": step}, {})
+    return config
+
+
+@unittest.skipUnless(LANGGRAPH_AVAILABLE, "langgraph-checkpoint-sqlite not installed")
+class TestPooledSqliteSaver(unittest.TestCase):
+    """Test suite for PooledSqliteSaver."""
+
+    def setUp(self):
+        """Create a store in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.temp_dir.name) / "checkpoints.db")
+        self.store = PooledSqliteSaver(self.db_path, keep_latest=3, prune_every=2)
+
+    def tearDown(self):
+        """Close the store and remove the directory."""
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_wal_mode_and_thread_connections(self):
+        """Each thread gets its own WAL connection."""
+        self.assertEqual(self.store.conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.store.conn))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], self.store.conn)
+
+    def test_retention_keeps_latest_checkpoints(self):
+        """Old checkpoints are pruned while the latest state stays readable."""
+        last_config = write_checkpoints(self.store, "thread-a", 10)
+        write_checkpoints(self.store, "thread-b", 2)
+
+        thread_a = list(self.store.list({"configurable": {"thread_id": "thread-a"}}))
+        self.assertLessEqual(len(thread_a), 4)
+        self.assertEqual(len(list(self.store.list({"configurable": {"thread_id": "thread-b"}}))), 2)
+
+        latest = self.store.get_tuple({"configurable": {"thread_id": "thread-a"}})
+        self.assertEqual(latest.config["configurable"]["checkpoint_id"],
+                         last_config["configurable"]["checkpoint_id"])
+        self.assertEqual(latest.checkpoint["channel_values"]["step"], 9)
+
+    def test_concurrent_writers(self):
+        """Turns on different threads write without sharing a connection."""
+        workers = [
+            threading.Thread(target=write_checkpoints, args=(self.store, f"thread-{i}", 6))
+            for i in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        stats = self.store.get_storage_stats()
+        self.assertEqual(stats['threads'], 4)
+        self.assertEqual(stats['checkpoints_written'], 24)
+
+    def test_prune_all_and_vacuum(self):
+        """Offline compaction keeps N per thread and shrinks the file."""
+        self.store.keep_latest = 0
+        write_checkpoints(self.store, "thread-a", 30)
+        self.assertEqual(self.store.get_storage_stats()['checkpoints'], 30)
+
+        self.assertEqual(self.store.prune_all(keep_latest=1), 29)
+        sizes = self.store.vacuum()
+        self.assertLess(sizes['size_after'], sizes['size_before'])
+        self.assertEqual(self.store.get_storage_stats()['checkpoints'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
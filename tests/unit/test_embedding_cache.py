@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the query embedding cache.
+
+Tests:
+- Normalized query text shares one cache entry
+- Memory budget and TTL are enforced
+- Embeddings survive a restart via the on-disk store
+- CachedEmbeddings embeds each distinct query once
+"""
+
+import unittest
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.cache.embedding_cache import EmbeddingCache, CachedEmbeddings
+
+
+class FakeEmbeddings:
+    """Counting stand-in for OpenAIEmbeddings."""
+
+    model = "fake-embedding"
+
+    def __init__(self, delay: float = 0.0):
+        self.query_calls = []
+        self.document_calls = []
+        self.delay = delay
+
+    def embed_query(self, text):
+        self.query_calls.append(text)
+        if self.delay:
+            time.sleep(self.delay)
+        return [float(len(text)), 1.0, 2.0]
+
+    def embed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        return [[float(len(text)), 1.0, 2.0] for text in texts]
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Test suite for EmbeddingCache."""
+
+    def setUp(self):
+        """Create a temporary cache directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = EmbeddingCache(cache_dir=self.temp_dir.name, model_name="fake-embedding")
+
+    def tearDown(self):
+        """Remove the temporary cache directory."""
+        self.temp_dir.cleanup()
+
+    def test_normalized_queries_share_entry(self):
+        """Case, whitespace and trailing punctuation do not create new entries."""
+        self.cache.put("What is Article 23 of GDPR?", [1.0, 2.0])
+        vector = self.cache.get("  what is   article 23 of gdpr ")
+        self.assertIsNotNone(vector)
+        self.assertEqual(vector.dtype, np.float32)
+
+    def test_memory_bound_evicts_lru(self):
+        """Oldest entries are evicted once max_entries is exceeded."""
+        cache = EmbeddingCache(cache_dir=None, max_entries=2)
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        cache.get("a")
+        cache.put("c", [3.0])
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+
+    def test_ttl_expiry(self):
+        """Expired entries are treated as misses."""
+        cache = EmbeddingCache(cache_dir=None, ttl_seconds=0.01)
+        cache.put("query", [1.0])
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("query"))
+
+    def test_survives_restart(self):
+        """A new cache instance loads vectors from the disk store."""
+        self.cache.put("persisted query", [0.5, 0.25])
+        restarted = EmbeddingCache(cache_dir=self.temp_dir.name, model_name="fake-embedding")
+        vector = restarted.get("persisted query")
+        np.testing.assert_allclose(vector, [0.5, 0.25])
+        self.assertEqual(restarted.get_stats()['disk_hits'], 1)
+
+
+class TestCachedEmbeddings(unittest.TestCase):
+    """Test suite for the CachedEmbeddings wrapper."""
+
+    def test_repeated_query_embedded_once(self):
+        """embed_query hits the API once per normalized query."""
+        base = FakeEmbeddings()
+        embeddings = CachedEmbeddings(base, EmbeddingCache(cache_dir=None))
+        first = embeddings.embed_query("GDPR Article 5")
+        second = embeddings.embed_query("gdpr article 5?")
+        self.assertEqual(first, second)
+        self.assertEqual(len(base.query_calls), 1)
+
+    def test_concurrent_queries_deduplicated(self):
+        """Concurrent branches embedding the same text share one API call."""
+        base = FakeEmbeddings(delay=0.05)
+        embeddings = CachedEmbeddings(base, EmbeddingCache(cache_dir=None))
+        threads = [threading.Thread(target=embeddings.embed_query, args=("same query",)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(base.query_calls), 1)
+
+    def test_embed_queries_batches_misses(self):
+        """embed_queries sends only uncached, distinct texts in one request."""
+        base = FakeEmbeddings()
+        embeddings = CachedEmbeddings(base, EmbeddingCache(cache_dir=None))
+        embeddings.embed_query("cached")
+        vectors = embeddings.embed_queries(["cached", "new one", "New one"])
+        self.assertEqual(len(vectors), 3)
+        self.assertEqual(base.document_calls, [["new one"]])
+        self.assertEqual(vectors[1], vectors[2])
+
+    def test_documents_pass_through(self):
+        """Document embeddings are not cached."""
+        base = FakeEmbeddings()
+        embeddings = CachedEmbeddings(base, EmbeddingCache(cache_dir=None))
+        embeddings.embed_documents(["doc"])
+        embeddings.embed_documents(["doc"])
+        self.assertEqual(len(base.document_calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the rate-limit-aware ingestion scheduler.
+
+Tests:
+- Token buckets hold callers to the configured rate
+- AIMD halves concurrency on 429s and grows it back on success
+- Rate-limited calls are retried, other errors propagate
+- Stages are pipelined per item and failures are recorded per stage
+"""
+
+import unittest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.ingestion_scheduler import (
+    AdaptiveConcurrencyLimiter,
+    IngestionScheduler,
+    PipelineStage,
+    ProviderLimiter,
+    TokenBucket,
+    is_rate_limit_error,
+)
+
+
+class RateLimitError(Exception):
+    """Stand-in for a provider 429 response."""
+    code = 429
+
+
+class TestLimits(unittest.TestCase):
+    """Test suite for token buckets and adaptive concurrency."""
+
+    def test_token_bucket_rate(self):
+        """After the burst, acquisitions are spaced at the refill rate."""
+        bucket = TokenBucket(per_minute=600, capacity=1)  # 10/s
+        start = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+    def test_aimd(self):
+        """Rate limits halve the limit, successes add one slot at a time."""
+        limiter = AdaptiveConcurrencyLimiter(initial=8, maximum=10, increase_after=2)
+        limiter.on_rate_limited()
+        self.assertEqual(limiter.limit, 4)
+        for _ in range(4):
+            limiter.on_success()
+        self.assertEqual(limiter.limit, 6)
+        for _ in range(5):
+            limiter.on_rate_limited()
+        self.assertEqual(limiter.limit, 1)
+
+    def test_rate_limit_detection(self):
+        """429s are recognised by status code or message."""
+        self.assertTrue(is_rate_limit_error(RateLimitError()))
+        self.assertTrue(is_rate_limit_error(Exception("429 RESOURCE_EXHAUSTED")))
+        self.assertFalse(is_rate_limit_error(ValueError("bad request")))
+
+
+class TestProviderLimiter(unittest.TestCase):
+    """Test suite for ProviderLimiter retries and accounting."""
+
+    def make_limiter(self):
+        return ProviderLimiter("gemini", requests_per_minute=60000, tokens_per_minute=6_000_000,
+                               max_concurrency=8, backoff_base=0.001)
+
+    def test_rate_limited_call_is_retried(self):
+        """A 429 shrinks concurrency and the call succeeds on retry."""
+        limiter = self.make_limiter()
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RateLimitError("slow down")
+            return "ok"
+
+        self.assertEqual(limiter.call(flaky, tokens=100), "ok")
+        stats = limiter.get_stats()
+        self.assertEqual(stats['rate_limited'], 2)
+        self.assertEqual(stats['concurrency_limit'], 1)
+        self.assertEqual(stats['tokens'], 100)
+
+    def test_other_errors_propagate(self):
+        """Non rate-limit failures are not retried."""
+        limiter = self.make_limiter()
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise ValueError("bad request")
+
+        with self.assertRaises(ValueError):
+            limiter.call(broken)
+        self.assertEqual(len(calls), 1)
+
+
+class TestIngestionScheduler(unittest.TestCase):
+    """Test suite for per-item stage pipelining."""
+
+    def test_dependent_stages_start_per_item(self):
+        """An item's dependent stage starts before slower items finish their first stage."""
+        events = []
+        lock = threading.Lock()
+
+        def record(name):
+            def stage(index, item):
+                time.sleep(item)
+                with lock:
+                    events.append((name, index))
+                return f"{name}-{index}"
+            return stage
+
+        scheduler = IngestionScheduler(max_workers=4)
+        results = scheduler.run(
+            [0.0, 0.2],
+            [PipelineStage('context', record('context')),
+             PipelineStage('metadata', record('metadata')),
+             PipelineStage('embed', record('embed'), after=('context', 'metadata'))]
+        )
+
+        self.assertEqual(results[0], {'context': 'context-0', 'metadata': 'metadata-0', 'embed': 'embed-0'})
+        self.assertLess(events.index(('embed', 0)), events.index(('context', 1)))
+        self.assertEqual(scheduler.get_stats()['items_done'], 2)
+
+    def test_failures_recorded_per_stage(self):
+        """A failing stage is reported as its exception; the item still completes."""
+        done = []
+
+        def fail(index, item):
+            raise RuntimeError("boom")
+
+        scheduler = IngestionScheduler(max_workers=2)
+        results = scheduler.run(
+            ["a"], [PipelineStage('context', fail), PipelineStage('embed', lambda i, item: item, after=('context',))],
+            on_item_done=lambda index, result: done.append(index)
+        )
+
+        self.assertIsInstance(results[0]['context'], RuntimeError)
+        self.assertEqual(results[0]['embed'], "a")
+        self.assertEqual(done, [0])
+
+    def test_unknown_dependency(self):
+        """Stages may only depend on stages that exist."""
+        with self.assertRaises(ValueError):
+            IngestionScheduler().run([1], [PipelineStage('embed', lambda i, item: item, after=('context',))])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the pipelined ingestion writer.
+
+Tests:
+- Batches are sized by estimated tokens
+- Embedding the next batch overlaps the upsert of the previous one
+- A failing input is isolated without failing its batch neighbours
+- Failed upserts are retried without re-embedding
+- Documents queued twice are written once
+"""
+
+import unittest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.documents import Document
+from src.core.ingestion_writer import IngestionWriter
+
+
+class FakeEmbeddings:
+    """Records embed_documents calls; texts containing 'bad' fail."""
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = []
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self.lock:
+            self.calls.append((time.monotonic(), list(texts)))
+        time.sleep(self.delay)
+        if any("bad" in text for text in texts):
+            raise ValueError("invalid input")
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class FakeCollection:
+    """Records upserts; the first `failures` upserts raise."""
+
+    def __init__(self, delay: float = 0.0, failures: int = 0):
+        self.rows = {}
+        self.upserts = []
+        self.delay = delay
+        self.failures = failures
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        start = time.monotonic()
+        time.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database is locked")
+        for chunk_id, embedding in zip(ids, embeddings):
+            self.rows[chunk_id] = embedding
+        self.upserts.append((start, time.monotonic(), list(ids)))
+
+
+def doc(chunk_id, text):
+    return Document(page_content=text, metadata={'chunk_id': chunk_id, 'source': 'a.md'})
+
+
+class TestIngestionWriter(unittest.TestCase):
+    """Test suite for IngestionWriter."""
+
+    def test_token_budget_batches(self):
+        """A batch closes once the next document would exceed the token budget."""
+        embeddings = FakeEmbeddings()
+        writer = IngestionWriter(FakeCollection(), embeddings, max_batch_tokens=100, retry_delay=0)
+        for i in range(5):
+            writer.add(doc(f"c{i}", "x" * 160))  # 40 tokens each
+        result = writer.close()
+
+        self.assertEqual(sorted(len(texts) for _, texts in embeddings.calls), [1, 2, 2])
+        self.assertEqual(result['written'], [f"c{i}" for i in range(5)])
+        self.assertEqual(result['batches'], 3)
+
+    def test_embedding_overlaps_upsert(self):
+        """Batch 2 is being embedded while batch 1 is written."""
+        embeddings = FakeEmbeddings(delay=0.05)
+        collection = FakeCollection(delay=0.1)
+        writer = IngestionWriter(collection, embeddings, max_batch_items=1, max_in_flight=2, retry_delay=0)
+        writer.add(doc("a", "first"))
+        writer.add(doc("b", "second"))
+        writer.close()
+
+        first_upsert_start, first_upsert_end, _ = collection.upserts[0]
+        second_embed_start = embeddings.calls[1][0]
+        self.assertLess(second_embed_start, first_upsert_end)
+
+    def test_bad_input_isolated(self):
+        """Only the failing document is reported; its neighbours are written."""
+        writer = IngestionWriter(FakeCollection(), FakeEmbeddings(), max_retries=0, retry_delay=0)
+        for chunk_id, text in (("a", "fine"), ("b", "bad chunk"), ("c", "also fine"), ("d", "ok")):
+            writer.add(doc(chunk_id, text))
+        result = writer.close()
+
+        self.assertEqual(result['written'], ["a", "c", "d"])
+        self.assertEqual(list(result['failed']), ["b"])
+
+    def test_upsert_retry_reuses_embeddings(self):
+        """A transient write failure does not trigger another embedding request."""
+        embeddings = FakeEmbeddings()
+        collection = FakeCollection(failures=1)
+        writer = IngestionWriter(collection, embeddings, retry_delay=0)
+        writer.add(doc("a", "text"))
+        result = writer.close()
+
+        self.assertEqual(result['written'], ["a"])
+        self.assertEqual(len(embeddings.calls), 1)
+        self.assertIn("a", collection.rows)
+
+    def test_duplicate_ids_written_once(self):
+        """Re-adding a queued chunk is a no-op."""
+        embeddings = FakeEmbeddings()
+        writer = IngestionWriter(FakeCollection(), embeddings, retry_delay=0)
+        writer.add(doc("a", "text"))
+        writer.add(doc("a", "text"))
+        result = writer.close()
+
+        self.assertEqual(result['written'], ["a"])
+        self.assertEqual(embeddings.calls[0][1], ["text"])
+
+
+if __name__ == "__main__":
+    unittest.main()
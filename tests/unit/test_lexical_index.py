@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the BM25 lexical index and reciprocal-rank fusion.
+
+Tests:
+- Legal references such as "23(4)(b)" are tokenized whole and by base number
+- Rare exact terms rank the chunks containing them first
+- Incremental add / replace / remove and persistence across processes
+- Scoring the full crawled corpus stays in the millisecond range
+- RRF merges dense and lexical results, keeping shared chunks on top
+"""
+
+import unittest
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root and src to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+from langchain_core.documents import Document
+from core.lexical_index import LexicalIndex, tokenize
+from core.contextual_rag import OptimizedContextualRAGSystem
+
+
+CHUNKS = {
+    "c1": "Article 23(4)(b): a CASP shall notify the competent authority.",
+    "c2": "ELTIF managers must publish the fund rules and the prospectus.",
+    "c3": "The crowdfunding service provider shall inform investors of the risks.",
+    "c4": "Investors in the crowdfunding platform receive a key investment information sheet.",
+}
+
+
+class TestLexicalIndex(unittest.TestCase):
+    """Test suite for LexicalIndex."""
+
+    def setUp(self):
+        """Create an index in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.temp_dir.name) / "lexical_index.npz")
+        self.index = LexicalIndex(self.path)
+        self.index.add_documents(list(CHUNKS), list(CHUNKS.values()), ["a.md", "b.md", "c.md", "c.md"])
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.temp_dir.cleanup()
+
+    def test_tokenize_legal_references(self):
+        """Paragraph references keep their structure and their base number."""
+        tokens = tokenize("See Article 23(4)(b) of the Regulation")
+        self.assertIn("23(4)(b)", tokens)
+        self.assertIn("23", tokens)
+        self.assertNotIn("the", tokens)
+
+    def test_exact_terms_rank_first(self):
+        """Acronyms dense search blurs are matched exactly."""
+        self.assertEqual(self.index.search("Which obligations apply to a CASP?", 2)[0][0], "c1")
+        self.assertEqual(self.index.search("ELTIF rules", 2)[0][0], "c2")
+        self.assertEqual(self.index.search("article 23(4)(b)", 1)[0][0], "c1")
+        self.assertEqual(self.index.search("unrelated gibberish", 3), [])
+
+    def test_incremental_updates(self):
+        """Chunks can be replaced and removed without a rebuild."""
+        self.index.add_documents(["c2"], ["ELTIF replaced by a newer text"], ["b.md"])
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.index.search("newer", 1)[0][0], "c2")
+
+        self.assertEqual(self.index.remove_source("c.md"), 2)
+        self.assertEqual(self.index.search("crowdfunding", 3), [])
+
+    def test_persistence_and_refresh(self):
+        """Saved changes are visible to another process's index."""
+        self.index.save()
+        reader = LexicalIndex(self.path)
+        self.assertEqual(reader.search("CASP", 1)[0][0], "c1")
+
+        self.index.add_documents(["c5"], ["MiCA whitepaper requirements for a CASP"], ["d.md"])
+        self.index.save()
+        self.assertEqual(len(reader.search("whitepaper", 5)), 1)
+
+    def test_corpus_scoring_speed(self):
+        """Scoring the whole crawled corpus takes single-digit milliseconds."""
+        corpus = sorted((project_root / "crawled_content").glob("*.md"))
+        if not corpus:
+            self.skipTest("crawled_content not available")
+
+        index = LexicalIndex(None)
+        for path in corpus:
+            text = path.read_text(encoding="utf-8")
+            chunks = [text[i:i + 2000] for i in range(0, len(text), 2000)]
+            index.add_documents([f"{path.name}:{i}" for i in range(len(chunks))], chunks)
+
+        index.search("warm up", 5)
+        start = time.perf_counter()
+        for _ in range(20):
+            index.search("crowdfunding service provider investor protection Article 23", 5)
+        self.assertLess((time.perf_counter() - start) / 20, 0.01)
+
+
+class TestReciprocalRankFusion(unittest.TestCase):
+    """Test suite for RRF fusion of dense and lexical results."""
+
+    def test_shared_chunks_rank_first(self):
+        """A chunk found by both retrievers beats single-list top hits."""
+        rag = OptimizedContextualRAGSystem.__new__(OptimizedContextualRAGSystem)
+        dense = [Document(page_content=f"dense {i}", metadata={}, id=f"d{i}") for i in range(3)]
+        shared = Document(page_content="shared", metadata={}, id="s")
+        lexical = [Document(page_content="lexical 0", metadata={}, id="l0"), shared]
+
+        fused = rag._reciprocal_rank_fusion([dense[:1] + [shared] + dense[1:], lexical], 3)
+
+        self.assertEqual(fused[0].id, "s")
+        self.assertEqual(fused[0].metadata['_search_type'], 'both')
+        self.assertEqual({doc.id for doc in fused[1:]}, {"d0", "l0"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the persistent LLM result cache.
+
+Tests:
+- Results survive a restart via the SQLite store
+- Prompt version, model and prompt inputs are part of the key
+- Metadata extraction is served from the cache and fallbacks are not stored
+"""
+
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.cache.llm_result_cache import LLMResultCache
+from src.vectorization.metadata_extractor import LegalMetadataExtractor, ExtractionConfig
+
+
+class TestLLMResultCache(unittest.TestCase):
+    """Test suite for LLMResultCache."""
+
+    def setUp(self):
+        """Create a cache in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = LLMResultCache(cache_dir=self.temp_dir.name)
+        self.chunk_hash = LLMResultCache.content_hash("Article 12 text")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip_survives_restart(self):
+        """A stored result is served by a new cache instance."""
+        self.cache.put("contextualization", "v1", "model", self.chunk_hash, "summary")
+        restarted = LLMResultCache(cache_dir=self.temp_dir.name)
+
+        self.assertEqual(restarted.get("contextualization", "v1", "model", self.chunk_hash), "summary")
+        self.assertEqual(restarted.get_stats()['hits'], 1)
+
+    def test_key_components(self):
+        """Changing the prompt version, model, task or inputs misses."""
+        self.cache.put("metadata_extraction", "v1", "model", self.chunk_hash, {"a": 1}, context="title")
+
+        self.assertEqual(self.cache.get("metadata_extraction", "v1", "model", self.chunk_hash, "title"), {"a": 1})
+        self.assertIsNone(self.cache.get("metadata_extraction", "v2", "model", self.chunk_hash, "title"))
+        self.assertIsNone(self.cache.get("metadata_extraction", "v1", "other", self.chunk_hash, "title"))
+        self.assertIsNone(self.cache.get("contextualization", "v1", "model", self.chunk_hash, "title"))
+        self.assertIsNone(self.cache.get("metadata_extraction", "v1", "model", self.chunk_hash, "other"))
+
+    def test_clear_by_task(self):
+        """Clearing one task keeps the others."""
+        self.cache.put("contextualization", "v1", "model", self.chunk_hash, "summary")
+        self.cache.put("metadata_extraction", "v1", "model", self.chunk_hash, {"a": 1})
+        self.cache.clear("contextualization")
+
+        self.assertEqual(self.cache.get_stats()['entries'], {"metadata_extraction@v1": 1})
+
+
+class TestCachedMetadataExtraction(unittest.TestCase):
+    """Test suite for metadata extraction through the cache."""
+
+    RESPONSE = (
+        '{"regulation_info": {"article_number": "Article 12"},'
+        ' "legal_content": {"provision_type": "obligation", "compliance_level": "mandatory"},'
+        ' "confidence_score": 0.9}'
+    )
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = LLMResultCache(cache_dir=self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_extractor(self, client):
+        """Extractor with a mocked Gen AI client."""
+        extractor = LegalMetadataExtractor.__new__(LegalMetadataExtractor)
+        extractor.config = ExtractionConfig(retry_attempts=1)
+        extractor.result_cache = self.cache
+        extractor.client = client
+        extractor.rate_limiter = None
+        return extractor
+
+    def test_second_extraction_is_cached(self):
+        """The same chunk is sent to the model once."""
+        client = Mock()
+        client.models.generate_content.return_value = Mock(text=self.RESPONSE)
+        extractor = self.make_extractor(client)
+
+        first = extractor.extract_metadata("## Article 12\nProviders shall comply.")
+        second = extractor.extract_metadata("## Article 12\nProviders shall comply.")
+
+        self.assertEqual(first, second)
+        self.assertEqual(client.models.generate_content.call_count, 1)
+
+    def test_fallback_not_cached(self):
+        """Failed extractions are retried on the next run."""
+        client = Mock()
+        client.models.generate_content.side_effect = RuntimeError("quota")
+        extractor = self.make_extractor(client)
+
+        extractor.extract_metadata("Article 3 text")
+        extractor.extract_metadata("Article 3 text")
+
+        self.assertEqual(client.models.generate_content.call_count, 2)
+        self.assertEqual(self.cache.get_stats()['writes'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the semantic Q&A answer cache.
+
+Tests:
+- Similar questions are served above the similarity threshold
+- Negated queries bypass the cache
+- Entries are invalidated when a source document changes (unregistered sources are not)
+- LRU eviction enforces max_cache_size
+- Only context-free turns may use the shared cache
+"""
+
+import unittest
+import sys
+import json
+import math
+import os
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from cache.qa_cache import QACache
+from cache.negative_intent_detector import NegativeIntentDetector
+
+
+class FakeCollection:
+    """In-memory stand-in for a cosine ChromaDB collection."""
+
+    def __init__(self):
+        self.rows = {}
+        self.metadata = {"hnsw:space": "cosine"}
+
+    def count(self):
+        return len(self.rows)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        for entry_id, embedding, document, metadata in zip(ids, embeddings, documents, metadatas):
+            self.rows[entry_id] = (embedding, document, dict(metadata))
+
+    def update(self, ids, metadatas):
+        for entry_id, metadata in zip(ids, metadatas):
+            embedding, document, _ = self.rows[entry_id]
+            self.rows[entry_id] = (embedding, document, dict(metadata))
+
+    def delete(self, ids):
+        for entry_id in ids:
+            self.rows.pop(entry_id, None)
+
+    def get(self, include=None):
+        return {
+            'ids': list(self.rows),
+            'metadatas': [row[2] for row in self.rows.values()]
+        }
+
+    def query(self, query_embeddings, n_results, where=None, include=None):
+        def distance(a, b):
+            dot = sum(x * y for x, y in zip(a, b))
+            norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+            return 1.0 - dot / norm
+
+        ranked = sorted(
+            (distance(query_embeddings[0], embedding), entry_id, document, metadata)
+            for entry_id, (embedding, document, metadata) in self.rows.items()
+            if not where or all(metadata.get(key) == value for key, value in where.items())
+        )[:n_results]
+        return {
+            'ids': [[row[1] for row in ranked]],
+            'documents': [[row[2] for row in ranked]],
+            'metadatas': [[row[3] for row in ranked]],
+            'distances': [[row[0] for row in ranked]]
+        }
+
+
+class FakeClient:
+    """Stand-in for chromadb.PersistentClient."""
+
+    def __init__(self, *args, **kwargs):
+        self.collection = FakeCollection()
+
+    def get_or_create_collection(self, name, metadata=None):
+        return self.collection
+
+    def delete_collection(self, name):
+        self.collection = FakeCollection()
+
+
+class KeywordEmbeddings:
+    """Embeds text as keyword presence so similar questions share a direction."""
+
+    VOCAB = ["gdpr", "article", "crowdfunding", "license", "dora", "avoid"]
+
+    def embed_query(self, text):
+        text = text.lower()
+        return [1.0 if word in text else 0.0 for word in self.VOCAB] + [0.01]
+
+
+class TestQACache(unittest.TestCase):
+    """Test suite for QACache."""
+
+    def setUp(self):
+        """Create a cache backed by fake storage and a temporary registry."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.registry_path = os.path.join(self.temp_dir.name, "document_registry.json")
+        self._write_registry("hash-1")
+
+        patcher = patch("cache.qa_cache.chromadb.PersistentClient", FakeClient)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.cache = QACache(
+            cache_dir=self.temp_dir.name,
+            embeddings=KeywordEmbeddings(),
+            model_name="test-model",
+            registry_path=self.registry_path,
+            negative_detector=NegativeIntentDetector(),
+            max_cache_size=2
+        )
+
+    def tearDown(self):
+        """Remove temporary files."""
+        self.temp_dir.cleanup()
+
+    def _write_registry(self, file_hash):
+        with open(self.registry_path, "w") as f:
+            json.dump({"gdpr.md": {"filepath": "gdpr.md", "file_hash": file_hash}}, f)
+        # Force a different mtime so the cache notices the change
+        stamp = os.path.getmtime(self.registry_path) + (1 if file_hash != "hash-1" else 0)
+        os.utime(self.registry_path, (stamp, stamp))
+
+    def test_similar_question_hit(self):
+        """A similar question is answered from the cache."""
+        self.cache.add_qa_pair("What does GDPR Article 5 say?", "Principles.", sources=["gdpr.md"])
+        entry = self.cache.search_qa("Explain GDPR article 5")
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.answer, "Principles.")
+        self.assertEqual(entry.metadata['sources'], ["gdpr.md"])
+        self.assertEqual(self.cache.get_stats()['cache_hits'], 1)
+
+    def test_dissimilar_question_miss(self):
+        """Questions below the similarity threshold miss."""
+        self.cache.add_qa_pair("What does GDPR Article 5 say?", "Principles.", sources=["gdpr.md"])
+        self.assertIsNone(self.cache.search_qa("What is a crowdfunding license?"))
+
+    def test_negative_intent_bypasses_cache(self):
+        """Negated queries are neither served nor stored."""
+        self.cache.add_qa_pair("What does GDPR Article 5 say?", "Principles.", sources=["gdpr.md"])
+        self.assertIsNone(self.cache.search_qa("Why should I avoid GDPR article 5?"))
+        self.assertFalse(self.cache.add_qa_pair("Why not GDPR article 5?", "Because.", sources=["gdpr.md"]))
+        self.assertEqual(self.cache.get_stats()['negative_bypasses'], 1)
+
+    def test_changed_source_invalidates_entry(self):
+        """Entries are dropped once their source document hash changes."""
+        self.cache.add_qa_pair("What does GDPR Article 5 say?", "Principles.", sources=["gdpr.md"])
+        self._write_registry("hash-2")
+        self.assertIsNone(self.cache.search_qa("What does GDPR Article 5 say?"))
+        self.assertEqual(self.cache.count(), 0)
+        self.assertEqual(self.cache.get_stats()['invalidations'], 1)
+
+    def test_unregistered_source_not_stale(self):
+        """Sources missing from the registry do not invalidate the entry."""
+        self.cache.add_qa_pair("What does GDPR Article 5 say?", "Principles.", sources=["gdpr.md", "notes.md"])
+        self.assertIsNotNone(self.cache.search_qa("What does GDPR Article 5 say?"))
+        self.assertEqual(self.cache.get_stats()['invalidations'], 0)
+
+    def test_lru_eviction(self):
+        """Least recently used entries are evicted above max_cache_size."""
+        self.cache.add_qa_pair("GDPR article", "A", sources=["gdpr.md"])
+        self.cache.add_qa_pair("DORA", "B", sources=["gdpr.md"])
+        self.cache.search_qa("GDPR article")
+        self.cache.add_qa_pair("Crowdfunding license", "C", sources=["gdpr.md"])
+        self.assertEqual(self.cache.count(), 2)
+        self.assertIsNotNone(self.cache.search_qa("GDPR article"))
+        self.assertIsNone(self.cache.search_qa("DORA"))
+
+    def test_context_free_turns_only(self):
+        """Follow-ups, later turns and sessions with a memory summary bypass the cache."""
+        human = lambda text: SimpleNamespace(type="human", content=text)
+        ai = lambda text: SimpleNamespace(type="ai", content=text)
+
+        self.assertTrue(self.cache.is_context_free([human("What does Article 12 ECSP require?")]))
+        self.assertFalse(self.cache.is_context_free([human("Does it apply to them?")]))
+        self.assertFalse(self.cache.is_context_free(
+            [human("What is DORA?"), ai("..."), human("What does Article 12 ECSP require?")]
+        ))
+        self.assertFalse(self.cache.is_context_free(
+            [human("What does Article 12 ECSP require?")], medium_term_summary="User runs a platform in Malta"
+        ))
+        self.assertEqual(self.cache.get_stats()['context_bypasses'], 3)
+
+        # The storage-side re-check of the same turn is not counted again
+        self.assertFalse(self.cache.is_context_free([human("Does it apply to them?")], record=False))
+        self.assertEqual(self.cache.get_stats()['context_bypasses'], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the quantized vector mirror.
+
+Tests:
+- int8 and binary mirrors find the exact nearest neighbours after rescoring
+- Distances match ChromaDB's cosine distance
+- A re-sync is picked up by a live reader and old versions are removed
+- Vector retrieval uses the mirror when it is synced
+"""
+
+import os
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+
+import numpy as np
+
+# Add project root and src to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+from core.contextual_rag import OptimizedContextualRAGSystem
+from core.quantized_index import QuantizedVectorIndex, build_quantized_index
+from core.retrieval_policy import AdaptiveRetrievalPolicy
+
+
+class FakeCollection:
+    """Collection stand-in serving embeddings page by page."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.ids = [f"chunk-{i}" for i in range(len(vectors))]
+
+    def count(self):
+        return len(self.ids)
+
+    def get(self, ids=None, limit=None, offset=0, include=()):
+        if ids is not None:
+            return {
+                'ids': list(ids),
+                'documents': [f"text of {chunk_id}" for chunk_id in ids],
+                'metadatas': [{'source': 'x'} for _ in ids]
+            }
+        return {
+            'ids': self.ids[offset:offset + limit],
+            'embeddings': self.vectors[offset:offset + limit]
+        }
+
+
+def random_vectors(count, dims, seed=0):
+    """Unit vectors with Matryoshka-like decaying energy per dimension."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, dims)) / np.sqrt(np.arange(1, dims + 1))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+class TestQuantizedVectorIndex(unittest.TestCase):
+    """Test suite for QuantizedVectorIndex and build_quantized_index."""
+
+    def setUp(self):
+        """Create a collection of random vectors."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.temp_dir.name) / "quantized_index")
+        self.vectors = random_vectors(500, 128)
+        self.collection = FakeCollection(self.vectors)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.temp_dir.cleanup()
+
+    def recall(self, index, k=10):
+        """Recall@k of the mirror against exact search for noisy copies of stored vectors."""
+        rng = np.random.default_rng(1)
+        total = 0.0
+        for row in range(0, 500, 25):
+            query = self.vectors[row] + rng.normal(scale=0.05, size=128).astype(np.float32)
+            exact = set(np.argsort(-(self.vectors @ (query / np.linalg.norm(query))))[:k])
+            found = {int(chunk_id.split("-")[1]) for chunk_id, _ in index.search(query, k)}
+            total += len(exact & found) / k
+        return total / 20
+
+    def test_int8_truncated_recall(self):
+        """int8 codes of half the dimensions still recover the true neighbours."""
+        stats = build_quantized_index(self.collection, self.path, mode="int8", dims=64, batch_size=128)
+        self.assertEqual(stats['vectors'], 500)
+        self.assertGreaterEqual(self.recall(QuantizedVectorIndex(self.path)), 0.95)
+
+    def test_binary_recall_with_rescoring(self):
+        """Binary codes plus full-precision rescoring find the nearest vector."""
+        build_quantized_index(self.collection, self.path, mode="binary", dims=None)
+        index = QuantizedVectorIndex(self.path, oversample=10)
+        self.assertEqual(self.recall(index, k=1), 1.0)
+
+    def test_cosine_distances(self):
+        """Returned scores are cosine distances like ChromaDB's."""
+        build_quantized_index(self.collection, self.path)
+        chunk_id, distance = QuantizedVectorIndex(self.path).search(self.vectors[7], 1)[0]
+        self.assertEqual(chunk_id, "chunk-7")
+        self.assertAlmostEqual(distance, 0.0, places=5)
+
+        with self.assertRaises(ValueError):
+            QuantizedVectorIndex(self.path).search(self.vectors[7][:64], 1)
+
+    def test_resync_is_picked_up(self):
+        """A live reader remaps the new version; old array files are removed."""
+        build_quantized_index(self.collection, self.path)
+        index = QuantizedVectorIndex(self.path)
+        self.assertEqual(len(index), 500)
+
+        build_quantized_index(FakeCollection(self.vectors[:100]), self.path)
+        index.search(self.vectors[0], 1)
+        self.assertEqual(len(index), 100)
+        self.assertEqual(len([name for name in os.listdir(self.path) if name.endswith(".npy")]), 4)
+
+    def test_missing_mirror_is_unloaded(self):
+        """Without a sync the mirror stays unloaded."""
+        index = QuantizedVectorIndex(self.path)
+        self.assertFalse(index.is_loaded())
+        self.assertEqual(index.search(self.vectors[0], 5), [])
+
+
+class TestMirroredRetrieval(unittest.TestCase):
+    """Test suite for vector retrieval through the mirror."""
+
+    def test_vector_branch_uses_mirror(self):
+        """ANN candidates come from the mirror and chunks from a primary-key fetch."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vectors = random_vectors(50, 32)
+            collection = FakeCollection(vectors)
+            build_quantized_index(collection, temp_dir)
+
+            rag = OptimizedContextualRAGSystem.__new__(OptimizedContextualRAGSystem)
+            rag.quantized_index = QuantizedVectorIndex(temp_dir)
+            rag.embeddings = Mock()
+            rag.embeddings.embed_query.return_value = vectors[3].tolist()
+            rag.vectorstore = Mock(_collection=collection)
+            rag.reranker = Mock()
+            rag.reranker.is_available.return_value = False
+            rag.reranker.queue_depth.return_value = 0
+            rag.adaptive_retrieval = True
+            rag.retrieval_policy = AdaptiveRetrievalPolicy()
+
+            docs = rag._retrieve_vector_with_reranking("query", 3)
+
+        self.assertEqual(docs[0].id, "chunk-3")
+        self.assertEqual(docs[0].page_content, "text of chunk-3")
+        self.assertAlmostEqual(docs[0].metadata['_similarity_score'], 0.0, places=5)
+        rag.vectorstore.similarity_search_with_score.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
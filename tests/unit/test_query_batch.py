@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batched multi-query retrieval.
+
+Tests:
+- All queries share one embeddings request, one ANN call and one rerank pass
+- Per-query results keep the parallel_hybrid format and input order
+- Precise lookups still get their keyword branch
+- Failures in the batched path fall back to per-query retrieval
+"""
+
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add project root and src to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+from langchain_core.documents import Document
+from core.contextual_rag import OptimizedContextualRAGSystem
+from core.query_parser import QueryParser
+from core.retrieval_policy import AdaptiveRetrievalPolicy
+
+
+class FakeEmbeddings:
+    """Embeddings stand-in recording batch calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_queries(self, texts):
+        self.calls.append(list(texts))
+        return [[float(i)] for i in range(len(texts))]
+
+
+class FakeCollection:
+    """Collection stand-in answering multi-query ANN calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def query(self, query_embeddings, n_results, include):
+        self.calls.append(len(query_embeddings))
+        rows = range(len(query_embeddings))
+        return {
+            'ids': [[f"q{q}-c{c}" for c in range(4)] for q in rows],
+            'documents': [[f"query {q} chunk {c}" for c in range(4)] for q in rows],
+            'metadatas': [[{'source': 'x'} for _ in range(4)] for _ in rows],
+            'distances': [[0.30 + c * 0.01 for c in range(4)] for _ in rows],
+        }
+
+
+class FakeReranker:
+    """Reranker stand-in preferring later chunks."""
+
+    def __init__(self):
+        self.calls = []
+
+    def is_available(self):
+        return True
+
+    def queue_depth(self):
+        return 0
+
+    def rerank_many(self, requests, timeout=None):
+        self.calls.append(sum(len(docs) for _, docs in requests))
+        return [[float(i) for i in range(len(docs))] for _, docs in requests]
+
+
+class TestQueryBatch(unittest.TestCase):
+    """Test suite for OptimizedContextualRAGSystem.query_batch."""
+
+    def setUp(self):
+        """Create a RAG system around fake embeddings, collection and reranker."""
+        self.rag = OptimizedContextualRAGSystem.__new__(OptimizedContextualRAGSystem)
+        self.rag.embeddings = FakeEmbeddings()
+        self.rag.vectorstore = Mock(_collection=FakeCollection())
+        self.rag.reranker = FakeReranker()
+        self.rag.quantized_index = Mock(is_loaded=Mock(return_value=False))
+        self.rag.adaptive_retrieval = True
+        self.rag.retrieval_policy = AdaptiveRetrievalPolicy()
+        self.rag.lexical_retrieval = False
+        self.rag.query_parser = QueryParser()
+        self.rag._keyword_search = Mock(return_value=[Document(page_content="Article 22 text", metadata={})])
+
+    def test_single_pass_per_stage(self):
+        """Three queries cost one embeddings call, one ANN call and one rerank pass."""
+        queries = ["first question", "second question", "third question"]
+        results = self.rag.query_batch(queries)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.rag.embeddings.calls, [queries])
+        self.assertEqual(self.rag.vectorstore._collection.calls, [3])
+        self.assertEqual(self.rag.reranker.calls, [12])
+
+    def test_results_in_parallel_hybrid_format(self):
+        """Each result matches query() output for its own query."""
+        results = self.rag.query_batch(["first question", "What does GDPR Article 22 say?"])
+
+        first, second = results
+        self.assertEqual(first['search_strategy'], 'parallel_hybrid')
+        self.assertEqual(first['vector_results'][0]['page_content'], "query 0 chunk 3")
+        self.assertEqual(second['vector_results'][0]['page_content'], "query 1 chunk 3")
+        self.assertEqual(first['keyword_results'], [])
+        self.assertEqual(len(second['keyword_results']), 1)
+        self.assertEqual(second['query_info']['query_type'], 'precise_article')
+        self.assertEqual(first['query_info']['retrieval']['stop_reason'], 'batched')
+
+    def test_falls_back_to_single_queries(self):
+        """A failing batched ANN call degrades to query() per question."""
+        self.rag.vectorstore._collection.query = Mock(side_effect=RuntimeError("down"))
+        self.rag.query = Mock(side_effect=lambda text, k: {'query': text})
+
+        results = self.rag.query_batch(["a", "b"])
+        self.assertEqual(results, [{'query': "a"}, {'query': "b"}])
+
+    def test_empty_batch(self):
+        """No queries, no work."""
+        self.assertEqual(self.rag.query_batch([]), [])
+        self.assertEqual(self.rag.embeddings.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
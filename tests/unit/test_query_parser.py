@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the query parser.
+
+Tests:
+- Single articles with and without a regulation
+- Article lists, ranges, paragraphs and points
+- Regulation aliases for all seven crawled regulations
+- Topic words and several named regulations ("Article 5 of DORA ... crowdfunding")
+- Regulations added from the document registry
+- Dict view stays compatible with existing query_info consumers
+"""
+
+import json
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root and src to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+from core.query_parser import ArticleReference, QueryParser, RegulationRegistry
+
+
+class TestQueryParser(unittest.TestCase):
+    """Test suite for QueryParser."""
+
+    def setUp(self):
+        """Create a parser with the built-in registry."""
+        self.parser = QueryParser()
+
+    def test_article_with_regulation(self):
+        """Both 'Article N of X' and 'X Article N' resolve the source."""
+        for query in ("What does Article 22 of the GDPR say?", "GDPR Article 22 explained"):
+            info = self.parser.analyze(query)
+            self.assertEqual(info['article_number'], "Article 22")
+            self.assertEqual(info['regulation'], "gdpr")
+            self.assertEqual(info['source'], "crawled_content/gdpr.md")
+            self.assertEqual(info['query_type'], "precise_article")
+
+    def test_standalone_and_semantic(self):
+        """Queries without a regulation or article keep the old query types."""
+        self.assertEqual(self.parser.analyze("Explain Article 12")['query_type'], "precise_standalone")
+        info = self.parser.analyze("What is a crowdfunding service provider?")
+        self.assertFalse(info['is_precise_lookup'])
+        self.assertEqual(info['query_type'], "semantic")
+
+    def test_lists_and_ranges(self):
+        """Several articles per query, including ranges."""
+        parsed = self.parser.parse("Compare Articles 5-7 and 9 of DORA")
+        self.assertEqual([a.number for a in parsed.articles], [5, 6, 7, 9])
+        self.assertEqual(parsed.query_type, "multi_article")
+        self.assertEqual(parsed.regulation.key, "dora")
+
+    def test_regulation_cited_after_article(self):
+        """Topic words are not regulation names; the regulation an article is cited from wins."""
+        info = self.parser.analyze("What does Article 5 of DORA require for crowdfunding platforms?")
+        self.assertEqual(info['regulations'], ["dora"])
+        self.assertEqual(info['source'], "crawled_content/dora.md")
+        self.assertEqual(info['query_type'], "precise_article")
+
+        info = self.parser.analyze("How does scoring work under Article 19 ECSP?")
+        self.assertEqual(info['regulation'], "crowdfunding")
+        self.assertEqual(info['source'], "crawled_content/crowdfunding.md")
+
+        info = self.parser.analyze("Does Article 23 of the ECSP regulation cover credit scoring?")
+        self.assertEqual(info['regulations'], ["crowdfunding", "scoring"])
+        self.assertEqual(info['regulation'], "crowdfunding")
+
+    def test_paragraphs_and_points(self):
+        """Subdivisions are kept on the article reference."""
+        parsed = self.parser.parse("Does Article 23(4)(b) of the ECSP regulation apply?")
+        self.assertEqual(parsed.articles, [ArticleReference(23, "4", "b")])
+        self.assertEqual(parsed.regulation.key, "crowdfunding")
+
+        parsed = self.parser.parse("paragraph 2 of Article 5 DSA")
+        self.assertEqual(parsed.articles, [ArticleReference(5, "2")])
+
+    def test_regulation_numbers_are_not_articles(self):
+        """'2024/1773' names a regulation, not an article."""
+        parsed = self.parser.parse("Article 3 and Regulation 2024/1773")
+        self.assertEqual([a.number for a in parsed.articles], [3])
+        self.assertEqual(parsed.regulation.key, "dora_amend")
+
+    def test_all_crawled_regulations_known(self):
+        """Every crawled_content document has a registry entry."""
+        registry = RegulationRegistry()
+        for path in (project_root / "crawled_content").glob("*.md"):
+            self.assertIsNotNone(registry.get(path.stem), path.stem)
+
+    def test_document_registry_adds_regulations(self):
+        """Documents ingested later become recognisable regulations."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            registry_path = Path(temp_dir) / "document_registry.json"
+            registry_path.write_text(json.dumps({"docs/mica_regulation.md": {}, "docs/gdpr.md": {}}))
+            parser = QueryParser(RegulationRegistry.from_document_registry(str(registry_path)))
+
+        info = parser.analyze("Article 16 of the MiCA regulation")
+        self.assertEqual(info['source'], "docs/mica_regulation.md")
+        self.assertEqual(parser.analyze("GDPR Article 1")['source'], "docs/gdpr.md")
+
+
+if __name__ == "__main__":
+    unittest.main()
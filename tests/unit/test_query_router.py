@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the local query router fast path.
+
+Tests:
+- Rules decide article lookups, regulatory questions and small talk
+- Ambiguous turns are left to the LLM classifier
+- Labelled LLM decisions train the nearest-centroid stage
+- Centroids persist across restarts
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.query_router import LocalQueryRouter
+
+
+def analyzer(query):
+    """Minimal stand-in for OptimizedContextualRAGSystem._detect_query_type."""
+    is_precise = "article 5" in query.lower()
+    return {'is_precise_lookup': is_precise, 'confidence': 0.9 if is_precise else 1.0}
+
+
+class TopicEmbeddings:
+    """Embeds text along two topic axes so centroids are separable."""
+
+    def embed_query(self, text):
+        text = text.lower()
+        return [1.0 if "pitch" in text else 0.0, 1.0 if "weather" in text else 0.0, 0.1]
+
+
+class TestLocalQueryRouter(unittest.TestCase):
+    """Test suite for LocalQueryRouter."""
+
+    def setUp(self):
+        """Create a router with fake embeddings and a temporary history file."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.history_path = os.path.join(self.temp_dir.name, "centroids.npz")
+        self.router = LocalQueryRouter(
+            embeddings=TopicEmbeddings(),
+            query_analyzer=analyzer,
+            history_path=self.history_path,
+            min_examples_per_label=2,
+            save_every=1
+        )
+
+    def tearDown(self):
+        """Remove temporary files."""
+        self.temp_dir.cleanup()
+
+    def test_article_lookup_uses_rag(self):
+        """Precise article lookups are analytical RAG turns."""
+        decision = self.router.route("What does Article 5 require?")
+        self.assertEqual((decision.message_type, decision.should_use_rag, decision.path),
+                         ("analytical", True, "rules"))
+
+    def test_advisory_regulatory_question(self):
+        """Business concerns about a regulation route to the advisory agent."""
+        decision = self.router.route("We are worried about GDPR compliance for our platform")
+        self.assertEqual((decision.message_type, decision.should_use_rag), ("advisory", True))
+
+    def test_small_talk_skips_rag(self):
+        """Greetings never trigger retrieval."""
+        decision = self.router.route("Hello!")
+        self.assertFalse(decision.should_use_rag)
+
+    def test_ambiguous_turn_needs_llm(self):
+        """Without rules or centroids the router defers to the LLM."""
+        self.assertIsNone(self.router.route("Tell me more about our pitch"))
+
+    def test_centroid_learned_from_llm_decisions(self):
+        """Recorded LLM decisions let the centroid stage route similar turns."""
+        for _ in range(2):
+            self.router.record_llm_decision("review my pitch deck", "advisory", False)
+            self.router.record_llm_decision("what is the weather", "analytical", False)
+
+        decision = self.router.route("Tell me more about our pitch")
+        self.assertEqual((decision.message_type, decision.path), ("advisory", "centroid"))
+
+    def test_centroids_persist(self):
+        """Labelled history is reloaded by a new router instance."""
+        for _ in range(2):
+            self.router.record_llm_decision("review my pitch deck", "advisory", False)
+            self.router.record_llm_decision("what is the weather", "analytical", False)
+
+        restarted = LocalQueryRouter(
+            embeddings=TopicEmbeddings(),
+            query_analyzer=analyzer,
+            history_path=self.history_path,
+            min_examples_per_label=2
+        )
+        self.assertEqual(restarted.get_stats()['centroid_ready'], 2)
+        self.assertEqual(restarted.route("weather tomorrow").message_type, "analytical")
+
+
+if __name__ == "__main__":
+    unittest.main()
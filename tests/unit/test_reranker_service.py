@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared CrossEncoderReranker service.
+
+Tests:
+- Model is loaded once and reused across queries
+- Scores are aligned with the input documents
+- Concurrent requests are batched into a single forward pass
+- rerank_many works in chunks of max_batch_pairs that interactive requests can join
+- Requests abandoned after a timeout are not scored
+- Graceful behaviour when the model is unavailable
+"""
+
+import unittest
+import sys
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.reranker_service import CrossEncoderReranker
+
+
+class FakeCrossEncoder:
+    """Deterministic stand-in for sentence_transformers.CrossEncoder."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs):
+        self.calls.append(len(pairs))
+        return [float(len(doc)) for _, doc in pairs]
+
+
+class TestCrossEncoderReranker(unittest.TestCase):
+    """Test suite for CrossEncoderReranker."""
+
+    def setUp(self):
+        """Create a reranker with a fake model loader."""
+        self.load_count = 0
+        self.model = FakeCrossEncoder()
+
+        def loader():
+            self.load_count += 1
+            return self.model
+
+        self.reranker = CrossEncoderReranker(batch_window_ms=20.0, model_loader=loader)
+
+    def test_model_loaded_once(self):
+        """Model construction happens once for many queries."""
+        for _ in range(5):
+            self.reranker.rerank("query", ["a", "bb"])
+        self.assertEqual(self.load_count, 1)
+
+    def test_scores_aligned_with_docs(self):
+        """Scores are returned in input order."""
+        scores = self.reranker.rerank("query", ["aaa", "b", "cc"])
+        self.assertEqual(scores, [3.0, 1.0, 2.0])
+
+    def test_empty_docs(self):
+        """Empty input returns an empty score list without loading the model."""
+        self.assertEqual(self.reranker.rerank("query", []), [])
+        self.assertEqual(self.load_count, 0)
+
+    def test_concurrent_requests_batched(self):
+        """Concurrent callers share one forward pass."""
+        self.reranker.warmup()
+        results = {}
+
+        def worker(i):
+            results[i] = self.reranker.rerank(f"q{i}", ["x" * (i + 1)])
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual({i: results[i] for i in range(4)}, {i: [float(i + 1)] for i in range(4)})
+        self.assertLess(len(self.model.calls), 4)
+
+    def test_rerank_many_single_pass(self):
+        """rerank_many scores several small queries in one predict() call."""
+        results = self.reranker.rerank_many([("q1", ["a", "bb"]), ("q2", ["ccc"])])
+        self.assertEqual(results, [[1.0, 2.0], [3.0]])
+        self.assertEqual(self.model.calls, [3])
+
+    def test_rerank_many_chunked(self):
+        """Large rerank_many calls are split into passes of at most max_batch_pairs."""
+        self.reranker.max_batch_pairs = 2
+        results = self.reranker.rerank_many([("q1", ["a", "bb", "ccc"]), ("q2", ["dddd", "e"])])
+        self.assertEqual(results, [[1.0, 2.0, 3.0], [4.0, 1.0]])
+        self.assertEqual(self.model.calls, [2, 2, 1])
+
+    def test_interactive_request_not_stuck_behind_bulk(self):
+        """An interactive rerank queued during a bulk pass is scored before the rest of the bulk."""
+        release = threading.Event()
+        slow_calls = []
+
+        class SlowCrossEncoder:
+            def predict(self, pairs):
+                slow_calls.append([doc for _, doc in pairs])
+                if len(slow_calls) == 1:
+                    release.wait(5)
+                return [1.0] * len(pairs)
+
+        reranker = CrossEncoderReranker(batch_window_ms=0, max_batch_pairs=2, model_loader=SlowCrossEncoder)
+        bulk = threading.Thread(target=reranker.rerank_many, args=([("q", ["b1", "b2", "b3", "b4"])],))
+        bulk.start()
+        while not slow_calls:
+            threading.Event().wait(0.01)
+
+        interactive = threading.Thread(target=reranker.rerank, args=("q", ["chat"]))
+        interactive.start()
+        while reranker.queue_depth() == 0:
+            threading.Event().wait(0.01)
+        release.set()
+        bulk.join()
+        interactive.join()
+
+        self.assertEqual(slow_calls[0], ["b1", "b2"])
+        self.assertEqual(slow_calls[1][0], "chat")
+
+    def test_timed_out_request_not_scored(self):
+        """A caller that gave up is dropped from the queue instead of being scored later."""
+        release = threading.Event()
+        slow_calls = []
+
+        class SlowCrossEncoder:
+            def predict(self, pairs):
+                slow_calls.append([doc for _, doc in pairs])
+                release.wait(5)
+                return [1.0] * len(pairs)
+
+        reranker = CrossEncoderReranker(batch_window_ms=0, model_loader=SlowCrossEncoder)
+        busy = threading.Thread(target=reranker.rerank, args=("q", ["first"]))
+        busy.start()
+        while not slow_calls:
+            threading.Event().wait(0.01)
+
+        with self.assertRaises(FutureTimeoutError):
+            reranker.rerank("q", ["abandoned"], timeout=0.05)
+        release.set()
+        busy.join()
+
+        self.assertEqual(reranker.rerank("q", ["next"]), [1.0])
+        self.assertEqual(slow_calls, [["first"], ["next"]])
+        self.assertEqual(reranker.queue_depth(), 0)
+        self.assertEqual(reranker.get_stats()['cancelled'], 1)
+
+    def test_unavailable_model(self):
+        """Missing dependency disables reranking instead of raising."""
+        def failing_loader():
+            raise ImportError("sentence_transformers not installed")
+
+        reranker = CrossEncoderReranker(model_loader=failing_loader)
+        self.assertFalse(reranker.is_available())
+        self.assertIsNone(reranker.rerank("query", ["doc"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Unit tests for adaptive candidate-pool sizing and rerank early exit.
+
+Tests:
+- A clear ANN winner skips reranking
+- The rerank pool follows the similarity distribution
+- A busy reranker shrinks the pool
+- Reranking stops once scores saturate or stop improving
+- Decisions are exposed per query
+- Distances are converted according to the collection's distance space
+"""
+
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add project root and src to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+from langchain_core.documents import Document
+from core.contextual_rag import OptimizedContextualRAGSystem
+from core.retrieval_policy import AdaptiveRetrievalPolicy
+
+
+class FakeReranker:
+    """Reranker stand-in scoring documents from a lookup table."""
+
+    def __init__(self, scores):
+        self.scores = scores
+        self.calls = []
+
+    def is_available(self):
+        return True
+
+    def queue_depth(self):
+        return 0
+
+    def rerank(self, query, docs, timeout=None):
+        self.calls.append(len(docs))
+        return [self.scores[doc.page_content] for doc in docs]
+
+
+def make_rag(distances, scores):
+    """RAG system over a fake vectorstore returning the given cosine distances."""
+    rag = OptimizedContextualRAGSystem.__new__(OptimizedContextualRAGSystem)
+    rag.adaptive_retrieval = True
+    rag.retrieval_policy = AdaptiveRetrievalPolicy(rerank_round_size=4)
+    rag.reranker = FakeReranker(scores)
+    rag.vector_branch_timeout = 10.0
+    rag.quantized_index = Mock(is_loaded=Mock(return_value=False))
+    rag.vectorstore = Mock()
+    rag.vectorstore.similarity_search_with_score.side_effect = lambda query, k: [
+        (Document(page_content=f"doc{i}", metadata={}), distance)
+        for i, distance in enumerate(distances[:k])
+    ]
+    return rag
+
+
+class TestAdaptiveRetrievalPolicy(unittest.TestCase):
+    """Test suite for AdaptiveRetrievalPolicy decisions."""
+
+    def setUp(self):
+        """Create a policy with default thresholds."""
+        self.policy = AdaptiveRetrievalPolicy()
+
+    def test_clear_winner_skips_rerank(self):
+        """A top hit far ahead of the rest is returned without reranking."""
+        plan = self.policy.plan([0.82, 0.60, 0.58, 0.55], k=2)
+        self.assertFalse(plan['rerank'])
+        self.assertEqual(plan['reason'], 'clear_ann_winner')
+
+    def test_pool_follows_similarity_window(self):
+        """Only candidates close to the best hit are reranked."""
+        tight = [0.70 - i * 0.05 for i in range(20)]
+        flat = [0.70 - i * 0.001 for i in range(20)]
+        self.assertEqual(self.policy.plan(tight, k=5)['candidate_pool'], 8)
+        self.assertEqual(self.policy.plan(flat, k=5)['candidate_pool'], 20)
+
+    def test_busy_reranker_shrinks_pool(self):
+        """Under load the pool drops to the minimum."""
+        flat = [0.70 - i * 0.001 for i in range(20)]
+        plan = self.policy.plan(flat, k=4, queue_depth=10)
+        self.assertEqual(plan['candidate_pool'], 6)
+        self.assertEqual(plan['reason'], 'reranker_busy')
+
+    def test_early_exit_rules(self):
+        """Saturated or non-improving rounds end reranking."""
+        self.assertEqual(self.policy.should_stop([7.0, 8.0, 6.5], [7.0, 8.0, 6.5], k=3), 'scores_saturated')
+        self.assertEqual(self.policy.should_stop([3.0, 2.5, 2.0, -4.0], [-4.0], k=3), 'no_improvement')
+        self.assertIsNone(self.policy.should_stop([3.0, 2.5, 2.0, 1.9], [1.9], k=3))
+        self.assertIsNone(self.policy.should_stop([9.0], [9.0], k=3))
+
+    def test_distance_spaces(self):
+        """Cosine, inner-product and squared-l2 distances map to the same cosine similarity."""
+        self.assertAlmostEqual(AdaptiveRetrievalPolicy(space="cosine").similarity(0.3), 0.7)
+        self.assertAlmostEqual(AdaptiveRetrievalPolicy(space="ip").similarity(0.3), 0.7)
+        self.assertAlmostEqual(AdaptiveRetrievalPolicy(space="l2").similarity(0.6), 0.7)
+        with self.assertRaises(ValueError):
+            AdaptiveRetrievalPolicy(space="manhattan")
+
+
+class TestAdaptiveReranking(unittest.TestCase):
+    """Test suite for adaptive reranking in the vector branch."""
+
+    def test_skip_keeps_ann_order(self):
+        """Skipped reranking returns the ANN top k and records why."""
+        rag = make_rag([0.15, 0.40, 0.42, 0.45], {})
+        decisions = {}
+        docs = rag._retrieve_vector_with_reranking("query", 2, decisions)
+
+        self.assertEqual([d.page_content for d in docs], ["doc0", "doc1"])
+        self.assertEqual(rag.reranker.calls, [])
+        self.assertEqual(decisions['reason'], 'clear_ann_winner')
+        self.assertEqual(decisions['reranked'], 0)
+
+    def test_saturated_scores_stop_early(self):
+        """Once the top k are clearly relevant later rounds are not scored."""
+        distances = [0.30 + i * 0.001 for i in range(16)]
+        scores = {f"doc{i}": (9.0 - i if i < 4 else 0.0) for i in range(16)}
+        rag = make_rag(distances, scores)
+        decisions = {}
+        docs = rag._retrieve_vector_with_reranking("query", 3, decisions)
+
+        self.assertEqual(rag.reranker.calls, [4])
+        self.assertEqual(decisions['stop_reason'], 'scores_saturated')
+        self.assertEqual(decisions['candidate_pool'], 16)
+        self.assertEqual([d.page_content for d in docs], ["doc0", "doc1", "doc2"])
+
+    def test_later_round_can_win(self):
+        """Rounds continue while they still improve the top k."""
+        distances = [0.30 + i * 0.001 for i in range(8)]
+        scores = {f"doc{i}": float(i) for i in range(8)}
+        rag = make_rag(distances, scores)
+        decisions = {}
+        docs = rag._retrieve_vector_with_reranking("query", 2, decisions)
+
+        self.assertEqual(rag.reranker.calls, [4, 4])
+        self.assertEqual(decisions['stop_reason'], 'pool_exhausted')
+        self.assertEqual([d.page_content for d in docs], ["doc7", "doc6"])
+
+    def test_l2_collection_converts_distances(self):
+        """The collection's l2 space is read once and its distances are not treated as cosine."""
+        # Squared l2 distances of unit vectors: cosine similarities 0.85, 0.60, 0.58, 0.55
+        rag = make_rag([0.30, 0.80, 0.84, 0.90], {f"doc{i}": float(i) for i in range(4)})
+        rag.collection_name = "test"
+        rag._configure_distance_space(Mock(configuration={"hnsw": {"space": "l2"}}))
+        decisions = {}
+        rag._retrieve_vector_with_reranking("query", 2, decisions)
+
+        self.assertEqual(rag.retrieval_policy.space, "l2")
+        self.assertEqual(decisions['reason'], 'clear_ann_winner')
+        self.assertAlmostEqual(decisions['top_similarity'], 0.85)
+
+    def test_unknown_space_disables_adaptive_retrieval(self):
+        """Without a known distance space the fixed rerank pool is used."""
+        rag = make_rag([0.30, 0.80], {})
+        rag.collection_name = "test"
+        rag._configure_distance_space(Mock(configuration={"hnsw": {"space": "unknown"}}))
+        self.assertFalse(rag.adaptive_retrieval)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the indexed session catalog.
+
+Tests:
+- Pages are ordered by last activity and filtered by user
+- Archived sessions are listed separately
+- Partial thread IDs resolve through the primary key
+- Existing checkpoints are backfilled once
+- Listing uses the user/activity index
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.session_catalog import SessionCatalog, user_id_for_thread
+
+
+class FakeCheckpointer:
+    """Checkpointer stand-in listing checkpoints newest first."""
+
+    def __init__(self, checkpoints):
+        self.checkpoints = checkpoints
+
+    def list(self, config, limit=None):
+        for thread_id, channel_values in self.checkpoints:
+            yield SimpleNamespace(
+                config={"configurable": {"thread_id": thread_id}},
+                checkpoint={"channel_values": channel_values}
+            )
+
+
+class TestSessionCatalog(unittest.TestCase):
+    """Test suite for SessionCatalog."""
+
+    def setUp(self):
+        """Create a catalog in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.catalog = SessionCatalog(os.path.join(self.temp_dir.name, "catalog.db"))
+
+    def tearDown(self):
+        """Close the catalog and remove temporary files."""
+        self.catalog.close()
+        self.temp_dir.cleanup()
+
+    def test_user_id_from_thread(self):
+        """User keys are parsed from prefixed thread IDs."""
+        self.assertEqual(user_id_for_thread("user_auth0_123_0b5c-77"), "auth0_123")
+        self.assertIsNone(user_id_for_thread("0b5c-77"))
+        self.assertIsNone(user_id_for_thread("temp_1234"))
+
+    def test_list_orders_and_filters_by_user(self):
+        """Listing returns the user's sessions newest first."""
+        self.catalog.upsert("user_alice_a1", created_at="2025-01-01T00:00:00", last_activity="2025-01-02T00:00:00")
+        self.catalog.upsert("user_alice_a2", created_at="2025-01-01T00:00:00", last_activity="2025-01-03T00:00:00")
+        self.catalog.upsert("user_bob_b1", created_at="2025-01-01T00:00:00", last_activity="2025-01-04T00:00:00")
+
+        sessions = self.catalog.list(limit=10, user_id="alice")
+        self.assertEqual([s["thread_id"] for s in sessions], ["user_alice_a2", "user_alice_a1"])
+        self.assertEqual(len(self.catalog.list(limit=1, offset=1)), 1)
+
+    def test_archived_sessions_listed_separately(self):
+        """Archived sessions move from the active list to the archived list."""
+        self.catalog.upsert("s1", created_at="2025-01-01T00:00:00")
+        self.assertTrue(self.catalog.update("s1", archived=True, archived_at="2025-01-05T00:00:00"))
+
+        self.assertEqual(self.catalog.list(), [])
+        archived = self.catalog.list(archived=True)
+        self.assertEqual(archived[0]["archived_at"], "2025-01-05T00:00:00")
+        self.assertTrue(archived[0]["archived"])
+
+    def test_update_missing_row(self):
+        """Updating an unknown session reports False."""
+        self.assertFalse(self.catalog.update("missing", title="x"))
+
+    def test_find_by_prefix(self):
+        """Partial IDs resolve to the full thread ID."""
+        self.catalog.upsert("abcdef-123", created_at="2025-01-01T00:00:00")
+        self.assertEqual(self.catalog.find_by_prefix("abcd"), "abcdef-123")
+        self.assertIsNone(self.catalog.find_by_prefix("zz"))
+
+    def test_backfill_keeps_latest_checkpoint(self):
+        """Backfill records one row per thread from its newest checkpoint."""
+        checkpointer = FakeCheckpointer([
+            ("t1", {"session_metadata": {"created_at": "2025-01-01", "last_activity": "2025-01-03", "title": "new"},
+                    "messages": [1, 2, 3]}),
+            ("t1", {"session_metadata": {"created_at": "2025-01-01", "last_activity": "2025-01-02", "title": "old"},
+                    "messages": [1]}),
+            ("t2", {"created_at": "2025-01-01"}),
+        ])
+
+        self.assertEqual(self.catalog.backfill_from_checkpointer(checkpointer), 2)
+        session = self.catalog.get("t1")
+        self.assertEqual((session["title"], session["message_count"]), ("new", 3))
+
+    def test_listing_uses_index(self):
+        """User listing is served by the user/activity index."""
+        plan = self.catalog._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM session_catalog WHERE archived = 0 AND user_id = 'u' "
+            "ORDER BY last_activity DESC LIMIT 10"
+        ).fetchall()
+        self.assertIn("idx_session_catalog_user_activity", " ".join(str(tuple(row)) for row in plan))
+
+
+if __name__ == "__main__":
+    unittest.main()
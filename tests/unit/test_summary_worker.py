@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Unit tests for background medium-term memory summarisation.
+
+Tests:
+- Turns return without waiting for the summary LLM call
+- Jobs queued for the same thread are coalesced into the latest one
+- Summaries are written through the writer callback, never in the middle of a turn
+- Without a writer the summary is still created inline
+- Incremental updates only send messages past the watermark
+- Prompt size stays within the token budget; messages past it are left pending
+- Checkpoints written before the watermark resume where their summary stopped
+- Per-session cost counters accumulate, also when written by the background worker
+- A job queued behind a running one starts from the stored state, not its turn's snapshot
+"""
+
+import unittest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root and src to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import HumanMessage, AIMessage
+from memory.memory_manager import MemoryManager, count_tokens
+from memory.summary_worker import SummaryWorker, ThreadLocks
+
+
+class SlowLLM:
+    """LLM stand-in that takes a while, counts calls and keeps prompts."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = 0
+        self.prompts = []
+
+    def invoke(self, messages):
+        self.calls += 1
+        self.prompts.append(messages[0].content)
+        time.sleep(self.delay)
+        return AIMessage(content=f"summary {self.calls}")
+
+
+def conversation(turns, start=0, answer="answer"):
+    """Build a conversation with the given number of exchanges and message IDs."""
+    messages = []
+    for i in range(start, start + turns):
+        question = HumanMessage(content=f"question {i}")
+        question.id = f"q{i}"
+        reply = AIMessage(content=f"{answer} {i}")
+        reply.id = f"a{i}"
+        messages.extend([question, reply])
+    return messages
+
+
+class TestSummaryWorker(unittest.TestCase):
+    """Test suite for SummaryWorker."""
+
+    def test_pending_jobs_coalesce(self):
+        """Only the latest waiting job per thread runs."""
+        worker = SummaryWorker(max_workers=1)
+        release = threading.Event()
+        written = []
+        writer = lambda thread_id, updates: written.append((thread_id, updates["value"]))
+
+        worker.submit("blocker", lambda: release.wait() and {"value": 0}, writer)
+        for value in range(1, 4):
+            worker.submit("thread-a", lambda value=value: {"value": value}, writer)
+        release.set()
+
+        self.assertTrue(worker.flush(timeout=5))
+        self.assertEqual(written, [("blocker", 0), ("thread-a", 3)])
+        self.assertEqual(worker.get_stats()['coalesced'], 2)
+
+    def test_job_for_running_thread_runs_after(self):
+        """A job submitted while the same thread is running is not lost."""
+        worker = SummaryWorker(max_workers=2)
+        release = threading.Event()
+        written = []
+        writer = lambda thread_id, updates: written.append(updates["value"])
+
+        worker.submit("thread-a", lambda: release.wait() and {"value": 1}, writer)
+        time.sleep(0.05)
+        worker.submit("thread-a", lambda: {"value": 2}, writer)
+        release.set()
+
+        self.assertTrue(worker.flush(timeout=5))
+        self.assertEqual(written, [1, 2])
+
+    def test_write_waits_for_running_turn(self):
+        """A summary finished during a turn is merged into the state the turn stored."""
+        locks = ThreadLocks()
+        worker = SummaryWorker(max_workers=1, locks=locks)
+        store = {"thread-a": {"messages": ["q1"], "medium_term_summary": None}}
+
+        def write_summary(thread_id, updates):
+            state = dict(store[thread_id])
+            state["medium_term_summary"] = updates["summary"]
+            store[thread_id] = state
+
+        with locks.hold("thread-a"):
+            state = dict(store["thread-a"])
+            worker.submit("thread-a", lambda: {"summary": "summary 1"}, write_summary)
+            time.sleep(0.1)
+            state["messages"] = state["messages"] + ["q2"]
+            store["thread-a"] = state
+
+        self.assertTrue(worker.flush(timeout=5))
+        self.assertEqual(store["thread-a"], {"messages": ["q1", "q2"], "medium_term_summary": "summary 1"})
+        self.assertEqual(len(locks), 0)
+
+    def test_failed_job_is_counted(self):
+        """Job errors are recorded and do not stop the worker."""
+        worker = SummaryWorker(max_workers=1)
+        written = []
+        worker.submit("thread-a", lambda: 1 / 0, lambda *args: written.append(args))
+        worker.submit("thread-b", lambda: {"value": 1}, lambda *args: written.append(args))
+
+        self.assertTrue(worker.flush(timeout=5))
+        self.assertEqual(worker.get_stats()['failed'], 1)
+        self.assertEqual(len(written), 1)
+
+
+class TestBackgroundMemoryUpdate(unittest.TestCase):
+    """Test suite for MemoryManager background summaries."""
+
+    def test_turn_does_not_wait_for_summary(self):
+        """Scheduling returns immediately and the writer gets the summary."""
+        llm = SlowLLM(delay=0.3)
+        manager = MemoryManager(llm)
+        written = {}
+
+        start = time.time()
+        updates = manager.update_medium_term_memory(
+            {"messages": conversation(20), "context": {}},
+            thread_id="thread-a",
+            writer=lambda thread_id, updates: written.update({thread_id: updates})
+        )
+
+        self.assertEqual(updates, {})
+        self.assertLess(time.time() - start, 0.1)
+        self.assertTrue(manager.summary_worker.flush(timeout=5))
+        self.assertEqual(written["thread-a"]["medium_term_summary"], "summary 1")
+        self.assertEqual(written["thread-a"]["context"]["summary_watermark_id"], "a9")
+
+    def test_queued_job_reads_stored_state(self):
+        """A job submitted while another runs for the same thread does not re-summarize its delta."""
+        llm = SlowLLM(delay=0.2)
+        manager = MemoryManager(llm)
+        store = {"thread-a": {"messages": conversation(20), "context": {}}}
+        writer = lambda thread_id, updates: store[thread_id].update(
+            manager.merge_summary_update(store[thread_id], updates)
+        )
+
+        manager.update_medium_term_memory(dict(store["thread-a"]), "thread-a", writer, reader=store.get)
+        time.sleep(0.05)
+        # The next turn's snapshot was taken before the running job wrote its watermark
+        store["thread-a"]["messages"] = store["thread-a"]["messages"] + conversation(8, start=20)
+        manager.update_medium_term_memory(dict(store["thread-a"]), "thread-a", writer, reader=store.get)
+
+        self.assertTrue(manager.summary_worker.flush(timeout=5))
+        self.assertEqual(llm.calls, 2)
+        self.assertNotIn("question 9\n", llm.prompts[-1])
+        self.assertIn("question 10", llm.prompts[-1])
+        cost = manager.get_summary_cost(store["thread-a"])
+        self.assertEqual((cost["calls"], cost["messages_summarized"]), (2, 36))
+
+    def test_merge_adds_cost_to_stored_counters(self):
+        """Writing an update adds its cost to the stored counters instead of replacing them."""
+        stored = {"context": {"summary_cost": {"calls": 3, "prompt_tokens": 900}, "topic": "ECSP"}}
+        updates = {"medium_term_summary": "summary", "context": {"summary_watermark_id": "a9"},
+                   "summary_cost": {"calls": 1, "prompt_tokens": 100}}
+
+        merged = MemoryManager.merge_summary_update(stored, updates)
+        self.assertEqual(merged["context"]["summary_cost"], {"calls": 4, "prompt_tokens": 1000})
+        self.assertEqual(merged["context"]["topic"], "ECSP")
+        self.assertEqual(merged["context"]["summary_watermark_id"], "a9")
+
+    def test_inline_fallback_without_writer(self):
+        """Without a thread and writer the summary is returned directly."""
+        manager = MemoryManager(SlowLLM(delay=0), background_summaries=False)
+        updates = manager.update_medium_term_memory({"messages": conversation(20), "context": {}})
+        self.assertEqual(updates["medium_term_summary"], "summary 1")
+
+
+class TestIncrementalSummaries(unittest.TestCase):
+    """Test suite for watermark-based incremental summaries."""
+
+    def setUp(self):
+        """Create a manager that summarizes inline."""
+        self.llm = SlowLLM(delay=0)
+        self.manager = MemoryManager(self.llm, background_summaries=False)
+
+    def test_no_summary_for_short_conversation(self):
+        """Messages still in the short-term window are not summarized."""
+        state = {"messages": conversation(5), "context": {}}
+        self.assertFalse(self.manager.should_create_summary(state))
+        self.assertEqual(self.manager.update_medium_term_memory(state), {})
+        self.assertEqual(self.llm.calls, 0)
+
+    def test_update_sends_only_delta(self):
+        """The second summary only contains messages after the watermark."""
+        messages = conversation(20)
+        first = self.manager.update_medium_term_memory({"messages": messages, "context": {}})
+
+        messages = messages + conversation(8, start=20)
+        state = {"messages": messages, "medium_term_summary": first["medium_term_summary"], "context": first["context"]}
+        second = self.manager.update_medium_term_memory(state)
+
+        prompt = self.llm.prompts[-1]
+        self.assertIn("summary 1", prompt)
+        self.assertIn("question 10", prompt)
+        self.assertNotIn("question 9\n", prompt)
+        self.assertEqual(second["context"]["summary_watermark_id"], "a17")
+
+    def test_prompt_respects_token_budget(self):
+        """Long backlogs are folded in oldest-first across passes, within the budget."""
+        self.manager.summary_prompt_token_budget = 700
+        long_answer = "detailed regulatory answer " * 200
+        messages = conversation(40, answer=long_answer)
+        first = self.manager.update_medium_term_memory({"messages": messages, "context": {}})
+
+        prompt = self.llm.prompts[-1]
+        self.assertLessEqual(count_tokens(prompt), 700)
+        self.assertIn("question 0\n", prompt)
+        self.assertNotIn("question 29", prompt)
+
+        # The watermark stops at the last message in the prompt; the rest stays pending
+        index = [message.id for message in messages].index(first["context"]["summary_watermark_id"])
+        self.assertEqual(first["context"]["summarized_message_count"], index + 1)
+        self.assertEqual(first["context"]["summary_cost"]["messages_summarized"], index + 1)
+        pending = self.manager.get_unsummarized_messages(messages, first["context"])
+        self.assertIs(pending[0], messages[index + 1])
+
+        state = {"messages": messages, "medium_term_summary": first["medium_term_summary"], "context": first["context"]}
+        second = self.manager.update_medium_term_memory(state)
+        self.assertNotIn("question 0\n", self.llm.prompts[-1])
+        self.assertIn(messages[index + 1].content[:20], self.llm.prompts[-1])
+        self.assertEqual(second["context"]["summarized_message_count"],
+                         second["context"]["summary_cost"]["messages_summarized"])
+
+    def test_legacy_count_includes_window(self):
+        """An older checkpoint's count (short-term window included) does not skip messages."""
+        # Older versions summarized messages[:-20] and stored len(messages) = 40
+        messages = [HumanMessage(content=f"question {i}") for i in range(60)]
+        pending = self.manager.get_unsummarized_messages(messages, {"last_summary_message_count": 40})
+
+        self.assertIs(pending[0], messages[20])
+        self.assertIs(pending[-1], messages[39])
+
+    def test_cost_counters_accumulate(self):
+        """Each summary adds to the session cost counters."""
+        messages = conversation(20)
+        first = self.manager.update_medium_term_memory({"messages": messages, "context": {}})
+        state = {"messages": messages + conversation(8, start=20),
+                 "medium_term_summary": first["medium_term_summary"], "context": first["context"]}
+        state.update(self.manager.update_medium_term_memory(state))
+
+        cost = self.manager.get_summary_cost(state)
+        self.assertEqual(cost["calls"], 2)
+        self.assertEqual(cost["messages_summarized"], 36)
+        self.assertGreater(cost["prompt_tokens"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the bounded temporary session store.
+
+Tests:
+- LRU eviction by session count and memory budget
+- Idle sessions expire after the TTL
+- Per-session message cap keeps the summary watermark consistent
+- Evicted sessions spill to disk and are restored on access
+- Metrics callback receives entry count and bytes held (throttled for both backends)
+- Expired spilled sessions are cleaned up every cleanup_every writes
+- The shared SQLite backend is visible across store instances (workers)
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import HumanMessage
+from src.core.temporary_session_store import (
+    TemporarySessionBackend,
+    TemporarySessionStore,
+    SharedTemporarySessionStore,
+    create_temporary_session_store
+)
+
+
+def session(message_count=1, size=10):
+    """Build a temporary session state."""
+    return {
+        "messages": [HumanMessage(content="x" * size) for _ in range(message_count)],
+        "session_metadata": {"temporary": True}
+    }
+
+
+class TestTemporarySessionStore(unittest.TestCase):
+    """Test suite for TemporarySessionStore."""
+
+    def test_lru_eviction_by_count(self):
+        """The least recently used session is evicted first."""
+        store = TemporarySessionStore(max_sessions=2)
+        store["temp_a"] = session()
+        store["temp_b"] = session()
+        store.get("temp_a")
+        store["temp_c"] = session()
+
+        self.assertIn("temp_a", store)
+        self.assertNotIn("temp_b", store)
+        self.assertEqual(store.get_stats()['evicted_lru'], 1)
+
+    def test_memory_budget(self):
+        """Sessions are evicted once the memory budget is exceeded."""
+        store = TemporarySessionStore(max_memory_mb=0.05)
+        for i in range(5):
+            store[f"temp_{i}"] = session(size=20000)
+
+        stats = store.get_stats()
+        self.assertLessEqual(stats['bytes_held'], stats['max_bytes'])
+        self.assertGreater(stats['evicted_memory'], 0)
+        self.assertIn("temp_4", store)
+
+    def test_ttl_expiry(self):
+        """Idle sessions expire."""
+        store = TemporarySessionStore(ttl_seconds=0.05)
+        store["temp_a"] = session()
+        time.sleep(0.1)
+        self.assertIsNone(store.get("temp_a"))
+        self.assertEqual(store.get_stats()['expired'], 1)
+
+    def test_message_cap_adjusts_watermark(self):
+        """Oldest messages are dropped and the summary count follows."""
+        store = TemporarySessionStore(max_messages_per_session=10)
+        state = session(message_count=15)
+        state["context"] = {"summarized_message_count": 8}
+        store["temp_a"] = state
+
+        self.assertEqual(len(store["temp_a"]["messages"]), 10)
+        self.assertEqual(store["temp_a"]["context"]["summarized_message_count"], 3)
+
+    def test_spill_and_restore(self):
+        """Evicted sessions are written to disk and restored on access."""
+        with tempfile.TemporaryDirectory() as spill_dir:
+            store = TemporarySessionStore(max_sessions=1, spill_dir=spill_dir)
+            store["temp_a"] = session(message_count=3)
+            store["temp_b"] = session()
+
+            self.assertEqual(len(store), 1)
+            restored = store["temp_a"]
+            self.assertEqual(len(restored["messages"]), 3)
+            self.assertEqual(store.get_stats()['restored'], 1)
+
+    def test_metrics_callback(self):
+        """The callback sees entry count and bytes held."""
+        events = []
+        store = TemporarySessionStore(report_interval=0, metrics_callback=lambda **kwargs: events.append(kwargs))
+        store["temp_a"] = session()
+        del store["temp_a"]
+
+        self.assertEqual(events[0]['entries'], 1)
+        self.assertGreater(events[0]['bytes_held'], 0)
+        self.assertEqual(events[-1]['entries'], 0)
+
+    def test_spill_cleanup_and_reports_are_periodic(self):
+        """Writes neither purge the spill store nor count it; every cleanup_every-th write does both."""
+        events = []
+        with tempfile.TemporaryDirectory() as spill_dir:
+            store = TemporarySessionStore(max_sessions=1, ttl_seconds=0.05, spill_dir=spill_dir, cleanup_every=4,
+                                          report_interval=60, metrics_callback=lambda **kwargs: events.append(kwargs))
+            store["temp_a"] = session()
+            store["temp_b"] = session()
+            time.sleep(0.1)
+            store["temp_c"] = session()
+            spilled = lambda: [row[0] for row in store._spill_conn.execute("SELECT session_id FROM temporary_sessions")]
+            self.assertEqual(spilled(), ["temp_a"])
+            self.assertEqual(len(events), 1)
+
+            store["temp_d"] = session()
+            self.assertEqual(spilled(), ["temp_c"])
+            self.assertEqual([event['spilled'] for event in events], [0, 1])
+
+
+class TestSharedTemporarySessionStore(unittest.TestCase):
+    """Test suite for SharedTemporarySessionStore."""
+
+    def setUp(self):
+        """Create a shared store file in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "temporary_sessions.db")
+
+    def tearDown(self):
+        """Remove temporary files."""
+        self.temp_dir.cleanup()
+
+    def test_sessions_shared_between_workers(self):
+        """A session written by one worker is read by another."""
+        worker_a = SharedTemporarySessionStore(self.db_path)
+        worker_b = SharedTemporarySessionStore(self.db_path)
+
+        worker_a["temp_a"] = session(message_count=2)
+        state = worker_b["temp_a"]
+        state["messages"].append(HumanMessage(content="follow-up"))
+        worker_b["temp_a"] = state
+
+        self.assertEqual(len(worker_a["temp_a"]["messages"]), 3)
+
+    def test_ttl_and_lru_cleanup(self):
+        """Expired and least recently used sessions are removed."""
+        store = SharedTemporarySessionStore(self.db_path, max_sessions=2, cleanup_every=1)
+        for i in range(3):
+            store[f"temp_{i}"] = session()
+        self.assertEqual(store.get_stats()['entries'], 2)
+        self.assertNotIn("temp_0", store)
+
+        expiring = SharedTemporarySessionStore(self.db_path, ttl_seconds=0.05)
+        time.sleep(0.1)
+        self.assertIsNone(expiring.get("temp_2"))
+
+    def test_metrics_reporting_is_throttled(self):
+        """Writes report at most once per interval; cleanup passes always report."""
+        events = []
+        store = SharedTemporarySessionStore(self.db_path, cleanup_every=3, report_interval=60,
+                                            metrics_callback=lambda **kwargs: events.append(kwargs))
+        store["temp_a"] = session()
+        store["temp_b"] = session()
+        del store["temp_a"]
+        self.assertEqual([event['entries'] for event in events], [1])
+
+        store["temp_c"] = session()
+        self.assertEqual([event['entries'] for event in events], [1, 2])
+
+    def test_factory(self):
+        """The factory picks the backend and drops options it does not use."""
+        self.assertIsInstance(create_temporary_session_store("memory", db_path=self.db_path), TemporarySessionStore)
+        self.assertIsInstance(create_temporary_session_store("sqlite", db_path=self.db_path, spill_dir=None),
+                              SharedTemporarySessionStore)
+        with self.assertRaises(ValueError):
+            create_temporary_session_store("redis")
+        with self.assertRaises(TypeError):
+            TemporarySessionBackend()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -70,6 +70,35 @@ def test_api():
         else:
             print(f"   ❌ Follow-up failed: {response.status_code}")
         
+        # Test 4b: Streaming chat (server-sent events)
+        print("\n4b. Testing streaming chat...")
+        chat_request = {
+            "message": "What are the authorisation requirements under the crowdfunding regulation?",
+            "session_id": session_id
+        }
+        start = time.time()
+        first_token_time = None
+        events = []
+        with requests.post(f"{API_BASE}/chat/stream", json=chat_request, stream=True) as response:
+            if response.status_code == 200:
+                event_name = None
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith("event: "):
+                        event_name = line[len("event: "):]
+                    elif line.startswith("data: "):
+                        events.append((event_name, json.loads(line[len("data: "):])))
+                        if event_name == "token" and first_token_time is None:
+                            first_token_time = time.time() - start
+                names = [name for name, _ in events]
+                if names and names[0] == "metadata" and names[-1] == "done":
+                    print("   ✅ Stream completed")
+                    print(f"   ⏱️ First token after {first_token_time or 0:.2f}s, total {time.time() - start:.2f}s")
+                    print(f"   🔍 Retrieval: {events[0][1].get('retrieval')}")
+                else:
+                    print(f"   ❌ Unexpected event sequence: {names[:3]}...{names[-1:]}")
+            else:
+                print(f"   ❌ Streaming chat failed: {response.status_code}")
+
         # Test 5: Lunar information
         print("\n5. Testing lunar endpoint...")
         response = requests.get(f"{API_BASE}/lunar")
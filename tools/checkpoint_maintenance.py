@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Maintenance for the LangGraph Session Database
+Offline retention pruning and compaction - stop the API/CLI before running prune or compact.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src to path for local imports
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.checkpoint_store import PooledSqliteSaver
+
+
+def format_size(num_bytes: int) -> str:
+    """Format a byte count as MB."""
+    return f"{num_bytes / (1024 * 1024):.2f} MB"
+
+
+def print_stats(store: PooledSqliteSaver):
+    """Print checkpoint table statistics."""
+    stats = store.get_storage_stats()
+    print("📊 Checkpoint Database Statistics:")
+    print(f"  🧵 Threads: {stats['threads']}")
+    print(f"  💾 Checkpoints: {stats['checkpoints']}")
+    print(f"  ✍️  Pending Writes: {stats['writes']}")
+    print(f"  📈 Avg Checkpoints/Thread: {stats['avg_checkpoints_per_thread']:.1f}")
+    print(f"  📦 File Size: {format_size(stats['file_size_bytes'])}")
+
+
+def main():
+    """Main CLI interface"""
+    parser = argparse.ArgumentParser(description="Checkpoint database maintenance")
+    parser.add_argument("command", choices=["stats", "prune", "vacuum", "compact"],
+                        help="compact = prune followed by vacuum")
+    parser.add_argument("--db", default="data/sessions/graph_checkpoints.db", help="Checkpoint database path")
+    parser.add_argument("--keep", type=int, default=10, help="Checkpoints to keep per thread")
+
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Database not found: {args.db}")
+        sys.exit(1)
+    if args.keep < 1:
+        print("❌ Error: --keep must be at least 1")
+        sys.exit(1)
+
+    store = PooledSqliteSaver(args.db, keep_latest=args.keep)
+    try:
+        if args.command == "stats":
+            print_stats(store)
+
+        if args.command in ("prune", "compact"):
+            deleted = store.prune_all(keep_latest=args.keep)
+            print(f"🧹 Pruned {deleted} checkpoints (keeping latest {args.keep} per thread)")
+
+        if args.command in ("vacuum", "compact"):
+            sizes = store.vacuum()
+            print(f"🗜️  Vacuumed: {format_size(sizes['size_before'])} → {format_size(sizes['size_after'])}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
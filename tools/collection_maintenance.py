@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Collection Maintenance for the ChromaDB Vector Store
+Reports effective HNSW parameters, tunes ef_search, rebuilds the collection with new HNSW
+parameters from its stored embeddings (no embeddings API calls) and benchmarks ef_search
+values on the real query log.
+
+HNSW settings are read when a process first loads the index: restart the API after tune
+or rebuild. Run rebuild with ingestion stopped.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Add src to path for local imports
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.insert(0, str(project_root))
+
+import chromadb
+
+from src.cache.embedding_cache import EmbeddingCache
+from src.core.contextual_rag import OptimizedContextualRAGSystem
+
+
+BUILD_PARAMETERS = ("space", "ef_construction", "max_neighbors")
+# Metadata keys left over from the pre-crowdfunding knowledge base
+STALE_METADATA_KEYS = ("domains",)
+
+
+def open_collection(client, name: str):
+    """Open a collection without attaching an embedding function."""
+    return client.get_collection(name=name, embedding_function=None)
+
+
+def effective_hnsw(collection) -> Dict[str, Any]:
+    """HNSW parameters the collection was created with (plus the current ef_search)."""
+    return dict((collection.configuration or {}).get('hnsw') or {})
+
+
+def find_issues(collection) -> List[str]:
+    """Differences between the collection and the expected configuration."""
+    expected = OptimizedContextualRAGSystem.HNSW_CONFIG
+    hnsw = effective_hnsw(collection)
+    issues = []
+    for key in BUILD_PARAMETERS:
+        if key in hnsw and hnsw[key] != expected[key]:
+            issues.append(f"{key} is {hnsw[key]} (expected {expected[key]}) - needs rebuild")
+    if hnsw.get('ef_search') != expected['ef_search']:
+        issues.append(f"ef_search is {hnsw.get('ef_search')} (default {expected['ef_search']}) - tunable in place")
+    for key in STALE_METADATA_KEYS:
+        if key in (collection.metadata or {}):
+            issues.append(f"stale metadata '{key}': {collection.metadata[key]}")
+    return issues
+
+
+def print_report(collection):
+    """Print effective index parameters, metadata and issues."""
+    print(f"📊 Collection '{collection.name}': {collection.count()} vectors")
+    print("  🔧 Effective HNSW parameters:")
+    for key, value in sorted(effective_hnsw(collection).items()):
+        print(f"     {key}: {value}")
+    print("  🏷️  Metadata:")
+    for key, value in sorted((collection.metadata or {}).items()):
+        print(f"     {key}: {value}")
+
+    issues = find_issues(collection)
+    if issues:
+        print("  ⚠️  Issues:")
+        for issue in issues:
+            print(f"     - {issue}")
+    else:
+        print("  ✅ Matches the expected configuration")
+
+
+def tune_ef_search(collection, ef_search: int):
+    """Persist a new ef_search (applies to processes that load the index afterwards)."""
+    collection.modify(configuration={"hnsw": {"ef_search": ef_search}})
+
+
+def rebuild_collection(client, name: str, hnsw: Dict[str, Any], page_size: int = 500,
+                       keep_backup: bool = True, keep_ids: Optional[set] = None,
+                       max_dropped: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Copy a collection into one built with new HNSW parameters and swap the names.
+
+    IDs, documents, metadata and stored embeddings are copied as-is, so the
+    article, BM25 and quantized indexes (keyed by chunk ID) stay valid.
+    With keep_ids only those chunks are copied (orphans are left behind); with
+    max_dropped the swap is aborted if a larger share of the collection would be
+    left behind, and the original is kept untouched.
+
+    Returns:
+        Rebuild statistics (including the backup collection name, if kept)
+    """
+    start_time = time.time()
+    source = open_collection(client, name)
+    total = source.count()
+    stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+
+    metadata = OptimizedContextualRAGSystem.collection_metadata(
+        created=(source.metadata or {}).get('created')
+    )
+    target_name = f"{name}_rebuild_{stamp}"
+    target = client.create_collection(
+        name=target_name,
+        metadata=metadata,
+        configuration={"hnsw": hnsw},
+        embedding_function=None
+    )
+
+    try:
+        copied = 0
+        for offset in range(0, total, page_size):
+            page = source.get(limit=page_size, offset=offset, include=["embeddings", "documents", "metadatas"])
+            if not len(page['ids']):
+                break
+            rows = [i for i, chunk_id in enumerate(page['ids']) if keep_ids is None or chunk_id in keep_ids]
+            if rows:
+                target.add(
+                    ids=[page['ids'][i] for i in rows],
+                    embeddings=[page['embeddings'][i] for i in rows],
+                    documents=[page['documents'][i] for i in rows],
+                    metadatas=[page['metadatas'][i] for i in rows]
+                )
+            copied += len(rows)
+            print(f"  📦 Copied {copied} of {total} vectors", end="\r")
+        print()
+
+        if target.count() != copied:
+            raise RuntimeError(f"copied {target.count()} of {copied} vectors")
+        if max_dropped is not None and total and (total - copied) / total > max_dropped:
+            raise RuntimeError(f"only {copied} of {total} vectors are registered - "
+                               f"refusing to drop {total - copied} (check the registry)")
+    except Exception:
+        client.delete_collection(target_name)
+        raise
+
+    # Swap: original -> backup, rebuilt -> original name
+    backup_name = f"{name}_backup_{stamp}"
+    source.modify(name=backup_name)
+    target.modify(name=name)
+    if not keep_backup:
+        client.delete_collection(backup_name)
+
+    return {
+        'vectors': copied,
+        'dropped': total - copied,
+        'hnsw': hnsw,
+        'backup': backup_name if keep_backup else None,
+        'duration': time.time() - start_time
+    }
+
+
+def load_query_log(cache_dir: str, limit: int, dims: int) -> np.ndarray:
+    """Recent query embeddings from the persistent embedding cache."""
+    cache = EmbeddingCache(cache_dir=cache_dir)
+    vectors = [vector for _, vector in cache.iter_persisted(limit=limit) if vector.shape[0] == dims]
+    return np.asarray(vectors, dtype=np.float32).reshape(len(vectors), dims)
+
+
+def exact_neighbours(collection, queries: np.ndarray, k: int, space: str, page_size: int = 1000) -> List[List[str]]:
+    """Brute-force top-k IDs per query under the collection's distance space."""
+    ids: List[str] = []
+    blocks = []
+    for offset in range(0, collection.count(), page_size):
+        page = collection.get(limit=page_size, offset=offset, include=["embeddings"])
+        ids.extend(page['ids'])
+        blocks.append(np.asarray(page['embeddings'], dtype=np.float32))
+    vectors = np.concatenate(blocks)
+
+    if space == "cosine":
+        vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        scores = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ vectors.T
+    elif space == "ip":
+        scores = queries @ vectors.T
+    else:
+        scores = -(np.sum(vectors ** 2, axis=1)[None, :] - 2 * queries @ vectors.T)
+
+    top = np.argsort(-scores, axis=1)[:, :k]
+    return [[ids[i] for i in row] for row in top]
+
+
+def probe(chroma_path: str, name: str, ef_search: int, queries_path: str, k: int) -> Dict[str, Any]:
+    """Apply ef_search before the index is loaded, then time the queries (one process per value)."""
+    client = chromadb.PersistentClient(path=chroma_path)
+    collection = open_collection(client, name)
+    tune_ef_search(collection, ef_search)
+    queries = np.load(queries_path)
+
+    # First query loads the index; not timed
+    collection.query(query_embeddings=[queries[0].tolist()], n_results=k, include=[])
+    found = []
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+        latencies.append((time.perf_counter() - start) * 1000)
+        found.append(result['ids'][0])
+    return {'ids': found, 'latencies_ms': latencies}
+
+
+def benchmark(chroma_path: str, name: str, ef_values: List[int], cache_dir: str,
+              limit: int, k: int) -> Optional[List[Dict[str, Any]]]:
+    """Recall@k and latency per ef_search value; the original ef_search is restored afterwards."""
+    client = chromadb.PersistentClient(path=chroma_path)
+    collection = open_collection(client, name)
+    hnsw = effective_hnsw(collection)
+    sample = collection.get(limit=1, include=["embeddings"])
+    if not len(sample['ids']):
+        return None
+
+    queries = load_query_log(cache_dir, limit, len(sample['embeddings'][0]))
+    if not len(queries):
+        return None
+    exact = exact_neighbours(collection, queries, k, hnsw.get('space', 'l2'))
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        queries_path = os.path.join(temp_dir, "queries.npy")
+        np.save(queries_path, queries)
+        try:
+            for ef_search in ef_values:
+                output = subprocess.run(
+                    [sys.executable, __file__, "probe", "--chroma-path", chroma_path, "--collection", name,
+                     "--ef-search", str(ef_search), "--queries-file", queries_path, "--k", str(k)],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                measured = json.loads(output.strip().splitlines()[-1])
+                recall = np.mean([len(set(truth) & set(found)) / len(truth)
+                                  for truth, found in zip(exact, measured['ids'])])
+                results.append({
+                    'ef_search': ef_search,
+                    'recall': float(recall),
+                    'p50_ms': float(np.percentile(measured['latencies_ms'], 50)),
+                    'p95_ms': float(np.percentile(measured['latencies_ms'], 95)),
+                })
+        finally:
+            if 'ef_search' in hnsw:
+                tune_ef_search(open_collection(chromadb.PersistentClient(path=chroma_path), name), hnsw['ef_search'])
+    return results
+
+
+def main():
+    """Main CLI interface"""
+    defaults = OptimizedContextualRAGSystem.HNSW_CONFIG
+    parser = argparse.ArgumentParser(description="ChromaDB collection maintenance")
+    parser.add_argument("command", choices=["report", "tune", "rebuild", "benchmark", "probe"],
+                        help="probe is used internally by benchmark")
+    parser.add_argument("--chroma-path", default="data/chroma_db", help="ChromaDB storage path")
+    parser.add_argument("--collection", default="contextual_rag_collection", help="Collection name")
+    parser.add_argument("--ef-search", type=int, default=defaults['ef_search'], help="HNSW ef_search")
+    parser.add_argument("--ef-construction", type=int, default=defaults['ef_construction'], help="HNSW ef_construction (rebuild)")
+    parser.add_argument("--max-neighbors", type=int, default=defaults['max_neighbors'], help="HNSW max_neighbors (rebuild)")
+    parser.add_argument("--drop-backup", action="store_true", help="Delete the original collection after rebuild")
+    parser.add_argument("--ef-values", default="16,32,64,100,200", help="Comma-separated ef_search values to benchmark")
+    parser.add_argument("--queries", type=int, default=200, help="Logged queries to benchmark")
+    parser.add_argument("--k", type=int, default=24, help="Benchmark recall@k (the vector branch fetches 24)")
+    parser.add_argument("--cache-dir", default="data/embedding_cache", help="Embedding cache holding the query log")
+    parser.add_argument("--queries-file", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.command == "probe":
+        print(json.dumps(probe(args.chroma_path, args.collection, args.ef_search, args.queries_file, args.k)))
+        return
+
+    if args.command == "benchmark":
+        ef_values = [int(value) for value in args.ef_values.split(",") if value.strip()]
+        results = benchmark(args.chroma_path, args.collection, ef_values, args.cache_dir, args.queries, args.k)
+        if not results:
+            print(f"❌ No logged queries in {args.cache_dir} (or the collection is empty)")
+            sys.exit(1)
+        print(f"⏱️  recall@{args.k} against exact search on logged queries:")
+        for result in results:
+            print(f"  ef_search {result['ef_search']:>4}  recall {result['recall']:.3f}  "
+                  f"p50 {result['p50_ms']:.2f} ms  p95 {result['p95_ms']:.2f} ms")
+        return
+
+    client = chromadb.PersistentClient(path=args.chroma_path)
+    try:
+        collection = open_collection(client, args.collection)
+    except Exception as e:
+        print(f"❌ Collection not found: {args.collection} ({e})")
+        sys.exit(1)
+
+    if args.command == "report":
+        print_report(collection)
+
+    elif args.command == "tune":
+        tune_ef_search(collection, args.ef_search)
+        print(f"✅ ef_search set to {args.ef_search} - restart the API to apply")
+
+    elif args.command == "rebuild":
+        hnsw = dict(defaults, ef_search=args.ef_search, ef_construction=args.ef_construction,
+                    max_neighbors=args.max_neighbors)
+        stats = rebuild_collection(client, args.collection, hnsw, keep_backup=not args.drop_backup)
+        print(f"✅ Rebuilt {stats['vectors']} vectors in {stats['duration']:.1f}s with {stats['hnsw']}")
+        if stats['backup']:
+            print(f"   💾 Original kept as '{stats['backup']}' (delete it once verified)")
+        print("   🔄 Restart the API to load the new index")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,9 +12,8 @@ import hashlib
 import time
 import argparse
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 from datetime import datetime
 
@@ -34,9 +33,15 @@ current_dir = Path(__file__).parent
 project_root = current_dir.parent
 sys.path.insert(0, str(project_root))
 
+from src.core.article_index import ArticleIndexWriter
 from src.core.contextual_rag import OptimizedContextualRAGSystem
+from src.core.ingestion_scheduler import IngestionScheduler, PipelineStage, ProviderLimiter, estimate_tokens
+from src.core.ingestion_writer import IngestionWriter
+from src.core.quantized_index import build_quantized_index
+from src.cache.llm_result_cache import LLMResultCache
 from src.vectorization.metadata_system import MetadataManager
 from src.vectorization.metadata_extractor import LegalMetadataExtractor, ExtractionConfig
+from tools.collection_maintenance import effective_hnsw, rebuild_collection
 
 @dataclass
 class DocumentRecord:
@@ -50,6 +55,8 @@ class DocumentRecord:
     # Legacy compatibility
     domain: str = "eu_crowdfunding"  # Default domain for backward compatibility
     doc_type: str = "standard"
+    # SHA-256 of each chunk's text, aligned with chunk_ids (empty for legacy records)
+    chunk_hashes: List[str] = field(default_factory=list)
 
 @dataclass
 class ProcessingConfig:
@@ -59,20 +66,51 @@ class ProcessingConfig:
     retry_attempts: int = 2
     enable_llm_extraction: bool = True
     extraction_timeout: float = 25.0
+    llm_cache_dir: Optional[str] = "data/llm_cache"  # None disables the LLM result cache
+    # Provider quotas (adaptive concurrency starts at half of max_workers and backs off on 429s)
+    gemini_requests_per_minute: float = 2000
+    gemini_tokens_per_minute: float = 2_000_000
+    openai_requests_per_minute: float = 3000
+    openai_tokens_per_minute: float = 1_000_000
+    # Embedding writes: tokens per embeddings request and batches embedding/writing at once
+    embedding_batch_tokens: int = 100_000
+    embedding_batches_in_flight: int = 2
 
 class DocumentManager:
     """Streamlined document manager - core functionality only"""
     
+    # Bump whenever the contextualization prompt changes (invalidates cached summaries)
+    CONTEXT_PROMPT_VERSION = "context-v1"
+    CONTEXT_MODEL = "gemini-1.5-flash-8b"
+    # Share of the collection a rebuild may leave out as orphans without --allow-drop
+    REBUILD_MAX_DROPPED = 0.1
+    
     def __init__(self, registry_path: str = "data/document_registry.json", config: Optional[ProcessingConfig] = None):
         self.registry_path = registry_path
         self.registry: Dict[str, DocumentRecord] = {}
         self.rag_system = None
+        self.article_index_writer = None
         self.config = config or ProcessingConfig()
         self.metadata_manager = MetadataManager()
         
         # Initialize Google Gen AI client for contextualization
         self._genai_client = genai.Client(api_key=os.getenv('GOOGLE_API_KEY'))
         
+        # Contextual summaries and extracted metadata survive re-runs and rebuilds
+        self.llm_cache = LLMResultCache(self.config.llm_cache_dir) if self.config.llm_cache_dir else None
+        
+        # Per-provider quotas shared by every model call made during ingestion
+        self.scheduler = IngestionScheduler({
+            'gemini': ProviderLimiter(
+                'gemini', self.config.gemini_requests_per_minute, self.config.gemini_tokens_per_minute,
+                max_concurrency=self.config.max_workers
+            ),
+            'openai': ProviderLimiter(
+                'openai', self.config.openai_requests_per_minute, self.config.openai_tokens_per_minute,
+                max_concurrency=self.config.max_workers
+            ),
+        }, max_workers=self.config.max_workers)
+        
         # Initialize LLM metadata extractor if enabled
         self.metadata_extractor = None
         if self.config.enable_llm_extraction:
@@ -80,7 +118,9 @@ class DocumentManager:
                 timeout=self.config.extraction_timeout,
                 retry_attempts=self.config.retry_attempts
             )
-            self.metadata_extractor = LegalMetadataExtractor(extraction_config)
+            self.metadata_extractor = LegalMetadataExtractor(
+                extraction_config, result_cache=self.llm_cache, rate_limiter=self.scheduler.limiter('gemini')
+            )
         
         # Load existing registry
         self._load_registry()
@@ -104,7 +144,8 @@ class DocumentManager:
                             'chunk_ids': record_data.get('chunk_ids', []),
                             'contextualized': record_data.get('contextualized', False),
                             'domain': record_data.get('domain', 'eu_crowdfunding'),
-                            'doc_type': record_data.get('doc_type', 'standard')
+                            'doc_type': record_data.get('doc_type', 'standard'),
+                            'chunk_hashes': record_data.get('chunk_hashes', [])
                         }
                         self.registry[filepath] = DocumentRecord(**clean_record)
                 print(f"✅ Loaded registry with {len(self.registry)} documents")
@@ -127,7 +168,8 @@ class DocumentManager:
                     'chunk_ids': record.chunk_ids,
                     'contextualized': record.contextualized,
                     'domain': record.domain,
-                    'doc_type': record.doc_type
+                    'doc_type': record.doc_type,
+                    'chunk_hashes': record.chunk_hashes
                 }
                 for filepath, record in self.registry.items()
             }
@@ -149,27 +191,64 @@ class DocumentManager:
         """Initialize RAG system if not already done"""
         if not self.rag_system:
             self.rag_system = OptimizedContextualRAGSystem()
+        if not self.article_index_writer:
+            self.article_index_writer = ArticleIndexWriter(self.rag_system.article_index.path)
+    
+    def _open_writer(self) -> IngestionWriter:
+        """Embedding writer for one ingestion run (feed it chunks as soon as they are processed)"""
+        self._init_rag_system()
+        return IngestionWriter(
+            self.rag_system.vectorstore._collection,
+            self.rag_system.embeddings,
+            limiter=self.scheduler.limiter('openai'),
+            max_batch_tokens=self.config.embedding_batch_tokens,
+            max_in_flight=self.config.embedding_batches_in_flight
+        )
     
-    def _add_documents_to_vectorstore(self, documents: List[Document]) -> bool:
+    def _embedding_document(self, doc: Document) -> Document:
+        """Copy of a chunk that embeds the hybrid content (context + original) with ChromaDB-safe metadata"""
+        return Document(
+            page_content=doc.metadata.get('hybrid_content', doc.page_content),
+            metadata=self._filter_metadata_for_chromadb(doc.metadata)
+        )
+    
+    def _add_documents_to_vectorstore(self, documents: List[Document], writer: Optional[IngestionWriter] = None) -> bool:
         """Add documents to vectorstore with hybrid content approach"""
         try:
-            # Create embedding documents that use hybrid content for vectorization
-            # but preserve original content in page_content
-            embedding_documents = []
+            writer = writer or self._open_writer()
             
+            # Chunks already handed to the writer during processing are not queued twice
+            embedding_documents = {}
             for doc in documents:
-                # Create a copy for embedding
-                embedding_doc = Document(
-                    page_content=doc.metadata.get('hybrid_content', doc.page_content),
-                    metadata=self._filter_metadata_for_chromadb(doc.metadata)
+                embedding_doc = self._embedding_document(doc)
+                embedding_documents[writer.add(embedding_doc)] = embedding_doc
+            result = writer.close()
+            print(f"📦 Embedded {len(result['written'])} chunks in {result['batches']} batches "
+                  f"(embed {result['embed_seconds']:.1f}s, write {result['upsert_seconds']:.1f}s, "
+                  f"wall {result['duration']:.1f}s)")
+            
+            # Index article references and BM25 terms against the stored chunk IDs
+            chunk_ids = result['written']
+            written_documents = [embedding_documents[chunk_id] for chunk_id in chunk_ids]
+            for chunk_id, embedding_doc in zip(chunk_ids, written_documents):
+                self.article_index_writer.add_chunk(
+                    chunk_id, embedding_doc.metadata.get('source', ''),
+                    embedding_doc.page_content, embedding_doc.metadata
                 )
-                embedding_documents.append(embedding_doc)
+            self.article_index_writer.save()
+            self.rag_system.lexical_index.add_documents(
+                chunk_ids,
+                [doc.page_content for doc in written_documents],
+                [doc.metadata.get('source', '') for doc in written_documents]
+            )
+            self.rag_system.lexical_index.save()
             
-            # Add to vectorstore using hybrid content for embeddings
-            self.rag_system.vectorstore.add_documents(embedding_documents)
+            if result['failed']:
+                print(f"❌ {len(result['failed'])} chunks failed to embed or write: {next(iter(result['failed'].values()))}")
+                return False
             
-            print(f"✅ Added {len(embedding_documents)} documents with hybrid embeddings and preserved original content")
-                return True
+            print(f"✅ Added {len(written_documents)} documents with hybrid embeddings and preserved original content")
+            return True
                 
         except Exception as e:
             print(f"❌ Error adding documents to vectorstore: {e}")
@@ -269,11 +348,21 @@ class DocumentManager:
         
         return [chunk for chunk in chunks if chunk.strip()]
 
+    @staticmethod
+    def _chunk_hash(chunk_text: str) -> str:
+        """SHA-256 of a chunk's text - context, metadata and embedding all derive from it"""
+        return hashlib.sha256(chunk_text.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _chunk_id(filepath: str, chunk_hash: str, occurrence: int = 0) -> str:
+        """Content-addressed vector ID: stable for as long as the chunk text is unchanged"""
+        return hashlib.sha256(f"{filepath}\0{chunk_hash}\0{occurrence}".encode('utf-8')).hexdigest()[:32]
+    
     def _load_and_chunk_document(self, filepath: str) -> List[Document]:
         """Load document and create chunks with metadata"""
         try:
-        loader = TextLoader(filepath, encoding='utf-8')
-        documents = loader.load()
+            loader = TextLoader(filepath, encoding='utf-8')
+            documents = loader.load()
         
             if not documents:
                 print(f"❌ No content loaded from {filepath}")
@@ -296,13 +385,18 @@ class DocumentManager:
             
             # Create Document objects with metadata
             chunks = []
+            occurrences: Dict[str, int] = {}
             for i, chunk_text in enumerate(chunk_texts):
+                chunk_hash = self._chunk_hash(chunk_text)
+                occurrence = occurrences.get(chunk_hash, 0)
+                occurrences[chunk_hash] = occurrence + 1
                 metadata = {
                     'source': filepath,
                     'chunk_index': i,
                     'document_title': document_title,
                     'char_count': len(chunk_text),
-                    'chunk_id': f"{filepath}:{i}"
+                    'chunk_id': self._chunk_id(filepath, chunk_hash, occurrence),
+                    'chunk_hash': chunk_hash
                 }
                 chunk_doc = Document(page_content=chunk_text, metadata=metadata)
                 chunks.append(chunk_doc)
@@ -318,6 +412,14 @@ class DocumentManager:
         """Contextualize a single chunk with retry logic - now returns both original and context"""
         chunk_index, chunk_text, document_title, filepath = chunk_data
         
+        chunk_hash = self._chunk_hash(chunk_text)
+        cache_context = f"{document_title}\0{filepath}"
+        if self.llm_cache:
+            cached = self.llm_cache.get('contextualization', self.CONTEXT_PROMPT_VERSION, self.CONTEXT_MODEL,
+                                        chunk_hash, cache_context)
+            if cached:
+                return (chunk_index, chunk_text, cached, len(chunk_text), True)
+        
         for attempt in range(self.config.retry_attempts):
             try:
                 prompt = f"""
@@ -338,17 +440,22 @@ Create a SHORT contextual summary that:
 
 Context summary:"""
 
-                response = self._genai_client.models.generate_content(
-                    model='gemini-1.5-flash-8b',
+                response = self.scheduler.limiter('gemini').call(
+                    self._genai_client.models.generate_content,
+                    model=self.CONTEXT_MODEL,
                     contents=prompt,
                     config=types.GenerateContentConfig(
                         temperature=0.1,
                         max_output_tokens=500  # Removed timeout parameter
-                    )
+                    ),
+                    tokens=estimate_tokens(prompt) + 500
                 )
                 
                 if response and response.text:
                     context_summary = response.text.strip()
+                    if self.llm_cache:
+                        self.llm_cache.put('contextualization', self.CONTEXT_PROMPT_VERSION, self.CONTEXT_MODEL,
+                                           chunk_hash, context_summary, cache_context)
                     return (chunk_index, chunk_text, context_summary, len(chunk_text), True)
                 else:
                     print(f"⚠️  Empty response for chunk {chunk_index}, attempt {attempt + 1}")
@@ -361,8 +468,13 @@ Context summary:"""
         
         return (chunk_index, chunk_text, "", len(chunk_text), False)
 
-    def _process_chunks_parallel(self, chunks: List[Document], document_title: str) -> Tuple[List[Document], Dict[str, Any]]:
-        """Process chunks in parallel for contextualization and metadata extraction"""
+    def _process_chunks_parallel(self, chunks: List[Document], document_title: str,
+                                 writer: Optional[IngestionWriter] = None) -> Tuple[List[Document], Dict[str, Any]]:
+        """Contextualize and extract metadata per chunk, pipelined under the provider rate limits
+        
+        With a writer, each chunk is queued for embedding as soon as it is processed, so
+        embedding requests and ChromaDB writes overlap with the remaining LLM calls.
+        """
         
         chunk_data = [
             (i, chunk.page_content, document_title, chunk.metadata['source'])
@@ -376,60 +488,59 @@ Context summary:"""
             'total_chunks': len(chunks)
         }
         
-        # Parallel contextualization
-        print(f"🧠 Contextualizing {len(chunks)} chunks...")
-        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-            context_futures = {
-                executor.submit(self._contextualize_chunk_with_retry, data): data[0] 
-                for data in chunk_data
-            }
+        # Both stages only need the original text, so they run side by side for each chunk
+        stages = [PipelineStage('context', lambda i, _: self._contextualize_chunk_with_retry(chunk_data[i]))]
+        if self.config.enable_llm_extraction and self.metadata_extractor:
+            stages.append(PipelineStage('metadata', lambda i, _: self._extract_metadata(chunk_data[i])))
+        
+        def apply_results(chunk_index: int, results: Dict[str, Any]):
+            chunk = processed_chunks[chunk_index]
+            original_text = chunk_data[chunk_index][1]
+            context_result = results['context']
+            if isinstance(context_result, Exception):
+                context_result = (chunk_index, original_text, "", len(original_text), False)
+            _, original_text, context_summary, char_count, success = context_result
             
-            with tqdm(total=len(chunk_data), desc="Contextualizing", unit="chunk") as pbar:
-                for future in as_completed(context_futures):
-                    chunk_index, original_text, context_summary, char_count, success = future.result()
-                    
-                    # CRITICAL: Preserve original content and add context
-                    chunk = processed_chunks[chunk_index]
-                    
-                    if success and context_summary:
-                        # Store original content as main content
-                        chunk.page_content = original_text
-                        
-                        # Add context summary to metadata
-                        chunk.metadata['context_summary'] = context_summary
-                        chunk.metadata['contextualized'] = True
-                        
-                        # Create hybrid content for embedding (original + context)
-                        hybrid_content = f"{context_summary}\n\nOriginal content:\n{original_text}"
-                        chunk.metadata['hybrid_content'] = hybrid_content
-                        
-                        processing_stats['contextualized_count'] += 1
+            # CRITICAL: Preserve original content and add context
+            chunk.page_content = original_text
+            if success and context_summary:
+                # Add context summary to metadata
+                chunk.metadata['context_summary'] = context_summary
+                chunk.metadata['contextualized'] = True
+                
+                # Create hybrid content for embedding (original + context)
+                chunk.metadata['hybrid_content'] = f"{context_summary}\n\nOriginal content:\n{original_text}"
+                processing_stats['contextualized_count'] += 1
             else:
-                        # Keep original content if contextualization failed
-                        chunk.page_content = original_text
-                        chunk.metadata['context_summary'] = ""
-                        chunk.metadata['contextualized'] = False
-                        chunk.metadata['hybrid_content'] = original_text
-                    
-                    chunk.metadata['char_count'] = char_count
-                    pbar.update(1)
+                # Keep original content if contextualization failed
+                chunk.metadata['context_summary'] = ""
+                chunk.metadata['contextualized'] = False
+                chunk.metadata['hybrid_content'] = original_text
+            chunk.metadata['char_count'] = char_count
+            
+            metadata_result = results.get('metadata')
+            if metadata_result and not isinstance(metadata_result, Exception):
+                _, metadata, success = metadata_result
+                if success and metadata:
+                    chunk.metadata.update(metadata)
+                    processing_stats['metadata_extracted_count'] += 1
+            
+            if writer:
+                writer.add(self._embedding_document(chunk))
         
-        # Parallel metadata extraction
-        if self.config.enable_llm_extraction and self.metadata_extractor:
-            print(f"🏷️  Extracting metadata from {len(chunks)} chunks...")
-            with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-                metadata_futures = {
-                    executor.submit(self._extract_metadata, data): data[0] 
-                    for data in chunk_data
-                }
-                
-                with tqdm(total=len(chunk_data), desc="Extracting metadata", unit="chunk") as pbar:
-                    for future in as_completed(metadata_futures):
-                        chunk_index, metadata, success = future.result()
-                        if success and metadata:
-                            processed_chunks[chunk_index].metadata.update(metadata)
-                            processing_stats['metadata_extracted_count'] += 1
-                        pbar.update(1)
+        print(f"🧠 Processing {len(chunks)} chunks ({', '.join(stage.name for stage in stages)})...")
+        with tqdm(total=len(chunks), desc="Processing", unit="chunk") as pbar:
+            def report_progress(stats: Dict[str, Any]):
+                gemini = stats['providers']['gemini']
+                pbar.set_postfix(
+                    chunks_s=f"{stats['chunks_per_s']:.2f}",
+                    tokens_s=f"{stats['tokens_per_s']:.0f}",
+                    concurrency=gemini['concurrency_limit'],
+                    throttled=gemini['rate_limited']
+                )
+                pbar.update(1)
+            
+            self.scheduler.run(processed_chunks, stages, on_item_done=apply_results, on_progress=report_progress)
         
         return processed_chunks, processing_stats
 
@@ -440,11 +551,11 @@ Context summary:"""
         try:
             metadata = self.metadata_extractor.extract_metadata(chunk_text)
             return (chunk_index, metadata, True)
-                    except Exception as e:
+        except Exception as e:
             print(f"⚠️  Metadata extraction failed for chunk {chunk_index}: {e}")
             return (chunk_index, {}, False)
 
-    def add_document(self, filepath: str, contextualize: bool = True) -> bool:
+    def add_document(self, filepath: str, contextualize: bool = True, sync_mirror: bool = True) -> bool:
         """Add a single document to the vector database"""
         try:
             if not os.path.exists(filepath):
@@ -459,97 +570,199 @@ Context summary:"""
                     return True
                 else:
                     print(f"🔄 Document {filepath} has changed, updating...")
-                    self._remove_existing_chunks(filepath)
+                    record = self.registry[filepath]
+                    if record.chunk_hashes and record.contextualized == contextualize:
+                        return self._update_document_incrementally(filepath, current_hash, contextualize, sync_mirror)
+                    if not self._remove_existing_chunks(filepath):
+                        return False
             
             # Load and chunk document
             chunks = self._load_and_chunk_document(filepath)
             if not chunks:
                 return False
             
-            # Process chunks (contextualize and extract metadata)
+            # Process chunks (contextualize and extract metadata), embedding them as they finish
+            writer = self._open_writer()
             if contextualize:
-                processed_chunks, processing_stats = self._process_chunks_parallel(chunks, os.path.basename(filepath))
+                processed_chunks, processing_stats = self._process_chunks_parallel(
+                    chunks, os.path.basename(filepath), writer
+                )
             else:
                 processed_chunks = chunks
                 processing_stats = {'contextualized_count': 0, 'metadata_extracted_count': 0, 'total_chunks': len(chunks)}
             
             # Add to vectorstore
-            success = self._add_documents_to_vectorstore(processed_chunks)
+            success = self._add_documents_to_vectorstore(processed_chunks, writer)
             if not success:
                 return False
             
             # Update registry
-            chunk_ids = [chunk.metadata['chunk_id'] for chunk in processed_chunks]
             self.registry[filepath] = DocumentRecord(
-                        filepath=filepath,
+                filepath=filepath,
                 chunk_count=len(processed_chunks),
                 last_updated=datetime.now().isoformat(),
                 file_hash=current_hash,
-                    chunk_ids=chunk_ids,
-                contextualized=contextualize and processing_stats['contextualized_count'] > 0
-                )
+                chunk_ids=[chunk.metadata['chunk_id'] for chunk in processed_chunks],
+                contextualized=contextualize and processing_stats['contextualized_count'] > 0,
+                chunk_hashes=[chunk.metadata['chunk_hash'] for chunk in processed_chunks]
+            )
             self._save_registry()
-                
+            if sync_mirror:
+                self.sync_vector_mirror()
+            
             print(f"✅ Successfully added {filepath}")
             print(f"   📊 {len(processed_chunks)} chunks, {processing_stats['contextualized_count']} contextualized")
-                return True
+            return True
                 
         except Exception as e:
             print(f"❌ Error adding document {filepath}: {e}")
             return False
     
+    def _delete_chunks(self, chunk_ids: List[str], batch_size: int = 500, retry_attempts: int = 3) -> bool:
+        """Delete chunks by ID from the collection and the article/BM25 indexes (batched, idempotent)"""
+        if not chunk_ids:
+            return True
+        self._init_rag_system()
+        collection = self.rag_system.vectorstore._collection
+        
+        success = True
+        for start in range(0, len(chunk_ids), batch_size):
+            batch = chunk_ids[start:start + batch_size]
+            for attempt in range(retry_attempts):
+                try:
+                    # Deleting IDs that are already gone is a no-op, so retries are safe
+                    collection.delete(ids=batch)
+                    break
+                except Exception as e:
+                    print(f"⚠️  Delete of {len(batch)} chunks failed (attempt {attempt + 1}): {e}")
+                    if attempt == retry_attempts - 1:
+                        success = False
+                    else:
+                        time.sleep(1 * (attempt + 1))
+        
+        # Only drop index entries for chunks that are really gone from the collection
+        remaining = set(collection.get(ids=chunk_ids, include=[])['ids']) if not success else set()
+        deleted = [chunk_id for chunk_id in chunk_ids if chunk_id not in remaining]
+        self.article_index_writer.remove_chunks(deleted)
+        self.article_index_writer.save()
+        self.rag_system.lexical_index.remove_ids(deleted)
+        self.rag_system.lexical_index.save()
+        return not remaining
+    
+    def _migrate_legacy_chunk_ids(self, filepaths: Optional[List[str]] = None) -> int:
+        """
+        Point legacy registry records at the chunk IDs actually stored in the collection.
+        
+        Records written before content-addressed chunk IDs (no chunk hashes) hold
+        'path:i' labels, while the collection holds the IDs the vector store generated.
+        Those are looked up by source and saved back to the registry; records whose
+        chunks cannot be found keep their labels so reconcile reports them as missing.
+        
+        Returns:
+            Number of records rewritten
+        """
+        self._init_rag_system()
+        collection = self.rag_system.vectorstore._collection
+        
+        migrated = 0
+        for filepath in filepaths if filepaths is not None else list(self.registry):
+            record = self.registry.get(filepath)
+            if record is None or record.chunk_hashes:
+                continue
+            stored = collection.get(where={"source": filepath}, include=["metadatas"])
+            if not stored['ids']:
+                continue
+            rows = sorted(zip(stored['ids'], stored['metadatas']),
+                          key=lambda row: (row[1] or {}).get('chunk_index', 0))
+            chunk_ids = [chunk_id for chunk_id, _ in rows]
+            if chunk_ids != record.chunk_ids:
+                record.chunk_ids = chunk_ids
+                record.chunk_count = len(chunk_ids)
+                migrated += 1
+        
+        if migrated:
+            self._save_registry()
+            print(f"🔁 Migrated {migrated} legacy registry records to their stored chunk IDs")
+        return migrated
+    
     def _remove_existing_chunks(self, filepath: str) -> bool:
-        """Remove existing chunks for a document from vectorstore"""
+        """Remove existing chunks for a document by the chunk IDs stored in the registry"""
         try:
             if filepath not in self.registry:
                 return True
             
+            self._migrate_legacy_chunk_ids([filepath])
             record = self.registry[filepath]
-            
-            # Use ChromaDB delete functionality if available
-            if hasattr(self.rag_system.vectorstore, '_collection'):
-            collection = self.rag_system.vectorstore._collection
-                
-                # Delete by source metadata
-                try:
-                    collection.delete(where={"source": filepath})
-                    print(f"🗑️  Removed chunks for {filepath} using ChromaDB delete")
-            return True
-        except Exception as e:
-                    print(f"⚠️  ChromaDB delete failed: {e}")
-            
-            # Fallback: recreate collection (more drastic but reliable)
-            try:
-                print(f"🔄 Recreating collection to remove chunks for {filepath}")
-                
-                # Get all documents except the one we're removing
-                all_docs = []
-                for other_filepath, other_record in self.registry.items():
-                    if other_filepath != filepath:
-                        other_chunks = self._load_and_chunk_document(other_filepath)
-                        if other_record.contextualized:
-                            other_chunks, _ = self._process_chunks_parallel(other_chunks, os.path.basename(other_filepath))
-                        all_docs.extend(other_chunks)
-                
-                # Recreate vectorstore
-                if hasattr(self.rag_system.vectorstore, '_collection'):
-                    collection = self.rag_system.vectorstore._collection
-                    collection.delete()  # Clear collection
-                
-                # Re-add all other documents
-                if all_docs:
-                    self._add_documents_to_vectorstore(all_docs)
-                
-                return True
-                
-            except Exception as e:
-                print(f"❌ Failed to recreate collection: {e}")
+            if not self._delete_chunks(record.chunk_ids):
+                print(f"❌ Some chunks of {filepath} could not be deleted - re-run the command or 'reconcile --repair'")
                 return False
+            print(f"🗑️  Removed {len(record.chunk_ids)} chunks for {filepath}")
+            return True
                 
         except Exception as e:
             print(f"❌ Error removing chunks for {filepath}: {e}")
             return False
     
+    def _update_document_incrementally(self, filepath: str, file_hash: str, contextualize: bool,
+                                       sync_mirror: bool = True) -> bool:
+        """Re-ingest only the chunks whose text changed; unchanged chunks keep their vectors and IDs"""
+        record = self.registry[filepath]
+        chunks = self._load_and_chunk_document(filepath)
+        if not chunks:
+            return False
+        
+        self._init_rag_system()
+        collection = self.rag_system.vectorstore._collection
+        stored_ids = set(record.chunk_ids)
+        current_ids = {chunk.metadata['chunk_id'] for chunk in chunks}
+        kept_chunks = [chunk for chunk in chunks if chunk.metadata['chunk_id'] in stored_ids]
+        new_chunks = [chunk for chunk in chunks if chunk.metadata['chunk_id'] not in stored_ids]
+        stale_ids = [chunk_id for chunk_id in record.chunk_ids if chunk_id not in current_ids]
+        print(f"🧩 {len(kept_chunks)} unchanged, {len(new_chunks)} new or changed, {len(stale_ids)} removed chunks")
+        
+        # Contextualize, extract and embed only the new chunks
+        contextualized_count = 0
+        if new_chunks:
+            writer = self._open_writer()
+            if contextualize:
+                new_chunks, processing_stats = self._process_chunks_parallel(
+                    new_chunks, os.path.basename(filepath), writer
+                )
+                contextualized_count = processing_stats['contextualized_count']
+            if not self._add_documents_to_vectorstore(new_chunks, writer):
+                return False
+        
+        try:
+            # Unchanged chunks may have moved within the document
+            if kept_chunks:
+                collection.update(
+                    ids=[chunk.metadata['chunk_id'] for chunk in kept_chunks],
+                    metadatas=[{'chunk_index': chunk.metadata['chunk_index']} for chunk in kept_chunks]
+                )
+            if stale_ids and not self._delete_chunks(stale_ids):
+                raise RuntimeError(f"{len(stale_ids)} replaced chunks could not be deleted")
+        except Exception as e:
+            print(f"❌ Error updating chunks for {filepath}: {e}")
+            return False
+        
+        self.registry[filepath] = DocumentRecord(
+            filepath=filepath,
+            chunk_count=len(chunks),
+            last_updated=datetime.now().isoformat(),
+            file_hash=file_hash,
+            chunk_ids=[chunk.metadata['chunk_id'] for chunk in chunks],
+            contextualized=contextualize and (contextualized_count > 0 or (bool(kept_chunks) and record.contextualized)),
+            domain=record.domain,
+            doc_type=record.doc_type,
+            chunk_hashes=[chunk.metadata['chunk_hash'] for chunk in chunks]
+        )
+        self._save_registry()
+        if sync_mirror and (new_chunks or stale_ids):
+            self.sync_vector_mirror()
+        
+        print(f"✅ Successfully updated {filepath} ({len(new_chunks)} chunks re-embedded)")
+        return True
+    
     def update_document(self, filepath: str, contextualize: bool = True) -> bool:
         """Update an existing document"""
         return self.add_document(filepath, contextualize)
@@ -557,21 +770,183 @@ Context summary:"""
     def remove_document(self, filepath: str) -> bool:
         """Remove a document from the vector database"""
         try:
-        if filepath not in self.registry:
+            if filepath not in self.registry:
                 print(f"⚠️  Document {filepath} not found in registry")
-            return False
-        
-        success = self._remove_existing_chunks(filepath)
-        if success:
-            del self.registry[filepath]
-            self._save_registry()
+                return False
+            
+            success = self._remove_existing_chunks(filepath)
+            if success:
+                del self.registry[filepath]
+                self._save_registry()
+                self.sync_vector_mirror()
                 print(f"✅ Successfully removed {filepath}")
-        return success
+            return success
                 
         except Exception as e:
             print(f"❌ Error removing document {filepath}: {e}")
             return False
     
+    def rebuild_article_index(self, page_size: int = 500) -> int:
+        """Rebuild the article and BM25 indexes from every chunk in the collection"""
+        try:
+            self._init_rag_system()
+            collection = self.rag_system.vectorstore._collection
+            writer = ArticleIndexWriter(self.rag_system.article_index.path, start_empty=True)
+            lexical_index = self.rag_system.lexical_index
+            lexical_index.clear()
+            
+            indexed = 0
+            offset = 0
+            while True:
+                page = collection.get(limit=page_size, offset=offset, include=["documents", "metadatas"])
+                if not page['ids']:
+                    break
+                for chunk_id, text, metadata in zip(page['ids'], page['documents'], page['metadatas']):
+                    writer.add_chunk(chunk_id, (metadata or {}).get('source', ''), text or '', metadata)
+                lexical_index.add_documents(
+                    page['ids'],
+                    [text or '' for text in page['documents']],
+                    [(metadata or {}).get('source', '') for metadata in page['metadatas']]
+                )
+                indexed += len(page['ids'])
+                offset += page_size
+            
+            size = writer.save()
+            lexical_index.save()
+            self.article_index_writer = writer
+            print(f"✅ Article and BM25 indexes rebuilt from {indexed} chunks (article index {size} bytes)")
+            return indexed
+            
+        except Exception as e:
+            print(f"❌ Error rebuilding article index: {e}")
+            return -1
+    
+    def reconcile(self, repair: bool = False, page_size: int = 1000) -> Dict[str, Any]:
+        """
+        Compare registry chunk IDs with the collection.
+        
+        With repair, orphan chunks (in the collection but in no registry record) are
+        deleted, documents with missing chunks are re-ingested (only the missing chunks
+        are re-embedded when the record has chunk hashes) and the article/BM25 indexes
+        are rebuilt from the collection.
+        """
+        self._init_rag_system()
+        collection = self.rag_system.vectorstore._collection
+        self._migrate_legacy_chunk_ids()
+        
+        stored = set()
+        offset = 0
+        while True:
+            page = collection.get(limit=page_size, offset=offset, include=[])
+            if not page['ids']:
+                break
+            stored.update(page['ids'])
+            offset += page_size
+        
+        registered = {
+            chunk_id: filepath
+            for filepath, record in self.registry.items()
+            for chunk_id in record.chunk_ids
+        }
+        orphans = sorted(stored - registered.keys())
+        missing: Dict[str, List[str]] = {}
+        for chunk_id, filepath in registered.items():
+            if chunk_id not in stored:
+                missing.setdefault(filepath, []).append(chunk_id)
+        
+        report = {
+            'collection_chunks': len(stored),
+            'registry_chunks': len(registered),
+            'orphan_chunks': orphans,
+            'missing_chunks': missing,
+            'repaired': None
+        }
+        if not repair or not (orphans or missing):
+            return report
+        
+        repaired = self._delete_chunks(orphans)
+        for filepath, missing_ids in missing.items():
+            if not os.path.exists(filepath):
+                print(f"⚠️  Cannot re-ingest {filepath}: file not found")
+                repaired = False
+                continue
+            # Forget the missing chunks so the update re-ingests exactly those
+            record = self.registry[filepath]
+            missing_set = set(missing_ids)
+            kept = [i for i, chunk_id in enumerate(record.chunk_ids) if chunk_id not in missing_set]
+            record.chunk_ids = [record.chunk_ids[i] for i in kept]
+            record.chunk_hashes = [record.chunk_hashes[i] for i in kept] if record.chunk_hashes else []
+            record.file_hash = ""
+            repaired = self.add_document(filepath, record.contextualized, sync_mirror=False) and repaired
+        
+        self.rebuild_article_index()
+        self.sync_vector_mirror()
+        report['repaired'] = repaired
+        return report
+    
+    def rebuild_collection(self, keep_backup: bool = True, allow_drop: bool = False) -> bool:
+        """
+        Offline rebuild: copy every registered chunk with its stored embedding into a
+        fresh collection (no LLM or embedding API calls), then rebuild the indexes.
+        Run with ingestion and the API stopped.
+        
+        The swap is refused when more than a tenth of the collection would be left
+        out as orphans, unless allow_drop is set.
+        """
+        try:
+            self._init_rag_system()
+            collection = self.rag_system.vectorstore._collection
+            self._migrate_legacy_chunk_ids()
+            hnsw = dict(OptimizedContextualRAGSystem.HNSW_CONFIG)
+            hnsw['ef_search'] = effective_hnsw(collection).get('ef_search', hnsw['ef_search'])
+            registered = {chunk_id for record in self.registry.values() for chunk_id in record.chunk_ids}
+            
+            stats = rebuild_collection(
+                self.rag_system.chroma_client, self.rag_system.collection_name, hnsw,
+                keep_backup=keep_backup, keep_ids=registered,
+                max_dropped=None if allow_drop else self.REBUILD_MAX_DROPPED
+            )
+            print(f"✅ Rebuilt collection with {stats['vectors']} chunks in {stats['duration']:.1f}s "
+                  f"({stats['dropped']} orphan chunks left out)")
+            if stats['backup']:
+                print(f"   💾 Original kept as '{stats['backup']}' (delete it once verified)")
+            
+            # Reopen the rebuilt collection and derive the indexes from it
+            self.rag_system = None
+            self.article_index_writer = None
+            self._init_rag_system()
+            self.rebuild_article_index()
+            self.sync_vector_mirror()
+            
+            missing = len(registered) - stats['vectors']
+            if missing:
+                print(f"⚠️  {missing} registered chunks had no stored embedding - run 'reconcile --repair'")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error rebuilding collection: {e}")
+            return False
+    
+    def sync_vector_mirror(self) -> bool:
+        """Rebuild the quantized ANN mirror (only if one was built with tools/vector_mirror.py)"""
+        try:
+            self._init_rag_system()
+            mirror = self.rag_system.quantized_index
+            if not mirror.is_loaded():
+                return False
+            
+            current = mirror.get_stats()
+            stats = build_quantized_index(
+                self.rag_system.vectorstore._collection, mirror.path,
+                mode=current['mode'], dims=current['dims']
+            )
+            print(f"🔄 Vector mirror synced: {stats['vectors']} vectors ({stats['mode']} x {stats['dims']} dims)")
+            return True
+            
+        except Exception as e:
+            print(f"⚠️  Vector mirror sync failed - run tools/vector_mirror.py sync: {e}")
+            return False
+    
     def list_documents(self) -> List[DocumentRecord]:
         """List all documents in the registry"""
         return list(self.registry.values())
@@ -603,7 +978,9 @@ Context summary:"""
         
         try:
             for filepath in filepaths:
-                results[filepath] = self.add_document(filepath, contextualize)
+                results[filepath] = self.add_document(filepath, contextualize, sync_mirror=False)
+            if any(results.values()):
+                self.sync_vector_mirror()
             
         except Exception as e:
             print(f"❌ Error in batch processing: {e}")
@@ -620,6 +997,7 @@ Context summary:"""
                 'total_documents': len(self.registry),
                 'total_chunks': sum(record.chunk_count for record in self.registry.values()),
                 'contextualized_documents': sum(1 for record in self.registry.values() if record.contextualized),
+                'llm_cache': self.llm_cache.get_stats() if self.llm_cache else None,
                 'documents': [
                     {
                         'filepath': record.filepath,
@@ -638,24 +1016,30 @@ Context summary:"""
                 
             return stats
             
-                            except Exception as e:
+        except Exception as e:
             print(f"❌ Error getting stats: {e}")
             return {'error': str(e)}
 
 def main():
     """Main CLI interface - simplified commands"""
     parser = argparse.ArgumentParser(description="Clean Document Manager for Vector Database")
-    parser.add_argument("command", choices=["add", "update", "remove", "list", "validate", "info", "batch", "stats"])
+    parser.add_argument("command", choices=["add", "update", "remove", "list", "validate", "info", "batch", "stats", "index",
+                                            "reconcile", "rebuild"])
     parser.add_argument("filepath", nargs="?", help="Path to document file or batch file")
     parser.add_argument("--no-contextualize", action="store_true", help="Skip contextualization")
     parser.add_argument("--no-extraction", action="store_true", help="Skip LLM metadata extraction")
     parser.add_argument("--workers", type=int, default=8, help="Number of parallel workers")
+    parser.add_argument("--no-llm-cache", action="store_true", help="Call the LLM even for chunks with cached results")
+    parser.add_argument("--repair", action="store_true", help="reconcile: delete orphan chunks and re-ingest missing ones")
+    parser.add_argument("--drop-backup", action="store_true", help="rebuild: delete the original collection afterwards")
+    parser.add_argument("--allow-drop", action="store_true", help="rebuild: swap even if many chunks are not in the registry")
     
     args = parser.parse_args()
     
     config = ProcessingConfig(
         max_workers=args.workers,
-        enable_llm_extraction=not args.no_extraction
+        enable_llm_extraction=not args.no_extraction,
+        llm_cache_dir=None if args.no_llm_cache else ProcessingConfig.llm_cache_dir
     )
     
     manager = DocumentManager(config=config)
@@ -734,9 +1118,9 @@ def main():
             if isinstance(batch_data, list):
                 filepaths = [item if isinstance(item, str) else item.get('filepath') for item in batch_data]
                 filepaths = [fp for fp in filepaths if fp]
-                else:
+            else:
                 print("❌ Error: Batch file must contain a JSON array")
-                    sys.exit(1)
+                sys.exit(1)
             
             contextualize = not args.no_contextualize
             results = manager.add_documents_batch(filepaths, contextualize)
@@ -750,6 +1134,29 @@ def main():
             print(f"❌ Batch processing failed: {e}")
             sys.exit(1)
     
+    elif args.command == "index":
+        indexed = manager.rebuild_article_index()
+        sys.exit(0 if indexed >= 0 else 1)
+    
+    elif args.command == "reconcile":
+        report = manager.reconcile(repair=args.repair)
+        missing = sum(len(ids) for ids in report['missing_chunks'].values())
+        print(f"🔍 Collection: {report['collection_chunks']} chunks, registry: {report['registry_chunks']} chunks")
+        print(f"  👻 Orphan chunks (not in registry): {len(report['orphan_chunks'])}")
+        print(f"  🕳️  Missing chunks (not in collection): {missing} in {len(report['missing_chunks'])} documents")
+        for filepath, ids in list(report['missing_chunks'].items())[:5]:
+            print(f"    - {filepath}: {len(ids)}")
+        if report['repaired'] is None:
+            consistent = not report['orphan_chunks'] and not missing
+            print("✅ Registry and collection are consistent" if consistent else "   Run with --repair to fix")
+            sys.exit(0 if consistent else 1)
+        print("✅ Repaired" if report['repaired'] else "❌ Repair incomplete")
+        sys.exit(0 if report['repaired'] else 1)
+    
+    elif args.command == "rebuild":
+        success = manager.rebuild_collection(keep_backup=not args.drop_backup, allow_drop=args.allow_drop)
+        sys.exit(0 if success else 1)
+    
     elif args.command == "stats":
         stats = manager.get_stats()
         print("📊 Clean Document Manager Statistics:")
@@ -757,6 +1164,9 @@ def main():
         print(f"  📄 Total Chunks: {stats['total_chunks']}")
         print(f"  🧠 Contextualized: {stats['contextualized_documents']}")
         print(f"  📝 Non-contextualized: {stats['total_documents'] - stats['contextualized_documents']}")
+        if stats.get('llm_cache'):
+            cached = ", ".join(f"{name}: {count}" for name, count in stats['llm_cache']['entries'].items())
+            print(f"  💾 LLM Result Cache: {cached or 'empty'}")
         print(f"  🔧 Max Workers: {stats['config']['max_workers']}")
         print(f"  🏷️  LLM Extraction: {'✅ Enabled' if stats['config']['enable_llm_extraction'] else '❌ Disabled'}")
         print()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Quantized Vector Mirror Maintenance
+Builds the in-process ANN mirror of the ChromaDB collection and benchmarks it against ChromaDB.
+Run "sync" after ingestion; running API workers pick up the new mirror on their next query.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path for local imports
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.insert(0, str(project_root))
+
+import chromadb
+
+from src.cache.embedding_cache import EmbeddingCache
+from src.core.quantized_index import QUANTIZATION_MODES, QuantizedVectorIndex, build_quantized_index
+
+
+def open_collection(chroma_path: str, collection_name: str):
+    """Open the persisted collection without an embedding function."""
+    client = chromadb.PersistentClient(path=chroma_path)
+    return client.get_collection(name=collection_name)
+
+
+def print_stats(index: QuantizedVectorIndex):
+    """Print mirror statistics."""
+    stats = index.get_stats()
+    if not stats['loaded']:
+        print(f"❌ No mirror at {index.path} - run 'sync' first")
+        return
+    print("📊 Quantized Mirror Statistics:")
+    print(f"  🔢 Vectors: {stats['vectors']}")
+    print(f"  🗜️  Codes: {stats['mode']} x {stats['dims']} dims (full: {stats['full_dims']})")
+    print(f"  🕒 Built: {stats['built_at']}")
+
+
+def load_benchmark_queries(index: QuantizedVectorIndex, cache_dir: str, count: int, seed: int = 0) -> np.ndarray:
+    """Recent real query embeddings from the embedding cache, topped up with stored chunk vectors."""
+    cache = EmbeddingCache(cache_dir=cache_dir)
+    queries = [vector for _, vector in cache.iter_persisted(limit=count)
+               if vector.shape[0] == index.get_stats()['full_dims']]
+
+    if len(queries) < count:
+        _, full = index.vectors()
+        rng = np.random.default_rng(seed)
+        rows = rng.choice(len(full), size=min(count - len(queries), len(full)), replace=False)
+        queries.extend(np.asarray(full[rows], dtype=np.float32))
+    return np.asarray(queries, dtype=np.float32)
+
+
+def benchmark(index: QuantizedVectorIndex, collection, queries: np.ndarray, k: int):
+    """Compare recall@k and latency of the mirror and ChromaDB against exact search."""
+    ids, full = index.vectors()
+    full = np.asarray(full, dtype=np.float32)
+    normalized = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    exact = [set(ids[i] for i in np.argsort(-(full @ query))[:k]) for query in normalized]
+
+    results = {}
+    for name, search in (
+        ("mirror", lambda query: [chunk_id for chunk_id, _ in index.search(query, k)]),
+        ("chromadb", lambda query: collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])['ids'][0]),
+    ):
+        latencies = []
+        recall = 0.0
+        for query, truth in zip(queries, exact):
+            start = time.perf_counter()
+            found = search(query)
+            latencies.append(time.perf_counter() - start)
+            recall += len(truth.intersection(found)) / max(len(truth), 1)
+        latencies_ms = np.array(latencies) * 1000
+        results[name] = {
+            'recall': recall / len(queries),
+            'p50_ms': float(np.percentile(latencies_ms, 50)),
+            'p95_ms': float(np.percentile(latencies_ms, 95)),
+        }
+    return results
+
+
+def main():
+    """Main CLI interface"""
+    parser = argparse.ArgumentParser(description="Quantized vector mirror maintenance")
+    parser.add_argument("command", choices=["sync", "stats", "benchmark"])
+    parser.add_argument("--chroma-path", default="data/chroma_db", help="ChromaDB storage path")
+    parser.add_argument("--collection", default="contextual_rag_collection", help="Collection name")
+    parser.add_argument("--index", default=None, help="Mirror directory (default: inside --chroma-path)")
+    parser.add_argument("--mode", choices=QUANTIZATION_MODES, default="int8", help="Coarse-pass quantization")
+    parser.add_argument("--dims", type=int, default=256, help="Matryoshka dimensions kept for the coarse pass (0 = all)")
+    parser.add_argument("--queries", type=int, default=200, help="Benchmark queries")
+    parser.add_argument("--k", type=int, default=10, help="Benchmark recall@k")
+    parser.add_argument("--cache-dir", default="data/embedding_cache", help="Embedding cache with logged queries")
+
+    args = parser.parse_args()
+    index_path = args.index or str(Path(args.chroma_path) / "quantized_index")
+
+    if args.command == "sync":
+        collection = open_collection(args.chroma_path, args.collection)
+        stats = build_quantized_index(collection, index_path, mode=args.mode, dims=args.dims or None)
+        print(f"✅ Synced {stats['vectors']} vectors ({stats['mode']} x {stats['dims']} dims, "
+              f"{stats['code_bytes'] / (1024 * 1024):.1f} MB codes) in {stats['build_time']:.1f}s")
+        return
+
+    index = QuantizedVectorIndex(index_path)
+    if args.command == "stats":
+        print_stats(index)
+        return
+
+    if not index.is_loaded() or not len(index):
+        print(f"❌ No mirror at {index_path} - run 'sync' first")
+        sys.exit(1)
+
+    collection = open_collection(args.chroma_path, args.collection)
+    queries = load_benchmark_queries(index, args.cache_dir, args.queries)
+    results = benchmark(index, collection, queries, args.k)
+
+    print(f"⏱️  {len(queries)} queries, recall@{args.k} against exact search:")
+    for name, result in results.items():
+        print(f"  {name:<9} recall {result['recall']:.3f}  p50 {result['p50_ms']:.2f} ms  p95 {result['p95_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()